@@ -9,6 +9,12 @@ Revision log
 1.0.0 - 6/10/2022 - Updated parameters for specific outputs to be more clear, simplified output
 1.1.0 - 12/21/2022 - Added ability to calculate cut and fill volumes and export a landxml
 1.2.0 - 2/19/2024 - Added error checking & implemented resampling of the input raster
+1.3.0 - 10/16/2026 - Grading boundaries extracted by raster morphology instead of polygonizing and buffering the cut/fill raster
+1.4.0 - 10/16/2026 - Volumes, graded area and cut and fill rasters from one streaming pass over the surfaces
+1.4.1 - 10/16/2026 - Row corner and end points from one packed vertex array instead of per-vertex distance checks
+1.4.2 - 10/16/2026 - Row spacing from the spatial index instead of a near table of the rows
+1.4.3 - 10/16/2026 - LandXML streamed from the triangle arrays instead of an lxml tree
+1.4.4 - 10/16/2026 - TIN triangles read in memory for the LandXML export instead of through a temporary shapefile
 """
 
 # Load modules
@@ -17,14 +23,17 @@ import os.path
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
-import shapefile
 import os
-import lxml.etree as ET
+from gradingBounds import gradingBounds
+from cutFillVolumes import cutFillVolumes
+from rowGeometry import insertRowPoints
+from spatialIndex import nearestTable
+from landXML import readTriangles, writeTriangleLandXML
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.2.0"
+__version__     = "1.4.4"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcGIS 3.0.3"
 __maintainer__  = ["Zane Nordquist"]
@@ -271,108 +280,8 @@ class SATGradeConventional(object):
         rowPoints = arcpy.management.CreateFeatureclass("in_memory", "rowPoints", "POINT", "#", "DISABLED", "DISABLED",rowsInput)
         arcpy.management.AddFields(rowPoints, [["PolygonOID", "LONG"], ["Position", "TEXT"]])
 
-        insert_cursor = arcpy.da.InsertCursor(rowPoints, ["SHAPE@", "PolygonOID", "Position"])
-        search_cursor = arcpy.da.SearchCursor(rowsInput, ["SHAPE@", "OID@"])
-
-        for row in search_cursor:
-            try:
-                polygon_oid = str(row[1])
-
-                coordinateList = []
-                lowerLeft_distances = {}
-                lowerRight_distances = {}
-                upperLeft_distances = {}
-                upperRight_distances = {}
-
-                for part in row[0]:
-                    for pnt in part:
-                        if pnt:
-                            coordinateList.append((pnt.X, pnt.Y))
-
-                # Finds the extent of each polygon
-                polygonExtent = row[0].extent
-
-                lowerLeft_coordinate = polygonExtent.lowerLeft
-                lowerRight_coordinate = polygonExtent.lowerRight
-                upperLeft_coordinate = polygonExtent.upperLeft
-                upperRight_coordinate = polygonExtent.upperRight
-
-                lowerLeft_point = arcpy.PointGeometry(lowerLeft_coordinate)
-                lowerRight_point = arcpy.PointGeometry(lowerRight_coordinate)
-                upperLeft_point = arcpy.PointGeometry(upperLeft_coordinate)
-                upperRight_point = arcpy.PointGeometry(upperRight_coordinate)
-
-                # Finds the vertex closest to each corner of the polygon extent
-                for vertex in coordinateList:
-                    vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                    vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                    lowerLeft_distances[float(lowerLeft_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-                for vertex in coordinateList:
-                    vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                    vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                    lowerRight_distances[float(lowerRight_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-                for vertex in coordinateList:
-                    vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                    vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                    upperLeft_distances[float(upperLeft_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-                for vertex in coordinateList:
-                    vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                    vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                    upperRight_distances[float(upperRight_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-                # Calculates where quarter quarter sections would intersect polygon
-                LLminDistance = min(lowerLeft_distances)
-                LRminDistance = min(lowerRight_distances)
-                ULminDistance = min(upperLeft_distances)
-                URminDistance = min(upperRight_distances)
-
-                top_left_X = float(upperLeft_distances[ULminDistance][0])
-                top_left_Y = float(upperLeft_distances[ULminDistance][1])
-                top_right_X = float(upperRight_distances[URminDistance][0])
-                top_right_Y = float(upperRight_distances[URminDistance][1])
-
-                bottom_left_X = float(lowerLeft_distances[LLminDistance][0])
-                bottom_left_Y = float(lowerLeft_distances[LLminDistance][1])
-                bottom_right_X = float(lowerRight_distances[LRminDistance][0])
-                bottom_right_Y = float(lowerRight_distances[LRminDistance][1])
-
-                top_left_point = arcpy.PointGeometry(arcpy.Point(top_left_X, top_left_Y))
-                top_right_point = arcpy.PointGeometry(arcpy.Point(top_right_X, top_right_Y))
-                bottom_left_point = arcpy.PointGeometry(arcpy.Point(bottom_left_X, bottom_left_Y))
-                bottom_right_point = arcpy.PointGeometry(arcpy.Point(bottom_right_X, bottom_right_Y))
-
-                insert_cursor.insertRow((top_left_point, polygon_oid, "NW"))
-                insert_cursor.insertRow((top_right_point, polygon_oid, "NE"))
-                insert_cursor.insertRow((bottom_left_point, polygon_oid, "SW"))
-                insert_cursor.insertRow((bottom_right_point, polygon_oid, "SE"))
-
-                west_line = arcpy.Polyline(
-                    arcpy.Array([arcpy.Point(top_left_X, top_left_Y), arcpy.Point(bottom_left_X, bottom_left_Y)]))
-                east_line = arcpy.Polyline(
-                    arcpy.Array([arcpy.Point(top_right_X, top_right_Y), arcpy.Point(bottom_right_X, bottom_right_Y)]))
-                north_line = arcpy.Polyline(
-                    arcpy.Array([arcpy.Point(top_left_X, top_left_Y), arcpy.Point(top_right_X, top_right_Y)]))
-                south_line = arcpy.Polyline(arcpy.Array(
-                    [arcpy.Point(bottom_left_X, bottom_left_Y), arcpy.Point(bottom_right_X, bottom_right_Y)]))
-
-                west_point = west_line.positionAlongLine(0.5, True)
-                east_point = east_line.positionAlongLine(0.5, True)
-                north_point = north_line.positionAlongLine(0.5, True)
-                south_point = south_line.positionAlongLine(0.5, True)
-
-                insert_cursor.insertRow((west_point, polygon_oid, "W"))
-                insert_cursor.insertRow((east_point, polygon_oid, "E"))
-                insert_cursor.insertRow((north_point, polygon_oid, "N"))
-                insert_cursor.insertRow((south_point, polygon_oid, "S"))
-
-            except Exception as err:
-                arcpy.AddMessage(str(err.message))
-
-        del insert_cursor
-        del search_cursor
+        # Vertices nearest the corners of each row extent and the midpoints of the edges between them
+        insertRowPoints(rowPoints, rowsInput, ["NW", "NE", "SW", "SE", "W", "E", "N", "S"])
 
         # Separate out end and corner points
         rowEndPoints = arcpy.analysis.Select(rowPoints, "rowEndPoints", "Position = 'S' Or Position = 'N'")
@@ -419,29 +328,13 @@ def lineID(pos,row_ID):
         tin_name = str(outputPath + "\poaBase_TIN_ST")
         poaBase_TIN = arcpy.ddd.CreateTin(tin_name, spatialRef, "boundLines Shape.Z Hard_Line <None>", "DELAUNAY")
 
-        # Find distance between rows east-west
-        rowsNear = arcpy.analysis.GenerateNearTable(rowsInput, rowsInput, r"in_memory\rowsNear", None, "NO_LOCATION","ANGLE", "ALL", 8, "GEODESIC")
-
-        codeblock_pos = """
-def direction(angle, nearDist):
-    if (angle < -85 and angle > -95) or (angle > 85 and angle < 95):
-        return "delta_x"
-    else:
-        return "NA"
-"""
-
-        arcpy.management.CalculateField(rowsNear, "delta_pos", "direction(!NEAR_ANGLE!, !NEAR_DIST!)", "PYTHON3", codeblock_pos, "TEXT")
-
-        near_stats = arcpy.analysis.Statistics(rowsNear, r"in_memory\near_stats", "NEAR_DIST MIN","IN_FID; delta_pos")
+        # Nearest row east or west of each row among its 8 nearest, from the session row index
+        screenTable = nearestTable(rowsInput, os.path.join(workspace, "screenTable"), [(-95, -85), (85, 95)], 8, "delta_zone_x")
 
         # Screen out outliers east-west
-        dist_x = arcpy.analysis.TableSelect(near_stats, r"in_memory\dist_x", "delta_pos = 'delta_x'")
-
         minMaxXRows = arcpy.analysis.Statistics(rowCornerPoints, r"in_memory\minMaxXRows", "POINT_X MIN; POINT_X MAX","PolygonOID")
         arcpy.management.CalculateField(minMaxXRows, "rowWidth", "(!MAX_POINT_X!- !MIN_POINT_X!)", "PYTHON3", "", "DOUBLE")
 
-        arcpy.management.AlterField(dist_x, "MIN_NEAR_DIST", "delta_zone_x")
-        screenTable = arcpy.conversion.TableToTable(dist_x, workspace, r"screenTable")
         arcpy.management.JoinField(screenTable, "IN_FID", minMaxXRows, "PolygonOID", "rowWidth")
 
         codeblock_screen = """
@@ -653,29 +546,8 @@ def poaAdjust(maxR, minR, maxRev, minRev):
 
             piles_graded_pre = arcpy.analysis.Select(piles_working, "piles_graded_pre","cutFill < -0.0415 OR cutFill > 0.0415")
 
-            # Reclassify cut-fill raster using tolerance
-            reclass_code = RemapRange([[-300, -1 * float(.0415), 1], [-1 * float(.0415), float(.0415), 0], [float(.0415), 300, 2]])
-            cutFill_reclass = arcpy.sa.Reclassify(cutFill, "VALUE", reclass_code, "DATA")
-            cutFill_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, "cutFill_poly", "SIMPLIFY", "Value","SINGLE_OUTER_PART", None)
-            grade_area = arcpy.analysis.Select(cutFill_poly, "grade_area", "gridcode <> 0")
-
-            # Select areas that intersect piles that are graded
-            grade_intersect = arcpy.management.SelectLayerByLocation(grade_area, "INTERSECT", piles_graded_pre)
-            grade_area_rows = arcpy.conversion.FeatureClassToFeatureClass(grade_intersect, workspace, "grade_area_rows")
-
-            arcpy.SetProgressor("default", "Refining the grading areas...")
-
-            # Buffer the graded areas by 5 feet close small holes and merge areas within 10 feet of each other
-            hole_close_buffer = "10 Feet"
-            grade_area_rows_buff = arcpy.analysis.PairwiseBuffer(grade_intersect, "in_memory\grade_area_rows_buff", hole_close_buffer, "ALL")
-
-            # Invert the buffer to just inside the graded area to eliminate small areas
-            buffer_in = "-9 Feet"
-            bounds_invert = arcpy.analysis.PairwiseBuffer(grade_area_rows_buff, "bounds_invert", buffer_in, "ALL")
-
-            # Extend the graded areas to 2 the raster resolution outside of the graded areas to join close areas
-            bounds_extend = "3 Feet"
-            grade_bounds_pre = arcpy.analysis.PairwiseBuffer(bounds_invert, r"in_memory\grade_bounds_pre", bounds_extend, "ALL")
+            # Grading areas holding graded piles, closed, trimmed and extended by raster morphology
+            grade_bounds_pre = gradingBounds(cutFill, piles_graded_pre, r"in_memory\grade_bounds_pre")
 
             if gridRes > 2:
                 simplifyFactor = 1
@@ -722,80 +594,10 @@ def poaAdjust(maxR, minR, maxRev, minRev):
             if cutFillOption == True:
                 arcpy.SetProgressor("default", "Comparing the graded surface to the existing surface...")
 
-                # Calculate the area of one raster square
-                grid_area = str(gridRes ** 2)
-
-                # Create a polygon of the domain of the existing elevation
-                TotalCutFill = arcpy.ddd.RasterDomain(demInput, "TotalCutFill", "POLYGON")
-
-                # Create new cut and fill rasters based on the final grade
-                cutFillFinal = arcpy.sa.Minus(output_grade, demInput)
-                
-                # Create individual cut rasters and fill rasters
-                cut_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, "VALUE > 0")
-                cut_raster.save(cutOut)
-                fill_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, "VALUE < 0")
-                fill_raster.save(fillOut)
-
-                arcpy.SetProgressorLabel("Calculating total graded area")
-
-                # Sum the graded area and convert to acres from square feet
-                if xyzUnit == "Foot":
-                    total_graded_area = arcpy.analysis.Statistics(grade_bounds, "total_graded_area", "Shape_Area SUM", None)
-                    arcpy.management.AddFields(total_graded_area,[["graded_area_acres", "DOUBLE", "Total Graded Area (acres)"]])
-                    arcpy.management.CalculateField(total_graded_area, "graded_area_acres", "round(!SUM_Shape_Area!/43560,2)","PYTHON3", None)
-
-                if xyzUnit == "Meter":
-                    total_graded_area = arcpy.analysis.Statistics(grade_bounds, "total_graded_area", "Shape_Area SUM", None)
-                    arcpy.management.AddFields(total_graded_area, [["graded_area_m2", "DOUBLE", "Total Graded Area (m^2)"]])
-                    arcpy.management.CalculateField(total_graded_area, "graded_area_m2", "round(!SUM_Shape_Area!,2)", "PYTHON3",None)
-
-                arcpy.SetProgressorLabel("Calculating cut and fill statistics")
-
-                # Calculate the cut-fill statistics
-                Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", cut_raster, "Cut_Total", "DATA", "ALL")
-                Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", fill_raster, "Fill_Total", "DATA", "ALL")
-
-                # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-                if xyzUnit == "Foot":
-                    arcpy.management.CalculateField(Cut_Total, "cut_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","", "DOUBLE")
-                    arcpy.management.CalculateField(Fill_Total, "fill_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","","DOUBLE")
-                    arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_y3"])
-                    arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_y3"])
-
-                    # Calculate net, gross, and ratio statistics for cubic yards
-                    CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_y3 SUM; fill_y3 SUM", None)
-                    arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_y3! + !SUM_fill_y3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_y3! - !SUM_cut_y3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)", "PYTHON3", "","DOUBLE")
-
-                    # Merge area and volume tables and transpose table for final output
-                    arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_acres")
-                    output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_y3", "Cut Volume (y^3)"],["SUM_fill_y3", "Fill Volume (y^3)"],["Net_Volume", "Net Volume (y^3)"],["Total_Volume", "Total Volume (y^3)"],["cut_fill_ratio", "Cut/Fill Ratio"],["graded_area_acres","Graded Area (acres)"]], statsOutput,"Grading", "Summary", None)
-
-                if xyzUnit == "Meter":
-                    arcpy.management.CalculateField(Cut_Total, "cut_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(Fill_Total, "fill_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3","","DOUBLE")
-                    arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_m3"])
-                    arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_m3"])
-
-                    # Calculate net, gross, and ratio statistics for cubic meters
-                    CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_m3 SUM; fill_m3 SUM", None)
-                    arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_m3! + !SUM_fill_m3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_m3! - !SUM_cut_m3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)", "PYTHON3", "","DOUBLE")
-
-                    # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-                    arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_m2")
-                    output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_m3", "Cut Volume (m^3)"],["SUM_fill_m3", "Fill Volume (m^3)"],["Net_Volume", "Net Volume (m^3)"],["Total_Volume", "Total Volume (m^3)"],["cut_fill_ratio", "Cut/Fill Ratio"],["graded_area_m2", "Graded Area (m^2)"]],statsOutput, "Grading", "Summary", None)
-
-                # Clean up
-                arcpy.management.Delete("Cut_Fill_Totals")
-                arcpy.management.Delete("Cut_Total")
-                arcpy.management.Delete("cutFill_poly")
-                arcpy.management.Delete("Fill_Total")
-                arcpy.management.Delete("total_graded_area")
-                arcpy.management.Delete("TotalCutFill")
+                # Cut and fill rasters, volumes and graded area in one pass over the surfaces
+                output_table = cutFillVolumes((output_grade, demInput), xyzUnit, statsOutput, gradeBounds=grade_bounds, cutOutput=cutOut, fillOutput=fillOut)
+                cut_raster = cutOut
+                fill_raster = fillOut
 
                 aprxMap.addDataFromPath(cut_raster)
                 aprxMap.addDataFromPath(fill_raster)
@@ -841,122 +643,27 @@ def poaAdjust(maxR, minR, maxRev, minRev):
                     
 
             if lxmlOutputOption == True:
-                tempDir = arcpy.management.CreateFolder(outputPath, "lxml_temp")
-                tempDirOut = outputPath + "/lxml_temp"                
                 
                 arcpy.SetProgressor("default", "Converting TIN to LandXML...")
                 # Convert to TIN Triangles
                 tinTriangle = arcpy.ddd.TinTriangle(grade_TIN, r"in_memory\tinTriangle", "PERCENT", 1, "", "")
 
-                # Convert tinTriangle to shapefile
-                tinShapefile = arcpy.conversion.FeatureClassToShapefile(tinTriangle, tempDir)
-
-                tin_shp = str(tempDirOut + "/tinTriangle")
-
-                # Reading input TIN shapefile using PyShp
-                in_shp = shapefile.Reader(tin_shp)
-                shapeRecs = in_shp.shapeRecords()
-
-                # Initializing landxml surface items
-                namespace = {"xsi" : "http://www.w3.org/2001/XMLSchema"}
-                landxml = ET.Element("LandXML",
-                                     nsmap=namespace,
-                                     xmlns="http://www.landxml.org/schema/LandXML-1.2",
-                                     language = "English",
-                                     readOnly = "false",
-                                     time = "08:00:00",
-                                     date = "2019-01-01",
-                                     version="1.2")
-                units = ET.SubElement(landxml, "Units")
-                surfaces = ET.SubElement(landxml, "Surfaces")
-                surface = ET.SubElement(surfaces, "Surface", name="demGrade")
-                definition = ET.SubElement(surface, "Definition",
-                                           surfType="TIN")
-                pnts = ET.SubElement(definition, "Pnts")
-                faces = ET.SubElement(definition, "Faces")
-
-                # Dictionary to define correct units based on input
-                unit_opt = {"ft":("Imperial", "squareFoot", "USSurveyFoot",
-                                  "cubicFeet", "fahrenheit", "inHG"),
-                            "m": ("Metric", "squareMeter", "meter",
-                                  "cubicMeter", "celsius", "mmHG"),
-                            "ft-int": ("Imperial", "squareFoot", "foot",
-                                       "cubicFeet", "fahrenheit", "inHG")}
 
                 if xyzUnit == "Foot":
                     unit_len = "ft"
                 else:
                     unit_len = "m"
 
-                # Define units here. Has not been tested with metric.
-                unit = ET.SubElement(units,
-                                     unit_opt[unit_len][0],
-                                     areaUnit=unit_opt[unit_len][1],
-                                     linearUnit=unit_opt[unit_len][2],
-                                     volumeUnit=unit_opt[unit_len][3],
-                                     temperatureUnit=unit_opt[unit_len][4],
-                                     pressureUnit=unit_opt[unit_len][5])
-
-                # Initializing output variables
-                pnt_dict = {}
-                face_list = []
-                cnt = 0
-
-                # Creating reference point dictionary/id for each coordinate
-                # As well as LandXML points, and list of faces
-                for sr in shapeRecs:
-                    shape_pnt_ids = []   # id of each shape point
-
-                    # Each shape should only have 3 points
-                    for pnt in range(3):   
-                        # Coordinate with y, x, z format
-                        coord = (sr.shape.points[pnt][1],
-                                 sr.shape.points[pnt][0],
-                                 sr.shape.z[pnt])
-
-                        # If element is new, add to dictionary and
-                        # write xml point element
-                        if coord not in pnt_dict:
-                            cnt+=1
-                            pnt_dict[coord] = cnt
-
-                            shape_pnt_ids.append(cnt)  # Add point id to list 
-
-                            # Individual point landxml features
-                            pnt_text = f"{coord[0]:.5f} {coord[1]:.5f} {coord[2]:.3f}"
-                            pnt = ET.SubElement(pnts, "P", id=str(cnt)).text = pnt_text
-
-                        # If point is already in the point dictionary, append existing point id
-                        else:
-                            shape_pnt_ids.append(pnt_dict[coord])
-
-                    # Reference face list for each shape
-                    face_list.append(shape_pnt_ids)
-
-                # Writing faces to landxml
-                for face in face_list:
-                    ET.SubElement(faces, "F").text = f"{face[0]} {face[1]} {face[2]}"
-
-                # Writing output
-                tree = ET.ElementTree(landxml)
-                tree.write(lxmlOutput, pretty_print=True, xml_declaration=True, encoding="iso-8859-1")
-
-                del tinShapefile
-                del in_shp
-                del shapeRecs
-
-                arcpy.management.Delete(tempDir)
+                # Stream the points and faces of the TIN triangles to the LandXML file
+                writeTriangleLandXML(lxmlOutput, readTriangles(tinTriangle), "demGrade", unit_len)
+
+
                 arcpy.management.Delete(tinTriangle)
 
                 arcpy.AddMessage("LandXML Exported Successfully")
 
             arcpy.management.Delete("grade_bounds")
             arcpy.management.Delete(grade_TIN)
-            arcpy.management.Delete("grade_area_rows_buff")
-            arcpy.management.Delete("cutFill_poly")
-            arcpy.management.Delete("bounds_invert")
-            arcpy.management.Delete("grade_area_rows")
-            arcpy.management.Delete("grade_area")
             arcpy.management.Delete("grade_area_line")
             arcpy.management.Delete("grade_bound_3D")
             arcpy.management.Delete("grade_raster")
@@ -10,22 +10,25 @@ Revision log
 1.0.0 - 8/4/2022 - Fixed output parameters so custom file names can be added
 1.0.1 - 8/5/2022 - added automatic symbology, dynamic labeling and inputs
 1.0.2 - 8/31/2022 - added validation of vertical and horizontal units
+1.1.0 - 10/16/2026 - Surface analysis read back from the shared terrain product cache when the DEM and parameters repeat
+1.2.0 - 10/16/2026 - North-south and east-west slopes from the directional slope kernel without the aspect and trig rasters
+1.2.1 - 10/17/2026 - Slopes in the z unit of the DEM as the replaced surface analysis tools took it
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.0.2"
+__version__     = "1.2.1"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
 __status__      = "Deployed"
 
 import arcpy
-import math
 from arcpy.sa import *
 import os
 import sys
+from slopeKernels import directionalSlopeRaster
 
 class DirectionalSlope(object):
     def __init__(self):
@@ -158,31 +161,14 @@ class DirectionalSlope(object):
 
         arcpy.SetProgressor('default', 'Analyzing the surface directional slope...')
 
-        # Process aspect
-        AspectDeg = arcpy.sa.Aspect(demInput, "PLANAR", xyzUnit)
-        AspectRad = AspectDeg * math.pi / 180
-
-        arcpy.SetProgressor('default', 'Analyzing the surface slope...')
-
-        # Process slope
-        SlopeDeg = arcpy.sa.Slope(demInput, "DEGREE", "1", "PLANAR", xyzUnit)
-        SlopeRad = SlopeDeg * math.pi / 180
+        # Process the north-south and east-west slope in radians, degrees, or percent from the PLANAR gradient
+        nsSlope, ewSlope = directionalSlopeRaster(demInput, "PLANAR", slopeUnits, zUnit=xyzUnit)
 
         if outPut_options == "North/South" or outPut_options == "East/West/North/South":
 
             arcpy.SetProgressor('default', 'Processing the north-south slope...')
 
-            # Process north-south slope in slope in radians, degrees, or percent
-            CosAspRad = Cos(AspectRad)
-            nsRad = CosAspRad * SlopeRad
-            if slopeUnits == "Radians":
-                nsRad.save(nsOutput)
-            if slopeUnits == "Degrees":
-                nsDeg = nsRad * 180 / math.pi
-                nsDeg.save(nsOutput)
-            if slopeUnits == "Percent":
-                nsPerc = Tan(nsRad) * 100
-                nsPerc.save(nsOutput)
+            nsSlope.save(nsOutput)
 
             aprxMap.addDataFromPath(nsOutput)
 
@@ -212,18 +198,7 @@ class DirectionalSlope(object):
 
             arcpy.SetProgressor('default', 'Processing the east-west slope...')
 
-            # Process east-west slope in radians, degrees, or percent
-            SinAspRad = Sin(AspectRad)
-            ewRad = SinAspRad * SlopeRad
-            if slopeUnits == "Radians":
-                ewRad.save(ewOutput)
-            if slopeUnits == "Degrees":
-                # Process east-west slope in degrees
-                ewDeg = ewRad * 180 / math.pi
-                ewDeg.save(ewOutput)
-            if slopeUnits == "Percent":
-                ewPerc = Tan(ewRad) * 100
-                ewPerc.save(ewOutput)
+            ewSlope.save(ewOutput)
 
             aprxMap.addDataFromPath(ewOutput)
 
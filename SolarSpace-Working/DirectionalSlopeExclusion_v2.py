@@ -10,22 +10,28 @@ Revision log
 1.0.0 - 8/5/2022 - Added automatic symbology
 1.0.1 - 8/31/2022 - Added validation, separated out east/west and south limits, updated units for meters
 2.0.0 - 12/15/2023 - 2.0 version created by MG; hard & soft exclusion zones added
+2.1.0 - 10/16/2026 - Focal means computed with the shared summed-area table kernel
+2.2.0 - 10/16/2026 - Focal statistics split into tiles across the worker processes set by the parallel processing factor
+2.3.0 - 10/16/2026 - Surface analysis read back from the shared terrain product cache when the DEM and parameters repeat
+2.4.0 - 10/16/2026 - North-south and east-west slopes from the directional slope kernel without the aspect and trig rasters
+2.4.1 - 10/17/2026 - Slopes in the z unit of the DEM as the replaced surface analysis tools took it
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2024, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "2.0.0"
+__version__     = "2.4.1"
 __license__     = "Commercial"
 __ArcVersion__  = "ArcPro 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
 __status__      = "Deployed"
 
 import arcpy
-import math
 from arcpy.sa import *
 import os.path
 import sys
+from focalStats import focalRaster
+from slopeKernels import directionalSlopeRaster
 
 class SlopeExclusion_v2(object):
     def __init__(self):
@@ -277,67 +283,16 @@ class SlopeExclusion_v2(object):
             lengthResHigh = rowNS * 1.5
 
         focalInputRow = ("Rectangle " + str(widthRes) + " " + str(lengthResRow) + " MAP")
-        demFocalRow = arcpy.sa.FocalStatistics(demInput, focalInputRow, "MEAN", "DATA", 90)
+        demFocalRow = focalRaster(demInput, focalInputRow, "MEAN")
 
         focalInputHigh = ("Rectangle " + str(widthRes) + " " + str(lengthResHigh) + " MAP")
-        demFocalHigh = arcpy.sa.FocalStatistics(demInput, focalInputHigh, "MEAN", "DATA", 90)
+        demFocalHigh = focalRaster(demInput, focalInputHigh, "MEAN")
 
         arcpy.SetProgressor("default", "Analyzing the terrain based on the row length...")
 
-        AspectRow = arcpy.sa.SurfaceParameters(
-            in_raster=demFocalRow,
-            parameter_type="ASPECT",
-            local_surface_type="QUADRATIC",
-            use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-            z_unit=xyzUnit,
-        )
-
-        AspectRad_row = AspectRow * math.pi / 180
-
-        # Process slope in radians
-        SlopeRow = arcpy.sa.SurfaceParameters(
-            in_raster=demFocalRow,
-            parameter_type="SLOPE",
-            local_surface_type="QUADRATIC",
-            use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-            z_unit=xyzUnit,
-            output_slope_measurement="DEGREE",
-        )
-        
-        SlopeRad_row = SlopeRow * math.pi / 180
-
-        AspectHigh = arcpy.sa.SurfaceParameters(
-            in_raster=demFocalHigh,
-            parameter_type="ASPECT",
-            local_surface_type="QUADRATIC",
-            use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-            z_unit=xyzUnit,
-        )
-
-        AspectRad_high = AspectHigh * math.pi / 180
-
-        # Process slope in radians
-        SlopeHigh = arcpy.sa.SurfaceParameters(
-            in_raster=demFocalHigh,
-            parameter_type="SLOPE",
-            local_surface_type="QUADRATIC",
-            use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-            z_unit=xyzUnit,
-            output_slope_measurement="DEGREE",
-        )
-        
-        SlopeRad_high = SlopeHigh * math.pi / 180
-
-        if slopeUnits == "Percent":
-            ewSlope_row = Tan(Sin(AspectRad_row) * SlopeRad_row) * 100
-            nsSlope_row = Tan(Cos(AspectRad_row) * SlopeRad_row) * 100
-            ewSlope_high = Tan(Sin(AspectRad_high) * SlopeRad_high) * 100
-            nsSlope_high = Tan(Cos(AspectRad_high) * SlopeRad_high) * 100
-        if slopeUnits == "Degrees":
-            ewSlope_row = Sin(AspectRad_row) * SlopeRad_row * 180 / math.pi
-            nsSlope_row = Cos(AspectRad_row) * SlopeRad_row * 180 / math.pi
-            ewSlope_high = Sin(AspectRad_high) * SlopeRad_high * 180 / math.pi
-            nsSlope_high = Cos(AspectRad_high) * SlopeRad_high * 180 / math.pi
+        # North-south and east-west slopes of the focal surfaces from the quadratic surface fit
+        nsSlope_row, ewSlope_row = directionalSlopeRaster(demFocalRow, "QUADRATIC", slopeUnits, zUnit=xyzUnit)
+        nsSlope_high, ewSlope_high = directionalSlopeRaster(demFocalHigh, "QUADRATIC", slopeUnits, zUnit=xyzUnit)
 
 
         arcpy.SetProgressor("default", "Determining slopes that exceed the specified tolerances...")
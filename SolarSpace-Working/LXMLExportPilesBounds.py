@@ -3,6 +3,8 @@
 
 Revision log
 1.0.0 - 01/06/2023 - Adopted from expor raster to landxml script
+1.1.0 - 10/16/2026 - LandXML streamed from the triangle arrays instead of an lxml tree
+1.1.1 - 10/16/2026 - TIN triangles read in memory for the LandXML export instead of through a temporary shapefile
 """
 
 
@@ -10,7 +12,7 @@ Revision log
 __author__      = ["Matthew Gagne", "Zane Nordquist"]
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.0.0"
+__version__     = "1.1.1"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -18,12 +20,10 @@ __status__      = "Deployed"
 
 # Load modules
 import arcpy
-import sys
 import os
-import shapefile
-import lxml.etree as ET
 from arcpy.sa import *
 from arcpy.ddd import *
+from landXML import readTriangles, writeTriangleLandXML
 
 class LXMLExportPilesBounds(object):
     def __init__(self):
@@ -117,8 +117,6 @@ class LXMLExportPilesBounds(object):
         out_xml = parameters[4].valueAsText
 
         outputPath = os.path.dirname(workspace)
-        tempDir = arcpy.management.CreateFolder(outputPath, "lxml_temp")
-        tempDirOut = outputPath + "/lxml_temp"
 
         gridRes = arcpy.Describe(demExist).meanCellWidth
         spatialRef = arcpy.Describe(demExist).spatialReference
@@ -162,111 +160,19 @@ class LXMLExportPilesBounds(object):
         arcpy.SetProgressor('default', "Converting TIN to LandXML...")
 
         # Convert to TIN Triangles
-        tinTriangle = arcpy.ddd.TinTriangle(gradeTIN, "tinTriangle", "PERCENT", 1, '', '')
-
-        # Convert tinTriangle to shapefile
-        tinShapefile = arcpy.conversion.FeatureClassToShapefile(tinTriangle, tempDir)
-
-        tin_shp = str(tempDirOut + "/tinTriangle")
-
-        # Reading input TIN shapefile using PyShp
-        in_shp = shapefile.Reader(tin_shp)
-        shapeRecs = in_shp.shapeRecords()
-
-        # Initializing landxml surface items
-        namespace = {'xsi' : "http://www.w3.org/2001/XMLSchema"}
-        landxml = ET.Element('LandXML',
-                             nsmap=namespace,
-                             xmlns="http://www.landxml.org/schema/LandXML-1.2",
-                             language = 'English',
-                             readOnly = 'false',
-                             time = '08:00:00',
-                             date = '2019-01-01',
-                             version="1.2")
-        units = ET.SubElement(landxml, 'Units')
-        surfaces = ET.SubElement(landxml, 'Surfaces')
-        surface = ET.SubElement(surfaces, 'Surface', name="demGrade")
-        definition = ET.SubElement(surface, 'Definition',
-                                   surfType="TIN")
-        pnts = ET.SubElement(definition, 'Pnts')
-        faces = ET.SubElement(definition, 'Faces')
-
-        # Dictionary to define correct units based on input
-        unit_opt = {'ft':('Imperial', 'squareFoot', 'USSurveyFoot',
-                          'cubicFeet', 'fahrenheit', 'inHG'),
-                    'm': ('Metric', 'squareMeter', 'meter',
-                          'cubicMeter', 'celsius', 'mmHG'),
-                    'ft-int': ('Imperial', 'squareFoot', 'foot',
-                               'cubicFeet', 'fahrenheit', 'inHG')}
+        tinTriangle = arcpy.ddd.TinTriangle(gradeTIN, r"in_memory\tinTriangle", "PERCENT", 1, '', '')
 
-        unit_len = "ft"
 
-        # Define units here. Has not been tested with metric.
-        unit = ET.SubElement(units,
-                             unit_opt[unit_len][0],
-                             areaUnit=unit_opt[unit_len][1],
-                             linearUnit=unit_opt[unit_len][2],
-                             volumeUnit=unit_opt[unit_len][3],
-                             temperatureUnit=unit_opt[unit_len][4],
-                             pressureUnit=unit_opt[unit_len][5])
-
-        # Initializing output variables
-        pnt_dict = {}
-        face_list = []
-        cnt = 0
-
-        # Creating reference point dictionary/id for each coordinate
-        # As well as LandXML points, and list of faces
-        for sr in shapeRecs:
-            shape_pnt_ids = []   # id of each shape point
-
-            # Each shape should only have 3 points
-            for pnt in range(3):   
-                # Coordinate with y, x, z format
-                coord = (sr.shape.points[pnt][1],
-                         sr.shape.points[pnt][0],
-                         sr.shape.z[pnt])
-
-                # If element is new, add to dictionary and
-                # write xml point element
-                if coord not in pnt_dict:
-                    cnt+=1
-                    pnt_dict[coord] = cnt
-
-                    shape_pnt_ids.append(cnt)  # Add point id to list 
-
-                    # Individual point landxml features
-                    pnt_text = f'{coord[0]:.5f} {coord[1]:.5f} {coord[2]:.3f}'
-                    pnt = ET.SubElement(pnts, 'P', id=str(cnt)).text = pnt_text
-
-                # If point is already in the point dictionary, append existing point id
-                else:
-                    shape_pnt_ids.append(pnt_dict[coord])
-
-            # Check if too many or too few points created
-            if len(shape_pnt_ids) != 3:
-                print('Error - check input shapefile. '\
-                      'Must be a polygon with only three nodes for each shape.')
-                sys.exit(0)
-
-            # Reference face list for each shape
-            face_list.append(shape_pnt_ids)
-
-        # Writing faces to landxml
-        for face in face_list:
-            ET.SubElement(faces, 'F').text = f'{face[0]} {face[1]} {face[2]}'
+        unit_len = "ft"
 
         arcpy.SetProgressor('default', "Writing output file...")
 
-        # Writing output
-        tree = ET.ElementTree(landxml)
-        tree.write(out_xml, pretty_print=True, xml_declaration=True, encoding="iso-8859-1")
+        # Stream the points and faces of the TIN triangles to the LandXML file
+        writeTriangleLandXML(out_xml, readTriangles(tinTriangle), "demGrade", unit_len)
+
+        arcpy.management.Delete(tinTriangle)
 
-        del tinShapefile
-        del in_shp
-        del shapeRecs
 
-        arcpy.management.Delete(tempDir)
 
         arcpy.AddMessage("LandXML Exported Successfully")
 
@@ -6,12 +6,17 @@ Revision log
 1.0.0 - 09/12/2022 - Fixed calculation errors
 1.1.0 - 12/20/2022 - Updated to calculate using directional rasters
 1.2.0 - 01/29/2024 - Updated syntx of focal stat. ln 175
+1.3.0 - 10/16/2026 - Directional focal range computed with the shared running max/min kernel
+1.4.0 - 10/16/2026 - Focal statistics split into tiles across the worker processes set by the parallel processing factor
+1.5.0 - 10/16/2026 - Surface analysis read back from the shared terrain product cache when the DEM and parameters repeat
+1.6.0 - 10/16/2026 - North-south and east-west slopes from the directional slope kernel without the aspect and trig rasters
+1.6.1 - 10/17/2026 - Slopes in the z unit of the DEM as the replaced surface analysis tools took it
 """
 
 __author__      = ["Liza Flowers", "Matthew Gagne", "Zane Nordquist", "John Williamson"]
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.2.0"
+__version__     = "1.6.1"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.0.3"
 __maintainer__  = ["Liza Flowers", "Zane Nordquist"]
@@ -23,6 +28,8 @@ import arcpy
 from arcpy.sa import *
 import os
 import sys
+from focalStats import focalRaster
+from slopeKernels import directionalSlopeRaster
 
 class MassGradev2(object):
 
@@ -184,8 +191,8 @@ class MassGradev2(object):
 
         arcpy.SetProgressor('default', 'Determining slopes over the limit...')
 
-        demFocalNS = arcpy.sa.FocalStatistics(demInput, focalNSInput, "RANGE", "DATA", 90)
-        demFocalEW = arcpy.sa.FocalStatistics(demInput, focalEWInput, "RANGE", "DATA", 90)
+        demFocalNS = focalRaster(demInput, focalNSInput, "RANGE")
+        demFocalEW = focalRaster(demInput, focalEWInput, "RANGE")
         heightRangeNS = demFocalNS / 2
         heightRangeEW = demFocalEW / 2
 
@@ -195,25 +202,9 @@ class MassGradev2(object):
         else:
             target_slope = float(maxSlope)
 
-        AspectDeg = arcpy.sa.Aspect(demInput, "PLANAR", xyzUnit)
-        AspectRad = AspectDeg * math.pi / 180
-
-        SlopeDeg = arcpy.sa.Slope(demInput, "DEGREE", "1", "PLANAR", xyzUnit)
-        SlopeRad = SlopeDeg * math.pi / 180
-
-        CosAspRad = arcpy.sa.Cos(AspectRad)
-        nsRad = CosAspRad * SlopeRad
-        if slopeUnits == "Degrees":
-            nsSlope = nsRad * 180 / math.pi
-        if slopeUnits == "Percent":
-            nsSlope = arcpy.sa.Tan(nsRad) * 100
-
-        SinAspRad = arcpy.sa.Sin(AspectRad)
-        ewRad = SinAspRad * SlopeRad
-        if slopeUnits == "Degrees":
-            ewSlope = abs(ewRad * 180 / math.pi)
-        if slopeUnits == "Percent":
-            ewSlope = abs(arcpy.sa.Tan(ewRad) * 100)
+        # North-south and east-west slopes from the PLANAR gradient
+        nsSlope, ewSlope = directionalSlopeRaster(demInput, "PLANAR", slopeUnits, zUnit=xyzUnit)
+        ewSlope = abs(ewSlope)
 
         arcpy.SetProgressor('default', 'Calculating the estimated volume...')
 
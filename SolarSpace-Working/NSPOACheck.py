@@ -5,6 +5,9 @@ Description: Checks the ends of the rows for transition issues and shading
 
 Revision log
 0.0.1 - 12/01/2022 - Initial scripting
+0.0.2 - 10/16/2026 - Row end plane of array from the grouped row regression
+0.0.3 - 10/16/2026 - Row corner and end points from one packed vertex array instead of per-vertex distance checks
+0.0.4 - 10/16/2026 - Nearest opposite row ends from the spatial index instead of Near and JoinField
 """
 
 # Load modules
@@ -14,11 +17,15 @@ import sys
 from arcpy.sa import *
 from arcpy.ddd import *
 import math
+from rowRegression import fitPiles, writeLinePOA, writeFields
+from rowGeometry import insertRowPoints
+from spatialIndex import nearValues
+from rasterArrays import mapDistance
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "0.0.1"
+__version__     = "0.0.4"
 __license__     = "Internal"
 __ArcVersion__  = "ArcGIS 3.1.3"
 __maintainer__  = ["Zane Nordquist"]
@@ -141,129 +148,25 @@ class NSPOACheck(object):
         outputPath = os.path.dirname(workspace)
         spatialRef = arcpy.Describe(rowsInput).spatialReference
 
-        # Calculate north-south plane of array slope
-        piles_working = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, "piles_working")
-
-        # Add xy coordinates - will overwrite if already present
-        arcpy.management.AddXY(piles_working)
-
-        # Change poaField to TOP_elv_orig
-        # Summary Statistics by row_ID to to get the mean of the plane of array and the mean of POINT_Y for each row and the count of piles for each row
-        coorStatsInput = [[poaField, "MEAN"], ["POINT_Y", "MEAN"]]
-        coorStats = arcpy.analysis.Statistics(piles_working, "coorStats", coorStatsInput, row_ID)
-
-        statPOAMean = "MEAN_" + poaField
-
-        # Join the mean of the plane of array and MEAN_POINT_Y back to the piles
-        arcpy.management.JoinField(piles_working, row_ID, coorStats, row_ID, [statPOAMean, "MEAN_POINT_Y"])
-
-        # Calculate zy_bar, y_ybar_sq
-        arcpy.management.CalculateField(piles_working, "zy_bar","(!"+poaField+"! + !"+statPOAMean+"!) * (!POINT_Y! - !MEAN_POINT_Y!)", "PYTHON3", "","DOUBLE")
-        arcpy.management.CalculateField(piles_working, "y_ybar_sq", "(!POINT_Y! - !MEAN_POINT_Y!)**2", "PYTHON3", "","DOUBLE")
-
-        # Summary Statistics by row_ID to get the sum of zy_bar, y_ybar_sq
-        sumStats = arcpy.analysis.Statistics(piles_working, "sumStats", [["zy_bar", "SUM"], ["y_ybar_sq", "SUM"]],row_ID)
-
-        # Calculate the slope (SUM_xy_bar/SUM_x_bar_sq), multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
-        arcpy.management.CalculateField(sumStats, "nsSlope", "!SUM_zy_bar!/!SUM_y_ybar_sq!", "PYTHON3", "","DOUBLE")
-
-        # Join slope to piles_working
-        arcpy.management.JoinField(piles_working, row_ID, sumStats, row_ID, ["nsSlope"])
-
-        # Find the intercept
-        arcpy.management.CalculateField(piles_working, "bInit", "!"+poaField+"! - !nsSlope! * !POINT_Y!", "PYTHON3", "", "DOUBLE")
-
-        endPointStats = arcpy.analysis.Statistics(piles_working, "endPointStats", [["bInit", "MEAN"],["nsSlope", "MEAN"]], row_ID)
+        # Fit the north-south line of the plane of array of every row in one pass over the piles
+        fit = fitPiles(pilesInput, row_ID, poaField)[0]
 
         rowEndPoints = arcpy.management.CreateFeatureclass(workspace, "rowEndPoints", "POINT", "#", "DISABLED", "DISABLED", rowsInput)
 
         arcpy.management.AddField(rowEndPoints, "PolygonOID", "LONG")
         arcpy.management.AddField(rowEndPoints, "Position", "TEXT")
 
-        result = arcpy.GetCount_management(rowsInput)
-        count = int(result.getOutput(0))
-
-        insert_cursor = arcpy.da.InsertCursor(rowEndPoints, ["SHAPE@", "PolygonOID", "Position"])
-        search_cursor = arcpy.da.SearchCursor(rowsInput, ["SHAPE@", "OID@"])
-
-        for row in search_cursor:
-            polygon_oid = str(row[1])
-
-            coordinateList = []
-            sw_dist = {}
-            se_dist = {}
-            nw_dist = {}
-            ne_dist = {}
-
-            for part in row[0]:
-                for pnt in part:
-                    if pnt:
-                        coordinateList.append((pnt.X, pnt.Y))
-
-            # Find the extent of each row
-            rowExtent = row[0].extent
-
-            sw_coordinate = rowExtent.lowerLeft
-            se_coordinate = rowExtent.lowerRight
-            nw_coordinate = rowExtent.upperLeft
-            ne_coordinate = rowExtent.upperRight
-
-            sw_point = arcpy.PointGeometry(sw_coordinate)
-            se_point = arcpy.PointGeometry(se_coordinate)
-            nw_point = arcpy.PointGeometry(nw_coordinate)
-            ne_point = arcpy.PointGeometry(ne_coordinate)
-
-            # Find the vertex closest to each corner of the row extent
-            for vertex in coordinateList:
-                vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                sw_dist[float(sw_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                se_dist[float(se_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                nw_dist[float(nw_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                ne_dist[float(ne_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-            #Calculates where quarter quarter sections would intersect polygon
-            swMinDist = min(sw_dist)
-            seMinDist = min(se_dist)
-            nwMinDist = min(nw_dist)
-            neMinDist = min(ne_dist)
-
-            sw_X = float(sw_dist[swMinDist][0])
-            sw_Y = float(sw_dist[swMinDist][1])
-            se_X = float(se_dist[seMinDist][0])
-            se_Y = float(se_dist[seMinDist][1])
-
-            nw_X = float(nw_dist[nwMinDist][0])
-            nw_Y = float(nw_dist[nwMinDist][1])
-            ne_X = float(ne_dist[neMinDist][0])
-            ne_Y = float(ne_dist[neMinDist][1])
-
-            north_bound_line = arcpy.Polyline(arcpy.Array([arcpy.Point(nw_X, nw_Y), arcpy.Point(ne_X, ne_Y)]))
-            south_bound_line = arcpy.Polyline(arcpy.Array([arcpy.Point(sw_X, sw_Y), arcpy.Point(se_X, se_Y)]))
-
-            north_row_end = north_bound_line.positionAlongLine(0.5, True)
-            south_row_end = south_bound_line.positionAlongLine(0.5, True)
-
-            insert_cursor.insertRow((north_row_end, polygon_oid, "N"))
-            insert_cursor.insertRow((south_row_end, polygon_oid, "S"))
-
-        del insert_cursor
-        del search_cursor
+        # North and south row ends, the midpoints between the vertices nearest the corners of each row extent
+        insertRowPoints(rowEndPoints, rowsInput, ["N", "S"])
 
         eorInitial = arcpy.analysis.SpatialJoin(rowEndPoints, rowsInput, eorOutput, "JOIN_ONE_TO_ONE", "KEEP_ALL")
 
-        arcpy.management.JoinField(eorInitial, row_ID, endPointStats, row_ID, [["MEAN_nsSlope"],["MEAN_bInit"]])
-
         arcpy.management.AddXY(eorInitial)
 
-        arcpy.management.CalculateField(eorInitial, "poaEnd", "!MEAN_nsSlope! * !POINT_Y! + !MEAN_bInit!", "PYTHON3", "", "DOUBLE")
+        # Plane of array of the row's line at each end point
+        writeLinePOA(eorInitial, row_ID, fit, "poaEnd")
 
-        arcpy.management.DeleteField(eorInitial, ["MEAN_nsSlope", "MEAN_bInit"])
         arcpy.management.Delete(rowEndPoints)
-        arcpy.management.Delete(coorStats)
-        arcpy.management.Delete(endPointStats)
-        arcpy.management.Delete(piles_working)
-        arcpy.management.Delete(sumStats)
 
         eorPOA_N = arcpy.analysis.Select(eorInitial, "eorPOA_N", "Position = 'N'")
         eorPOA_S = arcpy.analysis.Select(eorInitial, "eorPOA_S", "Position = 'S'")
@@ -271,11 +174,14 @@ class NSPOACheck(object):
         arcpy.management.CalculateField(eorPOA_N, "poaEnd_NEAR_N", "!poaEnd!", "PYTHON3", "","DOUBLE")
         arcpy.management.CalculateField(eorPOA_S, "poaEnd_NEAR_S", "!poaEnd!", "PYTHON3", "","DOUBLE")
 
-        arcpy.analysis.Near(eorPOA_N,eorPOA_S,"11 Feet","NO_LOCATION","NO_ANGLE","PLANAR","",xyzUnit)
-        arcpy.analysis.Near(eorPOA_S,eorPOA_N,"11 Feet","NO_LOCATION","NO_ANGLE","PLANAR","",xyzUnit)
+        # Nearest opposite row end within 11 feet of each end, from the session index of the row ends
+        searchRadius = mapDistance("11 Feet", spatialRef)
+        nearN = nearValues(eorPOA_N, eorPOA_S, "poaEnd_NEAR_S", None, None, searchRadius, xyzUnit)
+        nearS = nearValues(eorPOA_S, eorPOA_N, "poaEnd_NEAR_N", None, None, searchRadius, xyzUnit)
 
-        arcpy.management.JoinField(eorPOA_N, "NEAR_FID", eorPOA_S, "OBJECTID", [["poaEnd_NEAR_S"], ["NEAR_DIST"]])
-        arcpy.management.JoinField(eorPOA_S, "NEAR_FID", eorPOA_N, "OBJECTID", [["poaEnd_NEAR_N"], ["NEAR_DIST"]])
+        for eorPOA, near, nearField in [[eorPOA_N, nearN, "poaEnd_NEAR_S"], [eorPOA_S, nearS, "poaEnd_NEAR_N"]]:
+            arcpy.management.AddFields(eorPOA, [["NEAR_FID", "LONG"], ["NEAR_DIST", "DOUBLE"]])
+            writeFields(eorPOA, "OID@", near[0], {nearField: near[1], "NEAR_FID": near[2], "NEAR_DIST": near[3]})
         
         eorOutput_feature = arcpy.management.Merge([[eorPOA_N],[eorPOA_S]], eorOutput)
 
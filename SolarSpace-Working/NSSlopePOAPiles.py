@@ -4,6 +4,7 @@
 Revision log
 v0.0.1 - 9/3/2021 - Initial build
 1.0.0 - 5/17/2022 - Tested and deployed
+1.1.0 - 10/16/2026 - Row slopes from the grouped row regression instead of Statistics and JoinField passes
 
 FUTURE UPDATES: APPEND TO ROWS AND SYMBOLIZE WITH LIMITS?
 """
@@ -11,7 +12,7 @@ FUTURE UPDATES: APPEND TO ROWS AND SYMBOLIZE WITH LIMITS?
 __author__ =        "Matthew Gagne"
 __copyright__ =     "Copyright 2023, KiloNewton, LLC"
 __credits__ =       ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__ =       "1.0.0"
+__version__ =       "1.1.0"
 __license__ =       "Internal/Commercial"
 __ArcVersion__ =    "ArcPro 3.0.3"
 __maintainer__ =    ["Matthew Gagne", "Zane Nordquist"]
@@ -21,6 +22,7 @@ import arcpy
 import os.path
 import sys
 from arcpy.ddd import *
+from rowRegression import fitPiles, slopeValue, writeRowFit
 
 class NSSlopePiles(object):
     def __init__(self):
@@ -103,42 +105,13 @@ class NSSlopePiles(object):
 
         arcpy.SetProgressor('default', 'Calculating the plane of array slope from the piles...')
 
-        # Add xy coordinates - will overwrite if already present
-        arcpy.management.AddXY(pilesInput)
-
-        # Delete POINT_Z field - not needed
-        arcpy.management.DeleteField(pilesInput, "POINT_Z")
-
-        # Summary Statistics by row_ID to to get the mean of the plane of array and the mean of POINT_Y for each row and the count of piles for each row
-        coorStatsInput = [[poaField, "MEAN"], ["POINT_Y", "MEAN"]]
-        coorStats = arcpy.analysis.Statistics(pilesInput, "coorStats", coorStatsInput, row_ID)
-
-        # Join the mean of the plane of array and MEAN_POINT_Y back to the piles
-        coorStatsOutput = ["MEAN_" + poaField, "MEAN_POINT_Y"]
-        arcpy.management.JoinField(pilesInput, row_ID, coorStats, row_ID, coorStatsOutput)
-
-        # Calculate zy_bar, y_ybar_sq
-        zy_bar_equation = "(!" + poaField + "! - !" + "MEAN_" + poaField + "!)" + "*" + "(!POINT_Y! - !MEAN_POINT_Y!)"
-        arcpy.management.CalculateField(pilesInput, "zy_bar", zy_bar_equation, "PYTHON3", "", "DOUBLE")
-        arcpy.management.CalculateField(pilesInput, "y_ybar_sq", "(!POINT_Y! - !MEAN_POINT_Y!)**2", "PYTHON3", "","DOUBLE")
-
-        # Summary Statistics by row_ID to get the sum of zy_bar, y_ybar_sq
-        sumStats = arcpy.analysis.Statistics(pilesInput, "sumStats", [["zy_bar", "SUM"], ["y_ybar_sq", "SUM"]], row_ID)
-
-        # Calculate the slope (SUM_xy_bar/SUM_x_bar_sq), multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
-        arcpy.management.CalculateField(sumStats, "NS_slope_percent", "-100*!SUM_zy_bar!/!SUM_y_ybar_sq!", "PYTHON3","", "DOUBLE")
+        # Fit the north-south line of the plane of array of every row in one pass over the piles
+        fit = fitPiles(pilesInput, row_ID, poaField)[0]
 
+        # Slope multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
         if slopeUnits == "Percent":
-            # Join slope to pilesInput
-            arcpy.management.JoinField(pilesInput, row_ID, sumStats, row_ID, ["NS_slope_percent"])
+            writeRowFit(pilesInput, row_ID, fit, {"NS_slope_percent": slopeValue(fit.slope, "Percent")})
         else:
-            arcpy.management.CalculateField(sumStats, "NS_slope_degrees", "math.degrees(math.atan(!NS_slope_percent!/100))", "PYTHON3", "", "DOUBLE")
-            arcpy.management.JoinField(pilesInput, row_ID, sumStats, row_ID, ["NS_slope_degrees"])
-
-        # Clean up
-        arcpy.management.DeleteField(pilesInput, ["MEAN_POINT_Y", "MEAN_POINT_X", "MEAN_TOP_elv", "zy_bar", "y_ybar_sq"])
-
-        arcpy.management.Delete("coorStats")
-        arcpy.management.Delete("sumStats")
+            writeRowFit(pilesInput, row_ID, fit, {"NS_slope_degrees": slopeValue(fit.slope, "Degrees")})
 
         return
\ No newline at end of file
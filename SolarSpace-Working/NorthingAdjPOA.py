@@ -4,12 +4,13 @@
 0.0.1 - 10/20/2021 - adapted from raster version of the script
 1.0.0 - 5/17/2022 - Tested and deployed internally
 1.1.0 - 1/9/2023 - Converted to PYT format, added extrapolation of graded surface and reveal check
+1.2.0 - 10/16/2026 - Row slopes from the grouped row regression instead of Statistics and JoinField passes
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.1.0"
+__version__     = "1.2.0"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcGIS 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -21,6 +22,7 @@ import os.path
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
+from rowRegression import fitPiles, slopeValue, writeRowFit
 
 class NorthingAdjPOA(object):
     def __init__(self):
@@ -140,32 +142,9 @@ class NorthingAdjPOA(object):
         # Alter fieldname for POINT_Y for gearboxPiles
         arcpy.management.AlterField(gearboxPiles, "POINT_Y", "northing_gear", "northing_gear")
 
-        # Calculate the means of the northing and the base planes by row
-        nMeanInput = str("POINT_Y MEAN;" + poaField + " MEAN")
-        piles_northing_plane_mean = arcpy.analysis.Statistics(pilesOriginal, "piles_northing_plane_mean", nMeanInput, row_ID)
-
-        # Join back to the pile table
-        meanPOAField = "MEAN_" + poaField
-        nMeanResult = "MEAN_POINT_Y; " + meanPOAField
-        arcpy.management.JoinField(pilesOriginal, row_ID, piles_northing_plane_mean, row_ID, nMeanResult)
-
-        # Calculate the delta between the northing and northing mean, and the deltat between the plane and plane mean
-        arcpy.management.CalculateField(pilesOriginal, "n_nbar", "!POINT_Y!-!MEAN_POINT_Y!", "PYTHON3", "", "DOUBLE")
-        poa_poaBarCalc = str("!" + poaField + "! -!MEAN_" + poaField +"!")
-        arcpy.management.CalculateField(pilesOriginal, "poa_poaBar", poa_poaBarCalc, "PYTHON3", "", "DOUBLE")
-
-        # Calculate the delta plane squared, and the product of the delta plane and the delta northing
-        arcpy.management.CalculateField(pilesOriginal, "dNorthXdpoa", "!n_nbar! * !poa_poaBar!", "PYTHON3","","DOUBLE")
-        arcpy.management.CalculateField(pilesOriginal, "dNorth_sq", "!n_nbar!*!n_nbar!", "PYTHON3","","DOUBLE")
-
-        # Do summary statistics to get row sums of the delta plane squared and the product of the delta plane and the delta northing
-        piles_delta_sum = arcpy.analysis.Statistics(pilesOriginal, "piles_delta_sum", "dNorthXdpoa SUM;dNorth_sq SUM", row_ID)
-
-        # Calculate the slope
-        arcpy.management.CalculateField(piles_delta_sum, "slope", "-100*!SUM_dNorthXdpoa!/!SUM_dNorth_sq!", "PYTHON3","","DOUBLE")
-
-        # Join the slope back to the piles
-        arcpy.management.JoinField(pilesOriginal, row_ID, piles_delta_sum, row_ID, "slope")
+        # Fit the north-south slope of the plane of array of every row in one pass over the piles and add it to the piles as a percent
+        fit = fitPiles(pilesOriginal, row_ID, poaField)[0]
+        writeRowFit(pilesOriginal, row_ID, fit, {"slope": slopeValue(fit.slope, "Percent")})
 
         # Calculate the new northing based on the distance to the gearbox pile northing
         arcpy.management.JoinField(pilesOriginal, row_ID, gearboxPiles, row_ID, "northing_gear")
@@ -202,10 +181,8 @@ def dGrade(demE,demG):
         arcpy.management.AddXY(pilesAdj)
 
         # Delete unecessary fields
-        arcpy.management.DeleteField(pilesAdj, "dNorth_sq;dNorthXdpoa;MEAN_poa;MEAN_POINT_Y;n_nbar;northing_gear;poa_poaBar;POINT_Z;slope;demExist_temp")
+        arcpy.management.DeleteField(pilesAdj, "northing_gear;POINT_Z;slope;demExist_temp")
 
-        arcpy.management.Delete(piles_delta_sum)
-        arcpy.management.Delete(piles_northing_plane_mean)
         arcpy.management.Delete(pilesOriginal)
         arcpy.management.Delete(gearboxPiles)
 
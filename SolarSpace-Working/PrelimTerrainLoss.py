@@ -10,24 +10,30 @@ changed focal statistics for north-south and east west, added option for
 mechanical blocks and unlinked rows and optional east-west and north-south
 loss rasters
 1.1.1 - 4/1/2024 - Fixed minor focal stats issue
+1.2.0 - 10/16/2026 - Focal mean and standard deviation computed with the shared summed-area table kernel
+1.3.0 - 10/16/2026 - Focal statistics split into tiles across the worker processes set by the parallel processing factor
+1.4.0 - 10/16/2026 - Surface analysis read back from the shared terrain product cache when the DEM and parameters repeat
+1.5.0 - 10/16/2026 - North-south slope from the directional slope kernel without the aspect and trig rasters
+1.5.1 - 10/17/2026 - Slopes in the z unit of the DEM as the replaced surface analysis tools took it
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2024, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.1.1"
+__version__     = "1.5.1"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
 __status__      = "Deployed"
 
 # Load modules
-import math
 import arcpy
 from arcpy import env
 from arcpy.sa import *
 import os
 import sys
+from focalStats import focalRaster
+from slopeKernels import directionalSlopeRaster
 
 class PrelimTerrainLoss(object):
     def __init__(self):
@@ -218,17 +224,11 @@ class PrelimTerrainLoss(object):
         arcpy.SetProgressor('default', 'Analyzing terrain slope and variation...')
 
         # Run focal statistics on the terrain for east west and north south
-        focal_DEM_EW = arcpy.sa.FocalStatistics(demInput, focalInputEW, "STD", "DATA")
-        focal_DEM_NS = arcpy.sa.FocalStatistics(demInput, focalInputNW, "MEAN", "DATA")
+        focal_DEM_EW = focalRaster(demInput, focalInputEW, "STD")
+        focal_DEM_NS = focalRaster(demInput, focalInputNW, "MEAN")
 
-        # Process aspect
-        AspectRad = arcpy.sa.Aspect(focal_DEM_NS, "PLANAR", xyzUnit) * math.pi / 180
-
-        # Process slope
-        SlopeRad = arcpy.sa.Slope(focal_DEM_NS, "DEGREE", "1", "PLANAR", xyzUnit) * math.pi / 180
-
-        # Process north-south and east-west slope in degrees
-        nsDeg = arcpy.sa.Cos(AspectRad) * SlopeRad * 180 / math.pi
+        # Process the north-south slope in degrees from the PLANAR gradient of the focal surface
+        nsDeg = directionalSlopeRaster(focal_DEM_NS, "PLANAR", "Degrees", zUnit=xyzUnit)[0]
 
         arcpy.SetProgressor('default', 'Calculating the east-west losses...')
 
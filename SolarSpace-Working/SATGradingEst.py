@@ -7,13 +7,21 @@ Revision log
 1.0.0 - 4/2/2022 - Updated parameters for specific outputs to be more clear, simplified output
 1.2.0 - 12/9/2022 - Added ability to calculate volume statistics, simplified grading boundary, added ability to export LandXML
 1.2.1 - 2/25/2024 - Added checking input protocol and no grading checking
-
+1.3.0 - 10/16/2026 - Base planes fitted in one batched pass instead of per-row Trend
+1.3.1 - 10/16/2026 - Grading band clamped in one pass instead of the mosaic minimum/maximum chain
+1.3.2 - 10/16/2026 - Row reveals reduced with the zonal statistics engine
+1.3.3 - 10/16/2026 - Grading boundaries extracted by raster morphology instead of polygonizing and buffering the cut/fill raster
+1.4.0 - 10/16/2026 - Volumes, graded area and cut and fill rasters from one streaming pass over the surfaces
+1.4.1 - 10/16/2026 - North-south POA slope of the piles from the grouped row regression
+1.4.2 - 10/16/2026 - Row spacing from the spatial index instead of a near table of the rows
+1.4.3 - 10/16/2026 - LandXML streamed from the triangle arrays instead of an lxml tree
+1.4.4 - 10/16/2026 - TIN triangles read in memory for the LandXML export instead of through a temporary shapefile
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.2.1"
+__version__     = "1.4.4"
 __license__     = "Commercial"
 __ArcVersion__  = "ArcGIS 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -25,8 +33,15 @@ import os.path
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
-import shapefile
-import lxml.etree as ET
+from rasterArrays import rasterGrid, snapGrid, readRaster, writeRaster, readPolygons
+from basePlaneFit import basePlaneSurface
+from gradeBand import bandClampRaster
+from zonalStats import zonalRaster
+from gradingBounds import gradingBounds
+from cutFillVolumes import cutFillVolumes
+from rowRegression import fitPiles, slopeValue, writeRowFit
+from spatialIndex import nearestTable, nearestDistance
+from landXML import readTriangles, writeTriangleLandXML
 
 class SATGradingEstimate(object):
     def __init__(self):
@@ -309,49 +324,15 @@ class SATGradingEstimate(object):
         del insert_cursor
         del search_cursor
 
-        # Expand rows east/west by 10 ft (this should be sufficient, but need to test)
         arcpy.management.AddXY(rowCornerPoints)
 
-        # Calculate new point coordinates
-        codeblock_newXTG = """ 
-def xNewTG(pos,x):
-    if pos == "NW" or pos == "SW":
-        return x - 10
-    if pos == "NE" or pos == "SE":
-        return x + 10
-    """
-
-        arcpy.management.CalculateField(rowCornerPoints, "xNewTG", "xNewTG(!Position!,!POINT_X!)", "PYTHON3",codeblock_newXTG, "DOUBLE")
-        expTable = arcpy.conversion.TableToTable(rowCornerPoints, workspace, "expTable")
-        expPoints = arcpy.management.XYTableToPoint(expTable, r"in_memory\expPoints", "xNewTG", "POINT_Y", None,spatialRef)
-
-        tGroupExp = arcpy.management.MinimumBoundingGeometry(expPoints, "tGroupExp", "RECTANGLE_BY_AREA", "LIST","PolygonOID", "NO_MBG_FIELDS")
-        tGroupDiss = arcpy.Dissolve_management(tGroupExp, "tGroupDiss")
-        tGroup = arcpy.management.MultipartToSinglepart(tGroupDiss, "tGroup")
-        arcpy.management.CalculateField(tGroup, "tGroup", "!OBJECTID!", "PYTHON3", None, "LONG")
-
-        # Find distance between rows east-west
-        rowsNear = arcpy.analysis.GenerateNearTable(rowsInput, rowsInput, r"in_memory\rowsNear", None, "NO_LOCATION","ANGLE", "ALL", 8, "GEODESIC")
-
-        codeblock_pos = """
-def direction(angle, nearDist):
-    if (angle < -80 and angle > -100) or (angle > 80 and angle < 100):
-        return "delta_x"
-    else:
-        return "NA"
-    """
-
-        arcpy.management.CalculateField(rowsNear, "delta_pos", "direction(!NEAR_ANGLE!, !NEAR_DIST!)", "PYTHON3", codeblock_pos, "TEXT")
-
-        near_stats = arcpy.analysis.Statistics(rowsNear, r"in_memory\near_stats", "NEAR_DIST MIN","IN_FID; delta_pos")
+        # Nearest row east or west of each row among its 8 nearest, from the session row index
+        screenTable = nearestTable(rowsInput, os.path.join(workspace, "screenTable"), [(-100, -80), (80, 100)], 8, "delta_zone_x")
 
         # Screen out outliers
-        dist_x = arcpy.analysis.TableSelect(near_stats, r"in_memory\dist_x", "delta_pos = 'delta_x'")
         minMaxXRows = arcpy.analysis.Statistics(rowCornerPoints, r"in_memory\minMaxXRows", "POINT_X MIN; POINT_X MAX","PolygonOID")
         arcpy.management.CalculateField(minMaxXRows, "rowWidth", "(!MAX_POINT_X!- !MIN_POINT_X!)", "PYTHON3", "", "DOUBLE")
 
-        arcpy.management.AlterField(dist_x, "MIN_NEAR_DIST", "delta_zone_x")
-        screenTable = arcpy.conversion.TableToTable(dist_x, workspace, "screenTable")
         arcpy.management.JoinField(screenTable, "IN_FID", minMaxXRows, "PolygonOID", "rowWidth")
 
         codeblock_screen = """
@@ -379,21 +360,9 @@ def dXfinal(dXScreen, dxMean):
 
         arcpy.management.JoinField(rowCornerPoints, "PolygonOID", screenTable, "IN_FID", "dXfinal")
 
-        codeblock_nsDist = """
-def direction(angle, nearDist):
-    if (angle > -170) or (angle < 0 and angle < 10) or (angle > 170 and angle < 190):
-        return nearDist
-    else:
-        return ""
-    """
-        arcpy.management.CalculateField(rowsNear, "delta_y", "direction(!NEAR_ANGLE!, !NEAR_DIST!)", "PYTHON3", codeblock_nsDist, "DOUBLE")
-
-        near_y_stats = arcpy.analysis.Statistics(rowsNear, r"in_memory\near_y_stats", "NEAR_DIST MIN")
-        arcpy.management.AlterField(near_y_stats, "MIN_NEAR_DIST", "minYdist")
-
-        arcpy.management.CalculateField(rowCornerPoints, "joinField", "1", "PYTHON3", "", "LONG")
-
-        arcpy.management.JoinField(rowCornerPoints, "joinField", near_y_stats, "OBJECTID", "minYdist")
+        # Smallest distance between rows
+        minYdist = nearestDistance(rowsInput)
+        arcpy.management.CalculateField(rowCornerPoints, "minYdist", str(minYdist), "PYTHON3", "", "DOUBLE")
 
         arcpy.management.CalculateField(rowCornerPoints, "gridRes", gridRes, "PYTHON3", "", "DOUBLE")
 
@@ -437,51 +406,17 @@ def yNew(pos,y,ydist):
 
         basePlane_bounds = arcpy.management.MinimumBoundingGeometry(new_points, "basePlane_bounds","RECTANGLE_BY_AREA", "LIST", "PolygonOID","NO_MBG_FIELDS")
 
-        rowsGrouped = arcpy.analysis.SpatialJoin(basePlane_bounds, tGroup, "rowsGrouped", "JOIN_ONE_TO_ONE", "KEEP_ALL","", "INTERSECT", None, "")
-
-        # Create scratch geodatabase for the base planes
-        basePlaneScratchGDB = arcpy.management.CreateFileGDB(outputPath, "bpWorking.gdb", "CURRENT")
-
-        arcpy.analysis.SplitByAttributes(rowsGrouped, basePlaneScratchGDB, "tGroup")
-
-        # List feature classes
-        scratchWS = arcpy.env.workspace = (outputPath + "/bpWorking.gdb")
-        tGroupClasses = arcpy.ListFeatureClasses()
-
-        for tG in tGroupClasses:
-            try:
-                demClip = arcpy.management.Clip(demInput, "", "demClip", tG)
-                demPoint = arcpy.conversion.RasterToPoint(demClip, "demPoint", "Value")
-                planes = arcpy.management.CreateRasterDataset(scratchWS, "planes" + "_" + tG, gridRes, "32_BIT_FLOAT", spatialRef, "1")
-                with arcpy.da.SearchCursor(tG, "SHAPE@") as cursor:
-                    for row in cursor:
-                        demClipPoint = arcpy.analysis.Clip(demPoint, row[0], "demClipPoint")
-                        outPlanes = arcpy.sa.Trend(demClipPoint, "grid_code", gridRes, 1, "LINEAR", None)
-                        arcpy.Mosaic_management(outPlanes, planes, "BLEND")
-            except Exception as err:
-                arcpy.AddMessage(str(err.message))
-
-        del cursor
-        arcpy.management.Delete(demClip)
-
-        # List all the rasters and mosaic them
-        planesAll = arcpy.ListRasters()
-
-
-        baseplanes = arcpy.management.MosaicToNewRaster(planesAll, workspace, "baseplanes", spatialRef, "32_BIT_FLOAT",gridRes, 1, "BLEND", "FIRST")
+        # Fit the plane of every row in one pass and blend the overlaps
+        boundsExtent = arcpy.Describe(basePlane_bounds).extent
+        planeGrid = snapGrid(rasterGrid(demInput), boundsExtent.XMin, boundsExtent.YMin, boundsExtent.XMax, boundsExtent.YMax)
+        demArray, planeGrid = readRaster(demInput, planeGrid)
+        planePolygons = readPolygons(basePlane_bounds)[0]
+        planesArray = basePlaneSurface(demArray, planeGrid, planePolygons, blend=True)
+        baseplanes = writeRaster(planesArray, planeGrid, os.path.join(workspace, "baseplanes"), spatialRef)
 
         # Clean up
-        arcpy.management.Delete(expTable)
         arcpy.management.Delete(new_points_table)
-        arcpy.management.Delete(rowsGrouped)
         arcpy.management.Delete(screenTable)
-        arcpy.management.Delete(tGroup)
-        arcpy.management.Delete(tGroupDiss)
-        arcpy.management.Delete(tGroupExp)
-        arcpy.management.Delete(basePlaneScratchGDB)
-
-        # Change default environment back to workspace
-        arcpy.env.workspace = workspace
 
         arcpy.SetProgressor("default", "Calculating the initial grading...")
 
@@ -492,24 +427,15 @@ def yNew(pos,y,ydist):
 
         rowBoundsExpand = arcpy.analysis.GraphicBuffer(rowsInput, "rowBoundsExpand", "3 Feet", "SQUARE", "MITER", 10,"0 Feet")
 
-        # Create the upper bound
-        upperLimit = arcpy.sa.Plus(baseplanes, spacing)
-        upperBound = arcpy.management.MosaicToNewRaster([demInput, upperLimit], "in_memory", "upperBound", spatialRef,"32_BIT_FLOAT", gridRes, 1, "MINIMUM", "FIRST")
-
-        # Create the lower bound
-        lowerLimit = arcpy.sa.Minus(baseplanes, spacing)
-        lowerBound = arcpy.management.MosaicToNewRaster([demInput, lowerLimit], "in_memory", "lowerBound", spatialRef,"32_BIT_FLOAT", gridRes, 1, "MAXIMUM", "FIRST")
-
-        # Create and the final grading DEM
-        upperGrade = arcpy.sa.Minus(upperBound, demInput)
-        demGrade = arcpy.sa.Plus(lowerBound, upperGrade)
+        # Clamp the existing surface into the band around the base planes for the final grading DEM
+        demGrade, cutFill = bandClampRaster(demInput, baseplanes, spacing, spatialRef)
 
         arcpy.SetProgressor("default", "Calculating reveals...")
 
         # Calculate reveals 
         grade_trends = arcpy.sa.Minus(demGrade, baseplanes)
         min_rev_grade = arcpy.sa.Plus(float(minReveal), grade_trends)
-        max_min_reveal = arcpy.sa.ZonalStatistics(rowBoundsExpand, row_ID, min_rev_grade, "MAXIMUM", "DATA")
+        max_min_reveal = zonalRaster(rowBoundsExpand, row_ID, min_rev_grade, "MAXIMUM")
         reveals = arcpy.sa.Minus(max_min_reveal, grade_trends)
 
         arcpy.SetProgressor("default", "Calculating plane of array...")
@@ -532,25 +458,10 @@ def yNew(pos,y,ydist):
         # Add xy coordinates - will overwrite if already present
         arcpy.management.AddXY(piles_working)
 
-        # Summary Statistics by row_ID to to get the mean of the plane of array and the mean of POINT_Y for each row and the count of piles for each row
-        coorStatsInput = [["TOP_elv", "MEAN"], ["POINT_Y", "MEAN"]]
-        coorStats = arcpy.analysis.Statistics(piles_working, "coorStats", coorStatsInput, row_ID)
-
-        # Join the mean of the plane of array and MEAN_POINT_Y back to the piles
-        arcpy.management.JoinField(piles_working, row_ID, coorStats, row_ID, ["MEAN_TOP_elv", "MEAN_POINT_Y"])
-
-        # Calculate zy_bar, y_ybar_sq
-        arcpy.management.CalculateField(piles_working, "zy_bar","(!TOP_elv! + !MEAN_TOP_elv!) * (!POINT_Y! - !MEAN_POINT_Y!)", "PYTHON3", "","DOUBLE")
-        arcpy.management.CalculateField(piles_working, "y_ybar_sq", "(!POINT_Y! - !MEAN_POINT_Y!)**2", "PYTHON3", "","DOUBLE")
-
-        # Summary Statistics by row_ID to get the sum of zy_bar, y_ybar_sq
-        sumStats = arcpy.analysis.Statistics(piles_working, "sumStats", [["zy_bar", "SUM"], ["y_ybar_sq", "SUM"]],row_ID)
-
-        # Calculate the slope (SUM_xy_bar/SUM_x_bar_sq), multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
-        arcpy.management.CalculateField(sumStats, "nsSlopePercPOA", "-100*!SUM_zy_bar!/!SUM_y_ybar_sq!", "PYTHON3", "","DOUBLE")
-
-        # Join slope to piles_working
-        arcpy.management.JoinField(piles_working, row_ID, sumStats, row_ID, ["nsSlopePercPOA"])
+        # Fit the north-south line of the top of pile elevation of every row in one pass over the piles, multiplied by 100
+        # for percent and by -1 to get the convention of north is positive/south is negative
+        fit = fitPiles(piles_working, row_ID, "TOP_elv")[0]
+        writeRowFit(piles_working, row_ID, fit, {"nsSlopePercPOA": slopeValue(fit.slope, "Percent")})
 
         # Alter all fields to have alias
         arcpy.management.AlterField(piles_working, "POINT_X", "", "Easting", "DOUBLE", 4, "NULLABLE", "DO_NOT_CLEAR")
@@ -562,21 +473,15 @@ def yNew(pos,y,ydist):
         arcpy.management.AlterField(piles_working, "nsSlopePercPOA", "", "North-South POA Slope", "DOUBLE", 4,"NULLABLE", "DO_NOT_CLEAR")
         arcpy.management.AlterField(piles_working, "cutFill", "", "Cut Fill", "DOUBLE", 4, "NULLABLE", "DO_NOT_CLEAR")
 
-        arcpy.management.DeleteField(piles_working, ["MEAN_TOP_elv", "MEAN_POINT_Y", "zy_bar", "y_ybar_sq"])
-
         aprxMap.addDataFromPath(piles_working)
 
         # Clean up
         arcpy.management.Delete(max_min_reveal)
         arcpy.management.Delete("baseplanes")
-        arcpy.management.Delete("coorStats")
         arcpy.management.Delete("rowBoundsExpand")
-        arcpy.management.Delete("sumStats")
         arcpy.management.Delete("max_min_reveal")
 
-        # Subtract the existing elevation from the graded elevation
-        cutFill = arcpy.sa.Minus(demGrade, demInput)
-
+        # Cut/fill of the graded elevation from the existing elevation comes from the band clamp
         cutFillMAXResult = arcpy.GetRasterProperties_management(cutFill, "MAXIMUM")
         cutFillMINResult = arcpy.GetRasterProperties_management(cutFill, "MINIMUM")
         cutFillMAX = cutFillMAXResult.getOutput(0)
@@ -603,29 +508,8 @@ def yNew(pos,y,ydist):
 
             piles_graded_pre = arcpy.analysis.Select(piles_working, "piles_graded_pre","cutFill < -0.0415 OR cutFill > 0.0415")
 
-            # Reclassify cut-fill raster using tolerance
-            reclass_code = RemapRange([[-300, -1 * float(.0415), 1], [-1 * float(.0415), float(.0415), 0], [float(.0415), 300, 2]])
-            cutFill_reclass = arcpy.sa.Reclassify(cutFill, "VALUE", reclass_code, "DATA")
-            cutFill_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, "cutFill_poly", "SIMPLIFY", "Value","SINGLE_OUTER_PART", None)
-            grade_area = arcpy.analysis.Select(cutFill_poly, "grade_area", "gridcode <> 0")
-
-            # Select areas that intersect piles that are graded
-            grade_intersect = arcpy.management.SelectLayerByLocation(grade_area, "INTERSECT", piles_graded_pre)
-            grade_area_rows = arcpy.conversion.FeatureClassToFeatureClass(grade_intersect, workspace, "grade_area_rows")
-
-            arcpy.SetProgressor("default", "Refining the grading areas...")
-
-            # Buffer the graded areas by 5 feet close small holes and merge areas within 10 feet of each other
-            hole_close_buffer = "10 Feet"
-            grade_area_rows_buff = arcpy.analysis.PairwiseBuffer(grade_intersect, "in_memory\grade_area_rows_buff", hole_close_buffer, "ALL")
-
-            # Invert the buffer to just inside the graded area to eliminate small areas
-            buffer_in = "-9 Feet"
-            bounds_invert = arcpy.analysis.PairwiseBuffer(grade_area_rows_buff, "bounds_invert", buffer_in, "ALL")
-
-            # Extend the graded areas to 2 the raster resolution outside of the graded areas to join close areas
-            bounds_extend = "3 Feet"
-            grade_bounds_pre = arcpy.analysis.PairwiseBuffer(bounds_invert, "grade_bounds_pre", bounds_extend, "ALL")
+            # Grading areas holding graded piles, closed, trimmed and extended by raster morphology
+            grade_bounds_pre = gradingBounds(cutFill, piles_graded_pre, "grade_bounds_pre")
 
             if gridRes > 2:
                 simplifyFactor = 1
@@ -672,80 +556,10 @@ def yNew(pos,y,ydist):
             if cutFillOption == True:
                 arcpy.SetProgressor("default", "Comparing the graded surface to the existing surface...")
 
-                # Calculate the area of one raster square
-                grid_area = str(gridRes ** 2)
-
-                # Create a polygon of the domain of the existing elevation
-                TotalCutFill = arcpy.ddd.RasterDomain(demInput, "TotalCutFill", "POLYGON")
-
-                # Create new cut and fill rasters based on the final grade
-                cutFillFinal = arcpy.sa.Minus(output_grade, demInput)
-                
-                # Create individual cut rasters and fill rasters
-                cut_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, "VALUE > 0")
-                cut_raster.save(cutOut)
-                fill_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, "VALUE < 0")
-                fill_raster.save(fillOut)
-
-                arcpy.SetProgressorLabel("Calculating total graded area")
-
-                # Sum the graded area and convert to acres from square feet
-                if xyzUnit == "Foot":
-                    total_graded_area = arcpy.analysis.Statistics(grade_bounds, "total_graded_area", "Shape_Area SUM", None)
-                    arcpy.management.AddFields(total_graded_area,[["graded_area_acres", "DOUBLE", "Total Graded Area (acres)"]])
-                    arcpy.management.CalculateField(total_graded_area, "graded_area_acres", "round(!SUM_Shape_Area!/43560,2)","PYTHON3", None)
-
-                if xyzUnit == "Meter":
-                    total_graded_area = arcpy.analysis.Statistics(grade_bounds, "total_graded_area", "Shape_Area SUM", None)
-                    arcpy.management.AddFields(total_graded_area, [["graded_area_m2", "DOUBLE", "Total Graded Area (m^2)"]])
-                    arcpy.management.CalculateField(total_graded_area, "graded_area_m2", "round(!SUM_Shape_Area!,2)", "PYTHON3",None)
-
-                arcpy.SetProgressorLabel("Calculating cut and fill statistics")
-
-                # Calculate the cut-fill statistics
-                Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", cut_raster, "Cut_Total", "DATA", "ALL")
-                Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", fill_raster, "Fill_Total", "DATA", "ALL")
-
-                # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-                if xyzUnit == "Foot":
-                    arcpy.management.CalculateField(Cut_Total, "cut_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","", "DOUBLE")
-                    arcpy.management.CalculateField(Fill_Total, "fill_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","","DOUBLE")
-                    arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_y3"])
-                    arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_y3"])
-
-                    # Calculate net, gross, and ratio statistics for cubic yards
-                    CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_y3 SUM; fill_y3 SUM", None)
-                    arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_y3! + !SUM_fill_y3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_y3! - !SUM_cut_y3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)", "PYTHON3", "","DOUBLE")
-
-                    # Merge area and volume tables and transpose table for final output
-                    arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_acres")
-                    output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_y3", "Cut Volume (y^3)"],["SUM_fill_y3", "Fill Volume (y^3)"],["Net_Volume", "Net Volume (y^3)"],["Total_Volume", "Total Volume (y^3)"],["cut_fill_ratio", "Cut/Fill Ratio"],["graded_area_acres","Graded Area (acres)"]], statsOutput,"Grading", "Summary", None)
-
-                if xyzUnit == "Meter":
-                    arcpy.management.CalculateField(Cut_Total, "cut_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(Fill_Total, "fill_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3","","DOUBLE")
-                    arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_m3"])
-                    arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_m3"])
-
-                    # Calculate net, gross, and ratio statistics for cubic meters
-                    CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_m3 SUM; fill_m3 SUM", None)
-                    arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_m3! + !SUM_fill_m3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_m3! - !SUM_cut_m3!,2)","PYTHON3", "","DOUBLE")
-                    arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)", "PYTHON3", "","DOUBLE")
-
-                    # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-                    arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_m2")
-                    output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_m3", "Cut Volume (m^3)"],["SUM_fill_m3", "Fill Volume (m^3)"],["Net_Volume", "Net Volume (m^3)"],["Total_Volume", "Total Volume (m^3)"],["cut_fill_ratio", "Cut/Fill Ratio"],["graded_area_m2", "Graded Area (m^2)"]],statsOutput, "Grading", "Summary", None)
-
-                # Clean up
-                arcpy.management.Delete("Cut_Fill_Totals")
-                arcpy.management.Delete("Cut_Total")
-                arcpy.management.Delete("cutFill_poly")
-                arcpy.management.Delete("Fill_Total")
-                arcpy.management.Delete("total_graded_area")
-                arcpy.management.Delete("TotalCutFill")
+                # Cut and fill rasters, volumes and graded area in one pass over the surfaces
+                output_table = cutFillVolumes((output_grade, demInput), xyzUnit, statsOutput, gradeBounds=grade_bounds, cutOutput=cutOut, fillOutput=fillOut)
+                cut_raster = cutOut
+                fill_raster = fillOut
 
                 aprxMap.addDataFromPath(cut_raster)
                 aprxMap.addDataFromPath(fill_raster)
@@ -783,122 +597,25 @@ def yNew(pos,y,ydist):
                             l.symbology = symFill
 
             if lxmlOutputOption == True:
-                tempDir = arcpy.management.CreateFolder(outputPath, "lxml_temp")
-                tempDirOut = outputPath + "/lxml_temp"                
                 
                 arcpy.SetProgressor("default", "Converting TIN to LandXML...")
                 # Convert to TIN Triangles
-                tinTriangle = arcpy.ddd.TinTriangle(grade_TIN, "tinTriangle", "PERCENT", 1, "", "")
-
-                # Convert tinTriangle to shapefile
-                tinShapefile = arcpy.conversion.FeatureClassToShapefile(tinTriangle, tempDir)
-
-                tin_shp = str(tempDirOut + "/tinTriangle")
-
-                # Reading input TIN shapefile using PyShp
-                in_shp = shapefile.Reader(tin_shp)
-                shapeRecs = in_shp.shapeRecords()
-
-                # Initializing landxml surface items
-                namespace = {"xsi" : "http://www.w3.org/2001/XMLSchema"}
-                landxml = ET.Element("LandXML",
-                                     nsmap=namespace,
-                                     xmlns="http://www.landxml.org/schema/LandXML-1.2",
-                                     language = "English",
-                                     readOnly = "false",
-                                     time = "08:00:00",
-                                     date = "2019-01-01",
-                                     version="1.2")
-                units = ET.SubElement(landxml, "Units")
-                surfaces = ET.SubElement(landxml, "Surfaces")
-                surface = ET.SubElement(surfaces, "Surface", name="demGrade")
-                definition = ET.SubElement(surface, "Definition",
-                                           surfType="TIN")
-                pnts = ET.SubElement(definition, "Pnts")
-                faces = ET.SubElement(definition, "Faces")
-
-                # Dictionary to define correct units based on input
-                unit_opt = {"ft":("Imperial", "squareFoot", "USSurveyFoot",
-                                  "cubicFeet", "fahrenheit", "inHG"),
-                            "m": ("Metric", "squareMeter", "meter",
-                                  "cubicMeter", "celsius", "mmHG"),
-                            "ft-int": ("Imperial", "squareFoot", "foot",
-                                       "cubicFeet", "fahrenheit", "inHG")}
+                tinTriangle = arcpy.ddd.TinTriangle(grade_TIN, r"in_memory\tinTriangle", "PERCENT", 1, "", "")
 
                 if xyzUnit == "Foot":
                     unit_len = "ft"
                 else:
                     unit_len = "m"
 
-                # Define units here. Has not been tested with metric.
-                unit = ET.SubElement(units,
-                                     unit_opt[unit_len][0],
-                                     areaUnit=unit_opt[unit_len][1],
-                                     linearUnit=unit_opt[unit_len][2],
-                                     volumeUnit=unit_opt[unit_len][3],
-                                     temperatureUnit=unit_opt[unit_len][4],
-                                     pressureUnit=unit_opt[unit_len][5])
-
-                # Initializing output variables
-                pnt_dict = {}
-                face_list = []
-                cnt = 0
-
-                # Creating reference point dictionary/id for each coordinate
-                # As well as LandXML points, and list of faces
-                for sr in shapeRecs:
-                    shape_pnt_ids = []   # id of each shape point
-
-                    # Each shape should only have 3 points
-                    for pnt in range(3):   
-                        # Coordinate with y, x, z format
-                        coord = (sr.shape.points[pnt][1],
-                                 sr.shape.points[pnt][0],
-                                 sr.shape.z[pnt])
-
-                        # If element is new, add to dictionary and
-                        # write xml point element
-                        if coord not in pnt_dict:
-                            cnt+=1
-                            pnt_dict[coord] = cnt
-
-                            shape_pnt_ids.append(cnt)  # Add point id to list 
-
-                            # Individual point landxml features
-                            pnt_text = f"{coord[0]:.5f} {coord[1]:.5f} {coord[2]:.3f}"
-                            pnt = ET.SubElement(pnts, "P", id=str(cnt)).text = pnt_text
-
-                        # If point is already in the point dictionary, append existing point id
-                        else:
-                            shape_pnt_ids.append(pnt_dict[coord])
-
-                    # Reference face list for each shape
-                    face_list.append(shape_pnt_ids)
-
-                # Writing faces to landxml
-                for face in face_list:
-                    ET.SubElement(faces, "F").text = f"{face[0]} {face[1]} {face[2]}"
-
-                # Writing output
-                tree = ET.ElementTree(landxml)
-                tree.write(lxmlOutput, pretty_print=True, xml_declaration=True, encoding="iso-8859-1")
-
-                del tinShapefile
-                del in_shp
-                del shapeRecs
-
-                arcpy.management.Delete(tempDir)
+                # Stream the points and faces of the TIN triangles to the LandXML file
+                writeTriangleLandXML(lxmlOutput, readTriangles(tinTriangle), "demGrade", unit_len)
+
                 arcpy.management.Delete(tinTriangle)
 
                 arcpy.AddMessage("LandXML Exported Successfully")
 
             arcpy.management.Delete("grade_bounds")
             arcpy.management.Delete(grade_TIN)
-            arcpy.management.Delete("grade_area_rows_buff")
-            arcpy.management.Delete("cutFill_poly")
-            arcpy.management.Delete("bounds_invert")
-            arcpy.management.Delete("grade_area_rows")
-            arcpy.management.Delete("grade_area")
             arcpy.management.Delete("grade_area_line")
             arcpy.management.Delete("grade_bound_3D")
             arcpy.management.Delete("grade_raster")
@@ -9,6 +9,11 @@ Revision log
 corrected spacing calculations, added option for strings or full rows 
 output
 2.0.0 - 2/20/2024 - Added optimization options added ability to use exclusions
+2.1.0 - 10/17/2026 - Blocks, rows, strings and inverters computed arithmetically and written with one insert each instead of the fishnet and vertex adjustment chains
+2.2.0 - 10/17/2026 - Strings and inverters tested against the prepared buildable area in one batch instead of SelectLayerByLocation COMPLETELY_WITHIN
+2.3.0 - 10/17/2026 - Exclusion overlap of the strings computed as planar areas in one pass for projected coordinate systems
+2.3.1 - 10/17/2026 - Exclusions read in the coordinate system of the strings for the planar overlap
+2.3.2 - 10/17/2026 - Exclusions dissolved before the planar overlap so overlapping exclusions count once
 
 NEXT UPDATE - Add option for not deleting strings for inverters (for trends)
 Make it so strings are appropriately sized
@@ -18,7 +23,7 @@ Allow for soft boundaries? Make stand-alone tool first
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "John Williamson"]
-__version__     = "2.0.0"
+__version__     = "2.3.2"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcGIS Pro 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -28,6 +33,10 @@ import arcpy
 import math
 import os
 import sys
+import numpy as np
+from trackerLayout import trackerLayout, inverterPads, nearPads, writeRectangles
+from preparedPolygons import readPrepared, rectanglesWithin, overlapAreas
+from spatialIndex import featureExtents
 
 class SATLayoutPrelim(object):
     def __init__(self):
@@ -514,214 +523,41 @@ class SATLayoutPrelim(object):
 
         # Define extents of buildable area
         desc = arcpy.Describe(buildable_area)
-
-        xMin = str(desc.extent.XMin)
-        yMin = str(desc.extent.YMin)
-
-        originXY = xMin + " " + yMin
-        yAxisCoor = xMin + " " + str(desc.extent.YMin + 10)
+        extent = (desc.extent.XMin, desc.extent.YMin, desc.extent.XMax, desc.extent.YMax)
 
         arcpy.SetProgressor('default', 'Creating initial inverter blocks...')
 
-        # Create a fishnet of inverter block
-        inverterBlocks = arcpy.management.CreateFishnet(r"in_memory\inverterBlocks", originXY, yAxisCoor, EWfishnet,NSfishnet, None, None, None, "NO_LABELS", buildable_area,"POLYGON")
-
-        # Calculate x and y adjustments to polygon extents
-        y_adj = str(float(roadWidth) - float(rowGap))
-        x_adj = str(EWfishnet - center_center * EWrowsBlock)
-
-        # Make this a called script
-        # sys.path.append(util_path)
-
-        # Create points of zone corners
-        corner_points_blocks = arcpy.management.FeatureVerticesToPoints(inverterBlocks, r"in_memory\corner_points_blocks", "ALL")
-        arcpy.management.AddXY(corner_points_blocks)
-        points_stats_blocks = arcpy.analysis.Statistics(corner_points_blocks, r"in_memory\points_stats_blocks", "POINT_X MAX;POINT_X MIN;POINT_Y MAX;POINT_Y MIN; POINT_Y MEAN", "ORIG_FID")
-        arcpy.management.JoinField(corner_points_blocks, "ORIG_FID", points_stats_blocks, "ORIG_FID", "MAX_POINT_X; MAX_POINT_Y; MIN_POINT_Y; MEAN_POINT_Y")
-
-        # save corner points to a feature class for debugging
-        #arcpy.management.CopyFeatures(corner_points_blocks, f'{workspace}/corner_points_blocks')
-        
-        # Calculate new x coordinates
-        codeblock_newX = """
-def xNew(x,xMAX, xDist):
-    if x == xMAX:
-        return x - xDist/2
-    else:
-        return x + xDist/2
-"""
-
-        arcpy.management.CalculateField(corner_points_blocks, "xNew", "xNew(!POINT_X!,!MAX_POINT_X!," + x_adj + ")", "PYTHON3",codeblock_newX, "DOUBLE")
-
-        # Calculate new y coordinates
-        codeblock_newY = """
-def yNew(y,yMAX, yDist):
-    if y == yMAX:
-        return y - yDist/2
-    else:
-        return y + yDist/2
-"""
-
-        arcpy.management.CalculateField(corner_points_blocks, "yNew", "yNew(!POINT_Y!,!MAX_POINT_Y!," + y_adj + ")", "PYTHON3",codeblock_newY, "DOUBLE")
-
-        new_points_blocks_adj = arcpy.management.XYTableToPoint(corner_points_blocks, r"in_memory\new_points_blocks_adj", "xNew", "yNew", None,spatialRef)
-
-        inverterBlocks_adj = arcpy.management.MinimumBoundingGeometry(new_points_blocks_adj, r"in_memory\inverterBlocks_adj","RECTANGLE_BY_AREA", "LIST", "ORIG_FID", "NO_MBG_FIELDS")
-
-        # Subdivide into two sections
-        if NSrowsBlock == 1:
-            rowBlocks_pre = inverterBlocks_adj
-        else:
-            rowBlocks_pre = arcpy.management.SubdividePolygon(inverterBlocks_adj, r"in_memory\rowBlocks_pre", "NUMBER_OF_EQUAL_PARTS", NSrowsBlock,None, None, 0, "STRIPS")
-        
-        # save rowBlocks_pre to a feature class for debugging
-        #arcpy.management.CopyFeatures(rowBlocks_pre, f'{workspace}/rowBlocks_pre')
-
-        # Adjust to subdivide size
-        y_adj = str(float(rowGap) / 2)
-        x_adj = str(0)
-
-        # Make this a called script
-        # sys.path.append(util_path)
-
-        # Get the max, min of x and y and the mean of y for the adjusted inverter blocks
-
-        # Create points of the adjusted inverter blocks corners
-        corner_points_block_adj = arcpy.management.FeatureVerticesToPoints(rowBlocks_pre, r"in_memory\corner_points_block_adj", "ALL")
-
-        arcpy.management.AddXY(corner_points_block_adj)
-
-        points_stats = arcpy.analysis.Statistics(corner_points_block_adj, r"in_memory\points_stats","POINT_X MAX; POINT_Y MAX", "ORIG_FID")
-
-        arcpy.management.JoinField(corner_points_block_adj, "ORIG_FID", points_stats, "ORIG_FID", "MAX_POINT_X; MAX_POINT_Y")
-
-        # Calculate new x coordinates
-        codeblock_newX = """
-def xNew(x,xMAX, xDist):
-    if x == xMAX:
-        return x - xDist
-    else:
-        return x
-"""
-
-        arcpy.management.CalculateField(corner_points_block_adj, "xNew", "xNew(!POINT_X!,!MAX_POINT_X!," + x_adj + ")", "PYTHON3",codeblock_newX, "DOUBLE")
-
-        # Calculate new y coordinates
-        codeblock_newY = """
-def yNew(y,yMAX, yDist):
-    if y == yMAX:
-        return y - yDist
-    else:
-        return y + yDist
-
-"""
-
-        arcpy.management.CalculateField(corner_points_block_adj, "yNew", "yNew(!POINT_Y!,!MAX_POINT_Y!," + y_adj + ")", "PYTHON3",codeblock_newY, "DOUBLE")
+        # Lay out the inverter blocks, row blocks, rows and strings arithmetically from the block fishnet
+        layout = trackerLayout(extent, rowWidth, rowLength, center_center, float(rowGap), float(roadWidth), NSrowsBlock, EWrowsBlock, int(stringsRow))
 
-        new_points = arcpy.management.XYTableToPoint(corner_points_block_adj, r"in_memory\new_points", "xNew", "yNew", None,spatialRef)
-
-        rowBlocks = arcpy.management.MinimumBoundingGeometry(new_points, r"in_memory\rowBlocks", "RECTANGLE_BY_AREA","LIST", "ORIG_FID", "NO_MBG_FIELDS")
-
-        # Subdivide into expanded row bounds
-        rows_pre = arcpy.management.SubdividePolygon(rowBlocks, r"in_memory\rows_pre", "NUMBER_OF_EQUAL_PARTS",EWrowsBlock, None, None, 90, "STRIPS")
-
-        # Adjust to row size
-        # Adjust to subdivide size
-        x_adj = str(gap_EW / 2)
-
-        # Make this a called script
-        # sys.path.append(util_path)
-
-        # Create points of zone corners
-        corner_points_rows_pre = arcpy.management.FeatureVerticesToPoints(rows_pre, r"in_memory\corner_points_rows_pre", "ALL")
-        arcpy.management.AddXY(corner_points_rows_pre)
-        points_stats = arcpy.analysis.Statistics(corner_points_rows_pre, r"in_memory\points_stats","POINT_X MAX;POINT_X MIN", "ORIG_FID")
-        arcpy.management.JoinField(corner_points_rows_pre, "ORIG_FID", points_stats, "ORIG_FID", "MAX_POINT_X")
-
-        # Calculate new x coordinates
-        codeblock_newX = """
-def xNew(x,xMAX, xDist):
-    if x == xMAX:
-        return x - xDist
-    else:
-        return x + xDist
-"""
-
-        arcpy.management.CalculateField(corner_points_rows_pre, "xNew", "xNew(!POINT_X!,!MAX_POINT_X!," + x_adj + ")", "PYTHON3",codeblock_newX, "DOUBLE")
-
-        new_points = arcpy.management.XYTableToPoint(corner_points_rows_pre, r"in_memory\new_points", "xNew", "POINT_Y", None,spatialRef)
+        rowBlocks_pre = writeRectangles("in_memory", "rowBlocks_pre", layout.rowBlocks, spatialRef)
 
         arcpy.SetProgressor('default', 'Creating full rows...')
-
-        rowsFull = arcpy.management.MinimumBoundingGeometry(new_points, r"in_memory\rowsFull", "RECTANGLE_BY_AREA","LIST", "ORIG_FID", "NO_MBG_FIELDS")
-
-        del x_adj
+        arcpy.AddMessage('Number of rows: ' + str(len(layout.rows)))
 
         arcpy.SetProgressor('default', 'Creating strings...')
-         # Subdivide into strings
-        rowsStrings = arcpy.management.SubdividePolygon(rowsFull, r"rowsStrings", "NUMBER_OF_EQUAL_PARTS", stringsRow,None, None, 0, "STRIPS")
-        
+        keepStrings = np.ones(len(layout.strings), dtype=bool)
+
         # Create Inverter Blocks
         if invertersOption == True:
             
             arcpy.SetProgressor('default', 'Creating full inverters...')
 
-            # Create inverters point locations from inverter block center points
-            inverterBlock_centerPoint = arcpy.management.FeatureToPoint(inverterBlocks,r"in_memory\inverterBlock_centerPoint", "CENTROID")
-            arcpy.management.AddXY(arcpy.management.AddXY(inverterBlock_centerPoint))
-
-            y_adj = str((NSfishnet - (NSrowsBlock - 1) * float(rowGap) - float(roadWidth) / 2 - rowLength / float(stringsRow)) / 2)
-            x_adj = str((center_center * (EWrowsBlock - 1) / 2) - center_center / 2)
-
-            arcpy.management.CalculateField(inverterBlock_centerPoint, "yNew", "!POINT_Y! + " + y_adj + "", "PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(inverterBlock_centerPoint, "xNew", "!POINT_X! + " + x_adj + "", "PYTHON3", "", "DOUBLE")
-
-            inverter_points = arcpy.management.XYTableToPoint(inverterBlock_centerPoint, r"in_memory\inverter_points",
-                                                            "xNew", "yNew", None, spatialRef)
-
-            del y_adj
-            del x_adj
-
-            # Create inverter polygon from dimensions
-            y_adj = str(float(inverterLength) / 2 + 1)
-            x_adj = str(float(inverterWidth) / 2 + 1)
-
-
-            arcpy.management.CalculateField(inverter_points, "xW", "!xNew! - " + x_adj + "", "PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(inverter_points, "xE", "!xNew! + " + x_adj + "", "PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(inverter_points, "yN", "!yNew! - " + y_adj + "", "PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(inverter_points, "yS", "!yNew! + " + y_adj + "", "PYTHON3", "", "DOUBLE")
-
-            # Create new points
-            inNW = arcpy.management.XYTableToPoint(inverter_points, r"in_memory\inNW", "xW", "yN", None, spatialRef)
-            inNE = arcpy.management.XYTableToPoint(inverter_points, r"in_memory\inNE", "xE", "yN", None, spatialRef)
-            inSW = arcpy.management.XYTableToPoint(inverter_points, r"in_memory\inSW", "xW", "yS", None, spatialRef)
-            inSE = arcpy.management.XYTableToPoint(inverter_points, r"in_memory\inSE", "xE", "yS", None, spatialRef)
-
-            # merge
-            inverter_bound_points = arcpy.Merge_management([inNW, inNE, inSW, inSE], r"in_memory\inverter_bound_points")
-            inverters_pre = arcpy.management.MinimumBoundingGeometry(inverter_bound_points, r"in_memory\inverters_pre",
-                                                                    "RECTANGLE_BY_AREA", "LIST", "ORIG_FID",
-                                                                    "NO_MBG_FIELDS")
-
-            stringsInverters = arcpy.management.SelectLayerByLocation(rowsStrings, "WITHIN_A_DISTANCE", inverters_pre,
-                                                                    gap_EW, "NEW_SELECTION", "INVERT")
-            strings_pre = arcpy.conversion.FeatureClassToFeatureClass(stringsInverters, workspace, "strings_pre")
-        
-        else:
-            strings_pre = arcpy.conversion.FeatureClassToFeatureClass(rowsStrings, workspace, "strings_pre")
+            # Inverter pads offset from the block centers; strings within the east-west gap of a pad are removed
+            inverterPadsArray = inverterPads(layout.blocks, center_center, rowLength, float(rowGap), float(roadWidth), NSrowsBlock, EWrowsBlock,
+                                             int(stringsRow), float(inverterWidth), float(inverterLength))
+            keepStrings = ~nearPads(layout, inverterPadsArray, gap_EW)
 
         # Calculate initial layout statistics
         arcpy.SetProgressor('default', 'Calculating initial layout statistics..')
 
-        # Select within buildable area
-        strings_buildable = arcpy.management.SelectLayerByLocation(strings_pre, "COMPLETELY_WITHIN", buildable_area, None, "NEW_SELECTION", "NOT_INVERT")
-
-        stringsOutput_pre = arcpy.conversion.FeatureClassToFeatureClass(strings_buildable, workspace, "stringsOutput_pre")
+        # Keep the strings completely within the buildable area
+        buildablePrepared = readPrepared(buildable_area, spatialRef)
+        keepStrings &= rectanglesWithin(buildablePrepared, layout.strings)
 
-        arcpy.management.CalculateField(stringsOutput_pre, "row_ID","!ORIG_FID!", "PYTHON3", None, "LONG")
+        strings_buildable = writeRectangles(workspace, "strings_pre", layout.strings[keepStrings], spatialRef, ["row_ID"], [layout.stringRow[keepStrings] + 1])
 
-        arcpy.management.DeleteField(stringsOutput_pre, "ORIG_FID", "DELETE_FIELDS")
+        stringsOutput_pre = arcpy.conversion.FeatureClassToFeatureClass(strings_buildable, workspace, "stringsOutput_pre")
 
         ### OPTIMIZATION OPTIONS
         # if optimization options are selected run them now
@@ -764,9 +600,8 @@ def xNew(x,xMAX, xDist):
 
         # Create inverters if invertersOption is True
         if invertersOption == True:
-            inverters_buildable = arcpy.management.SelectLayerByLocation(inverters_pre, "COMPLETELY_WITHIN", buildable_area, None, "NEW_SELECTION", "NOT_INVERT")
             inverterName = os.path.basename(inverterOutput)
-            outputInverters = arcpy.conversion.FeatureClassToFeatureClass(inverters_buildable, workspace, inverterName)
+            outputInverters = writeRectangles(workspace, inverterName, inverterPadsArray[rectanglesWithin(buildablePrepared, inverterPadsArray)], spatialRef)
             
             inverterResult = arcpy.GetCount_management(outputInverters)
             # The result is a Result object. To get the count as an integer, use the getOutput method
@@ -834,19 +669,13 @@ def xNew(x,xMAX, xDist):
             if invertersOption == True:
                 aprxMap.addDataFromPath(outputInverters)
                 arcpy.management.Delete(inverterCount)
-                arcpy.management.Delete(inverters_buildable)
-                arcpy.management.Delete(inverters_pre)
-                arcpy.management.Delete(stringsInverters)
                 
             arcpy.management.Delete(stringsOutput_pre_modified)
             
             # Clean up
             arcpy.management.Delete(strings_buildable)
-            arcpy.management.Delete(strings_pre)
-            arcpy.management.Delete(points_stats)
-            arcpy.management.Delete(new_points)
+            arcpy.management.Delete(rowBlocks_pre)
             arcpy.management.Delete(stringsOutput_pre)
-            arcpy.management.Delete(rowsStrings)
         except:
             arcpy.AddMessage("Cleaning up was not successful")
             pass
@@ -968,7 +797,30 @@ def xNew(x,xMAX, xDist):
     
     def removeExclusionRows(stringsOutput_pre, xyzUnit, workspace, exclusionFeatureClass, exclusionRemovePercent):
         # Remove rows that intersect with slope exclusions
-        
+
+        # Projected strings: planar overlap area of every string rectangle with the prepared exclusions in one pass
+        stringsRef = arcpy.Describe(stringsOutput_pre).spatialReference
+        if stringsRef.type == "Projected":
+            stringsOutput_pre_modified = arcpy.management.CopyFeatures(stringsOutput_pre, os.path.join(workspace, "stringsOutput_pre_modified"))
+            oids, extents = featureExtents(stringsOutput_pre_modified)
+            stringArea = (extents[:, 2] - extents[:, 0]) * (extents[:, 3] - extents[:, 1])
+            # Exclusions dissolved so overlapping exclusions count once, as the Erase does, and projected to the strings' coordinate system
+            exclusionsDissolved = arcpy.management.Dissolve(exclusionFeatureClass, r"in_memory\exclusionsDissolved", None, None, "MULTI_PART")
+            overlap = overlapAreas(readPrepared(exclusionsDissolved, stringsRef), extents)
+            arcpy.management.Delete(exclusionsDissolved)
+
+            # Keep strings with more than the percent remaining or untouched by the exclusions
+            percentRemaining = 100 * (1 - overlap / stringArea)
+            keep = (percentRemaining > float(exclusionRemovePercent)) | (overlap <= stringArea * 1e-9)
+            drop = set(oids[~keep].tolist())
+
+            with arcpy.da.UpdateCursor(stringsOutput_pre_modified, ["OID@"]) as cursor:
+                for row in cursor:
+                    if row[0] in drop:
+                        cursor.deleteRow()
+
+            return stringsOutput_pre_modified
+
         # copy strings to a new feature class in memory
         stringsWorking = arcpy.management.CopyFeatures(stringsOutput_pre, r"in_memory\stringsWorking")
         
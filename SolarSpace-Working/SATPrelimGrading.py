@@ -16,24 +16,34 @@ along boundary, added ability to make exclusions based on grading depth,
 added ability for volume estimate outputs
 2.2.0 - Added ability to specify tracker width
 2.3.0 - 1/19/2024 - Added symbology exit protocol to prevent errors & ability to ouput a preliminary graded surface
+2.4.0 - 10/16/2026 - Focal means computed with the shared summed-area table kernel
+2.5.0 - 10/16/2026 - Grading run on memory-mapped tiles within a memory budget
+2.6.0 - 10/16/2026 - Tiles run across the worker processes set by the parallel processing factor
+2.7.0 - 10/16/2026 - Volumes and graded area from one streaming pass over the cut/fill surface
+2.7.1 - 10/17/2026 - Tile files written to a run folder that is removed after the run
+2.7.2 - 10/17/2026 - Graded area is the area of the cells beyond the tolerance, without the simplified outlines and filled holes of the polygonized area
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "2.3.0"
+__version__     = "2.7.2"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.1.3"
 __maintainer__  = ["Zane Nordquist"]
 __status__      = "Deployed"
 
 # Load modules
-import math
 import arcpy
 from arcpy import env
 from arcpy.sa import *
 import os
+import shutil
 import sys
+import tempfile
+from prelimGradingEngine import prelimGradingHalo, prelimGradingTile, TILE_CELL_BYTES
+from tiledRaster import parallelWorkers, rasterToMemmap, memmapToRaster, tiledArrays
+from cutFillVolumes import cutFillVolumes
 
 class PreliminaryGrading(object):
     def __init__(self):
@@ -156,7 +166,15 @@ class PreliminaryGrading(object):
             parameterType="Required",
             direction="Derived")
 
-        params = [param0, param1, param2, param3, param4, param5, param6, param7, param8, param9, param10, param11, param12, param13, param14]
+        param15 = arcpy.Parameter(
+            displayName="Memory budget (MB)",
+            name="memoryBudget",
+            datatype="GPLong",
+            parameterType="Optional",
+            direction="Input")
+        param15.value = 4096
+
+        params = [param0, param1, param2, param3, param4, param5, param6, param7, param8, param9, param10, param11, param12, param13, param14, param15]
 
         return params
 
@@ -258,6 +276,7 @@ class PreliminaryGrading(object):
         exclusionOut = parameters[12].valueAsText # Output exclusion feature class
         demPrelimgradeOutput = parameters[13].value # Output preliminary graded surface
         demPrelimgradeName = parameters[14].valueAsText # Output preliminary graded surface name
+        memoryBudget = parameters[15].value or 4096 # Working memory per tile in MB
         
         # Set grid resolution to the DEM raster and snap to raster
         arcpy.env.snapRaster = demInput
@@ -295,61 +314,34 @@ class PreliminaryGrading(object):
 
         arcpy.SetProgressor("default", "Calculating theoretical grading...")
 
-        # Get the directional NS slope of the DEM
-        # Process aspect
-        AspectDeg = arcpy.sa.Aspect(demInputClip, "PLANAR", xyzUnit)
-
-        AspectRad = AspectDeg * math.pi / 180
-
-        # Run focal statistics (mean) on the input elevation based on the row length and default x distance of 30 ft or 10 m
-        focal_input = str("Rectangle " + str(layout_width) + " " + str(tracker_length) + " MAP")
-        demFocal = arcpy.sa.FocalStatistics(demInputClip, focal_input, "MEAN", "DATA", 90)
-
-        # Process slope
-        SlopeDeg = arcpy.sa.Slope(demFocal, "DEGREE", "1", "PLANAR", xyzUnit)
-        SlopeRad = SlopeDeg * math.pi / 180
-
-        # Process north-south slope in radians
-        CosAspRad = Cos(AspectRad)
-        nsRad = CosAspRad * SlopeRad
-
-        # Process north-south slope in percent if option chosen
-        nsPerc = Tan(nsRad)
-
-        # Run focal statistics (mean) on the NS slope based on the row length and default x distance of 30 ft or 10 m
-        nsFocal = arcpy.sa.FocalStatistics(nsPerc, focal_input, "MEAN", "DATA", 90)
-
-        # Focal statistics on the northings
-        yFocal = arcpy.sa.FocalStatistics(northResample, focal_input, "MEAN", "DATA", 90)
-
-        # Calculate the "intercept" b
-        intB = demFocal - nsFocal * yFocal
-
-        # Calculate a "trend"
-        tPrelim = nsFocal * northResample + intB
-
-        # Subtract the existing elevation from the trend
-        trend_dem = arcpy.sa.Minus(tPrelim, demInputClip)
+        # Read the clipped DEM and the northings into memory-mapped arrays on the same grid
+        tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+        try:
+            demArray, demGrid = rasterToMemmap(demInputClip, os.path.join(tileFolder, "demInputClip.npy"), memoryBudget=memoryBudget)
+            northArray = rasterToMemmap(northResample, os.path.join(tileFolder, "northResample.npy"), demGrid, memoryBudget)[0]
 
-        # Run focal statistics on trend_dem based on the row width - THIS MAY NEED TO BE ADJUSTED - MAYBE HALF?
-        focal_trend_dem_input = str("Rectangle " + str(layout_width) + " " + str(layout_width) + " MAP")
-        initGrade = arcpy.sa.FocalStatistics(trend_dem, focal_trend_dem_input, "MEAN", "DATA", 90)
+            # Run the north-south trend and initial grade tile by tile, each tile padded by the reach of the focal windows
+            halo = prelimGradingHalo(gridRes, layout_width, tracker_length)
+            workers = parallelWorkers(arcpy.env.parallelProcessingFactor)
+            arcpy.AddMessage("Grading tiles on " + str(workers) + " worker processes")
+            cutArray, fillArray = tiledArrays(prelimGradingTile, [demArray, northArray], 2, halo, TILE_CELL_BYTES, memoryBudget, tileFolder, "prelimGrading", workers,
+                                              cellSize=gridRes, layoutWidth=layout_width, trackerLength=float(tracker_length), revTolerance=float(revTolerance))
 
-        # Create the upper and lower bounds - reveal tolerance is intentionally shurnk to be conservative
-        revToleranceHalf = float(revTolerance) / 2.05
-        upperBound = arcpy.sa.Plus(initGrade, revToleranceHalf)
-        lowerBound = arcpy.sa.Minus(initGrade, revToleranceHalf)
+            arcpy.SetProgressor("default", "Creating cut and fill rasters...")
 
-        arcpy.SetProgressor("default", "Creating cut and fill rasters...")
+            # Screen based on the tolerance
+            cutName = os.path.basename(cutOutput)
+            fillName = os.path.basename(fillOutput)
 
-        # Screen based on the tolerance
-        cutName = os.path.basename(cutOutput)
-        fillName = os.path.basename(fillOutput)
+            cutPrelim = memmapToRaster(cutArray, demGrid, os.path.join(workspace, "cutPrelim"), spatialRef, memoryBudget)
+            cutRaster = arcpy.management.Clip(cutPrelim, "", cutOutput, aoi_boundary, "", "ClippingGeometry", "NO_MAINTAIN_EXTENT")
 
-        cutPrelim = arcpy.sa.SetNull(upperBound, upperBound, "VALUE > 0")
-        cutRaster = arcpy.management.Clip(cutPrelim, "", cutOutput, aoi_boundary, "", "ClippingGeometry", "NO_MAINTAIN_EXTENT")
+            fillPrelim = memmapToRaster(fillArray, demGrid, os.path.join(workspace, "fillPrelim"), spatialRef, memoryBudget)
+            del demArray, northArray, cutArray, fillArray
+        finally:
+            # The full-size tile files are removed once the rasters are written
+            shutil.rmtree(tileFolder, ignore_errors=True)
 
-        fillPrelim = arcpy.sa.SetNull(lowerBound, lowerBound, "VALUE < 0")
         fillRaster = arcpy.management.Clip(fillPrelim, "", fillOutput, aoi_boundary, "", "ClippingGeometry", "NO_MAINTAIN_EXTENT")
 
         aprxMap.addDataFromPath(cutRaster)
@@ -400,87 +392,8 @@ class PreliminaryGrading(object):
 
             arcpy.SetProgressor("default", "Calculating preliminary grading statistics...")
 
-            # Calculate the area of one raster square
-            grid_area = str(gridRes ** 2)
-        
-            # Create a polygon of the domain of the existing elevation
-            TotalCutFill = arcpy.ddd.RasterDomain(demInput, "TotalCutFill", "POLYGON")
-
-            # Reclassify cut-fill raster using a tolerance of +/- 1 inch - NOTE: THIS IS ONLY FOR UNITS OF FEET
-            reclass_code = RemapRange([[-300, -.083, 1], [-.083, .083, 0], [.083, 300, 2]])
-            cutFill_reclass = arcpy.sa.Reclassify(cutFill, "VALUE", reclass_code, "DATA")
-            reclass_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, "cutFill_poly", "SIMPLIFY", "Value", "SINGLE_OUTER_PART", None)
-            grade_area = arcpy.analysis.Select(reclass_poly, "grade_area", "gridcode <> 0")
-
-            # Sum the graded area and convert to acres from square feet
-            if xyzUnit == "Foot":
-                total_graded_area = arcpy.analysis.Statistics(grade_area, "total_graded_area", "Shape_Area SUM", None)
-                arcpy.management.AddFields(total_graded_area, [["graded_area_acres", "DOUBLE", "Total Graded Area (acres)"]])
-                arcpy.management.CalculateField(total_graded_area, "graded_area_acres", "round(!SUM_Shape_Area!/43560,2)", "PYTHON3")
-
-            if xyzUnit == "Meter":
-                total_graded_area = arcpy.analysis.Statistics(grade_area, "total_graded_area", "Shape_Area SUM", None)
-                arcpy.management.AddFields(total_graded_area, [["graded_area_m2", "DOUBLE", "Total Graded Area (m^2)"]])
-                arcpy.management.CalculateField(total_graded_area, "graded_area_m2", "round(!SUM_Shape_Area!,2)", "PYTHON3")
-
-            arcpy.SetProgressorLabel("Calculating cut and fill statistics")
-
-            # Calculate the cut-fill statistics
-            Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", cutRaster, "Cut_Total", "DATA", "ALL")
-            Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", fillRaster, "Fill_Total", "DATA", "ALL")
-
-            # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-            if xyzUnit == "Foot":
-                arcpy.management.AddFields(Cut_Total, [["cut_y3", "DOUBLE"]])
-                arcpy.management.CalculateField(Cut_Total, "cut_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3",
-                                                None)
-                arcpy.management.AddFields(Fill_Total, [["fill_y3", "DOUBLE"]])
-                arcpy.management.CalculateField(Fill_Total, "fill_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3")
-                arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_y3"])
-                arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_y3"])
-
-                # Calculate net, gross, and ratio statistics for cubic yards
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_y3 SUM; fill_y3 SUM", None)
-                arcpy.management.AddFields(CutFill_Total,[["net_y3", "DOUBLE"], ["gross_y3", "DOUBLE"], ["cut_fill_ratio", "DOUBLE"]])
-                arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_y3! + !SUM_fill_y3!,2)","PYTHON3")
-                arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_y3! - !SUM_cut_y3!,2)","PYTHON3")
-                arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)", "PYTHON3")
-
-                # Merge area and volume tables and transpose table for final output
-                arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_acres")
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_y3", "Cut Volume (y^3)"],
-                                                                                ["SUM_fill_y3", "Fill Volume (y^3)"],
-                                                                                ["Net_Volume", "Net Volume (y^3)"],
-                                                                                ["Total_Volume", "Total Volume (y^3)"],
-                                                                                ["cut_fill_ratio", "Cut/Fill Ratio"],
-                                                                                ["graded_area_acres",
-                                                                                 "Graded Area (acres)"]], statsOutput,
-                                                                                "Grading", "Summary", None)
-
-            if xyzUnit == "Meter":
-                arcpy.management.AddFields(Cut_Total, [["cut_m3", "DOUBLE"]])
-                arcpy.management.CalculateField(Cut_Total, "cut_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3", None)
-                arcpy.management.AddFields(Fill_Total, [["fill_m3", "DOUBLE"]])
-                arcpy.management.CalculateField(Fill_Total, "fill_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3")
-                arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_m3"])
-                arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_m3"])
-
-                # Calculate net, gross, and ratio statistics for cubic meters
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_m3 SUM; fill_m3 SUM", None)
-                arcpy.management.AddFields(CutFill_Total, [["net_m3", "DOUBLE"], ["gross_m3", "DOUBLE"], ["cut_fill_ratio", "DOUBLE"]])
-                arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_m3! + !SUM_fill_m3!,2)", "PYTHON3")
-                arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_m3! - !SUM_cut_m3!,2)","PYTHON3")
-                arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)", "PYTHON3")
-
-                # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-                arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_m2")
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_m3", "Cut Volume (m^3)"],
-                                                                                ["SUM_fill_m3", "Fill Volume (m^3)"],
-                                                                                ["Net_Volume", "Net Volume (m^3)"],
-                                                                                ["Total_Volume", "Total Volume (m^3)"],
-                                                                                ["cut_fill_ratio", "Cut/Fill Ratio"],
-                                                                                ["graded_area_m2", "Graded Area (m^2)"]],
-                                                                                statsOutput, "Grading", "Summary", None)
+            # Volumes and graded area in one pass over the cut/fill surface
+            output_table = cutFillVolumes(cutFill, xyzUnit, statsOutput, 0.083)
 
         # Create exclusion areas based on maximum cut or fill depth
         if exclusionOption == True:
@@ -540,19 +453,14 @@ class PreliminaryGrading(object):
             arcpy.AddMessage("Preliminary graded surface option is not selected. This may not take a few minutes.")
         
         # Clean up
-        arcpy.management.Delete("Cut_Fill_Totals")
-        arcpy.management.Delete("Cut_Total")
-        arcpy.management.Delete("cutFill_poly")
-        arcpy.management.Delete("Fill_Total")
-        arcpy.management.Delete("grade_area")
         arcpy.management.Delete("grid_project")
         arcpy.management.Delete("grid_project_point")
         arcpy.management.Delete("northing_raster")
-        arcpy.management.Delete("total_graded_area")
-        arcpy.management.Delete("TotalCutFill")
         arcpy.management.Delete("cutFill")
         arcpy.management.Delete(demInputClip)
         arcpy.management.Delete("northResample")
+        arcpy.management.Delete(cutPrelim)
+        arcpy.management.Delete(fillPrelim)
 
         arcpy.ResetProgressor()
 
@@ -6,12 +6,17 @@ Revision log
 0.0.2 - 03/15/2022 - added row boundary expansion variable and piles for extraction of values
 1.0.0 - 02/03/2023 - Updated to PYT
 1.0.1 - 02/28/2023 - Added spatial join for piles if row ID doesn't exist in piles
+1.2.0 - 10/16/2026 - Grading band clamped in one pass instead of the mosaic minimum/maximum chain
+1.2.1 - 10/16/2026 - Row reveals reduced with the zonal statistics engine
+1.3.0 - 10/16/2026 - Volumes, graded area and cut and fill rasters from one streaming pass over the surfaces
+1.3.1 - 10/16/2026 - Row spacing from the spatial index instead of a near table of the rows
+1.3.2 - 10/17/2026 - Graded area is the area of the cells beyond the tolerance, without the simplified outlines and filled holes of the polygonized area
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "John Williamson"]
-__version__     = "1.1.0"
+__version__     = "1.3.2"
 __license__     = "Internal"
 __ArcVersion__  = "ArcGIS Pro 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -23,6 +28,10 @@ import os
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
+from gradeBand import bandClampRaster
+from zonalStats import zonalRaster
+from cutFillVolumes import cutFillVolumes
+from spatialIndex import nearestDistance
 
 class SATSiTE_Rough(object):
     def __init__(self):
@@ -303,24 +312,9 @@ class SATSiTE_Rough(object):
 
         arcpy.management.AddXY(rowCornerPoints)
 
-        # Find the minimum distance north-south between rows
-        rowsNear = arcpy.analysis.GenerateNearTable(rowsInput, rowsInput, r"in_memory\rowsNear", None, "NO_LOCATION","ANGLE", "ALL", 8, "GEODESIC")
-
-        codeblock_nsDist = """
-def direction(angle, nearDist):
-    if ((angle < -175) or (angle >= 0 and angle < 5)) or (angle > 175 and angle < 185):
-        return nearDist
-    else:
-        return ""
-"""
-        arcpy.management.CalculateField(rowsNear, "delta_y", "direction(!NEAR_ANGLE!, !NEAR_DIST!)", "PYTHON3", codeblock_nsDist, "DOUBLE")
-
-        near_y_stats = arcpy.analysis.Statistics(rowsNear, r"in_memory\near_y_stats", "NEAR_DIST MIN")
-        arcpy.management.AlterField(near_y_stats, "MIN_NEAR_DIST", "minYdist")
-
-        arcpy.management.CalculateField(rowsInput, "joinField", "1", "PYTHON3", "", "LONG")
-
-        arcpy.management.JoinField(rowsInput, "joinField", near_y_stats, "OBJECTID", "minYdist")
+        # Find the minimum distance between rows
+        minYdist = nearestDistance(rowsInput)
+        arcpy.management.CalculateField(rowsInput, "minYdist", str(minYdist), "PYTHON3", "", "DOUBLE")
 
         arcpy.management.CalculateField(rowsInput, "gridRes", gridRes, "PYTHON3", "", "DOUBLE")
 
@@ -337,24 +331,15 @@ def nsExp(minYdist,gridRes):
 
         rowBoundsExpand = arcpy.analysis.GraphicBuffer(rowsInput, "rowBoundsExpand", "nsExp", "SQUARE", "MITER", 10,"0 Feet")
 
-        arcpy.management.DeleteField(rowsInput, ["nsExp", "gridRes", "joinField"])
+        arcpy.management.DeleteField(rowsInput, ["nsExp", "gridRes"])
 
         # Calculate spacing above and below plane of array
         delta_poa = (float(maxReveal) - float(minReveal))
         arcpy.AddMessage("Reveal tolerance: " + str(delta_poa) + " " + mapUnits)
         spacing = delta_poa / 2
 
-        # Create the upper bound
-        upperLimit = arcpy.sa.Plus(poa_base, spacing)
-        upperBound = arcpy.management.MosaicToNewRaster([demInput, upperLimit], "in_memory", "upperBound", spatialRef,"32_BIT_FLOAT", gridRes, 1, "MINIMUM", "FIRST")
-
-        # Create the lower bound
-        lowerLimit = arcpy.sa.Minus(poa_base, spacing)
-        lowerBound = arcpy.management.MosaicToNewRaster([demInput, lowerLimit], "in_memory", "lowerBound", spatialRef,"32_BIT_FLOAT", gridRes, 1, "MAXIMUM", "FIRST")
-
-        # Create and the final grading DEM
-        upperGrade = arcpy.sa.Minus(upperBound, demInput)
-        demGrade = arcpy.sa.Plus(lowerBound, upperGrade)
+        # Clamp the existing surface into the band around the plane of array for the final grading DEM
+        demGrade, cutFillFinal = bandClampRaster(demInput, poa_base, spacing, spatialRef)
         demGrade.save(gradeOut)
         aprxMap.addDataFromPath(demGrade)
 
@@ -382,7 +367,7 @@ def nsExp(minYdist,gridRes):
         arcpy.SetProgressor("step", "Calculating reveals...", 0, 1)
         grade_trends = arcpy.sa.Minus(demGrade, poa_base)
         min_rev_grade = arcpy.sa.Plus(float(minReveal), grade_trends)
-        max_min_reveal = arcpy.sa.ZonalStatistics(rowBoundsExpand, "OBJECTID", min_rev_grade, "MAXIMUM", "DATA")
+        max_min_reveal = zonalRaster(rowBoundsExpand, "OBJECTID", min_rev_grade, "MAXIMUM")
         reveals = arcpy.sa.Minus(max_min_reveal, grade_trends)
 
         arcpy.SetProgressor("step", "Calculating plane of array...", 0, 1)
@@ -407,86 +392,10 @@ def nsExp(minYdist,gridRes):
         if cutFillOption == True:
             arcpy.SetProgressor("default", "Comparing the graded surface to the existing surface...")
 
-            # Calculate the area of one raster square
-            grid_area = str(gridRes ** 2)
-
-            # Create a polygon of the domain of the existing elevation
-            TotalCutFill = arcpy.ddd.RasterDomain(demInput, "TotalCutFill", "POLYGON")
-
-            # Create new cut and fill rasters based on the final grade
-            cutFillFinal = arcpy.sa.Minus(demGrade, demInput)
-            
-            # Create individual cut rasters and fill rasters
-            cut_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, "VALUE > 0")
-            cut_raster.save(cutOut)
-            fill_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, "VALUE < 0")
-            fill_raster.save(fillOut)
-
-            arcpy.SetProgressorLabel("Calculating total graded area")
-
-            # Reclassify cut-fill raster using a tolerance of +/- 1 inch - NOTE: THIS IS ONLY FOR UNITS OF FEET
-            reclass_code = RemapRange([[-300,-.01, 1],[-.01, .01, 0],[.01, 300, 2]])
-            cutFill_reclass = arcpy.sa.Reclassify(cutFillFinal, 'VALUE', reclass_code, 'DATA')
-            reclass_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, 'cutFill_poly', 'SIMPLIFY', 'Value', 'SINGLE_OUTER_PART', None)
-            grade_area = arcpy.analysis.Select(reclass_poly, 'grade_area', 'gridcode <> 0')
-
-            # Sum the graded area and convert to acres from square feet
-            if xyzUnit == "Foot":
-                total_graded_area = arcpy.analysis.Statistics(grade_area, "total_graded_area", "Shape_Area SUM", None)
-                arcpy.management.AddFields(total_graded_area,[["graded_area_acres", "DOUBLE", "Total Graded Area (acres)"]])
-                arcpy.management.CalculateField(total_graded_area, "graded_area_acres", "round(!SUM_Shape_Area!/43560,2)","PYTHON3", None)
-
-            if xyzUnit == "Meter":
-                total_graded_area = arcpy.analysis.Statistics(grade_area, "total_graded_area", "Shape_Area SUM", None)
-                arcpy.management.AddFields(total_graded_area, [["graded_area_m2", "DOUBLE", "Total Graded Area (m^2)"]])
-                arcpy.management.CalculateField(total_graded_area, "graded_area_m2", "round(!SUM_Shape_Area!,2)", "PYTHON3",None)
-
-            arcpy.SetProgressorLabel("Calculating cut and fill statistics")
-
-            # Calculate the cut-fill statistics
-            Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", cut_raster, "Cut_Total", "DATA", "ALL")
-            Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", fill_raster, "Fill_Total", "DATA", "ALL")
-
-            # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-            if xyzUnit == "Foot":
-                arcpy.management.CalculateField(Cut_Total, "cut_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","", "DOUBLE")
-                arcpy.management.CalculateField(Fill_Total, "fill_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","","DOUBLE")
-                arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_y3"])
-                arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_y3"])
-
-                # Calculate net, gross, and ratio statistics for cubic yards
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_y3 SUM; fill_y3 SUM", None)
-                arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_y3! + !SUM_fill_y3!,2)","PYTHON3", "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_y3! - !SUM_cut_y3!,2)","PYTHON3", "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)", "PYTHON3", "","DOUBLE")
-
-                # Merge area and volume tables and transpose table for final output
-                arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_acres")
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_y3", "Cut Volume (y^3)"],["SUM_fill_y3", "Fill Volume (y^3)"],["Net_Volume", "Net Volume (y^3)"],["Total_Volume", "Total Volume (y^3)"],["cut_fill_ratio", "Cut/Fill Ratio"],["graded_area_acres","Graded Area (acres)"]], statsOutput,"Grading", "Summary", None)
-
-            if xyzUnit == "Meter":
-                arcpy.management.CalculateField(Cut_Total, "cut_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3", "","DOUBLE")
-                arcpy.management.CalculateField(Fill_Total, "fill_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3","","DOUBLE")
-                arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_m3"])
-                arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_m3"])
-
-                # Calculate net, gross, and ratio statistics for cubic meters
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_m3 SUM; fill_m3 SUM", None)
-                arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_m3! + !SUM_fill_m3!,2)","PYTHON3", "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_m3! - !SUM_cut_m3!,2)","PYTHON3", "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)", "PYTHON3", "","DOUBLE")
-
-                # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-                arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_m2")
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_m3", "Cut Volume (m^3)"],["SUM_fill_m3", "Fill Volume (m^3)"],["Net_Volume", "Net Volume (m^3)"],["Total_Volume", "Total Volume (m^3)"],["cut_fill_ratio", "Cut/Fill Ratio"],["graded_area_m2", "Graded Area (m^2)"]],statsOutput, "Grading", "Summary", None)
-
-            # Clean up
-            arcpy.management.Delete("Cut_Fill_Totals")
-            arcpy.management.Delete("Cut_Total")
-            arcpy.management.Delete("cutFill_poly")
-            arcpy.management.Delete("Fill_Total")
-            arcpy.management.Delete("total_graded_area")
-            arcpy.management.Delete("TotalCutFill")
+            # Cut and fill rasters, volumes and graded area in one pass over the surfaces
+            output_table = cutFillVolumes(cutFillFinal, xyzUnit, statsOutput, 0.01, cutOutput=cutOut, fillOutput=fillOut)
+            cut_raster = cutOut
+            fill_raster = fillOut
 
             aprxMap.addDataFromPath(cut_raster)
             aprxMap.addDataFromPath(fill_raster)
@@ -5,12 +5,14 @@ Revision log
 v0.0.1 - 3/15/2022 - Adapted from full smooth grading script
 v1.0.0 - 1/9/2023 - Upgraded to Python Toolbox format, revised grading 
 boundary derivation for simplified boundaries
+v1.1.0 - 10/16/2026 - Grading boundaries extracted by raster morphology instead of polygonizing and buffering the cut/fill raster
+v1.2.0 - 10/16/2026 - Volumes, graded area and cut and fill rasters from one streaming pass over the surfaces
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.0.0"
+__version__     = "1.2.0"
 __license__     = "Internal"
 __ArcVersion__  = "ArcGIS 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -22,6 +24,8 @@ import os.path
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
+from gradingBounds import gradingBounds
+from cutFillVolumes import cutFillVolumes
 
 class SmoothRoughGrading(object):
     def __init__(self):
@@ -180,28 +184,8 @@ class SmoothRoughGrading(object):
 
         piles_graded_pre = arcpy.analysis.Select(piles_working, 'piles_graded_pre', 'cutFill_temp < -0.083 OR cutFill_temp > 0.083' )
 
-        # Reclassify cut-fill raster using tolerance
-        reclass_code = RemapRange([[-300,-1*float(.083), 1],[-1*float(.083), float(.083), 0],[float(.083), 300, 2]])
-        cutFill_reclass = arcpy.sa.Reclassify(cutFill, "VALUE", reclass_code, "DATA")
-        reclass_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, "cutFill_poly", "SIMPLIFY", "Value", "SINGLE_OUTER_PART", None)
-        grade_area = arcpy.analysis.Select(reclass_poly, "grade_area", "gridcode <> 0")
-
-        # Select areas that intersect piles that are graded
-        grade_intersect = arcpy.management.SelectLayerByLocation(grade_area, 'INTERSECT', piles_graded_pre)
-        grade_area_rows = arcpy.conversion.FeatureClassToFeatureClass(grade_intersect, workspace, 'grade_area_rows')
-
-        # Buffer the graded areas by 5 feet close small holes and merge areas within 10 feet of each other
-        hole_close_buffer = "10 Feet"
-        grade_area_rows_buff = arcpy.analysis.PairwiseBuffer(grade_area_rows, 'grade_area_rows_buff', hole_close_buffer, "ALL")
-
-        # Invert the buffer to just inside the graded area to eliminate small areas
-        buffer_in = "-9 Feet"
-        bounds_invert = arcpy.analysis.PairwiseBuffer(grade_area_rows_buff, 'bounds_invert', buffer_in, "ALL")
-
-        # Extend the graded areas to 2 the raster resolution outside of the graded areas to join close areas  
-        bounds_extend = "3 Feet"
-
-        grade_bounds_pre = arcpy.analysis.PairwiseBuffer(bounds_invert, "grade_bounds_pre", bounds_extend, "ALL")
+        # Grading areas holding graded piles, closed, trimmed and extended by raster morphology
+        grade_bounds_pre = gradingBounds(cutFill, piles_graded_pre, "grade_bounds_pre", 0.083)
 
         if gridRes > 2:
             simplifyFactor = 1
@@ -249,86 +233,10 @@ class SmoothRoughGrading(object):
         if cutFillOption == True:
             arcpy.SetProgressor('default', 'Comparing the graded surface to the existing surface...')
 
-            # Calculate the area of one raster square
-            grid_area = str(gridRes ** 2)
-
-            # Create a polygon of the domain of the existing elevation
-            TotalCutFill = arcpy.ddd.RasterDomain(demInput, 'TotalCutFill', 'POLYGON')
-
-            # Create new cut and fill rasters based on the final grade
-            cutFillFinal = arcpy.sa.Minus(grade_raster, demInput)
-            
-            # Create individual cut rasters and fill rasters
-            cut_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, 'VALUE > 0')
-            cut_raster.save(cutOut)
-            fill_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, 'VALUE < 0')
-            fill_raster.save(fillOut)
-                
-            arcpy.SetProgressorLabel('Calculating total graded area')
-
-            # Sum the graded area and convert to acres from square feet
-            if xyzUnit == "Foot":
-                total_graded_area = arcpy.analysis.Statistics(grade_bounds, 'total_graded_area', 'Shape_Area SUM', None)
-                arcpy.management.AddFields(total_graded_area,[['graded_area_acres', 'DOUBLE', 'Total Graded Area (acres)']])
-                arcpy.management.CalculateField(total_graded_area, 'graded_area_acres', 'round(!SUM_Shape_Area!/43560,2)','PYTHON3', None)
-
-            if xyzUnit == "Meter":
-                total_graded_area = arcpy.analysis.Statistics(grade_bounds, 'total_graded_area', 'Shape_Area SUM', None)
-                arcpy.management.AddFields(total_graded_area, [['graded_area_m2', 'DOUBLE', 'Total Graded Area (m^2)']])
-                arcpy.management.CalculateField(total_graded_area, 'graded_area_m2', 'round(!SUM_Shape_Area!,2)', 'PYTHON3',None)
-
-            arcpy.SetProgressorLabel('Calculating cut and fill statistics')
-
-            # Calculate the cut-fill statistics
-            Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, 'OID', cut_raster, 'Cut_Total', 'DATA', 'ALL')
-            Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, 'OID', fill_raster, 'Fill_Total', 'DATA', 'ALL')
-
-            # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-            if xyzUnit == "Foot":
-                arcpy.management.AddFields(Cut_Total, [['cut_y3', 'DOUBLE']])
-                arcpy.management.CalculateField(Cut_Total, 'cut_y3', 'round((!SUM!*' + grid_area + ')/27,2)', 'PYTHON3',None)
-                arcpy.management.AddFields(Fill_Total, [['fill_y3', 'DOUBLE']])
-                arcpy.management.CalculateField(Fill_Total, 'fill_y3', 'round((!SUM!*' + grid_area + ')/27,2)', 'PYTHON3',None)
-                arcpy.management.JoinField(TotalCutFill, 'OID', Cut_Total, 'OID', ['cut_y3'])
-                arcpy.management.JoinField(TotalCutFill, 'OID', Fill_Total, 'OID', ['fill_y3'])
-
-                # Calculate net, gross, and ratio statistics for cubic yards
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, 'Cut_Fill_Totals', 'cut_y3 SUM; fill_y3 SUM', None)
-                arcpy.management.AddFields(CutFill_Total,[['net_y3', 'DOUBLE'], ['gross_y3', 'DOUBLE'], ['cut_fill_ratio', 'DOUBLE']])
-                arcpy.management.CalculateField(CutFill_Total, 'Net_Volume', 'round(!SUM_cut_y3! + !SUM_fill_y3!,2)','PYTHON3', None)
-                arcpy.management.CalculateField(CutFill_Total, 'Total_Volume', 'round(!SUM_fill_y3! - !SUM_cut_y3!,2)','PYTHON3', None)
-                arcpy.management.CalculateField(CutFill_Total, 'cut_fill_ratio','round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)', 'PYTHON3', None)
-
-                # Merge area and volume tables and transpose table for final output
-                arcpy.management.JoinField(CutFill_Total, 'OBJECTID', total_graded_area, 'OBJECTID', 'graded_area_acres')
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [['SUM_cut_y3', 'Cut Volume (y^3)'],['SUM_fill_y3', 'Fill Volume (y^3)'],['Net_Volume', 'Net Volume (y^3)'],['Total_Volume', 'Total Volume (y^3)'],['cut_fill_ratio', 'Cut/Fill Ratio'],['graded_area_acres','Graded Area (acres)']], statsOutput,'Grading', 'Summary', None)
-
-            if xyzUnit == "Meter":
-                arcpy.management.AddFields(Cut_Total, [['cut_m3', 'DOUBLE']])
-                arcpy.management.CalculateField(Cut_Total, 'cut_m3', 'round((!SUM!*' + grid_area + '),2)', 'PYTHON3', None)
-                arcpy.management.AddFields(Fill_Total, [['fill_m3', 'DOUBLE']])
-                arcpy.management.CalculateField(Fill_Total, 'fill_m3', 'round((!SUM!*' + grid_area + '),2)', 'PYTHON3',None)
-                arcpy.management.JoinField(TotalCutFill, 'OID', Cut_Total, 'OID', ['cut_m3'])
-                arcpy.management.JoinField(TotalCutFill, 'OID', Fill_Total, 'OID', ['fill_m3'])
-
-                # Calculate net, gross, and ratio statistics for cubic meters
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, 'Cut_Fill_Totals', 'cut_m3 SUM; fill_m3 SUM', None)
-                arcpy.management.AddFields(CutFill_Total,[['net_m3', 'DOUBLE'], ['gross_m3', 'DOUBLE'], ['cut_fill_ratio', 'DOUBLE']])
-                arcpy.management.CalculateField(CutFill_Total, 'Net_Volume', 'round(!SUM_cut_m3! + !SUM_fill_m3!,2)','PYTHON3', None)
-                arcpy.management.CalculateField(CutFill_Total, 'Total_Volume', 'round(!SUM_fill_m3! - !SUM_cut_m3!,2)','PYTHON3', None)
-                arcpy.management.CalculateField(CutFill_Total, 'cut_fill_ratio','round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)', 'PYTHON3', None)
-
-                # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-                arcpy.management.JoinField(CutFill_Total, 'OBJECTID', total_graded_area, 'OBJECTID', 'graded_area_m2')
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [['SUM_cut_m3', 'Cut Volume (m^3)'],['SUM_fill_m3', 'Fill Volume (m^3)'],['Net_Volume', 'Net Volume (m^3)'],['Total_Volume', 'Total Volume (m^3)'],['cut_fill_ratio', 'Cut/Fill Ratio'],['graded_area_m2', 'Graded Area (m^2)']],statsOutput, 'Grading', 'Summary', None)
-
-            # Clean up
-            arcpy.management.Delete("Cut_Fill_Totals")
-            arcpy.management.Delete("Cut_Total")
-            arcpy.management.Delete("cutFill_poly")
-            arcpy.management.Delete("Fill_Total")
-            arcpy.management.Delete("total_graded_area")
-            arcpy.management.Delete("TotalCutFill")
+            # Cut and fill rasters, volumes and graded area in one pass over the surfaces
+            output_table = cutFillVolumes((grade_raster, demExist), xyzUnit, statsOutput, gradeBounds=grade_bounds, cutOutput=cutOut, fillOutput=fillOut)
+            cut_raster = cutOut
+            fill_raster = fillOut
 
             aprxMap.addDataFromPath(cut_raster)
             aprxMap.addDataFromPath(fill_raster)
@@ -0,0 +1,134 @@
+########################################################################
+"""BATCHED BASE PLANE FITTER
+
+Fits the linear base plane (first order trend) of every tracker row in
+one pass. The expanded row bounds are rasterized into label arrays, the
+least-squares normal equations of every row are accumulated with
+bincount and solved together, and the planes are evaluated over each
+row's footprint with the overlap blending of the mosaic step.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Base plane surface returns the plane array only
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.2"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import numpy as np
+from rasterArrays import cellCenters, rasterizePolygons
+
+def fitPlanes(dem, grid, labelLayers, nLabels):
+    """Least-squares plane z = a + b*x + c*y of the DEM cells under each label
+
+    Returns an (nLabels + 1, 3) array of [a, b, c] indexed by label, with
+    coordinates relative to the grid's upper-left corner. Labels with
+    fewer than three cells, or collinear cells, are NaN.
+    """
+
+    x, y = cellCenters(grid)
+    dx = np.broadcast_to((x - grid.xMin)[None, :], dem.shape)
+    dy = np.broadcast_to((y - grid.yMax)[:, None], dem.shape)
+    valid = ~np.isnan(dem)
+
+    # Sums of the normal equations per label
+    terms = {"n": None, "x": dx, "y": dy, "z": dem, "xx": dx * dx, "xy": dx * dy, "yy": dy * dy, "xz": dx * dem, "yz": dy * dem}
+    sums = dict((key, np.zeros(nLabels + 1)) for key in terms)
+    for labels in labelLayers:
+        use = valid & (labels > 0)
+        idx = labels[use]
+        for key, values in terms.items():
+            weights = None if values is None else values[use].astype(np.float64)
+            sums[key] += np.bincount(idx, weights, minlength=nLabels + 1)
+
+    # Solve the centered normal equations so large coordinates stay well conditioned
+    n = sums["n"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = sums["x"] / n
+        my = sums["y"] / n
+        mz = sums["z"] / n
+        sxx = sums["xx"] - n * mx * mx
+        sxy = sums["xy"] - n * mx * my
+        syy = sums["yy"] - n * my * my
+        sxz = sums["xz"] - n * mx * mz
+        syz = sums["yz"] - n * my * mz
+
+        det = sxx * syy - sxy * sxy
+        b = (sxz * syy - syz * sxy) / det
+        c = (syz * sxx - sxz * sxy) / det
+        a = mz - b * mx - c * my
+
+    coeffs = np.stack([a, b, c], axis=1)
+    coeffs[~((n >= 3) & (det > 1e-9 * sxx * syy))] = np.nan
+
+    return coeffs
+
+def evaluatePlanes(coeffs, grid, labelLayers, blend=True):
+    """Evaluate each plane over the bounding box of its labelled cells and mosaic the results
+
+    Overlaps are blended with weights that grow with distance from each
+    plane's edge (mosaic BLEND), or averaged evenly (mosaic MEAN) when
+    blend is False.
+    """
+
+    total = np.zeros((grid.nRows, grid.nCols))
+    weight = np.zeros((grid.nRows, grid.nCols))
+    x, y = cellCenters(grid)
+    dx = x - grid.xMin
+    dy = y - grid.yMax
+
+    for labels in labelLayers:
+        rows, cols = np.nonzero(labels)
+        if len(rows) == 0:
+            continue
+        ids = labels[rows, cols]
+
+        # Bounding box of each label's cells
+        nLabels = len(coeffs) - 1
+        r0 = np.full(nLabels + 1, grid.nRows)
+        c0 = np.full(nLabels + 1, grid.nCols)
+        r1 = np.full(nLabels + 1, -1)
+        c1 = np.full(nLabels + 1, -1)
+        np.minimum.at(r0, ids, rows)
+        np.minimum.at(c0, ids, cols)
+        np.maximum.at(r1, ids, rows)
+        np.maximum.at(c1, ids, cols)
+
+        for label in np.unique(ids):
+            a, b, c = coeffs[label]
+            if np.isnan(a):
+                continue
+            rs = slice(r0[label], r1[label] + 1)
+            cs = slice(c0[label], c1[label] + 1)
+            plane = a + b * dx[cs][None, :] + c * dy[rs][:, None]
+
+            if blend:
+                # Distance in cells from the edge of the plane's footprint
+                h = r1[label] - r0[label] + 1
+                w = c1[label] - c0[label] + 1
+                rowDist = np.minimum(np.arange(h), np.arange(h)[::-1])
+                colDist = np.minimum(np.arange(w), np.arange(w)[::-1])
+                wts = 1.0 + np.minimum(rowDist[:, None], colDist[None, :])
+            else:
+                wts = 1.0
+
+            total[rs, cs] += plane * wts
+            weight[rs, cs] += wts
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = total / weight
+    out[weight == 0] = np.nan
+
+    return out.astype(np.float32)
+
+def basePlaneSurface(dem, grid, polygons, blend=True):
+    """Fit and evaluate the base plane of every polygon; returns the plane raster array"""
+
+    labelLayers = rasterizePolygons(polygons, grid)
+    coeffs = fitPlanes(dem, grid, labelLayers, len(polygons))
+
+    return evaluatePlanes(coeffs, grid, labelLayers, blend)
@@ -5,12 +5,13 @@ Revision log
 0.0.1 - 8/30/2021- Updated to match KN coding standards
 0.0.2 - 2/14/2022 - Completely rebuilt, incorporated zones into algorithm, much faster
 1.0.0 - 12/9/2022 - Converted to PYT format
+1.1.0 - 10/16/2026 - Base planes fitted in one batched pass instead of per-row Trend
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.0.0"
+__version__     = "1.1.0"
 __license__     = "Internal"
 __ArcVersion__  = "ArcGIS 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -22,6 +23,8 @@ import os.path
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
+from rasterArrays import rasterGrid, snapGrid, readRaster, writeRaster, readPolygons
+from basePlaneFit import basePlaneSurface
 
 class BasePlanes(object):
     def __init__(self):
@@ -182,25 +185,6 @@ class BasePlanes(object):
 
         arcpy.management.AddXY(rowCornerPoints)
 
-        # Calculate new point coordinates
-        codeblock_newXTG = """ 
-def xNewTG(pos,x):
-    if pos == "NW" or pos == "SW":
-        return x - 10
-    if pos == "NE" or pos == "SE":
-        return x + 10
-    """
-
-        arcpy.management.CalculateField(rowCornerPoints, "xNewTG", "xNewTG(!Position!,!POINT_X!)", "PYTHON3",codeblock_newXTG, "DOUBLE")
-        expTable = arcpy.conversion.TableToTable(rowCornerPoints, workspace, "expTable")
-        expPoints = arcpy.management.XYTableToPoint(expTable, r"in_memory\expPoints", "xNewTG", "POINT_Y", None,spatialRef)
-
-        tGroupExp = arcpy.management.MinimumBoundingGeometry(expPoints, "tGroupExp", "RECTANGLE_BY_AREA", "LIST","PolygonOID", "NO_MBG_FIELDS")
-        tGroupDiss = arcpy.Dissolve_management(tGroupExp, "tGroupDiss")
-        tGroup = arcpy.management.MultipartToSinglepart(tGroupDiss, "tGroup")
-        arcpy.AddField_management(tGroup, "tGroup", "LONG")
-        arcpy.management.CalculateField(tGroup, "tGroup", "!OBJECTID!", "PYTHON3", None)
-
         # Find distance between rows east-west
         rowsNear = arcpy.analysis.GenerateNearTable(rowsInput, rowsInput, r'in_memory\rowsNear', None, 'NO_LOCATION','ANGLE', 'ALL', 8, 'GEODESIC')
 
@@ -310,49 +294,19 @@ def yNew(pos,y,ydist):
 
         aprxMap.addDataFromPath(basePlane_bounds)
 
-        rowsGrouped = arcpy.analysis.SpatialJoin(basePlane_bounds, tGroup, "rowsGrouped", "JOIN_ONE_TO_ONE", "KEEP_ALL","", "INTERSECT", None, "")
-
-        # Create scratch geodatabase for the base planes
-        basePlaneScratchGDB = arcpy.management.CreateFileGDB(outputPath, "bpWorking.gdb", "CURRENT")
-
-        arcpy.analysis.SplitByAttributes(rowsGrouped, basePlaneScratchGDB, "tGroup")
-
-        # List feature classes
-        scratchWS = arcpy.env.workspace = (outputPath + "/bpWorking.gdb")
-        tGroupClasses = arcpy.ListFeatureClasses()
-
-        for tG in tGroupClasses:
-            try:
-                demClip = arcpy.management.Clip(demInput, "", "demClip", tG)
-                demPoint = arcpy.conversion.RasterToPoint(demClip, "demPoint", "Value")
-                planes = arcpy.management.CreateRasterDataset(scratchWS, "planes" + "_" + tG, gridRes, "32_BIT_FLOAT", spatialRef, "1")
-                with arcpy.da.SearchCursor(tG, "SHAPE@") as cursor:
-                    for row in cursor:
-                        demClipPoint = arcpy.analysis.Clip(demPoint, row[0], "demClipPoint")
-                        outPlanes = arcpy.sa.Trend(demClipPoint, "grid_code", gridRes, 1, "LINEAR", None)
-                        arcpy.Mosaic_management(outPlanes, planes, "MEAN")
-            except Exception as err:
-                arcpy.AddMessage(str(err.message))
-
-        del cursor
-        arcpy.management.Delete(demClip)
-
-        # List all the rasters and mosaic them
-        planesAll = arcpy.ListRasters()
+        # Fit the plane of every row in one pass and blend the overlaps
+        boundsExtent = arcpy.Describe(basePlane_bounds).extent
+        planeGrid = snapGrid(rasterGrid(demInput), boundsExtent.XMin, boundsExtent.YMin, boundsExtent.XMax, boundsExtent.YMax)
+        demArray, planeGrid = readRaster(demInput, planeGrid)
+        planePolygons = readPolygons(basePlane_bounds)[0]
+        planesArray = basePlaneSurface(demArray, planeGrid, planePolygons, blend=True)
 
         bpName = os.path.basename(basePlanesOut)
-
-        baseplanesRaster = arcpy.management.MosaicToNewRaster(planesAll, workspace, bpName,spatialRef,"32_BIT_FLOAT",gridRes,1,"BLEND","FIRST")
+        baseplanesRaster = writeRaster(planesArray, planeGrid, os.path.join(workspace, bpName), spatialRef)
 
         # Clean up
-        arcpy.management.Delete(expTable)
         arcpy.management.Delete(new_points_table)
-        arcpy.management.Delete(rowsGrouped)
         arcpy.management.Delete(screenTable)
-        arcpy.management.Delete(tGroup)
-        arcpy.management.Delete(tGroupDiss)
-        arcpy.management.Delete(tGroupExp)
-        arcpy.management.Delete(basePlaneScratchGDB)
 
         aprxMap.addDataFromPath(baseplanesRaster)
 
@@ -0,0 +1,6 @@
+"""SolarSpace toolbox benchmarks
+
+syntheticSite builds deterministic synthetic sites, engineBench times the
+tool engines on them and checks for regressions, and toolboxLoad times
+opening the toolbox.
+"""
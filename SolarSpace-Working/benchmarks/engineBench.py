@@ -0,0 +1,312 @@
+########################################################################
+"""TOOLBOX ENGINE BENCHMARKS
+
+Times the arcpy-free core engine of each tool on synthetic sites at
+small, medium and utility scale and prints the timings as a
+pytest-benchmark style table. The results can be saved as JSON and
+compared against a saved baseline; the run fails (exit status 1) when a
+benchmark's median is slower than the baseline's by more than the
+threshold. With --workers the tiled engines are also timed on the tile
+scheduler at each worker count, reporting the speedup over the first
+count and whether the stitched outputs are bit-identical. Run from the
+toolbox folder:
+
+    python -m benchmarks.engineBench --scale small medium --save baseline.json
+    python -m benchmarks.engineBench --scale small medium --compare baseline.json --threshold 0.15
+    python -m benchmarks.engineBench --scale medium --workers 1 2 4 8
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Worker scaling of the tiled engines
+0.0.3 - 10/17/2026 - Case folder removed after the run
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+
+from rasterArrays import rasterizePolygons, sampleBilinear
+from slopeKernels import directionalSlopeTile
+from focalStats import focalArray, focalTile, windowCells
+from prelimGradingEngine import prelimGradingHalo, prelimGradingTile
+from terrainFollowingEngine import iterationLengths, iterationRanges, iterationHalo, terrainFollowingTile
+from tiledRaster import scalingReport, workerTileShape
+import focalStats
+import prelimGradingEngine
+import slopeKernels
+import terrainFollowingEngine
+from basePlaneFit import basePlaneSurface
+from gradeBand import bandClamp
+from zonalStats import zoneIndex, zonalStatistics
+from cutFillVolumes import addBlockVolumes
+from gradingBounds import gradedMask
+from rowRegression import rowFit
+from rowGeometry import packVertices, rowPointSet
+from spatialIndex import gridIndex, pointExtents, coneNearest
+from landXML import writeTriangleLandXML
+from benchmarks.syntheticSite import SCALES, syntheticSite
+
+# Fractional slowdown of the median over the baseline that fails the comparison
+REGRESSION_THRESHOLD = 0.10
+
+# Rounds per benchmark and the time after which no more rounds are started
+MIN_ROUNDS = 3
+MAX_ROUNDS = 20
+MAX_TIME = 2.0
+
+# Memory budget in MB of the tiles in the worker scaling runs, small enough that every worker gets several tiles
+SCALING_TILE_MB = 64
+
+# Tracker and grading parameters shared by the cases, in feet
+REVEAL_WINDOW = 1.5
+TERRAIN_FOLLOWING = dict(maxPileSpan=30.0, maxHalfRow=150.0, pilesRow=14, maxAngleSpan=0.75, maxAngleHalfRow=4.0,
+                         deflectionTolerance=0.9, safetyFactor=0.9)
+
+def gridTriangles(dem, grid, step=1):
+    """(n, 3, 3) triangles of (northing, easting, elevation) with two per cell of a DEM subsampled by step"""
+
+    z = dem[::step, ::step].astype(np.float64)
+    x = grid.xMin + (np.arange(z.shape[1]) * step + 0.5) * grid.cellSize
+    y = grid.yMax - (np.arange(z.shape[0]) * step + 0.5) * grid.cellSize
+    X, Y = np.meshgrid(x, y)
+    vertices = np.stack([Y, X, z], axis=-1)
+
+    a, b = vertices[:-1, :-1], vertices[:-1, 1:]
+    c, d = vertices[1:, :-1], vertices[1:, 1:]
+
+    return np.concatenate([np.stack([a, c, b], axis=2).reshape(-1, 3, 3), np.stack([b, c, d], axis=2).reshape(-1, 3, 3)])
+
+def engineCases(site, folder):
+    """{name: (tools, callable)} of the engine benchmarks on a site; setup is done here, outside the timing"""
+
+    spec, grid, dem, north = site.spec, site.grid, site.dem, site.northing
+    cellSize = grid.cellSize
+    analysisWidth = spec.trackerWidth / spec.gcr / 2
+    lengths = iterationLengths(spec.trackerLength, TERRAIN_FOLLOWING["maxHalfRow"], TERRAIN_FOLLOWING["maxPileSpan"])
+    ranges = iterationRanges(lengths, TERRAIN_FOLLOWING["pilesRow"], TERRAIN_FOLLOWING["maxAngleSpan"], TERRAIN_FOLLOWING["maxHalfRow"],
+                             TERRAIN_FOLLOWING["maxAngleHalfRow"], TERRAIN_FOLLOWING["deflectionTolerance"],
+                             TERRAIN_FOLLOWING["safetyFactor"], REVEAL_WINDOW)
+
+    labelLayers = rasterizePolygons(site.rows, grid)
+    base = basePlaneSurface(dem, grid, site.rows)
+    delta = bandClamp(dem, base, REVEAL_WINDOW / 2)[1]
+    pileZ = sampleBilinear(dem, grid, site.pileXY[:, 0], site.pileXY[:, 1])
+
+    ringXY = np.concatenate([rings[0][:-1] for rings in site.rows])
+    ringIDs = np.repeat(site.rowIDs, 4)
+    rowCenters = np.array([rings[0][:-1].mean(axis=0) for rings in site.rows])
+    triangles = gridTriangles(dem, grid, max(1, grid.nRows // 512))
+    landXMLFile = os.path.join(folder, "bench.xml")
+
+    def rowNeighbors():
+        index = gridIndex(pointExtents(rowCenters))
+        return coneNearest(index, rowCenters, [(-100, -80), (80, 100)], k=8, selfJoin=True)
+
+    def zonal():
+        return zonalStatistics(zoneIndex(labelLayers), len(site.rows), {"cutFill": delta})
+
+    return {
+        "directionalSlope": ("DirectionalSlope, MassGrading_v2, PrelimTerrainLoss",
+                             lambda: directionalSlopeTile(dem, cellSize=cellSize)),
+        "focalStatistics": ("DirectionalSlopeExclusion_v2, MassGrading_v2, terrainClass",
+                            lambda: focalArray(dem, "Rectangle 60 60 MAP", "STD", cellSize)),
+        "prelimGrading": ("SATPrelimGrading",
+                          lambda: prelimGradingTile(dem, north, cellSize=cellSize, layoutWidth=analysisWidth * 2,
+                                                    trackerLength=spec.trackerLength, revTolerance=REVEAL_WINDOW)),
+        "terrainFollowing": ("terrainFollowingGrading_v4",
+                             lambda: terrainFollowingTile(dem, north, cellSize=cellSize, analysisWidth=analysisWidth,
+                                                          lengths=lengths, ranges=ranges)),
+        "basePlanes": ("basePlanes, SATGradingEst",
+                       lambda: basePlaneSurface(dem, grid, site.rows)),
+        "bandClamp": ("SATGradingEst, SATSiTE_Rough, gradeRevisePOA",
+                      lambda: bandClamp(dem, base, REVEAL_WINDOW / 2)),
+        "zonalStatistics": ("SATGradingEst, SATSiTE_Rough, terrainLoss", zonal),
+        "cutFillVolumes": ("cutFill, SATGradingEst, ConventionalGrading",
+                           lambda: addBlockVolumes(np.zeros((len(site.rows) + 1, 3)), delta, labelLayers)),
+        "gradingBounds": ("SATGradingEst, ConventionalGrading, SmoothRoughGrading",
+                          lambda: gradedMask(delta, grid, site.pileXY)),
+        "rowRegression": ("NorthingAdjPOA, NSSlopePOAPiles, poaRowEnds, poaEWcheck",
+                          lambda: rowFit(site.pileRows, site.pileXY[:, 1], pileZ)),
+        "rowPoints": ("PointsOnPoylgon, NSPOACheck, maxPOADeltaNS",
+                      lambda: rowPointSet(ringXY, packVertices(ringIDs, ringXY)[1])),
+        "rowNeighbors": ("SATGradingEst, ConventionalGrading, ewPOAopt", rowNeighbors),
+        "landXML": ("LXMLExport, TINtoLXML, pilesBoundsLandXML",
+                    lambda: writeTriangleLandXML(landXMLFile, triangles)),
+        }
+
+def scalingCases(site):
+    """{name: (func, inputs, nOutputs, halo, cellBytes, kwargs)} of the tiled engines on a site"""
+
+    spec, grid, dem = site.spec, site.grid, site.dem
+    north = site.northing.astype(np.float32)
+    cellSize = grid.cellSize
+    analysisWidth = spec.trackerWidth / spec.gcr / 2
+    lengths = iterationLengths(spec.trackerLength, TERRAIN_FOLLOWING["maxHalfRow"], TERRAIN_FOLLOWING["maxPileSpan"])
+    ranges = iterationRanges(lengths, TERRAIN_FOLLOWING["pilesRow"], TERRAIN_FOLLOWING["maxAngleSpan"], TERRAIN_FOLLOWING["maxHalfRow"],
+                             TERRAIN_FOLLOWING["maxAngleHalfRow"], TERRAIN_FOLLOWING["deflectionTolerance"],
+                             TERRAIN_FOLLOWING["safetyFactor"], REVEAL_WINDOW)
+    window = windowCells(60, cellSize)
+
+    return {
+        "directionalSlope": (directionalSlopeTile, [dem], 2, (1, 1), slopeKernels.TILE_CELL_BYTES, dict(cellSize=cellSize, k=1)),
+        "focalStatistics": (focalTile, [dem], 1, (window // 2, window // 2), focalStats.TILE_CELL_BYTES,
+                            dict(nRowsWin=window, nColsWin=window, statistics_type="STD", shift=float(np.nanmean(dem)))),
+        "prelimGrading": (prelimGradingTile, [dem, north], 2, prelimGradingHalo(cellSize, analysisWidth * 2, spec.trackerLength),
+                          prelimGradingEngine.TILE_CELL_BYTES,
+                          dict(cellSize=cellSize, layoutWidth=analysisWidth * 2, trackerLength=spec.trackerLength, revTolerance=REVEAL_WINDOW)),
+        "terrainFollowing": (terrainFollowingTile, [dem, north], 6, iterationHalo(cellSize, analysisWidth, lengths),
+                             terrainFollowingEngine.TILE_CELL_BYTES,
+                             dict(cellSize=cellSize, analysisWidth=analysisWidth, lengths=lengths, ranges=ranges)),
+        }
+
+def runScaling(scales, workerCounts, select=None, seed=0, memoryBudget=SCALING_TILE_MB):
+    """Worker scaling records of the tiled engines at each scale
+
+    The tile shape is fixed by the largest worker count so every count
+    runs the same tiles.
+    """
+
+    records = []
+    for scale in scales:
+        site = syntheticSite(scale, seed)
+        for name, (func, inputs, nOutputs, halo, cellBytes, kwargs) in scalingCases(site).items():
+            if select and not any(s in name for s in select):
+                continue
+            tileShape = workerTileShape(memoryBudget, halo, cellBytes, site.grid.nRows, site.grid.nCols, max(workerCounts))
+            for workers, seconds, speedup, identical in scalingReport(func, inputs, nOutputs, halo, tileShape, workerCounts, **kwargs):
+                records.append({"name": "{}[{}]".format(name, scale), "workers": workers, "seconds": seconds,
+                                "speedup": speedup, "identical": identical, "tileShape": list(tileShape)})
+
+    return records
+
+def scalingTable(records):
+    """Table of the worker scaling records"""
+
+    header = "{:<34}{:>9}{:>12}{:>10}{:>11}".format("Name (time in s)", "Workers", "Time", "Speedup", "Identical")
+    lines = [header, "-" * len(header)]
+    for record in records:
+        lines.append("{:<34}{:>9d}{:>12.3f}{:>10.2f}{:>11}".format(
+            record["name"], record["workers"], record["seconds"], record["speedup"], str(record["identical"])))
+
+    return "\n".join(lines)
+
+def timeCase(function, minRounds=MIN_ROUNDS, maxRounds=MAX_ROUNDS, maxTime=MAX_TIME):
+    """Timings in seconds of a warmed-up callable over rounds until maxTime has passed"""
+
+    function()
+    times = []
+    start = time.perf_counter()
+    while len(times) < minRounds or (len(times) < maxRounds and time.perf_counter() - start < maxTime):
+        t0 = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - t0)
+
+    return times
+
+def caseStats(times):
+    """pytest-benchmark statistics of a list of timings"""
+
+    return {"min": min(times), "max": max(times), "mean": statistics.mean(times),
+            "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "median": statistics.median(times), "rounds": len(times)}
+
+def runBenchmarks(scales, select=None, seed=0):
+    """Benchmark records of the engine cases at each scale, as in a pytest-benchmark JSON file"""
+
+    records = []
+    with tempfile.TemporaryDirectory() as folder:
+        for scale in scales:
+            site = syntheticSite(scale, seed)
+            for name, (tools, function) in engineCases(site, folder).items():
+                if select and not any(s in name for s in select):
+                    continue
+                records.append({"name": "{}[{}]".format(name, scale), "group": scale, "params": {"scale": scale, "seed": seed},
+                                "extra_info": {"tools": tools, "cells": site.grid.nRows * site.grid.nCols, "rows": len(site.rows),
+                                               "piles": len(site.pileXY)},
+                                "stats": caseStats(timeCase(function))})
+
+    return records
+
+def benchmarkTable(records):
+    """pytest-benchmark style table of benchmark records, timings in milliseconds"""
+
+    header = "{:<34}{:>12}{:>12}{:>12}{:>12}{:>12}{:>8}".format("Name (time in ms)", "Min", "Max", "Mean", "StdDev", "Median", "Rounds")
+    lines = [header, "-" * len(header)]
+    for record in records:
+        s = record["stats"]
+        lines.append("{:<34}{:>12.3f}{:>12.3f}{:>12.3f}{:>12.3f}{:>12.3f}{:>8d}".format(
+            record["name"], s["min"] * 1e3, s["max"] * 1e3, s["mean"] * 1e3, s["stddev"] * 1e3, s["median"] * 1e3, s["rounds"]))
+
+    return "\n".join(lines)
+
+def compareBenchmarks(records, baseline, threshold=REGRESSION_THRESHOLD):
+    """(name, baseline median, median, change) of the benchmarks slower than the baseline by more than the threshold"""
+
+    previous = dict((record["name"], record["stats"]["median"]) for record in baseline["benchmarks"])
+    regressions = []
+    for record in records:
+        if record["name"] in previous:
+            change = record["stats"]["median"] / previous[record["name"]] - 1
+            if change > threshold:
+                regressions.append((record["name"], previous[record["name"]], record["stats"]["median"], change))
+
+    return regressions
+
+def machineInfo():
+    """Machine description stored with the results"""
+
+    return {"node": platform.node(), "processor": platform.processor(), "machine": platform.machine(),
+            "python_version": platform.python_version(), "numpy_version": np.__version__, "cpu_count": os.cpu_count()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the toolbox engines on synthetic sites")
+    parser.add_argument("--scale", nargs="+", default=["small", "medium"], choices=sorted(SCALES))
+    parser.add_argument("-k", dest="select", nargs="+", help="only run the benchmarks whose names contain one of these")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed fractional slowdown of the median")
+    parser.add_argument("--workers", type=int, nargs="+", help="also time the tiled engines at these worker counts")
+    args = parser.parse_args(argv)
+
+    records = runBenchmarks(args.scale, args.select, args.seed)
+    print(benchmarkTable(records))
+
+    scaling = []
+    if args.workers:
+        scaling = runScaling(args.scale, args.workers, args.select, args.seed)
+        print("")
+        print(scalingTable(scaling))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"machine_info": machineInfo(), "datetime": datetime.datetime.now().isoformat(),
+                       "version": __version__, "benchmarks": records, "scaling": scaling}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compareBenchmarks(records, json.load(f), args.threshold)
+        for name, before, after, change in regressions:
+            print("REGRESSION {}: median {:.3f} ms -> {:.3f} ms ({:+.1%})".format(name, before * 1e3, after * 1e3, change))
+        if regressions:
+            return 1
+        print("No regressions beyond {:.0%} of the baseline".format(args.threshold))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+########################################################################
+"""SYNTHETIC SITE GENERATOR
+
+Deterministic synthetic solar sites for benchmarking the toolbox engines.
+A site is a fractal DEM of controllable roughness and relief over a
+planar north-south and east-west slope, north-south single axis tracker
+rows laid out at a ground coverage ratio, and sample piles placed by the
+Sample Piles tool's rules. The same scale and seed always give the same
+site.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.1"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import math
+from collections import namedtuple
+import numpy as np
+from rasterArrays import RasterGrid, northingArray
+
+SiteSpec = namedtuple("SiteSpec", ["nRows", "nCols", "cellSize", "hurst", "relief", "slopeNS", "slopeEW",
+                                   "trackerWidth", "trackerLength", "gcr", "rowGap", "pilesPerRow"])
+
+Site = namedtuple("Site", ["spec", "grid", "dem", "northing", "rows", "rowIDs", "pileXY", "pileRows"])
+
+# Site sizes in feet: small is about 20 acres, medium about 330 acres and utility scale about 1300 acres
+SCALES = {
+    "small": SiteSpec(320, 320, 3.0, 0.8, 6.0, 2.0, 1.0, 6.5, 300.0, 0.35, 20.0, 14),
+    "medium": SiteSpec(1280, 1280, 3.0, 0.8, 12.0, 2.0, 1.0, 6.5, 300.0, 0.35, 20.0, 14),
+    "utility": SiteSpec(2560, 2560, 3.0, 0.8, 20.0, 2.0, 1.0, 6.5, 300.0, 0.35, 20.0, 14),
+    }
+
+def fractalSurface(nRows, nCols, hurst=0.8, seed=0):
+    """Zero mean, unit deviation fractional Brownian surface by spectral synthesis
+
+    A higher Hurst exponent (0 to 1) gives a smoother surface.
+    """
+
+    rng = np.random.default_rng(seed)
+    ky = np.fft.fftfreq(nRows)[:, None]
+    kx = np.fft.rfftfreq(nCols)[None, :]
+    k = np.hypot(kx, ky)
+    k[0, 0] = 1.0
+
+    # Power spectrum falling as k^-(2H + 2)
+    amplitude = k ** -(hurst + 1.0)
+    amplitude[0, 0] = 0.0
+    spectrum = amplitude * (rng.standard_normal(k.shape) + 1j * rng.standard_normal(k.shape))
+    surface = np.fft.irfft2(spectrum, s=(nRows, nCols))
+
+    return ((surface - surface.mean()) / surface.std()).astype(np.float32)
+
+def fractalDEM(spec, seed=0, origin=(0.0, 0.0)):
+    """DEM of a site spec: the fractal surface scaled to the relief over the planar slopes (percent)"""
+
+    grid = RasterGrid(origin[0], origin[1] + spec.nRows * spec.cellSize, spec.cellSize, spec.nRows, spec.nCols)
+    surface = fractalSurface(spec.nRows, spec.nCols, spec.hurst, seed) * np.float32(spec.relief)
+
+    x = (np.arange(spec.nCols) + 0.5) * spec.cellSize
+    y = (spec.nRows - np.arange(spec.nRows) - 0.5) * spec.cellSize
+    plane = 500.0 + spec.slopeNS / 100.0 * y[:, None] + spec.slopeEW / 100.0 * x[None, :]
+
+    return (surface + plane).astype(np.float32), grid
+
+def trackerRows(grid, trackerWidth, trackerLength, gcr, rowGap=20.0, margin=None):
+    """North-south tracker row rectangles filling a grid at a ground coverage ratio
+
+    Rows are spaced trackerWidth / gcr apart east-west and trackerLength +
+    rowGap apart north-south. Returns (rows, rowIDs) with every row a list
+    of one closed (5, 2) ring.
+    """
+
+    pitch = trackerWidth / gcr
+    if margin is None:
+        margin = pitch
+    xMin, yMax = grid.xMin + margin, grid.yMax - margin
+    xMax = grid.xMin + grid.nCols * grid.cellSize - margin
+    yMin = grid.yMax - grid.nRows * grid.cellSize + margin
+
+    nEast = max(int((xMax - xMin - trackerWidth) // pitch) + 1, 0)
+    nNorth = max(int((yMax - yMin + rowGap) // (trackerLength + rowGap)), 0)
+
+    rows = []
+    for j in range(nNorth):
+        top = yMax - j * (trackerLength + rowGap)
+        for i in range(nEast):
+            left = xMin + i * pitch
+            rows.append([np.array([[left, top], [left + trackerWidth, top], [left + trackerWidth, top - trackerLength],
+                                   [left, top - trackerLength], [left, top]])])
+
+    return rows, np.arange(1, len(rows) + 1)
+
+def samplePiles(rows, rowIDs, pilesPerRow):
+    """Piles of every row by the Sample Piles rules; returns (pile xy, pile row IDs)
+
+    Each row is expanded by floor(perimeter / 2) / piles / 2 - 1, cut into
+    equal north-south strips, one per pile, and the strip centroids inside
+    the row are kept.
+    """
+
+    pileXY, pileRows = [], []
+    for rings, rowID in zip(rows, rowIDs):
+        ring = rings[0]
+        left, bottom = ring[:, 0].min(), ring[:, 1].min()
+        right, top = ring[:, 0].max(), ring[:, 1].max()
+        perimeter = 2 * ((right - left) + (top - bottom))
+        expand = int(math.floor(perimeter / 2) / pilesPerRow / 2 - 1)
+
+        strip = (top - bottom + 2 * expand) / pilesPerRow
+        y = bottom - expand + (np.arange(pilesPerRow) + 0.5) * strip
+        y = y[(y >= bottom) & (y <= top)]
+        pileXY.append(np.column_stack([np.full(len(y), (left + right) / 2), y]))
+        pileRows.append(np.full(len(y), rowID))
+
+    return np.concatenate(pileXY), np.concatenate(pileRows)
+
+def syntheticSite(scale="small", seed=0):
+    """Synthetic site of a named scale or a SiteSpec"""
+
+    spec = SCALES[scale] if isinstance(scale, str) else scale
+    dem, grid = fractalDEM(spec, seed)
+    rows, rowIDs = trackerRows(grid, spec.trackerWidth, spec.trackerLength, spec.gcr, spec.rowGap)
+    pileXY, pileRows = samplePiles(rows, rowIDs, spec.pilesPerRow)
+
+    return Site(spec, grid, dem, northingArray(grid), rows, rowIDs, pileXY, pileRows)
@@ -0,0 +1,94 @@
+########################################################################
+"""TOOLBOX LOAD BENCHMARK
+
+Times opening the SolarSpace toolbox in fresh interpreters, eagerly (every
+tool module imported up front, as the toolbox did before the tool
+registry) and lazily (the toolbox as it is now, tools imported on first
+use), and the first opening of a single tool in a lazily loaded toolbox.
+Run it with the ArcGIS Pro Python environment:
+
+    python benchmarks/toolboxLoad.py --repeat 5
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.1"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TOOLBOX_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLBOX = os.path.join(TOOLBOX_FOLDER, "SolarSpace v1p4.pyt")
+
+# Each scenario runs in its own interpreter and prints its load time in seconds
+_SETUP = """
+import sys, time
+sys.path.insert(0, {folder!r})
+start = time.perf_counter()
+import arcpy
+"""
+
+SCENARIOS = {
+    "eager": _SETUP + """
+import importlib
+from toolRegistry import TOOL_SPECS
+tools = [getattr(importlib.import_module(spec.module), spec.name)() for spec in TOOL_SPECS]
+print(time.perf_counter() - start)
+""",
+    "lazy": _SETUP + """
+namespace = {{"__name__": "toolbox"}}
+exec(compile(open({toolbox!r}).read(), {toolbox!r}, "exec"), namespace)
+tools = [tool() for tool in namespace["Toolbox"]().tools]
+print(time.perf_counter() - start)
+""",
+    "lazy, one tool opened": _SETUP + """
+namespace = {{"__name__": "toolbox"}}
+exec(compile(open({toolbox!r}).read(), {toolbox!r}, "exec"), namespace)
+tools = [tool() for tool in namespace["Toolbox"]().tools]
+[tool for tool in tools if tool.spec.name == {tool!r}][0].tool()
+print(time.perf_counter() - start)
+""",
+    }
+
+def timeScenario(code, repeat):
+    """Load times in seconds of a scenario over repeated fresh interpreters"""
+
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+
+    return times
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time loading the SolarSpace toolbox eagerly and lazily")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tool", default="SATGradingEstimate", help="tool opened in the one tool scenario")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        times = timeScenario(code.format(folder=TOOLBOX_FOLDER, toolbox=TOOLBOX, tool=args.tool), args.repeat)
+        results[name] = {"min": min(times), "median": statistics.median(times), "times": times}
+        print("{:<24}min {:7.3f} s   median {:7.3f} s".format(name, results[name]["min"], results[name]["median"]))
+
+    print("lazy / eager median: {:.2f}".format(results["lazy"]["median"] / results["eager"]["median"]))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,15 @@ Revision log
 0.0.2 - 4/2/2022 - Updated parameters for specific outputs to be more clear
 1.0.0 - 8/5/2022 - Added automatic symbology
 2.0.0 - 12/9/2022 - Combined zonal and regular cut fill into one script
+2.1.0 - 10/16/2026 - Zone volumes reduced with the zonal statistics engine
+2.2.0 - 10/16/2026 - Site and zone volumes, graded area and cut and fill rasters from one streaming pass
+2.2.1 - 10/17/2026 - Graded area is the area of the cells beyond the tolerance, without the simplified outlines and filled holes of the polygonized area; zones keep their volume fields only
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.0.0"
+__version__     = "2.2.1"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.0.3"
 __maintainer__  = "Matthew Gagne"
@@ -23,6 +26,7 @@ from arcpy.sa import *
 from arcpy.ddd import *
 import os.path
 import sys
+from cutFillVolumes import cutFillVolumes
 
 class CutFillAssessment(object):
     def __init__(self):
@@ -182,100 +186,19 @@ class CutFillAssessment(object):
         arcpy.env.snapRaster = demExist
         mapUnits = spatialRef.linearUnitName
 
-        # Calculate the area of one raster square
-        grid_area = str(gridRes ** 2)
-
         arcpy.SetProgressor("default", "Comparing the graded surface to the existing surface...")
 
-        # Create a polygon of the domain of the existing elevation
-        TotalCutFill = arcpy.ddd.RasterDomain(demExist, "TotalCutFill", "POLYGON")
-
-        # Create a raster of the delta from the existing DEM to the graded DEM, then isolate the cut (greater than 0) and fill (less than 0)
-        cutFill = arcpy.sa.Minus(demGrade, demExist)
-
-        # Create individual cut rasters and fill rasters
-        cut_raster = arcpy.sa.SetNull(cutFill, cutFill, "VALUE > 0")
-        cut_raster.save(cutOutput)
-        fill_raster = arcpy.sa.SetNull(cutFill, cutFill, "VALUE < 0")
-        fill_raster.save(fillOutput)
-
-        arcpy.SetProgressorLabel("Calculating total graded area")
-
-        # Reclassify cut-fill raster using a tolerance of +/- 1 inch - NOTE: THIS IS ONLY FOR UNITS OF FEET
-        reclass_code = arcpy.sa.RemapRange([[-300, -.0415, 1], [-.0415, .0415, 0], [.0415, 300, 2]])
-        cutFill_reclass = arcpy.sa.Reclassify(cutFill, "VALUE", reclass_code, "DATA")
-        reclass_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, "cutFill_poly", "SIMPLIFY", "Value","SINGLE_OUTER_PART", None)
-        grade_area = arcpy.analysis.Select(reclass_poly, "grade_area", "gridcode <> 0")
-
-        # Sum the graded area and convert to acres from square feet
-        if xyzUnit == "Foot":
-            total_graded_area = arcpy.analysis.Statistics(grade_area, "total_graded_area", "Shape_Area SUM", None)
-            arcpy.management.AddFields(total_graded_area,[["graded_area_acres", "DOUBLE", "Total Graded Area (acres)"]])
-            arcpy.management.CalculateField(total_graded_area, "graded_area_acres", "round(!SUM_Shape_Area!/43560,2)","PYTHON3", None)
-
-        if xyzUnit == "Meter":
-            total_graded_area = arcpy.analysis.Statistics(grade_area, "total_graded_area", "Shape_Area SUM", None)
-            arcpy.management.AddFields(total_graded_area, [["graded_area_m2", "DOUBLE", "Total Graded Area (m^2)"]])
-            arcpy.management.CalculateField(total_graded_area, "graded_area_m2", "round(!SUM_Shape_Area!,2)", "PYTHON3",None)
-
-        arcpy.SetProgressorLabel("Calculating cut and fill statistics")
-
-        # Calculate the cut-fill statistics
-        Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", cut_raster, "Cut_Total", "DATA", "ALL")
-        Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, "OID", fill_raster, "Fill_Total", "DATA", "ALL")
-
-        # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-        if xyzUnit == "Foot":
-            arcpy.management.CalculateField(Cut_Total, "cut_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","", "DOUBLE")
-            arcpy.management.CalculateField(Fill_Total, "fill_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","", "DOUBLE")
-            arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_y3"])
-            arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_y3"])
-
-            # Calculate net, gross, and ratio statistics for cubic yards
-            CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_y3 SUM; fill_y3 SUM", None)
-            arcpy.management.AddFields(CutFill_Total,[["net_y3", "DOUBLE"], ["gross_y3", "DOUBLE"], ["cut_fill_ratio", "DOUBLE"]])
-            arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_y3! + !SUM_fill_y3!,2)","PYTHON3", None)
-            arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_y3! - !SUM_cut_y3!,2)","PYTHON3", None)
-            arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)", "PYTHON3", None)
-
-            # Merge area and volume tables and transpose table for final output
-            arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_acres")
-            output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_y3", "Cut Volume (y^3)"],
-                                                                            ["SUM_fill_y3", "Fill Volume (y^3)"],
-                                                                            ["Net_Volume", "Net Volume (y^3)"],
-                                                                            ["Total_Volume", "Total Volume (y^3)"],
-                                                                            ["cut_fill_ratio", "Cut/Fill Ratio"],
-                                                                            ["graded_area_acres","Graded Area (acres)"]],
-                                                                            statsOutput,"Grading", "Summary", None)
-
-        if xyzUnit == "Meter":
-            arcpy.management.CalculateField(Cut_Total, "cut_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(Fill_Total, "fill_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3","", "DOUBLE")
-            arcpy.management.JoinField(TotalCutFill, "OID", Cut_Total, "OID", ["cut_m3"])
-            arcpy.management.JoinField(TotalCutFill, "OID", Fill_Total, "OID", ["fill_m3"])
-
-            # Calculate net, gross, and ratio statistics for cubic meters
-            CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, "Cut_Fill_Totals", "cut_m3 SUM; fill_m3 SUM", None)
-            arcpy.management.CalculateField(CutFill_Total, "Net_Volume", "round(!SUM_cut_m3! + !SUM_fill_m3!,2)","PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(CutFill_Total, "Total_Volume", "round(!SUM_fill_m3! - !SUM_cut_m3!,2)","PYTHON3", "", "DOUBLE")
-            arcpy.management.CalculateField(CutFill_Total, "cut_fill_ratio","round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)", "PYTHON3", "", "DOUBLE")
-            # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-            arcpy.management.JoinField(CutFill_Total, "OBJECTID", total_graded_area, "OBJECTID", "graded_area_m2")
-            output_table = arcpy.management.TransposeFields(CutFill_Total, [["SUM_cut_m3", "Cut Volume (m^3)"],
-                                                                            ["SUM_fill_m3", "Fill Volume (m^3)"],
-                                                                            ["Net_Volume", "Net Volume (m^3)"],
-                                                                            ["Total_Volume", "Total Volume (m^3)"],
-                                                                            ["cut_fill_ratio", "Cut/Fill Ratio"],
-                                                                            ["graded_area_m2", "Graded Area (m^2)"]],
-                                                                            statsOutput, "Grading", "Summary", None)
-
-        # Clean up
-        arcpy.management.Delete("Cut_Fill_Totals")
-        arcpy.management.Delete("Cut_Total")
-        arcpy.management.Delete("cutFill_poly")
-        arcpy.management.Delete("Fill_Total")
-        arcpy.management.Delete("total_graded_area")
-        arcpy.management.Delete("TotalCutFill")
+        # Copy the zones to receive the zone volumes
+        zonesCutFill = None
+        if zoneOption == True:
+            zoneOutputName = os.path.basename(zonesOutput)
+            zonesCutFill = arcpy.conversion.FeatureClassToFeatureClass(zonesInput, workspace, zoneOutputName)
+
+        # Cut and fill rasters, site and zone volumes and graded area in one pass over the surfaces
+        cutFillVolumes((demGrade, demExist), xyzUnit, statsOutput, cutOutput=cutOutput, fillOutput=fillOutput,
+                       zonesInput=zonesCutFill, zoneField=zoneID)
+        cut_raster = cutOutput
+        fill_raster = fillOutput
 
         aprxMap.addDataFromPath(cut_raster)
         aprxMap.addDataFromPath(fill_raster)
@@ -313,72 +236,8 @@ class CutFillAssessment(object):
                     l.symbology = symFill
 
         if zoneOption == True:
-
-            arcpy.SetProgressorLabel("Gathering cut and fill statistics by zone...")
-
-            zoneOutputName = os.path.basename(zonesOutput)
-
-            zonesCutFill = arcpy.conversion.FeatureClassToFeatureClass(zonesInput, workspace, zoneOutputName)
-
-            # Create zonal statistics for the cut and fill rasters
-            cut_zonal = arcpy.sa.ZonalStatisticsAsTable(zonesCutFill, zoneID, cut_raster, "cut_zonal", "DATA", "ALL")
-            fill_zonal = arcpy.sa.ZonalStatisticsAsTable(zonesCutFill, zoneID, fill_raster, "fill_zonal", "DATA", "ALL")
-
-            # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-            if xyzUnit == "Foot":
-                arcpy.management.CalculateField(cut_zonal, "cut_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","", "DOUBLE")
-                arcpy.management.CalculateField(fill_zonal, "fill_y3", "round((!SUM!*" + grid_area + ")/27,2)", "PYTHON3","","DOUBLE")
-                arcpy.management.JoinField(zonesCutFill, zoneID, cut_zonal, zoneID, ["cut_y3"])
-                arcpy.management.JoinField(zonesCutFill, zoneID, fill_zonal, zoneID, ["fill_y3"])
-
-                nullOutCode = """
-def nullOut(input):
-    if input == None:
-        return 0
-    else:
-        return input
-"""
-                arcpy.management.CalculateField(zonesCutFill, "fill_y3", "nullOut(!fill_y3!)", "PYTHON3",nullOutCode,"DOUBLE")
-                arcpy.management.CalculateField(zonesCutFill, "cut_y3", "nullOut(!cut_y3!)", "PYTHON3",nullOutCode,"DOUBLE")
-
-                # Calculate net, gross, and ratio statistics for zones
-                arcpy.management.AddFields(zonesCutFill, [["net_y3", "DOUBLE", "Net Volume (y^3)"],
-                                                          ["gross_y3", "DOUBLE", "Total Volume (y^3)"],
-                                                          ["cut_fill_ratio", "DOUBLE", "Cut/Fill Ratio"]])
-                arcpy.management.CalculateField(zonesCutFill, "net_y3", "round(!cut_y3! + !fill_y3!,2)", "PYTHON3", None)
-                arcpy.management.CalculateField(zonesCutFill, "gross_y3", "round(!fill_y3! - !cut_y3!,2)", "PYTHON3", None)
-                arcpy.management.CalculateField(zonesCutFill, "cut_fill_ratio", "round(abs(!cut_y3!) / !fill_y3!,2)","PYTHON3", None)
-
-            if xyzUnit == "Meter":
-                arcpy.management.CalculateField(cut_zonal, "cut_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3", "","DOUBLE")
-                arcpy.management.CalculateField(fill_zonal, "fill_m3", "round((!SUM!*" + grid_area + "),2)", "PYTHON3","","DOUBLE")
-                arcpy.management.JoinField(zonesCutFill, zoneID, cut_zonal, zoneID, ["cut_m3"])
-                arcpy.management.JoinField(zonesCutFill, zoneID, fill_zonal, zoneID, ["fill_m3"])
-
-                nullOutCode = """
-def nullOut(input):
-    if input == None:
-        return 0
-    else:
-        return input
-"""
-                arcpy.management.CalculateField(zonesCutFill, "fill_m3", "nullOut(!fill_m3!)", "PYTHON3",nullOutCode,"DOUBLE")
-                arcpy.management.CalculateField(zonesCutFill, "cut_m3", "nullOut(!cut_m3!)", "PYTHON3",nullOutCode,"DOUBLE")
-
-                # Calculate net, gross, and ratio statistics for zones
-                arcpy.management.AddFields(zonesCutFill, [["net_m3", "DOUBLE", "Net Volume (m^3)"],
-                                                          ["gross_m3", "DOUBLE", "Total Volume (m^3)"],
-                                                          ["cut_fill_ratio", "DOUBLE", "Cut/Fill Ratio"]])
-                arcpy.management.CalculateField(zonesCutFill, "net_m3", "round(!cut_m3! + !fill_m3!,2)", "PYTHON3", None)
-                arcpy.management.CalculateField(zonesCutFill, "gross_m3", "round(!fill_m3! - !cut_m3!,2)", "PYTHON3", None)
-                arcpy.management.CalculateField(zonesCutFill, "cut_fill_ratio", "round(abs(!cut_m3!) / !fill_m3!,2)","PYTHON3", None)
-
             aprxMap.addDataFromPath(zonesCutFill)
 
-            arcpy.management.Delete(cut_zonal)
-            arcpy.management.Delete(fill_zonal)
-
-
         arcpy.ResetProgressor()
 
         return
\ No newline at end of file
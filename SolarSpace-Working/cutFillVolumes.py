@@ -0,0 +1,225 @@
+########################################################################
+"""CUT & FILL VOLUME ENGINE
+
+Cut, fill, net and gross volumes and the graded area of a graded surface
+in one streaming pass. The cut/fill depth is read a strip of rows at a
+time, either from a cut/fill raster or as the difference of the graded
+and existing surfaces, and the sums are accumulated site-wide and per
+zone through the rasterized zone labels of the strip. The cut and fill
+rasters are written from the same pass, and the totals are written in
+the Grading/Summary table of the Cut_Fill_Totals chain it replaces.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Tile folder removed after each run
+0.0.3 - 10/17/2026 - Zone fields kept to the volume fields of the zone chain it replaces
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import os.path
+import shutil
+import tempfile
+import numpy as np
+
+# Cut/fill depth beyond which a cell is graded (1/2 inch in feet)
+VOLUME_TOLERANCE = 0.0415
+
+def blockVolumes(delta, tolerance=VOLUME_TOLERANCE):
+    """Cut (at or below zero) and fill (at or above zero) depth sums and graded cell count of a block"""
+
+    delta = np.asarray(delta, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        cut = float(np.nansum(np.where(delta <= 0, delta, 0)))
+        fill = float(np.nansum(np.where(delta >= 0, delta, 0)))
+        graded = int(np.count_nonzero(np.abs(delta) > tolerance))
+
+    return cut, fill, graded
+
+def addBlockVolumes(totals, delta, labelLayers=(), tolerance=VOLUME_TOLERANCE):
+    """Add a block's cut and fill sums and graded cell count to the running totals
+
+    totals is an (nZones + 1, 3) array of (cut, fill, graded cells); row 0
+    is the whole site and row i the zone labelled i in labelLayers.
+    """
+
+    delta = np.asarray(delta, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        cut = np.where(delta <= 0, delta, 0)
+        fill = np.where(delta >= 0, delta, 0)
+        graded = (np.abs(delta) > tolerance).astype(np.float64)
+    cut[np.isnan(cut)] = 0
+    fill[np.isnan(fill)] = 0
+
+    totals[0] += [cut.sum(), fill.sum(), graded.sum()]
+
+    nZones = totals.shape[0] - 1
+    for layer in labelLayers:
+        labels = layer.ravel()
+        for i, values in enumerate((cut, fill, graded)):
+            totals[1:, i] += np.bincount(labels, values.ravel(), minlength=nZones + 1)[1:]
+
+    return totals
+
+def volumeRow(cutSum, fillSum, gradedArea, cellSize, xyzUnit):
+    """Cut, fill, net and gross volumes, cut/fill ratio and graded area, rounded as the Cut_Fill_Totals fields are
+
+    Volumes are cubic yards and the area acres for "Foot", otherwise cubic
+    meters and square meters. The ratio is NaN without fill.
+    """
+
+    cellArea = cellSize ** 2
+    if xyzUnit == "Foot":
+        cut = round(cutSum * cellArea / 27, 2)
+        fill = round(fillSum * cellArea / 27, 2)
+        area = round(gradedArea / 43560, 2)
+    else:
+        cut = round(cutSum * cellArea, 2)
+        fill = round(fillSum * cellArea, 2)
+        area = round(gradedArea, 2)
+    ratio = round(abs(cut) / fill, 2) if fill else np.nan
+
+    return [cut, fill, round(cut + fill, 2), round(fill - cut, 2), ratio, area]
+
+def volumeSummary(cutSum, fillSum, gradedArea, cellSize, xyzUnit):
+    """Rows of the grading volume summary table"""
+
+    if xyzUnit == "Foot":
+        labels = ["Cut Volume (y^3)", "Fill Volume (y^3)", "Net Volume (y^3)", "Total Volume (y^3)", "Cut/Fill Ratio", "Graded Area (acres)"]
+    else:
+        labels = ["Cut Volume (m^3)", "Fill Volume (m^3)", "Net Volume (m^3)", "Total Volume (m^3)", "Cut/Fill Ratio", "Graded Area (m^2)"]
+
+    return list(zip(labels, volumeRow(cutSum, fillSum, gradedArea, cellSize, xyzUnit)))
+
+def zoneFields(xyzUnit):
+    """Fields of the per-zone volumes as [name, type, alias], as the zone chain wrote them (no graded area)"""
+
+    unit = "y3" if xyzUnit == "Foot" else "m3"
+    label = "y^3" if xyzUnit == "Foot" else "m^3"
+
+    return [["cut_" + unit, "DOUBLE", "cut_" + unit], ["fill_" + unit, "DOUBLE", "fill_" + unit],
+            ["net_" + unit, "DOUBLE", "Net Volume (" + label + ")"], ["gross_" + unit, "DOUBLE", "Total Volume (" + label + ")"],
+            ["cut_fill_ratio", "DOUBLE", "Cut/Fill Ratio"]]
+
+def writeSummary(summary, outTable):
+    """Write summary rows as the Grading and Summary fields of a table"""
+    import arcpy
+
+    records = np.array(summary, dtype=[("Grading", "U32"), ("Summary", np.float64)])
+    if arcpy.Exists(outTable):
+        arcpy.management.Delete(outTable)
+    arcpy.da.NumPyArrayToTable(records, outTable)
+
+    return outTable
+
+def _aligned(grid, other):
+    """True if two grids share a cell size and their cells line up"""
+
+    size = grid.cellSize
+    if abs(other.cellSize - size) > 1e-9 * size:
+        return False
+    dx = (other.xMin - grid.xMin) / size
+    dy = (other.yMax - grid.yMax) / size
+
+    return abs(dx - round(dx)) < 1e-6 and abs(dy - round(dy)) < 1e-6
+
+def cutFillVolumes(surfaces, xyzUnit, statsOutput, tolerance=VOLUME_TOLERANCE, gradeBounds=None, cutOutput=None, fillOutput=None,
+                   zonesInput=None, zoneField=None, memoryBudget=1024):
+    """Replacement for the RasterDomain, SetNull, Reclassify, RasterToPolygon, ZonalStatisticsAsTable and TransposeFields chain
+
+    surfaces is a cut/fill raster or a (graded, existing) pair of surfaces,
+    read strip by strip on the grid of the cut/fill raster or the existing
+    surface. The graded area is the area of the gradeBounds polygons if
+    given, otherwise the area of the cells beyond the tolerance; the
+    polygonized chain it replaces simplified the cell outlines and took
+    the outer rings, holes included, so its area ran somewhat larger.
+    The cut and fill rasters are saved if outputs are given, and the
+    per-zone volumes are added to zonesInput if given. Returns statsOutput.
+    """
+    import arcpy
+    from rasterArrays import rasterGrid, readRaster, readPolygons, rasterizePolygons
+    from tiledRaster import createMemmap, memmapToRaster, stripRows, subGrid
+    from zonalStats import featureZones
+
+    if isinstance(surfaces, (list, tuple)):
+        graded = surfaces[0] if isinstance(surfaces[0], arcpy.Raster) else arcpy.Raster(str(surfaces[0]))
+        existing = surfaces[1] if isinstance(surfaces[1], arcpy.Raster) else arcpy.Raster(str(surfaces[1]))
+        grid = rasterGrid(existing)
+        if not _aligned(grid, rasterGrid(graded)):
+            # Let map algebra resample the graded surface onto the existing one
+            graded = arcpy.sa.Minus(graded, existing)
+            existing = None
+            grid = rasterGrid(graded)
+    else:
+        graded = surfaces if isinstance(surfaces, arcpy.Raster) else arcpy.Raster(str(surfaces))
+        existing = None
+        grid = rasterGrid(graded)
+    spatialRef = graded.spatialReference
+
+    zonePolygons = []
+    featureZone = None
+    zoneIDs = []
+    if zonesInput:
+        zonesInput = str(zonesInput)
+        zonePolygons, values = readPolygons(zonesInput, zoneField)
+        featureZone, zoneIDs = featureZones(values)
+    totals = np.zeros((len(zoneIDs) + 1, 3))
+
+    tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+    try:
+        cutArray = createMemmap(os.path.join(tileFolder, "cut.npy"), (grid.nRows, grid.nCols)) if cutOutput else None
+        fillArray = createMemmap(os.path.join(tileFolder, "fill.npy"), (grid.nRows, grid.nCols)) if fillOutput else None
+
+        nStrip = stripRows(memoryBudget, grid.nCols, 8)
+        for r0 in range(0, grid.nRows, nStrip):
+            r1 = min(r0 + nStrip, grid.nRows)
+            strip = subGrid(grid, r0, r1)
+            delta = readRaster(graded, strip)[0]
+            if existing is not None:
+                delta = delta - readRaster(existing, strip)[0]
+
+            labelLayers = [featureZone[layer] for layer in rasterizePolygons(zonePolygons, strip)] if zonePolygons else []
+            addBlockVolumes(totals, delta, labelLayers, tolerance)
+
+            with np.errstate(invalid="ignore"):
+                if cutArray is not None:
+                    cutArray[r0:r1] = np.where(delta <= 0, delta, np.nan)
+                if fillArray is not None:
+                    fillArray[r0:r1] = np.where(delta >= 0, delta, np.nan)
+
+        if cutArray is not None:
+            cutArray.flush()
+            memmapToRaster(cutArray, grid, cutOutput, spatialRef, memoryBudget)
+        if fillArray is not None:
+            fillArray.flush()
+            memmapToRaster(fillArray, grid, fillOutput, spatialRef, memoryBudget)
+        del cutArray, fillArray
+    finally:
+        shutil.rmtree(tileFolder, ignore_errors=True)
+
+    cellArea = grid.cellSize ** 2
+    if gradeBounds is not None:
+        gradedArea = 0.0
+        with arcpy.da.SearchCursor(str(gradeBounds), ["SHAPE@AREA"]) as cursor:
+            for row in cursor:
+                gradedArea += row[0]
+    else:
+        gradedArea = totals[0, 2] * cellArea
+    writeSummary(volumeSummary(totals[0, 0], totals[0, 1], gradedArea, grid.cellSize, xyzUnit), statsOutput)
+
+    if zonesInput:
+        fields = zoneFields(xyzUnit)
+        arcpy.management.AddFields(zonesInput, fields)
+        zoneRows = dict((zoneID, volumeRow(totals[i, 0], totals[i, 1], 0.0, grid.cellSize, xyzUnit)[:len(fields)])
+                        for i, zoneID in enumerate(zoneIDs, start=1))
+        with arcpy.da.UpdateCursor(zonesInput, [zoneField] + [f[0] for f in fields]) as cursor:
+            for row in cursor:
+                values = zoneRows.get(row[0], volumeRow(0.0, 0.0, 0.0, grid.cellSize, xyzUnit)[:len(fields)])
+                cursor.updateRow([row[0]] + [None if isinstance(v, float) and np.isnan(v) else v for v in values])
+
+    return statsOutput
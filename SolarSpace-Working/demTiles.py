@@ -0,0 +1,275 @@
+########################################################################
+"""PUBLIC DEM TILE FETCHER
+
+Retrieves an elevation image service's surface over a bounding box as
+native-resolution tiles. The tiles lie on a grid anchored at the origin
+of the request spatial reference, so the same tile of the same service,
+spatial reference and resolution always has the same index and is read
+back from a persistent on-disk cache on later runs. Missing tiles are
+requested through a bounded thread pool sharing one HTTP session, with
+retries and backoff, and the tiles are mosaicked locally into a single
+raster.
+
+The service URL and session are passed in, so the fetcher can be pointed
+at a local stub image server answering exportImage and ?f=json requests.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Mosaic folder removed once the output raster is written
+0.0.3 - 10/17/2026 - Session optionally passed in to the DEM retrieval
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import hashlib
+import json
+import math
+import os
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from rasterArrays import RasterGrid
+
+# Edge of a tile in pixels, concurrent requests, attempts per tile and size cap of the cache in MB
+TILE_PIXELS = 1024
+FETCH_WORKERS = 4
+FETCH_RETRIES = 4
+FETCH_BACKOFF = 1.0
+FETCH_TIMEOUT = 120
+DEM_CACHE_MB = 4096
+
+# Meters per degree at the equator, for services published in a geographic coordinate system
+METERS_PER_DEGREE = 111319.49
+
+TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+
+TileLayout = namedtuple("TileLayout", ["tiles", "grid", "tilePixels"])
+
+def tileLayout(bbox, cellSize, tilePixels=TILE_PIXELS):
+    """Tiles covering a bounding box (xmin, ymin, xmax, ymax) and the grid of their mosaic
+
+    Tile (col, row) spans [col, col + 1) x [row, row + 1) tile widths from
+    the origin, rows counting up in y.
+    """
+
+    size = tilePixels * cellSize
+    c0, r0 = int(math.floor(bbox[0] / size)), int(math.floor(bbox[1] / size))
+    c1 = max(c0, int(math.ceil(bbox[2] / size)) - 1)
+    r1 = max(r0, int(math.ceil(bbox[3] / size)) - 1)
+
+    tiles = [(c, r) for r in range(r1, r0 - 1, -1) for c in range(c0, c1 + 1)]
+    grid = RasterGrid(c0 * size, (r1 + 1) * size, cellSize, (r1 - r0 + 1) * tilePixels, (c1 - c0 + 1) * tilePixels)
+
+    return TileLayout(tiles, grid, tilePixels)
+
+def tileBox(tile, cellSize, tilePixels):
+    """Bounding box (xmin, ymin, xmax, ymax) of a tile"""
+
+    size = tilePixels * cellSize
+    col, row = tile
+
+    return (col * size, row * size, (col + 1) * size, (row + 1) * size)
+
+def tileKey(serviceUrl, sr, cellSize, tilePixels, tile):
+    """Cache key of a tile of a service in a spatial reference at a resolution"""
+
+    text = json.dumps({"service": serviceUrl.rstrip("/").lower(), "sr": str(sr), "cellSize": repr(float(cellSize)),
+                       "tilePixels": int(tilePixels), "tile": [int(tile[0]), int(tile[1])]}, sort_keys=True)
+
+    return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+def demCacheFolder():
+    """Tile cache folder shared by the projects beside the workspace geodatabase"""
+    import arcpy
+
+    return os.path.join(os.path.dirname(arcpy.env.workspace), "demTileCache")
+
+def httpSession(workers=FETCH_WORKERS):
+    """HTTP session whose connection pool holds a connection per worker"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+def serviceInfo(session, serviceUrl, timeout=FETCH_TIMEOUT):
+    """Description of an image service from its ?f=json endpoint"""
+
+    response = session.get(serviceUrl.rstrip("/"), params={"f": "json"}, timeout=timeout)
+    response.raise_for_status()
+
+    return response.json()
+
+def nativeCellSize(info, metersPerUnit, serviceMetersPerUnit=None):
+    """Service pixel size in the units of the request spatial reference
+
+    serviceMetersPerUnit is that of the service's own spatial reference,
+    None for a geographic one.
+    """
+
+    pixelSize = min(float(info["pixelSizeX"]), float(info["pixelSizeY"]))
+    if serviceMetersPerUnit is None:
+        serviceMetersPerUnit = METERS_PER_DEGREE
+
+    return pixelSize * serviceMetersPerUnit / metersPerUnit
+
+def serviceTilePixels(info, tilePixels=TILE_PIXELS):
+    """Tile edge in pixels within the service's image size limits"""
+
+    return int(min(tilePixels, info.get("maxImageWidth", tilePixels), info.get("maxImageHeight", tilePixels)))
+
+def fetchTile(session, serviceUrl, bbox, sr, tilePixels, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF, timeout=FETCH_TIMEOUT):
+    """TIFF bytes of an exportImage request over a tile, retried with exponential backoff
+
+    A response that is not a TIFF (the service reports some errors as
+    JSON with status 200) counts as a failed attempt.
+    """
+
+    params = {"f": "image", "bbox": ",".join(repr(float(v)) for v in bbox), "bboxSR": sr, "imageSR": sr,
+              "size": "{0},{0}".format(tilePixels), "format": "tiff", "pixelType": "F32", "noData": 0,
+              "interpolation": "RSP_BilinearInterpolation"}
+
+    for attempt in range(retries):
+        try:
+            response = session.get(serviceUrl.rstrip("/") + "/exportImage", params=params, timeout=timeout)
+            response.raise_for_status()
+            if response.content[:4] in TIFF_MAGIC:
+                return response.content
+            error = ValueError("Service returned no image for tile {}: {}".format(bbox, response.content[:200]))
+        except Exception as e:
+            error = e
+        if attempt + 1 < retries:
+            time.sleep(backoff * 2 ** attempt)
+
+    raise error
+
+def evictTiles(folder, maxBytes, keep=()):
+    """Delete the least recently used tiles until the cache fits in maxBytes; returns the bytes freed"""
+
+    tiles = []
+    for name in os.listdir(folder):
+        if name.endswith(".tif"):
+            path = os.path.join(folder, name)
+            tiles.append((os.path.getmtime(path), os.path.getsize(path), path))
+    tiles.sort()
+
+    total = sum(size for mtime, size, path in tiles)
+    freed = 0
+    for mtime, size, path in tiles:
+        if total - freed <= maxBytes:
+            break
+        if path in keep:
+            continue
+        os.remove(path)
+        freed += size
+
+    return freed
+
+def fetchTiles(session, serviceUrl, layout, sr, cacheFolder, workers=FETCH_WORKERS, maxMB=DEM_CACHE_MB, progress=None):
+    """Paths of the cached TIFFs of a layout's tiles, fetching the missing ones concurrently
+
+    Tiles are written to a temporary name and renamed into place, so a
+    partly written tile is never read back. progress(done, total) is
+    called as tiles arrive.
+    """
+
+    if not os.path.exists(cacheFolder):
+        os.makedirs(cacheFolder)
+
+    cellSize, tilePixels = layout.grid.cellSize, layout.tilePixels
+    paths = dict((tile, os.path.join(cacheFolder, tileKey(serviceUrl, sr, cellSize, tilePixels, tile) + ".tif")) for tile in layout.tiles)
+    missing = [tile for tile in layout.tiles if not os.path.exists(paths[tile])]
+    for tile in layout.tiles:
+        if tile not in missing:
+            os.utime(paths[tile])
+
+    def fetch(tile):
+        content = fetchTile(session, serviceUrl, tileBox(tile, cellSize, tilePixels), sr, tilePixels)
+        staging = "{}.{}.part".format(paths[tile], uuid.uuid4().hex)
+        with open(staging, "wb") as f:
+            f.write(content)
+        os.replace(staging, paths[tile])
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as pool:
+        for done, result in enumerate(pool.map(fetch, missing), 1):
+            if progress is not None:
+                progress(done, len(missing))
+
+    evictTiles(cacheFolder, maxMB * 1024 ** 2, keep=set(paths.values()))
+
+    return paths
+
+def mosaicTiles(paths, layout, outRaster, spatialRef, outFolder, memoryBudget=1024):
+    """Mosaic the tile TIFFs of a layout into a raster, zero (the service NoData) as NoData"""
+    import arcpy
+    from tiledRaster import createMemmap, memmapToRaster
+
+    grid, tilePixels = layout.grid, layout.tilePixels
+    c0 = int(round(grid.xMin / (tilePixels * grid.cellSize)))
+    r1 = int(round(grid.yMax / (tilePixels * grid.cellSize))) - 1
+
+    mosaic = createMemmap(os.path.join(outFolder, "demMosaic.npy"), (grid.nRows, grid.nCols))
+    for (col, row), path in paths.items():
+        tile = arcpy.RasterToNumPyArray(path, nodata_to_value=0).astype(np.float32, copy=False)
+        tile = np.where(tile == 0, np.nan, tile)[:tilePixels, :tilePixels]
+        y0, x0 = (r1 - row) * tilePixels, (col - c0) * tilePixels
+        mosaic[y0:y0 + tile.shape[0], x0:x0 + tile.shape[1]] = tile
+    mosaic.flush()
+
+    outRaster = memmapToRaster(mosaic, grid, outRaster, spatialRef, memoryBudget)
+    del mosaic
+
+    return outRaster
+
+def retrieveDEM(serviceUrl, bbox, spatialRef, outRaster, cacheFolder=None, tilePixels=TILE_PIXELS, workers=FETCH_WORKERS, progress=None, session=None):
+    """Fetch an image service's DEM over a bounding box at native resolution into a raster; returns (raster, layout)
+
+    bbox and the output are in spatialRef, a projected spatial reference
+    with a factory code. A session passed in is used as is and left open;
+    otherwise one is opened for the run and closed afterwards.
+    """
+    import arcpy
+    import shutil
+    import tempfile
+
+    if cacheFolder is None:
+        cacheFolder = demCacheFolder()
+
+    ownSession = session is None
+    if ownSession:
+        session = httpSession(workers)
+    try:
+        info = serviceInfo(session, serviceUrl)
+        serviceSR = info.get("spatialReference", {})
+        serviceCode = serviceSR.get("latestWkid", serviceSR.get("wkid"))
+        serviceMeters = None
+        if serviceCode is not None:
+            serviceRef = arcpy.SpatialReference(int(serviceCode))
+            if serviceRef.type == "Projected":
+                serviceMeters = serviceRef.metersPerUnit
+        cellSize = nativeCellSize(info, spatialRef.metersPerUnit, serviceMeters)
+
+        layout = tileLayout(bbox, cellSize, serviceTilePixels(info, tilePixels))
+        paths = fetchTiles(session, serviceUrl, layout, spatialRef.factoryCode, cacheFolder, workers, progress=progress)
+    finally:
+        if ownSession:
+            session.close()
+
+    tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+    try:
+        outRaster = mosaicTiles(paths, layout, outRaster, spatialRef, tileFolder)
+    finally:
+        shutil.rmtree(tileFolder, ignore_errors=True)
+
+    return outRaster, layout
@@ -2,12 +2,13 @@
 """Description: Optimizes the plane of array using theoretical planes of array from adacent rows
 Revision log
 0.0.1 - 4/5/2022 - updated to new template
+1.1.0 - 10/16/2026 - East and west piles from the spatial index instead of a near table of the piles
 """
 
 __author__ = "Matthew Gagne"
 __copyright__ = "Copyright 2022, KiloNewton, LLC"
 __credits__ = ["Matthew Gagne", "John Williamson"]
-__version__ = "1.0.0"
+__version__ = "1.1.0"
 __license__= "internal"
 __ArcVersion__ = "ArcGIS 2.9.3"
 __maintainer__ = "Matthew Gagne"
@@ -19,6 +20,8 @@ from arcpy import env
 from arcpy.sa import *
 import os
 import sys
+from spatialIndex import nearValues
+from rowRegression import writeFields
 
 class ewPOAopt(object):
     def __init__(self):
@@ -140,22 +143,13 @@ class ewPOAopt(object):
         pilesOutName = os.path.basename(pileOutput)
         pileRevealsOpt = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, pilesOutName)
 
-        # Find the nearest four piles (max) for each individual pile, and separate out into east and west
-        piles_near = arcpy.analysis.GenerateNearTable(pilesWorking, pilesInput, "piles_near","", "NO_LOCATION", "ANGLE", "ALL", 4, "GEODESIC")
-
         arcpy.management.AlterField(pilesWorking,poaField, "poa_near", "", "", "", "", "CLEAR_ALIAS")
-        arcpy.management.JoinField(piles_near, "NEAR_FID", pilesWorking, "OBJECTID", "poa_near")
-
-        near_east = arcpy.TableSelect_analysis(piles_near, "near_east", "NEAR_ANGLE > 87 And NEAR_ANGLE < 92") # Note: this assumes that there are no short rows, or staggered piles 
-
-        arcpy.management.AlterField(near_east,"poa_near", "poa_east", "", "", "", "", "CLEAR_ALIAS")
-
-        near_west = arcpy.TableSelect_analysis(piles_near, "near_west", "NEAR_ANGLE > -92 And NEAR_ANGLE < -87") # Note: this assumes that there are no short rows, or staggered piles 
-        arcpy.management.AlterField(near_west, "poa_near", "poa_west", "", "", "", "", "CLEAR_ALIAS")
 
-        # Join east and west back to the piles
-        arcpy.management.JoinField(pilesWorking, "OBJECTID", near_east, "IN_FID", "poa_east")
-        arcpy.management.JoinField(pilesWorking, "OBJECTID", near_west, "IN_FID", "poa_west")
+        # Plane of array of the pile east and west of each pile among its four nearest, from the session pile index
+        # Note: this assumes that there are no short rows, or staggered piles
+        pileOIDs, poaEast = nearValues(pilesWorking, pilesInput, poaField, [(87, 92)], 4)[:2]
+        poaWest = nearValues(pilesWorking, pilesInput, poaField, [(-92, -87)], 4)[1]
+        writeFields(pilesWorking, "OID@", pileOIDs, {"poa_east": poaEast, "poa_west": poaWest})
 
         # Calculate theoretical plane of array
         codeblock_poaTH = """
@@ -0,0 +1,278 @@
+########################################################################
+"""FOCAL STATISTICS KERNELS
+
+Rectangular focal statistics on float32 NumPy arrays. MEAN and STD are
+computed from separable running sums and MAXIMUM, MINIMUM and RANGE from
+separable van Herk/Gil-Werman running extrema, so the cost per cell does
+not depend on the window size. NoData (NaN) cells are ignored in the same
+way as FocalStatistics with ignore_nodata="DATA".
+
+Running sums are built from prefix and suffix sums inside blocks anchored
+to the full raster's cell index rather than from one table anchored at
+the array corner. Every cell's window sum is then the same sequence of
+additions whether the array is the full raster or a tile of it (given its
+origin), so tiled runs are bit-identical to full-raster runs.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Added MAXIMUM, MINIMUM and RANGE
+0.0.3 - 10/16/2026 - Block-anchored running sums so tiles match full-raster runs
+0.0.4 - 10/16/2026 - focalRaster runs tiles on the parallel tile scheduler
+0.0.5 - 10/16/2026 - focalRaster reads repeated windows back from the terrain product cache
+0.0.6 - 10/17/2026 - Tile folder removed after each run; tile budget measured
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.6"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import os.path
+import shutil
+import tempfile
+import numpy as np
+
+# Working memory of focalTile per tile cell in bytes; tiledRaster.tileCellBytes measures 86 for STD, the largest statistic
+TILE_CELL_BYTES = 96
+
+def windowCells(size, cellSize):
+    """Convert a map unit window size to an odd number of cells so the window is centered"""
+
+    n = max(1, int(round(float(size) / float(cellSize))))
+    if n % 2 == 0:
+        n += 1
+    return n
+
+def rectangleCells(neighborhood, cellSize):
+    """Return the (rows, columns) of a "Rectangle {width} {height} {MAP|CELL}" neighborhood or NbrRectangle"""
+
+    if hasattr(neighborhood, "width"):
+        width = float(neighborhood.width)
+        height = float(neighborhood.height)
+        units = str(neighborhood.units).upper()
+    else:
+        parts = str(neighborhood).split()
+        if parts[0].upper() != "RECTANGLE":
+            raise ValueError("Only rectangle neighborhoods are supported: " + str(neighborhood))
+
+        width = float(parts[1])
+        height = float(parts[2])
+        units = parts[3].upper() if len(parts) > 3 else "CELL"
+
+    if units == "MAP":
+        return windowCells(height, cellSize), windowCells(width, cellSize)
+    return windowCells(height, 1), windowCells(width, 1)
+
+def runningSum(array, n, axis, offset=0):
+    """Running sum of an odd window along one axis, truncated at the array edges
+
+    Each window is the suffix sum of one block plus the prefix sum of the
+    next, with blocks of n cells starting at raster indices of -(n // 2)
+    modulo n. offset is the raster index of the array's first cell along
+    the axis, so a tile and the full raster add the same values in the
+    same order.
+    """
+
+    if n <= 1:
+        return array.astype(np.float64)
+
+    src = np.moveaxis(array, axis, -1)
+    size = src.shape[-1]
+    half = n // 2
+
+    # Window of cell i covers padded cells lead + i to lead + i + n - 1
+    lead = int(offset) % n
+    nBlocks = -(-(lead + size + n - 1) // n)
+    padded = np.zeros(src.shape[:-1] + (nBlocks * n,), dtype=np.float64)
+    padded[..., lead + half:lead + half + size] = src
+
+    blocks = padded.reshape(src.shape[:-1] + (nBlocks, n))
+    prefix = np.cumsum(blocks, axis=-1).reshape(padded.shape)
+    suffix = np.cumsum(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+
+    out = suffix[..., lead:lead + size] + prefix[..., lead + n - 1:lead + n - 1 + size]
+
+    # A window that starts on a block boundary is exactly one block
+    first = (n - lead) % n
+    out[..., first::n] = suffix[..., lead + first:lead + size:n]
+
+    return np.moveaxis(out, -1, axis)
+
+def windowSum(array, nRowsWin, nColsWin, origin=(0, 0)):
+    """Rectangular window sum of an array whose first cell is at raster (row, column) origin"""
+
+    return runningSum(runningSum(array, nRowsWin, 0, origin[0]), nColsWin, 1, origin[1])
+
+def focalMoments(array, nRowsWin, nColsWin, std=True, origin=(0, 0), shift=None):
+    """Focal count, mean and (population) standard deviation over a rectangle
+
+    Returns (count, mean, std); std is None when not requested. For the
+    standard deviation, values are shifted before squaring to keep the
+    variance stable on large elevations; the shift defaults to the array
+    mean and must be passed explicitly for tiles to match a full run.
+    """
+
+    valid = ~np.isnan(array)
+    if shift is None:
+        shift = float(np.mean(array[valid], dtype=np.float64)) if std and valid.any() else 0.0
+    values = np.where(valid, array - np.float64(shift), 0)
+
+    count = windowSum(valid, nRowsWin, nColsWin, origin)
+    total = windowSum(values, nRowsWin, nColsWin, origin)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        dev = None
+        if std:
+            sumSq = windowSum(values * values, nRowsWin, nColsWin, origin)
+            dev = np.sqrt(np.maximum(sumSq / count - mean * mean, 0))
+
+    noData = count == 0
+    mean = (mean + shift).astype(np.float32)
+    mean[noData] = np.nan
+    if dev is not None:
+        dev = dev.astype(np.float32)
+        dev[noData] = np.nan
+
+    return count, mean, dev
+
+def focalMean(array, nRowsWin, nColsWin, origin=(0, 0)):
+    """Rectangular focal mean ignoring NoData"""
+
+    return focalMoments(array, nRowsWin, nColsWin, std=False, origin=origin)[1]
+
+def focalStd(array, nRowsWin, nColsWin, origin=(0, 0), shift=None):
+    """Rectangular focal standard deviation ignoring NoData"""
+
+    return focalMoments(array, nRowsWin, nColsWin, origin=origin, shift=shift)[2]
+
+def runningExtreme(array, n, axis, func):
+    """Running max (func=np.maximum) or min (func=np.minimum) of an odd window along one axis
+
+    Uses the van Herk/Gil-Werman block prefix/suffix scheme: three
+    comparisons per cell for any window size. Windows are truncated at the
+    array edges.
+    """
+
+    if n <= 1:
+        return array.copy()
+
+    fill = -np.inf if func is np.maximum else np.inf
+    src = np.moveaxis(array, axis, -1)
+    size = src.shape[-1]
+    half = n // 2
+
+    # Pad so every window lies inside the padded array and the length is a multiple of n
+    nBlocks = -(-(size + n - 1) // n)
+    padded = np.full(src.shape[:-1] + (nBlocks * n,), fill, dtype=array.dtype)
+    padded[..., half:half + size] = src
+
+    blocks = padded.reshape(src.shape[:-1] + (nBlocks, n))
+    prefix = func.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = func.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+
+    out = func(suffix[..., :size], prefix[..., n - 1:n - 1 + size])
+
+    return np.moveaxis(out, -1, axis)
+
+def focalMax(array, nRowsWin, nColsWin):
+    """Rectangular focal maximum ignoring NoData"""
+
+    out = np.where(np.isnan(array), -np.inf, array).astype(np.float32)
+    out = runningExtreme(runningExtreme(out, nRowsWin, 0, np.maximum), nColsWin, 1, np.maximum)
+    out[np.isneginf(out)] = np.nan
+
+    return out
+
+def focalMin(array, nRowsWin, nColsWin):
+    """Rectangular focal minimum ignoring NoData"""
+
+    out = np.where(np.isnan(array), np.inf, array).astype(np.float32)
+    out = runningExtreme(runningExtreme(out, nRowsWin, 0, np.minimum), nColsWin, 1, np.minimum)
+    out[np.isposinf(out)] = np.nan
+
+    return out
+
+def focalRange(array, nRowsWin, nColsWin):
+    """Rectangular focal range ignoring NoData"""
+
+    return focalMax(array, nRowsWin, nColsWin) - focalMin(array, nRowsWin, nColsWin)
+
+def focalWindow(array, nRowsWin, nColsWin, statistics_type, origin=(0, 0), shift=None):
+    """Run a focal statistic over a window given in cells"""
+
+    statistics_type = statistics_type.upper()
+
+    if statistics_type == "MEAN":
+        return focalMean(array, nRowsWin, nColsWin, origin)
+    if statistics_type == "STD":
+        return focalStd(array, nRowsWin, nColsWin, origin, shift)
+    if statistics_type == "MAXIMUM":
+        return focalMax(array, nRowsWin, nColsWin)
+    if statistics_type == "MINIMUM":
+        return focalMin(array, nRowsWin, nColsWin)
+    if statistics_type == "RANGE":
+        return focalRange(array, nRowsWin, nColsWin)
+    raise ValueError("Unsupported focal statistic: " + statistics_type)
+
+def focalArray(array, neighborhood, statistics_type, cellSize):
+    """Run a focal statistic on an array with a FocalStatistics style neighborhood string"""
+
+    nRowsWin, nColsWin = rectangleCells(neighborhood, cellSize)
+
+    return focalWindow(array, nRowsWin, nColsWin, statistics_type)
+
+def focalTile(array, origin=(0, 0), nRowsWin=1, nColsWin=1, statistics_type="MEAN", shift=None):
+    """Tile pipeline for tiledRaster: one focal statistic"""
+
+    return [focalWindow(array, nRowsWin, nColsWin, statistics_type, origin, shift)]
+
+def focalRaster(in_raster, neighborhood, statistics_type, memoryBudget=1024):
+    """Drop-in replacement for arcpy.sa.FocalStatistics(in_raster, neighborhood, statistics_type, "DATA")
+
+    The raster is processed in tiles on as many worker processes as the
+    parallelProcessingFactor environment allows. Results are kept in the
+    terrain product cache keyed by the raster's cells, window and
+    statistic.
+    """
+    import arcpy
+    from rasterArrays import rasterGrid
+    from tiledRaster import parallelWorkers, rasterToMemmap, memmapToRaster, tiledArrays
+    from terrainCache import cachedArrays
+
+    ras = in_raster if isinstance(in_raster, arcpy.Raster) else arcpy.Raster(str(in_raster))
+    grid = rasterGrid(ras)
+    nRowsWin, nColsWin = rectangleCells(neighborhood, grid.cellSize)
+    workers = parallelWorkers(arcpy.env.parallelProcessingFactor)
+
+    tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+    try:
+        array = rasterToMemmap(ras, os.path.join(tileFolder, "focalInput.npy"), grid, memoryBudget)[0]
+
+        def compute():
+            # Every tile shifts by the same mean so the standard deviation matches a full-raster run
+            shift = None
+            if statistics_type.upper() == "STD":
+                total = 0.0
+                count = 0
+                for r0 in range(0, grid.nRows, 1024):
+                    strip = array[r0:r0 + 1024]
+                    valid = ~np.isnan(strip)
+                    total += float(np.sum(strip[valid], dtype=np.float64))
+                    count += int(valid.sum())
+                shift = total / count if count else 0.0
+
+            return tiledArrays(focalTile, [array], 1, (nRowsWin // 2, nColsWin // 2), TILE_CELL_BYTES, memoryBudget, tileFolder, "focal", workers,
+                               nRowsWin=nRowsWin, nColsWin=nColsWin, statistics_type=statistics_type, shift=shift)
+
+        out = cachedArrays([array], grid, "FocalStatistics", {"window": [nRowsWin, nColsWin], "statistics_type": statistics_type.upper()},
+                           tileFolder, compute, spatialRef=ras.spatialReference.name)[0]
+
+        outRaster = memmapToRaster(out, grid, arcpy.CreateUniqueName("focal", arcpy.env.scratchGDB), ras.spatialReference, memoryBudget)
+        del array, out
+    finally:
+        shutil.rmtree(tileFolder, ignore_errors=True)
+
+    return arcpy.Raster(outRaster)
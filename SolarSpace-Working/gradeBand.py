@@ -0,0 +1,109 @@
+########################################################################
+"""GRADING BAND CLAMP KERNEL
+
+Clamps an existing surface into a band around a base surface (base
+planes, plane of array or a terrain following trend) in one fused pass.
+This replaces the Plus/Minus and MosaicToNewRaster MINIMUM/MAXIMUM chain
+that materialized six rasters to produce the graded surface. The graded
+surface, cut/fill delta and graded mask are written chunk by chunk so
+temporaries stay a fixed number of rows regardless of the DEM size.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Raster clamp run on memory-mapped tiles
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.2"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import os.path
+import shutil
+import tempfile
+import numpy as np
+
+# Working memory of bandClampTile per tile cell in bytes: the two float32 input copies, the float32 graded and
+# delta arrays and the bool mask, with the chunked abs() temporary; tracemalloc peak of 21 on a 1000 x 1000 tile
+TILE_CELL_BYTES = 24
+
+def bandClamp(dem, base, spacing, lowerLimit=None, tolerance=0.0, chunkRows=1024):
+    """Clamp a DEM into [base - spacing, base + spacing]
+
+    Returns (graded, delta, mask): the graded surface, graded minus
+    existing, and the cells where the absolute delta exceeds the tolerance.
+    Cells where the base is NoData keep the existing surface and cells
+    where the DEM is NoData stay NoData, as the mosaic chain does. If
+    lowerLimit is given it replaces base - spacing as the bottom of the
+    band. The graded surface is max(dem, lower) + min(dem, upper) - dem,
+    which matches the mosaic chain even where the band is inverted.
+    """
+
+    nRows = dem.shape[0]
+    graded = np.empty(dem.shape, dtype=np.float32)
+    delta = np.empty(dem.shape, dtype=np.float32)
+    mask = np.empty(dem.shape, dtype=bool)
+    spacing = np.float32(spacing)
+
+    for r0 in range(0, nRows, max(int(chunkRows), 1)):
+        rows = slice(r0, min(r0 + int(chunkRows), nRows))
+        s = dem[rows].astype(np.float32, copy=False)
+        b = base[rows].astype(np.float32, copy=False)
+        g = graded[rows]
+        d = delta[rows]
+
+        # Upper grade: min(dem, upper) - dem
+        np.add(b, spacing, out=d)
+        np.fmin(s, d, out=d)
+        np.subtract(d, s, out=d)
+
+        # Graded: max(dem, lower) + upper grade
+        if lowerLimit is None:
+            np.subtract(b, spacing, out=g)
+        else:
+            g[...] = lowerLimit[rows]
+        np.fmax(s, g, out=g)
+        np.add(g, d, out=g)
+
+        np.subtract(g, s, out=d)
+        np.greater(np.abs(d), tolerance, out=mask[rows])
+
+    return graded, delta, mask
+
+def bandClampTile(dem, base, origin=(0, 0), spacing=0.0, tolerance=0.0):
+    """Tile pipeline for tiledRaster: graded surface and cut/fill delta"""
+
+    graded, delta, mask = bandClamp(dem, base, spacing, tolerance=tolerance)
+
+    return [graded, delta]
+
+def bandClampRaster(demInput, baseRaster, spacing, spatialRef, tolerance=0.0, memoryBudget=1024):
+    """Grade a DEM raster to a band around a base raster
+
+    The base is read on the DEM's grid and both are clamped tile by tile
+    through memory-mapped files. Returns temporary (graded, cutFill)
+    rasters.
+    """
+    import arcpy
+    from rasterArrays import rasterGrid
+    from tiledRaster import rasterToMemmap, memmapToRaster, tiledArrays
+
+    ras = demInput if isinstance(demInput, arcpy.Raster) else arcpy.Raster(str(demInput))
+    grid = rasterGrid(ras)
+
+    tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+    try:
+        demArray = rasterToMemmap(ras, os.path.join(tileFolder, "bandDEM.npy"), grid, memoryBudget)[0]
+        baseArray = rasterToMemmap(baseRaster, os.path.join(tileFolder, "bandBase.npy"), grid, memoryBudget)[0]
+        graded, delta = tiledArrays(bandClampTile, [demArray, baseArray], 2, (0, 0), TILE_CELL_BYTES, memoryBudget, tileFolder, "band",
+                                    spacing=spacing, tolerance=tolerance)
+
+        gradedRaster = memmapToRaster(graded, grid, arcpy.CreateUniqueName("bandGraded", arcpy.env.scratchGDB), spatialRef, memoryBudget)
+        deltaRaster = memmapToRaster(delta, grid, arcpy.CreateUniqueName("bandCutFill", arcpy.env.scratchGDB), spatialRef, memoryBudget)
+        del demArray, baseArray, graded, delta
+    finally:
+        shutil.rmtree(tileFolder, ignore_errors=True)
+
+    return arcpy.Raster(gradedRaster), arcpy.Raster(deltaRaster)
@@ -7,12 +7,22 @@ Revision log
 0.0.1 - 10/31/2022 - Initial scripting
 1.0.0 - 01/10/2023 - Tested and deployed
 1.1.0 - 03/16/2023 - Added catch if max and min reveal present in row, then just use average of max and min reveal, otherwise us the average of the reveals
+1.2.0 - 10/16/2026 - Grading band clamped in one pass instead of the mosaic minimum/maximum chain
+1.2.1 - 10/16/2026 - Row reveals reduced with the zonal statistics engine
+1.3.0 - 10/16/2026 - Added incremental regrading of the rows whose planes of array changed since the cached run
+1.3.1 - 10/16/2026 - Grading boundaries extracted by raster morphology instead of polygonizing and buffering the cut/fill raster
+1.3.2 - 10/16/2026 - Volumes, graded area and cut and fill rasters from one streaming pass over the surfaces
+1.4.0 - 10/16/2026 - Row base planes from the grouped row regression instead of Statistics and JoinField passes
+1.4.1 - 10/16/2026 - LandXML streamed from the triangle arrays instead of an lxml tree
+1.4.2 - 10/16/2026 - TIN triangles read in memory for the LandXML export instead of through a temporary shapefile
+1.4.3 - 10/17/2026 - Code blocks kept flush-left and base plane temporaries deleted only after a full regrade
+1.4.4 - 10/17/2026 - Incremental regrade checks the DEM cells, rasters the base plane from the rebuilt TIN and takes volumes from the cut/fill volume engine as a full run does
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.0.0"
+__version__     = "1.4.4"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcGIS 3.0.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -24,8 +34,15 @@ import os.path
 import sys
 from arcpy.sa import *
 from arcpy.ddd import *
-import shapefile
-import lxml.etree as ET
+from gradeBand import bandClampRaster
+from zonalStats import zonalRaster
+from rasterArrays import rasterGrid
+from tiledRaster import memmapToRaster
+from incrementalGrading import pileTable, rowPlanes, layoutChanged, dirtyRows, loadGradingCache, saveGradingCache, dirtyWindows, regradeDirtyRows, cachedRaster, patchGradeFinal, mergeBounds, updateGradingCache
+from gradingBounds import gradingBounds
+from cutFillVolumes import cutFillVolumes
+from rowRegression import writeLinePOA
+from landXML import readTriangles, writeTriangleLandXML
 
 class gradeRevisePOA(object):
     def __init__(self):
@@ -165,7 +182,15 @@ class gradeRevisePOA(object):
             parameterType="Optional",
             direction="Output")
 
-        params = [param0, param1, param2, param3, param4, param5, param6, param7, param8, param9, param10, param11, param12, param13, param14, param15, param16]
+        param17 = arcpy.Parameter(
+            displayName="Regrade only rows with revised planes of array?",
+            name="incrementalOption",
+            datatype="GPBoolean",
+            parameterType="Optional",
+            direction="Input")
+        param17.value = False
+
+        params = [param0, param1, param2, param3, param4, param5, param6, param7, param8, param9, param10, param11, param12, param13, param14, param15, param16, param17]
 
         return params
 
@@ -260,6 +285,7 @@ class gradeRevisePOA(object):
         statsOutput = parameters[14].valueAsText
         lxmlOutputOption = parameters[15].value
         lxmlOutput = parameters[16].valueAsText
+        incrementalOption = parameters[17].value
 
         outputPath = os.path.dirname(workspace)
 
@@ -271,60 +297,261 @@ class gradeRevisePOA(object):
         # Set all raster outputs to snap to the DEM
         arcpy.env.snapRaster = demExist
 
-        arcpy.SetProgressor('default', 'Analyzing the grade at the piles...')
+        gradeName = os.path.basename(gradeRevOutput)
+        gradeBoundsName = os.path.basename(gradeBoundsOut)
 
-        # Calculate north-south plane of array slope
-        piles_working = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, "piles_working")
+        # Compare the piles to the cached run so only the rows with revised planes of array are regraded
+        # Pile rows, coordinates, planes of array and reveals for the base plane regression and the cache
+        pileArray = arcpy.da.FeatureClassToNumPyArray(pilesInput, [row_ID, "SHAPE@X", "SHAPE@Y", poaField, revField], skip_nulls=True)
+        piles = pileTable(pileArray[row_ID], pileArray["SHAPE@X"], pileArray["SHAPE@Y"], pileArray[poaField], pileArray[revField])
 
-        # Add xy coordinates - will overwrite if already present
-        arcpy.management.AddXY(piles_working)
+        cache = None
+        if incrementalOption == True:
+            cacheFolder = os.path.join(outputPath, gradeName + "_cache")
+            demGrid = rasterGrid(demExist)
+            revealParams = [float(minReveal), float(maxReveal)]
 
-        # Calculate derived base plane of array
-        avgRev_stats = arcpy.analysis.Statistics(piles_working, "avgRev_stats", [[revField, "MEAN"], [revField, "MAX"], [revField, "MIN"]], row_ID)
-        revealMeanField = "MEAN_" + revField
-        revealMaxField = "MAX_" + revField
-        revealMinField = "MIN_" + revField
+            if lxmlOutputOption == True:
+                arcpy.AddMessage("The LandXML surface needs the TIN of the whole site, running a full regrade")
+            else:
+                cache = loadGradingCache(cacheFolder, demExist, demGrid, revealParams)
+                if cache is None:
+                    arcpy.AddMessage("No cache of a previous run with this DEM and reveals, running a full regrade")
+                elif layoutChanged(cache[0]["piles"], piles):
+                    arcpy.AddMessage("Rows were added, removed or moved since the cached run, running a full regrade")
+                    cache = None
 
-        poaDevCode = """
-def poaDev(maxRevRow, minRevRow, meanRevRow, maxR, minR):
-    if (maxRevRow == maxR) or (minRevRow == minR):
-        return (maxR + minR)/2
-    else:
-        return meanRevRow
-"""
+        if cache is not None:
+            dirty = dirtyRows(cache[0]["piles"], piles)
+            arcpy.AddMessage("Rows with revised planes of array: " + str(len(dirty)))
 
-        arcpy.management.CalculateField(avgRev_stats, "poaDevFactor", "poaDev(!"+revealMaxField+"!, !"+revealMinField+"!, !"+revealMeanField+"!, "+maxReveal+", "+minReveal+")", "PYTHON3", poaDevCode, "DOUBLE")
+            if len(dirty) == 0:
+                arcpy.AddMessage("No rows changed since the last run, the graded outputs are up to date")
+                return
 
+        arcpy.SetProgressor('default', 'Analyzing the grade at the piles...')
+
+        # Derived base plane of array of each row: the plane of array lowered by the average reveal, or by the
+        # average of the max and min reveal if the row hits either, fitted north-south in one grouped pass
         revTolerance = float(maxReveal) - float(minReveal)
-        arcpy.management.JoinField(piles_working, row_ID, avgRev_stats, row_ID, "poaDevFactor")
-        arcpy.management.CalculateField(piles_working, "basePlaneDev","(!"+poaField+"! - !poaDevFactor!)", "PYTHON3", "","DOUBLE")
+        planes = rowPlanes(piles, minReveal, maxReveal)
+
+        arcpy.SetProgressor('default', 'Interpolating the planes of array...')
+
+        # The triangulation depends on the row outlines only, so an incremental run rebuilds the same TIN as a full run
+        basePlaneTIN, baseTemps = gradeRevisePOA.basePlaneTIN(rowsInput, row_ID, planes, workspace, outputPath, spatialRef)
 
-        # Summary Statistics by row_ID to to get the mean of the plane of array and the mean of POINT_Y for each row and the count of piles for each row
-        coorStatsInput = [["basePlaneDev", "MEAN"], ["POINT_Y", "MEAN"]]
-        coorStats = arcpy.analysis.Statistics(piles_working, "coorStats", coorStatsInput, row_ID)
+        # Calculate spacing above and below base planes for the new reveal tolerance
+        spacing = revTolerance/2
 
-        # Join the mean of the plane of array and MEAN_POINT_Y back to the piles
-        arcpy.management.JoinField(piles_working, row_ID, coorStats, row_ID, ["MEAN_basePlaneDev", "MEAN_POINT_Y"])
+        if cache is None:
+            # Calculate north-south plane of array slope
+            piles_working = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, "piles_working")
 
-        # Calculate zy_bar, y_ybar_sq
-        arcpy.management.CalculateField(piles_working, "zy_bar","(!basePlaneDev! + !MEAN_basePlaneDev!) * (!POINT_Y! - !MEAN_POINT_Y!)", "PYTHON3", "","DOUBLE")
-        arcpy.management.CalculateField(piles_working, "y_ybar_sq", "(!POINT_Y! - !MEAN_POINT_Y!)**2", "PYTHON3", "","DOUBLE")
+            # Convert to raster
+            basePlaneDev = arcpy.ddd.TinRaster(basePlaneTIN, "basePlaneDev","FLOAT", "LINEAR", "CELLSIZE", 1, gridRes)
 
-        # Summary Statistics by row_ID to get the sum of zy_bar, y_ybar_sq
-        sumStats = arcpy.analysis.Statistics(piles_working, "sumStats", [["zy_bar", "SUM"], ["y_ybar_sq", "SUM"]],row_ID)
+            arcpy.SetProgressor('default', 'Deriving grading for the site...')
 
-        # Calculate the slope (SUM_xy_bar/SUM_x_bar_sq), multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
-        arcpy.management.CalculateField(sumStats, "nsSlope_BP", "!SUM_zy_bar!/!SUM_y_ybar_sq!", "PYTHON3", "","DOUBLE")
+            rowBoundsExpand = arcpy.analysis.GraphicBuffer(rowsInput, "rowBoundsExpand", "3 Feet", "SQUARE", "MITER", 10, "0 Feet")
 
-        # Join slope to piles_working
-        arcpy.management.JoinField(piles_working, row_ID, sumStats, row_ID, ["nsSlope_BP"])
+            # Clamp the existing surface into the band around the base planes for the final grading DEM
+            demGrade, cutFill = bandClampRaster(demExist, basePlaneDev, spacing, spatialRef)
 
-        # Find the intercept
-        arcpy.management.CalculateField(piles_working, "bInit_BP", "!basePlaneDev! - !nsSlope_BP! * !POINT_Y!", "PYTHON3", "", "DOUBLE")
+            # Calculate reveals 
+            grade_trends = arcpy.sa.Minus(demGrade, basePlaneDev)
+            min_rev_grade = arcpy.sa.Plus(float(minReveal), grade_trends)
+            max_min_reveal = zonalRaster(rowBoundsExpand, row_ID, min_rev_grade, 'MAXIMUM')
+            reveals = arcpy.sa.Minus(max_min_reveal,grade_trends)
 
-        newPointStats = arcpy.analysis.Statistics(piles_working, "newPointStats", [["bInit_BP", "MEAN"],["nsSlope_BP", "MEAN"]], row_ID)
+            # Create plane of array raster
+            POA =  arcpy.sa.Plus(reveals, demGrade)
 
-        arcpy.SetProgressor('default', 'Interpolating the planes of array...')
+        else:
+            arcpy.SetProgressor('default', 'Regrading the rows with revised planes of array...')
+
+            # The hole closing, inverting and extending buffers of the grading bounds reach about 25 feet
+            if xyzUnit == "Foot":
+                boundsReach = 25
+            else:
+                boundsReach = 7.62
+
+            # Windows over the base plane triangles touching the changed rows and the reach of their grading bounds
+            regradeGrid, coreGrid, processGrid = dirtyWindows(cache, basePlaneTIN, rowsInput, row_ID, dirty, boundsReach)
+
+            # Raster the base plane over the regrade window and patch it, the band clamp and cut/fill into the cache
+            arcpy.env.extent = arcpy.Extent(regradeGrid.xMin, regradeGrid.yMax - regradeGrid.nRows * gridRes, regradeGrid.xMin + regradeGrid.nCols * gridRes, regradeGrid.yMax)
+            basePlaneDev = arcpy.ddd.TinRaster(basePlaneTIN, "basePlaneDev","FLOAT", "LINEAR", "CELLSIZE", 1, gridRes)
+            regradeDirtyRows(cache, demExist, basePlaneDev, regradeGrid, spacing)
+
+            # Derive the grading bounds and final grade over the process window only
+            cutFill = cachedRaster(cache, "cutFill", processGrid, spatialRef)
+            arcpy.env.extent = arcpy.Extent(processGrid.xMin, processGrid.yMax - processGrid.nRows * gridRes, processGrid.xMin + processGrid.nCols * gridRes, processGrid.yMax)
+            piles_working = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, "piles_working")
+            gradeBoundsName = "grade_bounds_win"
+            gradeName = "grade_final_win"
+
+        # Extract ungraded and graded elevation layers
+        arcpy.management.CalculateField(piles_working, "demGrade_rev", "!"+poaField+"!-!"+revField+"!", "PYTHON3","","DOUBLE")
+
+        arcpy.sa.ExtractMultiValuesToPoints(piles_working,[[demExist, 'demExist_temp']], 'BILINEAR')
+
+        # Create a cutFill column and create a layer with only piles that require grading
+        arcpy.management.CalculateField(piles_working, "cutFill_rev", "!demGrade_rev!-!demExist_temp!", "PYTHON3","","DOUBLE")
+
+        piles_graded_pre = arcpy.analysis.Select(piles_working, 'in_memory\piles_graded_pre', 'cutFill_rev < -0.0415 OR cutFill_rev > 0.0415' )
+
+        # Cut/fill of the graded elevation from the existing elevation comes from the band clamp
+        # Grading areas holding graded piles, closed, trimmed and extended by raster morphology
+        grade_bounds_pre = gradingBounds(cutFill, piles_graded_pre, "grade_bounds_pre")
+
+        if gridRes > 2:
+            simplifyFactor = 1
+        else:
+            simplifyFactor = gridRes/2
+
+        if xyzUnit == "Foot":
+            simpInput = str(simplifyFactor) + " Feet"
+        else:
+            simpInput = str(simplifyFactor) + " Meter"
+            
+        grade_bounds = arcpy.cartography.SimplifyPolygon(grade_bounds_pre, gradeBoundsName, "WEIGHTED_AREA", simpInput, "0 SquareFeet", "RESOLVE_ERRORS", "NO_KEEP", None)
+
+        # Select the sample points and the piles within graded areas
+        piles_intersect = arcpy.management.SelectLayerByLocation(piles_working, 'INTERSECT', grade_bounds)
+        piles_graded = arcpy.conversion.FeatureClassToFeatureClass(piles_intersect, workspace, 'piles_graded')
+
+        # Convert the buffered layer to polylines and interpolate the existing elevation
+        grade_area_line = arcpy.management.FeatureToLine(grade_bounds, "grade_area_line")
+        grade_bound_3D = arcpy.sa.InterpolateShape(demExist, grade_area_line, "grade_bound_3D", None, 1, "BILINEAR", "DENSIFY", 0, "EXCLUDE")
+
+        arcpy.SetProgressor('default', 'Creating the final graded raster...')
+
+        # Create TIN between graded piles and refine to graded area, and extract the 3D edges
+        tin_name_piles = str(outputPath + "\piles_TIN")
+        piles_TIN = arcpy.ddd.CreateTin(tin_name_piles, spatialRef, "piles_graded demGrade_rev masspoints")
+        tinEdge_piles = arcpy.ddd.TinEdge(piles_TIN, r"in_memory\tinEdge_piles", "REGULAR")
+        tinEdge_piles_select = arcpy.management.SelectLayerByLocation(tinEdge_piles, "INTERSECT", grade_area_line, None, "NEW_SELECTION", "INVERT")
+        tinEdge_final = arcpy.conversion.FeatureClassToFeatureClass(tinEdge_piles_select, workspace, "tinEdge_final")
+
+        # Create a TIN from the bound and piles layer
+        tin_name = str(outputPath + "\grade_TIN")
+        grade_TIN = arcpy.ddd.CreateTin(tin_name, spatialRef, "grade_bound_3D Shape.Z Hard_Line <None>; tinEdge_final Shape.Z Hard_Line <None>")
+        grade_raster = arcpy.ddd.TinRaster(grade_TIN, "grade_raster","FLOAT", "NATURAL_NEIGHBORS", "CELLSIZE", 1, gridRes)
+
+        # Clip the grade raster to the grading areas
+        grade_final = arcpy.management.Clip(grade_raster,"",gradeName, grade_bounds, "", "ClippingGeometry")
+
+        if cache is not None:
+            arcpy.SetProgressor('default', 'Patching the regraded rows into the site...')
+            arcpy.ClearEnvironment("extent")
+
+            # Replace the final grade and the grading bounds inside the core window
+            patchGradeFinal(cache, grade_final, coreGrid)
+            grade_bounds = mergeBounds(os.path.join(cacheFolder, "gradeBounds.shp"), grade_bounds, coreGrid, spatialRef, os.path.join(workspace, os.path.basename(gradeBoundsOut)))
+            grade_final = memmapToRaster(cache[1]["gradeFinal"], demGrid, os.path.join(workspace, os.path.basename(gradeRevOutput)), spatialRef)
+            updateGradingCache(cacheFolder, cache, piles, grade_bounds)
+
+            arcpy.management.Delete("grade_bounds_win")
+            arcpy.management.Delete("grade_final_win")
+
+        elif incrementalOption == True:
+            arcpy.SetProgressorLabel('Caching the site surfaces for incremental regrading...')
+            saveGradingCache(cacheFolder, demExist, demGrid, revealParams, piles, {"basePlane": basePlaneDev, "demGrade": demGrade, "cutFill": cutFill, "gradeFinal": grade_final}, grade_bounds)
+
+        aprxMap.addDataFromPath(grade_final)
+        aprxMap.addDataFromPath(grade_bounds)
+
+        if cutFillOption == True:
+            arcpy.SetProgressor('default', 'Comparing the graded surface to the existing surface...')
+
+            # Cut and fill rasters, volumes and graded area in one pass over the surfaces, after a full or an incremental regrade
+            output_table = cutFillVolumes((grade_final, demExist), xyzUnit, statsOutput, gradeBounds=grade_bounds, cutOutput=cutOut, fillOutput=fillOut)
+            cut_raster = cutOut
+            fill_raster = fillOut
+
+            aprxMap.addDataFromPath(cut_raster)
+            aprxMap.addDataFromPath(fill_raster)
+
+            cutName = os.path.basename(cutOut)
+            fillName = os.path.basename(fillOut)
+
+            # Apply symbology
+            for l in aprxMap.listLayers():
+                if l.isRasterLayer:
+                    if l.name == cutName:
+                        symCut = l.symbology
+                        symCut.colorizer.stretchType = "MinimumMaximum"
+                        cr = aprx.listColorRamps('Cut')[0]
+                        symCut.colorizer.colorRamp = cr
+
+                        if xyzUnit == "Foot":
+                            l.label = "Cut (ft)"
+                        else:
+                            l.label = "Cut (m)"
+
+                        l.symbology = symCut
+
+                    if l.name == fillName:
+                        symFill = l.symbology
+                        symFill.colorizer.stretchType = "MinimumMaximum"
+                        cr = aprx.listColorRamps('Fill')[0]
+                        symFill.colorizer.colorRamp = cr
+
+                        if xyzUnit == "Foot":
+                            l.label = "Fill (ft)"
+                        else:
+                            l.label = "Fill (m)"
+
+                        l.symbology = symFill
+
+        if lxmlOutputOption == True:
+
+            # Convert to TIN Triangles
+            tinTriangle = arcpy.ddd.TinTriangle(grade_TIN, r"in_memory\tinTriangle", "PERCENT", 1, '', '')
+
+            if xyzUnit == "Foot":
+                unit_len = "ft"
+            else:
+                unit_len = "m"
+
+            # Stream the points and faces of the TIN triangles to the LandXML file
+            writeTriangleLandXML(lxmlOutput, readTriangles(tinTriangle), "demGrade", unit_len)
+
+            arcpy.management.Delete(tinTriangle)
+
+            arcpy.AddMessage("LandXML Exported Successfully")
+
+        arcpy.management.Delete("grade_bounds")
+        arcpy.management.Delete(grade_TIN)
+        arcpy.management.Delete("grade_area_line")
+        arcpy.management.Delete("grade_bound_3D")
+        arcpy.management.Delete("grade_raster")
+        arcpy.management.Delete("piles_graded")
+        arcpy.management.Delete("piles_graded_pre")
+        arcpy.management.Delete("tinEdge_final")
+        arcpy.management.Delete(piles_TIN)
+        arcpy.management.Delete(tin_name)
+        arcpy.management.Delete(tinEdge_piles)
+        arcpy.management.Delete(tin_name_piles)
+        arcpy.management.Delete(piles_working)
+        arcpy.management.Delete(grade_bounds_pre)
+
+        arcpy.management.Delete(basePlaneDev)
+        for temp in baseTemps:
+            arcpy.management.Delete(temp)
+
+        # The expanded row bounds of the reveals only exist after a full regrade
+        if cache is None:
+            arcpy.management.Delete(rowBoundsExpand)
+
+        return
+
+    def basePlaneTIN(rowsInput, row_ID, planes, workspace, outputPath, spatialRef):
+        """Base plane TIN of the rows: row outlines at their base planes, clipped to the expanded row bounds
+
+        Returns the TIN and its temporary feature classes.
+        """
 
         # Create a working feature class for the rows
         rows_working = arcpy.conversion.FeatureClassToFeatureClass(rowsInput, workspace, "rows_working")
@@ -349,7 +576,7 @@ def poaDev(maxRevRow, minRevRow, meanRevRow, maxR, minR):
                 for pnt in part:
                     if pnt:
                         coordinateList.append((pnt.X, pnt.Y))
-            
+        
             #Determine the extent of each row
             rowExtent = row[0].extent
 
@@ -357,12 +584,12 @@ def poaDev(maxRevRow, minRevRow, meanRevRow, maxR, minR):
             se_coordinate = rowExtent.lowerRight
             nw_coordinate = rowExtent.upperLeft
             ne_coordinate = rowExtent.upperRight
-            
+        
             sw_point = arcpy.PointGeometry(sw_coordinate)
             se_point = arcpy.PointGeometry(se_coordinate)
             nw_point = arcpy.PointGeometry(nw_coordinate)
             ne_point = arcpy.PointGeometry(ne_coordinate)
-            
+        
             insert_cursor.insertRow((nw_point, polygon_oid, "NW"))
             insert_cursor.insertRow((ne_point, polygon_oid, "NE"))
             insert_cursor.insertRow((sw_point, polygon_oid, "SW"))
@@ -420,9 +647,7 @@ def ordPoint(pos):
 
         # Calculate base plane of array elevation at each point
         arcpy.management.JoinField(newBoundPoints, "PolygonOID", rows_working, "OBJECTID", row_ID)
-        arcpy.management.JoinField(newBoundPoints, row_ID, newPointStats, row_ID, [["MEAN_nsSlope_BP"],["MEAN_bInit_BP"]])
-
-        arcpy.management.CalculateField(newBoundPoints, "basePlaneDev", "!MEAN_nsSlope_BP! * !newY! + !MEAN_bInit_BP!", "PYTHON3", "", "DOUBLE")
+        writeLinePOA(newBoundPoints, row_ID, planes, "basePlaneDev")
 
         # Make points 3D
         bound3Dpoints = arcpy.ddd.FeatureTo3DByAttribute(newBoundPoints, "bound3Dpoints", "basePlaneDev")
@@ -475,373 +700,5 @@ def yNew(pos,y):
         # Clip TIN
         arcpy.ddd.EditTin(basePlaneTIN, "basePlanesBounds <None> <None> Hard_Clip false", "DELAUNAY")
 
-        # Convert to raster
-        basePlaneDev = arcpy.ddd.TinRaster(basePlaneTIN, "basePlaneDev","FLOAT", "LINEAR", "CELLSIZE", 1, gridRes)
-
-        arcpy.SetProgressor('default', 'Deriving grading for the site...')
-
-        # Calculate spacing above and below base planes for the new reveal tolerance
-        spacing = revTolerance/2
-
-        rowBoundsExpand = arcpy.analysis.GraphicBuffer(rowsInput, "rowBoundsExpand", "3 Feet", "SQUARE", "MITER", 10, "0 Feet")
-
-        # Create the upper bound
-        upperLimit = arcpy.sa.Plus(basePlaneDev, spacing)
-        upperBound = arcpy.management.MosaicToNewRaster([demExist,upperLimit],'in_memory','upperBound',spatialRef,'32_BIT_FLOAT',gridRes,1,'MINIMUM','FIRST')
-
-        # Create the lower bound
-        lowerLimit = arcpy.sa.Minus(basePlaneDev, spacing)
-        lowerBound = arcpy.management.MosaicToNewRaster([demExist,lowerLimit],'in_memory','lowerBound',spatialRef,'32_BIT_FLOAT',gridRes,1,'MAXIMUM','FIRST')
-
-        # Create and the final grading DEM
-        upperGrade = arcpy.sa.Minus(upperBound, demExist)
-        demGrade = arcpy.sa.Plus(lowerBound, upperGrade)
-
-        # Calculate reveals 
-        grade_trends = arcpy.sa.Minus(demGrade, basePlaneDev)
-        min_rev_grade = arcpy.sa.Plus(float(minReveal), grade_trends)
-        max_min_reveal = arcpy.sa.ZonalStatistics(rowBoundsExpand, row_ID, min_rev_grade, 'MAXIMUM', 'DATA')
-        reveals = arcpy.sa.Minus(max_min_reveal,grade_trends)
-
-        # Create plane of array raster
-        POA =  arcpy.sa.Plus(reveals, demGrade)
-
-        # Extract ungraded and graded elevation layers
-        arcpy.management.CalculateField(piles_working, "demGrade_rev", "!"+poaField+"!-!"+revField+"!", "PYTHON3","","DOUBLE")
-
-        arcpy.sa.ExtractMultiValuesToPoints(piles_working,[[demExist, 'demExist_temp']], 'BILINEAR')
-
-        # Create a cutFill column and create a layer with only piles that require grading
-        arcpy.management.CalculateField(piles_working, "cutFill_rev", "!demGrade_rev!-!demExist_temp!", "PYTHON3","","DOUBLE")
-
-        piles_graded_pre = arcpy.analysis.Select(piles_working, 'in_memory\piles_graded_pre', 'cutFill_rev < -0.0415 OR cutFill_rev > 0.0415' )
-
-        # Subtract the existing elevation from the graded elevation
-        cutFill = arcpy.sa.Minus(demGrade,demExist)
-
-        # Reclassify cut-fill raster using tolerance
-        reclass_code = RemapRange([[-300,-1*float(.0415), 1],[-1*float(.0415), float(.0415), 0],[float(.0415), 300, 2]])
-        cutFill_reclass = arcpy.sa.Reclassify(cutFill, "VALUE", reclass_code, "DATA")
-        reclass_poly = arcpy.conversion.RasterToPolygon(cutFill_reclass, "in_memory\cutFill_poly", "SIMPLIFY", "Value", "SINGLE_OUTER_PART", None)
-        grade_area = arcpy.analysis.Select(reclass_poly, "in_memory\grade_area", "gridcode <> 0")
-
-        # Select areas that intersect piles that are graded
-        grade_intersect = arcpy.management.SelectLayerByLocation(grade_area, 'INTERSECT', piles_graded_pre)
-
-        arcpy.SetProgressor('default', 'Refining the grading boundaries...')
-        
-        # Buffer the graded areas by 5 feet close small holes and merge areas within 10 feet of each other
-        hole_close_buffer = "10 Feet"
-        grade_area_rows_buff = arcpy.analysis.PairwiseBuffer(grade_intersect, "in_memory\grade_area_rows_buff", hole_close_buffer, "ALL")
-        
-        # Invert the buffer to just inside the graded area to eliminate small areas
-        buffer_in = "-9 Feet"
-        bounds_invert = arcpy.analysis.PairwiseBuffer(grade_area_rows_buff, "bounds_invert", buffer_in, "ALL")
-
-        # Extend the graded areas to 2 the raster resolution outside of the graded areas to join close areas  
-        bounds_extend = "3 Feet"
-
-        grade_bounds_pre = arcpy.analysis.PairwiseBuffer(bounds_invert, "grade_bounds_pre", bounds_extend, "ALL") 
-
-        if gridRes > 2:
-            simplifyFactor = 1
-        else:
-            simplifyFactor = gridRes/2
-
-        if xyzUnit == "Foot":
-            simpInput = str(simplifyFactor) + " Feet"
-        else:
-            simpInput = str(simplifyFactor) + " Meter"
-            
-        gradeBoundsName = os.path.basename(gradeBoundsOut)
-
-        grade_bounds = arcpy.cartography.SimplifyPolygon(grade_bounds_pre, gradeBoundsName, "WEIGHTED_AREA", simpInput, "0 SquareFeet", "RESOLVE_ERRORS", "NO_KEEP", None)
-
-        # Select the sample points and the piles within graded areas
-        piles_intersect = arcpy.management.SelectLayerByLocation(piles_working, 'INTERSECT', grade_bounds)
-        piles_graded = arcpy.conversion.FeatureClassToFeatureClass(piles_intersect, workspace, 'piles_graded')
-
-        # Convert the buffered layer to polylines and interpolate the existing elevation
-        grade_area_line = arcpy.management.FeatureToLine(grade_bounds, "grade_area_line")
-        grade_bound_3D = arcpy.sa.InterpolateShape(demExist, grade_area_line, "grade_bound_3D", None, 1, "BILINEAR", "DENSIFY", 0, "EXCLUDE")
-
-        arcpy.SetProgressor('default', 'Creating the final graded raster...')
-
-        # Create TIN between graded piles and refine to graded area, and extract the 3D edges
-        tin_name_piles = str(outputPath + "\piles_TIN")
-        piles_TIN = arcpy.ddd.CreateTin(tin_name_piles, spatialRef, "piles_graded demGrade_rev masspoints")
-        tinEdge_piles = arcpy.ddd.TinEdge(piles_TIN, r"in_memory\tinEdge_piles", "REGULAR")
-        tinEdge_piles_select = arcpy.management.SelectLayerByLocation(tinEdge_piles, "INTERSECT", grade_area_line, None, "NEW_SELECTION", "INVERT")
-        tinEdge_final = arcpy.conversion.FeatureClassToFeatureClass(tinEdge_piles_select, workspace, "tinEdge_final")
-
-        # Create a TIN from the bound and piles layer
-        tin_name = str(outputPath + "\grade_TIN")
-        grade_TIN = arcpy.ddd.CreateTin(tin_name, spatialRef, "grade_bound_3D Shape.Z Hard_Line <None>; tinEdge_final Shape.Z Hard_Line <None>")
-        grade_raster = arcpy.ddd.TinRaster(grade_TIN, "grade_raster","FLOAT", "NATURAL_NEIGHBORS", "CELLSIZE", 1, gridRes)
-
-        gradeName = os.path.basename(gradeRevOutput)
-
-        # Clip the grade raster to the grading areas
-        grade_final = arcpy.management.Clip(grade_raster,"",gradeName, grade_bounds, "", "ClippingGeometry")
-
-        aprxMap.addDataFromPath(grade_final)
-        aprxMap.addDataFromPath(grade_bounds)
-
-        if cutFillOption == True:
-            arcpy.SetProgressor('default', 'Comparing the graded surface to the existing surface...')
-
-            # Calculate the area of one raster square
-            grid_area = str(gridRes ** 2)
-
-            # Create a polygon of the domain of the existing elevation
-            TotalCutFill = arcpy.ddd.RasterDomain(demExist, 'TotalCutFill', 'POLYGON')
-            
-            # Create new cut and fill rasters based on the final grade
-            cutFillFinal = arcpy.sa.Minus(grade_final, demExist)
-            
-            # Create individual cut rasters and fill rasters
-            cut_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, 'VALUE > 0')
-            cut_raster.save(cutOut)
-            fill_raster = arcpy.sa.SetNull(cutFillFinal, cutFillFinal, 'VALUE < 0')
-            fill_raster.save(fillOut)
-
-            arcpy.SetProgressorLabel('Calculating total graded area')
-
-            # Sum the graded area and convert to acres from square feet
-            if xyzUnit == "Foot":
-                total_graded_area = arcpy.analysis.Statistics(grade_bounds, 'total_graded_area', 'Shape_Area SUM', None)
-                arcpy.management.AddFields(total_graded_area,[['graded_area_acres', 'DOUBLE', 'Total Graded Area (acres)']])
-                arcpy.management.CalculateField(total_graded_area, 'graded_area_acres', 'round(!SUM_Shape_Area!/43560,2)','PYTHON3', None)
-
-            if xyzUnit == "Meter":
-                total_graded_area = arcpy.analysis.Statistics(grade_bounds, 'total_graded_area', 'Shape_Area SUM', None)
-                arcpy.management.AddFields(total_graded_area, [['graded_area_m2', 'DOUBLE', 'Total Graded Area (m^2)']])
-                arcpy.management.CalculateField(total_graded_area, 'graded_area_m2', 'round(!SUM_Shape_Area!,2)', 'PYTHON3',None)
-
-            arcpy.SetProgressorLabel('Calculating cut and fill statistics')
-
-            # Calculate the cut-fill statistics
-            Cut_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, 'OID', cut_raster, 'Cut_Total', 'DATA', 'ALL')
-            Fill_Total = arcpy.sa.ZonalStatisticsAsTable(TotalCutFill, 'OID', fill_raster, 'Fill_Total', 'DATA', 'ALL')
-
-            # Add fields to convert to cubic yards, multiply the sum by the grid resolution and convert to cubic yards or meters
-            if xyzUnit == "Foot":
-                arcpy.management.CalculateField(Cut_Total, 'cut_y3', 'round((!SUM!*' + grid_area + ')/27,2)', 'PYTHON3',"", "DOUBLE")
-                arcpy.management.CalculateField(Fill_Total, 'fill_y3', 'round((!SUM!*' + grid_area + ')/27,2)', 'PYTHON3',"","DOUBLE")
-                arcpy.management.JoinField(TotalCutFill, 'OID', Cut_Total, 'OID', ['cut_y3'])
-                arcpy.management.JoinField(TotalCutFill, 'OID', Fill_Total, 'OID', ['fill_y3'])
-
-                # Calculate net, gross, and ratio statistics for cubic yards
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, 'Cut_Fill_Totals', 'cut_y3 SUM; fill_y3 SUM', None)
-                arcpy.management.CalculateField(CutFill_Total, 'Net_Volume', 'round(!SUM_cut_y3! + !SUM_fill_y3!,2)','PYTHON3', "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, 'Total_Volume', 'round(!SUM_fill_y3! - !SUM_cut_y3!,2)','PYTHON3', "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, 'cut_fill_ratio','round(abs(!SUM_cut_y3!) / !SUM_fill_y3!,2)', 'PYTHON3', "","DOUBLE")
-
-                # Merge area and volume tables and transpose table for final output
-                arcpy.management.JoinField(CutFill_Total, 'OBJECTID', total_graded_area, 'OBJECTID', 'graded_area_acres')
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [['SUM_cut_y3', 'Cut Volume (y^3)'],['SUM_fill_y3', 'Fill Volume (y^3)'],['Net_Volume', 'Net Volume (y^3)'],['Total_Volume', 'Total Volume (y^3)'],['cut_fill_ratio', 'Cut/Fill Ratio'],['graded_area_acres','Graded Area (acres)']], statsOutput,'Grading', 'Summary', None)
-
-            if xyzUnit == "Meter":
-                arcpy.management.CalculateField(Cut_Total, 'cut_m3', 'round((!SUM!*' + grid_area + '),2)', 'PYTHON3', "","DOUBLE")
-                arcpy.management.CalculateField(Fill_Total, 'fill_m3', 'round((!SUM!*' + grid_area + '),2)', 'PYTHON3',"","DOUBLE")
-                arcpy.management.JoinField(TotalCutFill, 'OID', Cut_Total, 'OID', ['cut_m3'])
-                arcpy.management.JoinField(TotalCutFill, 'OID', Fill_Total, 'OID', ['fill_m3'])
-
-                # Calculate net, gross, and ratio statistics for cubic meters
-                CutFill_Total = arcpy.analysis.Statistics(TotalCutFill, 'Cut_Fill_Totals', 'cut_m3 SUM; fill_m3 SUM', None)
-                arcpy.management.CalculateField(CutFill_Total, 'Net_Volume', 'round(!SUM_cut_m3! + !SUM_fill_m3!,2)','PYTHON3', "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, 'Total_Volume', 'round(!SUM_fill_m3! - !SUM_cut_m3!,2)','PYTHON3', "","DOUBLE")
-                arcpy.management.CalculateField(CutFill_Total, 'cut_fill_ratio','round(abs(!SUM_cut_m3!) / !SUM_fill_m3!,2)', 'PYTHON3', "","DOUBLE")
-
-                # Merge area and volume tables and transpose table for final output for metric NEED TO CHANGE ACRES
-                arcpy.management.JoinField(CutFill_Total, 'OBJECTID', total_graded_area, 'OBJECTID', 'graded_area_m2')
-                output_table = arcpy.management.TransposeFields(CutFill_Total, [['SUM_cut_m3', 'Cut Volume (m^3)'],['SUM_fill_m3', 'Fill Volume (m^3)'],['Net_Volume', 'Net Volume (m^3)'],['Total_Volume', 'Total Volume (m^3)'],['cut_fill_ratio', 'Cut/Fill Ratio'],['graded_area_m2', 'Graded Area (m^2)']],statsOutput, 'Grading', 'Summary', None)
-
-            # Clean up
-            arcpy.management.Delete("Cut_Fill_Totals")
-            arcpy.management.Delete("Cut_Total")
-            arcpy.management.Delete("cutFill_poly")
-            arcpy.management.Delete("Fill_Total")
-            arcpy.management.Delete("total_graded_area")
-            arcpy.management.Delete("TotalCutFill")
-
-            aprxMap.addDataFromPath(cut_raster)
-            aprxMap.addDataFromPath(fill_raster)
-
-            cutName = os.path.basename(cutOut)
-            fillName = os.path.basename(fillOut)
-
-            # Apply symbology
-            for l in aprxMap.listLayers():
-                if l.isRasterLayer:
-                    if l.name == cutName:
-                        symCut = l.symbology
-                        symCut.colorizer.stretchType = "MinimumMaximum"
-                        cr = aprx.listColorRamps('Cut')[0]
-                        symCut.colorizer.colorRamp = cr
-
-                        if xyzUnit == "Foot":
-                            l.label = "Cut (ft)"
-                        else:
-                            l.label = "Cut (m)"
-
-                        l.symbology = symCut
-
-                    if l.name == fillName:
-                        symFill = l.symbology
-                        symFill.colorizer.stretchType = "MinimumMaximum"
-                        cr = aprx.listColorRamps('Fill')[0]
-                        symFill.colorizer.colorRamp = cr
-
-                        if xyzUnit == "Foot":
-                            l.label = "Fill (ft)"
-                        else:
-                            l.label = "Fill (m)"
-
-                        l.symbology = symFill
-
-        if lxmlOutputOption == True:
-            tempDir = arcpy.management.CreateFolder(outputPath, "lxml_temp")
-            tempDirOut = outputPath + "/lxml_temp"
-
-            # Convert to TIN Triangles
-            tinTriangle = arcpy.ddd.TinTriangle(grade_TIN, "tinTriangle", "PERCENT", 1, '', '')
-
-            # Convert tinTriangle to shapefile
-            tinShapefile = arcpy.conversion.FeatureClassToShapefile(tinTriangle, tempDir)
-
-            tin_shp = str(tempDirOut + "/tinTriangle")
-
-            # Reading input TIN shapefile using PyShp
-            in_shp = shapefile.Reader(tin_shp)
-            shapeRecs = in_shp.shapeRecords()
-
-            # Initializing landxml surface items
-            namespace = {'xsi' : "http://www.w3.org/2001/XMLSchema"}
-            landxml = ET.Element('LandXML',
-                                 nsmap=namespace,
-                                 xmlns="http://www.landxml.org/schema/LandXML-1.2",
-                                 language = 'English',
-                                 readOnly = 'false',
-                                 time = '08:00:00',
-                                 date = '2019-01-01',
-                                 version="1.2")
-            units = ET.SubElement(landxml, 'Units')
-            surfaces = ET.SubElement(landxml, 'Surfaces')
-            surface = ET.SubElement(surfaces, 'Surface', name="demGrade")
-            definition = ET.SubElement(surface, 'Definition',
-                                       surfType="TIN")
-            pnts = ET.SubElement(definition, 'Pnts')
-            faces = ET.SubElement(definition, 'Faces')
-
-            # Dictionary to define correct units based on input
-            unit_opt = {'ft':('Imperial', 'squareFoot', 'USSurveyFoot',
-                              'cubicFeet', 'fahrenheit', 'inHG'),
-                        'm': ('Metric', 'squareMeter', 'meter',
-                              'cubicMeter', 'celsius', 'mmHG'),
-                        'ft-int': ('Imperial', 'squareFoot', 'foot',
-                                   'cubicFeet', 'fahrenheit', 'inHG')}
-
-            if xyzUnit == "Foot":
-                unit_len = "ft"
-            else:
-                unit_len = "m"
-
-            # Define units here. Has not been tested with metric.
-            unit = ET.SubElement(units,
-                                 unit_opt[unit_len][0],
-                                 areaUnit=unit_opt[unit_len][1],
-                                 linearUnit=unit_opt[unit_len][2],
-                                 volumeUnit=unit_opt[unit_len][3],
-                                 temperatureUnit=unit_opt[unit_len][4],
-                                 pressureUnit=unit_opt[unit_len][5])
-
-            # Initializing output variables
-            pnt_dict = {}
-            face_list = []
-            cnt = 0
-
-            # Creating reference point dictionary/id for each coordinate
-            # As well as LandXML points, and list of faces
-            for sr in shapeRecs:
-                shape_pnt_ids = []   # id of each shape point
-
-                # Each shape should only have 3 points
-                for pnt in range(3):   
-                    # Coordinate with y, x, z format
-                    coord = (sr.shape.points[pnt][1],
-                             sr.shape.points[pnt][0],
-                             sr.shape.z[pnt])
-
-                    # If element is new, add to dictionary and
-                    # write xml point element
-                    if coord not in pnt_dict:
-                        cnt+=1
-                        pnt_dict[coord] = cnt
-
-                        shape_pnt_ids.append(cnt)  # Add point id to list 
-
-                        # Individual point landxml features
-                        pnt_text = f'{coord[0]:.5f} {coord[1]:.5f} {coord[2]:.3f}'
-                        pnt = ET.SubElement(pnts, 'P', id=str(cnt)).text = pnt_text
-
-                    # If point is already in the point dictionary, append existing point id
-                    else:
-                        shape_pnt_ids.append(pnt_dict[coord])
-
-                # Reference face list for each shape
-                face_list.append(shape_pnt_ids)
-
-            # Writing faces to landxml
-            for face in face_list:
-                ET.SubElement(faces, 'F').text = f'{face[0]} {face[1]} {face[2]}'
-
-            # Writing output
-            tree = ET.ElementTree(landxml)
-            tree.write(lxmlOutput, pretty_print=True, xml_declaration=True, encoding="iso-8859-1")
-
-            del tinShapefile
-            del in_shp
-            del shapeRecs
-
-            arcpy.management.Delete(tempDir)
-            arcpy.management.Delete(tinTriangle)
-
-            arcpy.AddMessage("LandXML Exported Successfully")
-
-        arcpy.management.Delete("grade_bounds")
-        arcpy.management.Delete(grade_TIN)
-        arcpy.management.Delete("grade_area_rows_buff")
-        arcpy.management.Delete("cutFill_poly")
-        arcpy.management.Delete("bounds_invert")
-        arcpy.management.Delete("grade_area")
-        arcpy.management.Delete("grade_area_line")
-        arcpy.management.Delete("grade_bound_3D")
-        arcpy.management.Delete("grade_raster")
-        arcpy.management.Delete("piles_graded")
-        arcpy.management.Delete("piles_graded_pre")
-        arcpy.management.Delete("tinEdge_final")
-        arcpy.management.Delete(piles_TIN)
-        arcpy.management.Delete(rows_working)
-        arcpy.management.Delete(coorStats)
-        arcpy.management.Delete(avgRev_stats)
-        arcpy.management.Delete(sumStats)
-        arcpy.management.Delete(newPointStats)
-        arcpy.management.Delete(rowCornerPoints)
-        arcpy.management.Delete(newBoundPoints)
-        arcpy.management.Delete(tin_name)
-        arcpy.management.Delete(tinEdge_piles)
-        arcpy.management.Delete(tin_name_piles)
-        arcpy.management.Delete(piles_working)
-        arcpy.management.Delete(basePlaneDev)
-        arcpy.management.Delete(basePlanesBounds)
-        arcpy.management.Delete(bound3Dpoints)
-        arcpy.management.Delete(boundLine)
-        arcpy.management.Delete(expTable)
-        arcpy.management.Delete(extentStats)
-        arcpy.management.Delete(grade_bounds_pre)
-        arcpy.management.Delete(rowBounds_pre)
-        arcpy.management.Delete(rowBounds_pre_diss)
-        arcpy.management.Delete(rowBoundsExpand)
-
-        return
+        return basePlaneTIN, [rows_working, rowCornerPoints, newBoundPoints, bound3Dpoints, boundLine, expTable, extentStats,
+                              rowBounds_pre, rowBounds_pre_diss, basePlanesBounds]
@@ -0,0 +1,261 @@
+########################################################################
+"""GRADING BOUNDARY EXTRACTOR
+
+Grading boundaries from the cut/fill raster by binary morphology instead
+of polygonizing the whole raster and buffering it in vector space. Cells
+beyond the grading tolerance are split into cut and fill areas, the areas
+holding a graded pile are kept, and the +10/-9/+3 foot buffer chain is run
+as dilation, erosion and dilation by discs on the graded mask. The mask is
+vectorized once into the grade_bounds_pre feature class the tools simplify
+into gradeBoundsOut.
+
+Connected areas are labelled from row runs, so labelling costs scale with
+the number of runs rather than cells, and the disc morphology is done in
+strips of rows as unions of horizontal running windows.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Tile folder removed after each run
+0.0.3 - 10/17/2026 - Linear unit conversion moved to the raster array helpers
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import numpy as np
+from rasterArrays import RasterGrid, mapDistance
+
+# Grading tolerance of the cut/fill raster and the buffer chain of the grading tools
+GRADE_TOLERANCE = 0.0415
+HOLE_CLOSE = "10 Feet"
+BUFFER_IN = "-9 Feet"
+BOUNDS_EXTEND = "3 Feet"
+
+# Rows per strip of the disc morphology
+STRIP_ROWS = 512
+
+def gradedClasses(cutFill, tolerance=GRADE_TOLERANCE):
+    """Reclassify cut/fill to 0 (within tolerance or NoData), 1 (cut) and 2 (fill)"""
+
+    classes = np.zeros(cutFill.shape, dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        classes[cutFill < -tolerance] = 1
+        classes[cutFill > tolerance] = 2
+
+    return classes
+
+def rowRuns(mask):
+    """Runs of True cells in each row as (row, start, end) arrays, end exclusive, in row-major order"""
+
+    nRows, nCols = mask.shape
+    edges = np.zeros((nRows, nCols + 2), dtype=np.int8)
+    edges[:, 1:-1] = mask
+    change = np.diff(edges, axis=1)
+
+    startRow, start = np.nonzero(change == 1)
+    endRow, end = np.nonzero(change == -1)
+
+    return startRow, start, end
+
+def runLinks(row, start, end, nCols, connectivity=4):
+    """Pairs of runs in adjacent rows that touch, with 4 or 8 cell connectivity"""
+
+    reach = 1 if connectivity == 8 else 0
+    width = nCols + 2
+    keyStart = row.astype(np.int64) * width + start
+    keyEnd = row.astype(np.int64) * width + end
+
+    # Runs in the next row starting before this run's end and ending after its start
+    first = np.searchsorted(keyEnd, (row + 1).astype(np.int64) * width + start - reach, side="right")
+    last = np.searchsorted(keyStart, (row + 1).astype(np.int64) * width + end + reach, side="left")
+    counts = np.maximum(last - first, 0)
+
+    linkA = np.repeat(np.arange(len(row)), counts)
+    linkB = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return linkA, linkB
+
+def runComponents(nRuns, linkA, linkB):
+    """Component number (0..n-1) of each run from the links between runs"""
+
+    labels = np.arange(nRuns)
+    while True:
+        rootA = labels[linkA]
+        rootB = labels[linkB]
+        low = np.minimum(rootA, rootB)
+        before = labels.copy()
+        np.minimum.at(labels, rootA, low)
+        np.minimum.at(labels, rootB, low)
+
+        # Point every run at its root
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+        if np.array_equal(labels, before):
+            break
+
+    return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+def paintRuns(shape, row, start, end):
+    """Boolean mask of the cells covered by a set of runs"""
+
+    delta = np.zeros((shape[0], shape[1] + 1), dtype=np.int8)
+    np.add.at(delta, (row, start), 1)
+    np.add.at(delta, (row, end), -1)
+
+    return np.cumsum(delta, axis=1, dtype=np.int8)[:, :-1] > 0
+
+def pileAreas(mask, pileRows, pileCols, connectivity=4):
+    """Connected areas of a mask that hold at least one pile cell"""
+
+    nRows, nCols = mask.shape
+    row, start, end = rowRuns(mask)
+    if len(row) == 0:
+        return np.zeros(mask.shape, dtype=bool)
+
+    component = runComponents(len(row), *runLinks(row, start, end, nCols, connectivity))
+
+    # Run holding each pile, if any
+    inside = (pileRows >= 0) & (pileRows < nRows) & (pileCols >= 0) & (pileCols < nCols)
+    width = nCols + 2
+    keys = pileRows[inside].astype(np.int64) * width + pileCols[inside]
+    run = np.searchsorted(row.astype(np.int64) * width + start, keys, side="right") - 1
+    hit = (run >= 0) & (keys < row[np.maximum(run, 0)].astype(np.int64) * width + end[np.maximum(run, 0)])
+
+    keep = np.isin(component, component[run[hit]])
+
+    return paintRuns(mask.shape, row[keep], start[keep], end[keep])
+
+def discHalfWidths(radius):
+    """Half width in cells of each row of a disc of radius cells, from its top row to its bottom row"""
+
+    reach = int(np.floor(radius))
+    offsets = np.arange(-reach, reach + 1)
+
+    return offsets, np.floor(np.sqrt(np.maximum(radius * radius - offsets * offsets, 0))).astype(int)
+
+def dilate(mask, radius, stripRows=STRIP_ROWS):
+    """Dilate a mask by a disc of radius cells; cells beyond the array are background"""
+
+    if radius < 1:
+        return mask.copy()
+
+    nRows, nCols = mask.shape
+    offsets, halfWidths = discHalfWidths(radius)
+    reach = offsets[-1]
+    out = np.zeros(mask.shape, dtype=bool)
+
+    for r0 in range(0, nRows, stripRows):
+        r1 = min(r0 + stripRows, nRows)
+        h0 = max(r0 - reach, 0)
+        h1 = min(r1 + reach, nRows)
+
+        # Horizontal running windows of the strip and its halo, one per half width
+        counts = np.zeros((h1 - h0, nCols + 1), dtype=np.int32)
+        np.cumsum(mask[h0:h1], axis=1, out=counts[:, 1:])
+        windows = {}
+        for w in set(halfWidths.tolist()):
+            hi = np.minimum(np.arange(nCols) + w + 1, nCols)
+            lo = np.maximum(np.arange(nCols) - w, 0)
+            windows[w] = counts[:, hi] > counts[:, lo]
+
+        for dy, w in zip(offsets, halfWidths):
+            s0 = max(r0 + dy, 0)
+            s1 = min(r1 + dy, nRows)
+            if s1 > s0:
+                out[s0 - dy:s1 - dy] |= windows[w][s0 - h0:s1 - h0]
+
+    return out
+
+def erode(mask, radius, stripRows=STRIP_ROWS):
+    """Erode a mask by a disc of radius cells; cells beyond the array are foreground"""
+
+    return ~dilate(~mask, radius, stripRows)
+
+def bufferCells(distance, cellSize):
+    """Disc radius in cells of a buffer distance in map units
+
+    A buffer reaches the cells whose center lies within the distance of
+    the edge of a buffered cell, half a cell beyond the cell centers.
+    """
+
+    return abs(distance) / float(cellSize) + 0.5
+
+def gradedMask(cutFill, grid, pileXY, tolerance=GRADE_TOLERANCE, holeClose=10.0, bufferIn=-9.0, boundsExtend=3.0):
+    """Grading area mask from a cut/fill array and the graded pile locations
+
+    Distances are in map units. The cut and fill areas holding a pile are
+    dilated by holeClose, eroded by bufferIn and dilated by boundsExtend.
+    The mask is padded so the buffers can reach past the raster; returns
+    (mask, padded grid).
+    """
+
+    pad = int(np.ceil(bufferCells(holeClose, grid.cellSize) + bufferCells(boundsExtend, grid.cellSize)))
+    padGrid = RasterGrid(grid.xMin - pad * grid.cellSize, grid.yMax + pad * grid.cellSize, grid.cellSize,
+                         grid.nRows + 2 * pad, grid.nCols + 2 * pad)
+
+    pileXY = np.asarray(pileXY, dtype=np.float64).reshape(-1, 2)
+    pileCols = np.floor((pileXY[:, 0] - grid.xMin) / grid.cellSize).astype(np.int64)
+    pileRows = np.floor((grid.yMax - pileXY[:, 1]) / grid.cellSize).astype(np.int64)
+
+    # Cut and fill areas are separate polygons in the reclassified raster
+    classes = gradedClasses(cutFill, tolerance)
+    mask = np.zeros((padGrid.nRows, padGrid.nCols), dtype=bool)
+    core = mask[pad:pad + grid.nRows, pad:pad + grid.nCols]
+    for value in (1, 2):
+        core |= pileAreas(classes == value, pileRows, pileCols)
+    del classes
+
+    mask = dilate(mask, bufferCells(holeClose, grid.cellSize))
+    mask = erode(mask, bufferCells(bufferIn, grid.cellSize))
+    mask = dilate(mask, bufferCells(boundsExtend, grid.cellSize))
+
+    return mask, padGrid
+
+def gradingBounds(cutFill, gradedPiles, outFeatureClass, tolerance=GRADE_TOLERANCE, holeClose=HOLE_CLOSE,
+                  bufferIn=BUFFER_IN, boundsExtend=BOUNDS_EXTEND, memoryBudget=1024):
+    """Replacement for the Reclassify, RasterToPolygon, Select, SelectLayerByLocation and PairwiseBuffer chain
+
+    Returns outFeatureClass holding the dissolved grading areas, equivalent
+    to the last PairwiseBuffer of the chain and ready for SimplifyPolygon.
+    """
+    import os.path
+    import shutil
+    import tempfile
+    import arcpy
+    from rasterArrays import rasterGrid
+    from tiledRaster import rasterToMemmap
+
+    ras = cutFill if isinstance(cutFill, arcpy.Raster) else arcpy.Raster(str(cutFill))
+    spatialRef = ras.spatialReference
+    grid = rasterGrid(ras)
+
+    tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+    try:
+        array = rasterToMemmap(ras, os.path.join(tileFolder, "cutFill.npy"), grid, memoryBudget)[0]
+        pileXY = [row[0] for row in arcpy.da.SearchCursor(gradedPiles, ["SHAPE@XY"])]
+
+        mask, padGrid = gradedMask(array, grid, pileXY, tolerance, mapDistance(holeClose, spatialRef),
+                                   mapDistance(bufferIn, spatialRef), mapDistance(boundsExtend, spatialRef))
+        del array
+    finally:
+        shutil.rmtree(tileFolder, ignore_errors=True)
+
+    # Vectorize the mask once and dissolve it into one feature like the buffers
+    lowerLeft = arcpy.Point(padGrid.xMin, padGrid.yMax - padGrid.nRows * padGrid.cellSize)
+    with arcpy.EnvManager(outputCoordinateSystem=spatialRef):
+        maskRaster = arcpy.NumPyArrayToRaster(mask.astype(np.uint8), lowerLeft, padGrid.cellSize, padGrid.cellSize, 0)
+    del mask
+
+    maskPoly = arcpy.conversion.RasterToPolygon(maskRaster, r"in_memory\grade_mask_poly", "SIMPLIFY", "Value", "SINGLE_OUTER_PART", None)
+    arcpy.management.Dissolve(maskPoly, outFeatureClass, None, None, "MULTI_PART")
+    arcpy.management.Delete(maskPoly)
+
+    return outFeatureClass
@@ -0,0 +1,343 @@
+########################################################################
+"""INCREMENTAL GRADING REVISION
+
+Regrades only the rows whose piles changed since the previous revision
+run. The pile table, a digest of the DEM cells and the base plane, band
+clamped grade, cut/fill and final graded surfaces of a full run are
+cached next to the workspace. On the next run the pile tables are
+compared and, when only planes of array or reveals changed, the base
+plane TIN of the site is rebuilt and rastered over a window covering
+every TIN triangle that touches a changed row. The triangulation depends
+on the row outlines only, so the base plane over the window is the one a
+full run would give, and the band clamp is redone over that window. The
+cached surfaces are then patched in place. Rows added, removed or moved
+need a full regrade.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Volume sums and summary table from the cut/fill volume engine
+0.0.3 - 10/16/2026 - Row base planes from the grouped row regression
+0.0.4 - 10/17/2026 - Cache checked against a digest of the DEM cells; base plane rastered from the rebuilt TIN instead of re-interpolated gaps; volumes left to the cut/fill volume engine
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.4"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import os.path
+import numpy as np
+from rasterArrays import RasterGrid, snapGrid
+from gradeBand import bandClamp
+from rowRegression import rowFit
+from terrainCache import stripDigest
+
+CACHE_VERSION = 2
+
+# Surfaces kept in the cache as memory-mapped arrays on the DEM grid
+CACHE_SURFACES = ["basePlane", "demGrade", "cutFill", "gradeFinal"]
+
+# Expansion of the row extents for the expanded row bounds, as in gradeRevisePOA
+BOUNDS_EXPAND = 10.0
+
+# Distance from a row within which a base plane TIN triangle touches it, past the 0.5 unit expansion of the row outline
+TRIANGLE_REACH = 1.0
+
+def pileTable(rowIDs, x, y, poa, reveal):
+    """Pile table sorted by row and position so two runs can be compared pile by pile"""
+
+    rowIDs = np.asarray(rowIDs).astype(str)
+    table = np.zeros(len(rowIDs), dtype=[("row", rowIDs.dtype), ("x", np.float64), ("y", np.float64), ("poa", np.float64), ("reveal", np.float64)])
+    table["row"] = rowIDs
+    table["x"] = x
+    table["y"] = y
+    table["poa"] = poa
+    table["reveal"] = reveal
+
+    return table[np.lexsort((table["x"], table["y"], table["row"]))]
+
+def _rowGroups(table):
+    """Split a sorted pile table into a dictionary of {row ID: piles}"""
+
+    rows, starts = np.unique(table["row"], return_index=True)
+    bounds = np.r_[starts, len(table)]
+
+    return dict((row, table[bounds[i]:bounds[i + 1]]) for i, row in enumerate(rows))
+
+def layoutChanged(previous, current, tolerance=1e-6):
+    """True if rows were added or removed or any pile moved, which changes the base plane triangulation"""
+
+    if len(previous) != len(current) or not np.array_equal(previous["row"], current["row"]):
+        return True
+
+    return not (np.allclose(previous["x"], current["x"], rtol=0, atol=tolerance) and
+                np.allclose(previous["y"], current["y"], rtol=0, atol=tolerance))
+
+def dirtyRows(previous, current, tolerance=1e-6):
+    """Row IDs whose piles were added, removed, moved or given a new plane of array or reveal"""
+
+    before = _rowGroups(previous)
+    after = _rowGroups(current)
+
+    dirty = set(before) ^ set(after)
+    for row in set(before) & set(after):
+        a = before[row]
+        b = after[row]
+        if len(a) != len(b):
+            dirty.add(row)
+            continue
+        for field in ("x", "y", "poa", "reveal"):
+            if not np.allclose(a[field], b[field], rtol=0, atol=tolerance, equal_nan=True):
+                dirty.add(row)
+                break
+
+    return np.array(sorted(dirty), dtype=current["row"].dtype)
+
+def rowPlanes(table, minReveal, maxReveal):
+    """North-south base plane of every row from its piles, as in the gradeRevisePOA regression
+
+    The base plane is the plane of array lowered by the row's mean reveal,
+    or by the middle of the reveal range when the row hits the minimum or
+    maximum reveal. Returns the row fit of z = slope * y + intercept.
+    """
+
+    minR = float(minReveal)
+    maxR = float(maxReveal)
+    rows, inverse = np.unique(table["row"], return_inverse=True)
+    inverse = inverse.reshape(-1)
+    n = np.bincount(inverse).astype(np.float64)
+
+    reveal = table["reveal"]
+    highRev = np.full(len(rows), -np.inf)
+    lowRev = np.full(len(rows), np.inf)
+    np.maximum.at(highRev, inverse, reveal)
+    np.minimum.at(lowRev, inverse, reveal)
+    factor = np.where((highRev == maxR) | (lowRev == minR), (maxR + minR) / 2, np.bincount(inverse, reveal) / n)
+
+    return rowFit(table["row"], table["y"], table["poa"] - factor[inverse])
+
+def rowExtents(polygons, rowIDs):
+    """Extent (xMin, yMin, xMax, yMax) of each row ID over all of its polygons"""
+
+    rowIDs = np.asarray(rowIDs).astype(str)
+    rows, inverse = np.unique(rowIDs, return_inverse=True)
+    extents = np.tile(np.array([np.inf, np.inf, -np.inf, -np.inf]), (len(rows), 1))
+    for i, rings in zip(inverse, polygons):
+        coords = np.concatenate(rings)
+        extents[i, :2] = np.minimum(extents[i, :2], coords.min(axis=0))
+        extents[i, 2:] = np.maximum(extents[i, 2:], coords.max(axis=0))
+
+    return rows, extents
+
+def regradeWindows(extents, dirty, grid, boundsReach, triangleBox=None):
+    """Grid windows of an incremental regrade
+
+    The regrade window covers the expanded bounds of the dirty rows and
+    of every row whose expanded bounds touch them, and the triangleBox
+    (xMin, yMin, xMax, yMax) of the base plane triangles touching the
+    dirty rows if given. The core window adds the reach of the grading
+    boundary buffers and the process window adds it again so boundaries
+    inside the core are not cut short. Returns (neighbour row mask,
+    regrade grid, core grid, process grid).
+    """
+
+    boxes = extents + np.array([-BOUNDS_EXPAND, -BOUNDS_EXPAND, BOUNDS_EXPAND, BOUNDS_EXPAND])
+    dirtyBoxes = boxes[dirty]
+    touch = ((boxes[:, None, 0] <= dirtyBoxes[None, :, 2]) & (boxes[:, None, 2] >= dirtyBoxes[None, :, 0]) &
+             (boxes[:, None, 1] <= dirtyBoxes[None, :, 3]) & (boxes[:, None, 3] >= dirtyBoxes[None, :, 1])).any(axis=1)
+
+    box = np.r_[boxes[touch, :2].min(axis=0), boxes[touch, 2:].max(axis=0)]
+    if triangleBox is not None:
+        box = np.r_[np.minimum(box[:2], triangleBox[:2]), np.maximum(box[2:], triangleBox[2:])]
+    reach = np.array([-boundsReach, -boundsReach, boundsReach, boundsReach])
+
+    return touch, snapGrid(grid, *box), snapGrid(grid, *(box + reach)), snapGrid(grid, *(box + 2 * reach))
+
+def windowSlices(grid, window):
+    """Row and column slices of a grid covered by a window snapped to it"""
+
+    r0 = int(round((grid.yMax - window.yMax) / grid.cellSize))
+    c0 = int(round((window.xMin - grid.xMin) / grid.cellSize))
+
+    return slice(r0, r0 + window.nRows), slice(c0, c0 + window.nCols)
+
+def demDigest(demInput, grid, memoryBudget=1024):
+    """Digest of the DEM cells on its grid, read strip by strip"""
+    from rasterArrays import readRaster
+    from tiledRaster import stripRows, subGrid
+
+    return stripDigest(lambda r0, r1: readRaster(demInput, subGrid(grid, r0, r1))[0], grid.nRows, grid,
+                       chunkRows=stripRows(memoryBudget, grid.nCols))
+
+def _writeState(folder, state):
+    """Write the cached pile table, DEM digest, grid and parameters"""
+
+    np.savez(os.path.join(folder, "state.npz"), **state)
+
+def loadGradingCache(folder, demInput, grid, params, memoryBudget=1024):
+    """Open the cache of a previous run; returns (state, surfaces) or None if missing or stale
+
+    The cache is stale if the DEM cells, its grid or the reveal parameters
+    changed; the DEM is compared by the digest of its cells, so a DEM
+    edited or replaced at the same path is caught. The surfaces are
+    opened as writable memory maps.
+    """
+
+    statePath = os.path.join(folder, "state.npz")
+    if not os.path.exists(statePath) or not os.path.exists(os.path.join(folder, "gradeBounds.shp")):
+        return None
+
+    with np.load(statePath) as data:
+        state = dict((key, data[key]) for key in data.files)
+    if (int(state["version"]) != CACHE_VERSION
+            or not np.allclose(state["grid"], np.array(grid, dtype=np.float64))
+            or not np.allclose(state["params"], np.array(params, dtype=np.float64))
+            or str(state["demDigest"]) != demDigest(demInput, grid, memoryBudget)):
+        return None
+
+    surfaces = {}
+    for name in CACHE_SURFACES:
+        path = os.path.join(folder, name + ".npy")
+        if not os.path.exists(path):
+            return None
+        surfaces[name] = np.load(path, mmap_mode="r+")
+
+    return state, surfaces
+
+def saveGradingCache(folder, demInput, grid, params, piles, rasters, gradeBounds, memoryBudget=1024):
+    """Cache the surfaces and grading bounds of a full run for later incremental runs
+
+    rasters is a dictionary of {name: raster} for CACHE_SURFACES; each is
+    read on the DEM grid.
+    """
+    import arcpy
+    from tiledRaster import rasterToMemmap
+
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    surfaces = {}
+    for name in CACHE_SURFACES:
+        surfaces[name] = rasterToMemmap(rasters[name], os.path.join(folder, name + ".npy"), grid, memoryBudget)[0]
+
+    arcpy.management.CopyFeatures(gradeBounds, os.path.join(folder, "gradeBounds.shp"))
+
+    state = {"version": CACHE_VERSION, "demDigest": demDigest(demInput, grid, memoryBudget), "grid": np.array(grid, dtype=np.float64),
+             "params": np.array(params, dtype=np.float64), "piles": piles}
+    _writeState(folder, state)
+
+    return state, surfaces
+
+def triangleBox(tin, rowsInput, rowField, dirty):
+    """Extent (xMin, yMin, xMax, yMax) of the base plane TIN triangles touching the dirty rows, None if there are none"""
+    import arcpy
+
+    dirtySet = set(str(row) for row in dirty)
+    with arcpy.da.SearchCursor(rowsInput, ["OID@", rowField]) as cursor:
+        oids = [str(row[0]) for row in cursor if str(row[1]) in dirtySet]
+    if not oids:
+        return None
+
+    oidField = arcpy.Describe(rowsInput).OIDFieldName
+    dirtyLayer = arcpy.management.MakeFeatureLayer(rowsInput, "dirtyRows_lyr", "{} IN ({})".format(oidField, ",".join(oids)))
+    triangles = arcpy.ddd.TinTriangle(tin, r"in_memoryaseTriangles", "PERCENT", 1, "", "")
+    touching = arcpy.management.SelectLayerByLocation(triangles, "INTERSECT", dirtyLayer, TRIANGLE_REACH, "NEW_SELECTION")
+
+    box = None
+    with arcpy.da.SearchCursor(touching, ["SHAPE@"]) as cursor:
+        for row in cursor:
+            extent = np.array([row[0].extent.XMin, row[0].extent.YMin, row[0].extent.XMax, row[0].extent.YMax])
+            box = extent if box is None else np.r_[np.minimum(box[:2], extent[:2]), np.maximum(box[2:], extent[2:])]
+
+    arcpy.management.Delete(dirtyLayer)
+    arcpy.management.Delete(triangles)
+
+    return box
+
+def dirtyWindows(cache, tin, rowsInput, rowField, dirty, boundsReach):
+    """Regrade, core and process grids of the dirty rows, covering the base plane triangles that touch them"""
+    from rasterArrays import readPolygons
+
+    state, surfaces = cache
+    grid = RasterGrid(*state["grid"][:3], *[int(v) for v in state["grid"][3:]])
+    polygons, ids = readPolygons(rowsInput, rowField)
+    rowIDs, extents = rowExtents(polygons, ids)
+
+    return regradeWindows(extents, np.isin(rowIDs, dirty), grid, boundsReach, triangleBox(tin, rowsInput, rowField, dirty))[1:]
+
+def regradeDirtyRows(cache, demInput, baseRaster, regradeGrid, spacing):
+    """Patch the base plane, band clamped grade and cut/fill of the cached run over the regrade window
+
+    baseRaster is the base plane rastered from the rebuilt TIN over the
+    regrade window.
+    """
+    from rasterArrays import readRaster
+
+    state, surfaces = cache
+    grid = RasterGrid(*state["grid"][:3], *[int(v) for v in state["grid"][3:]])
+    rows, cols = windowSlices(grid, regradeGrid)
+
+    base = readRaster(baseRaster, regradeGrid)[0]
+    graded, delta = bandClamp(readRaster(demInput, regradeGrid)[0], base, spacing)[:2]
+
+    for name, array in (("basePlane", base), ("demGrade", graded), ("cutFill", delta)):
+        surfaces[name][rows, cols] = array
+        surfaces[name].flush()
+
+    return regradeGrid
+
+def cachedRaster(cache, name, window, spatialRef):
+    """Temporary raster of a cached surface over a window of the DEM grid"""
+    from rasterArrays import toRaster
+
+    state, surfaces = cache
+    grid = RasterGrid(*state["grid"][:3], *[int(v) for v in state["grid"][3:]])
+    rows, cols = windowSlices(grid, window)
+
+    return toRaster(np.array(surfaces[name][rows, cols]), window, spatialRef)
+
+def patchGradeFinal(cache, gradeWindow, coreGrid):
+    """Write a regraded final surface over the core window into the cache"""
+    from rasterArrays import readRaster
+
+    state, surfaces = cache
+    grid = RasterGrid(*state["grid"][:3], *[int(v) for v in state["grid"][3:]])
+    rows, cols = windowSlices(grid, coreGrid)
+
+    surfaces["gradeFinal"][rows, cols] = readRaster(gradeWindow, coreGrid)[0]
+    surfaces["gradeFinal"].flush()
+
+    return surfaces["gradeFinal"]
+
+def updateGradingCache(folder, cache, piles, gradeBounds):
+    """Record the pile table and grading bounds of an incremental run in the cache"""
+    import arcpy
+
+    state, surfaces = cache
+    state["piles"] = piles
+    _writeState(folder, state)
+    arcpy.management.CopyFeatures(gradeBounds, os.path.join(folder, "gradeBounds.shp"))
+
+    return state
+
+def mergeBounds(cachedBounds, windowBounds, coreGrid, spatialRef, outBounds):
+    """Replace the grading bounds inside the core window with the regraded window's bounds"""
+    import arcpy
+
+    x0 = coreGrid.xMin
+    y1 = coreGrid.yMax
+    x1 = x0 + coreGrid.nCols * coreGrid.cellSize
+    y0 = y1 - coreGrid.nRows * coreGrid.cellSize
+    core = arcpy.Polygon(arcpy.Array([arcpy.Point(x0, y0), arcpy.Point(x0, y1), arcpy.Point(x1, y1), arcpy.Point(x1, y0), arcpy.Point(x0, y0)]), spatialRef)
+
+    outside = arcpy.analysis.Erase(cachedBounds, core, r"in_memory\bounds_outside")
+    inside = arcpy.analysis.Clip(windowBounds, core, r"in_memory\bounds_inside")
+    merged = arcpy.management.Merge([outside, inside], r"in_memory\bounds_merged")
+    outBounds = arcpy.management.Dissolve(merged, outBounds, None, None, "SINGLE_PART")
+
+    for temp in (outside, inside, merged):
+        arcpy.management.Delete(temp)
+
+    return outBounds
@@ -0,0 +1,146 @@
+########################################################################
+"""STREAMING LANDXML WRITER
+
+LandXML 1.2 TIN surfaces written straight from an array of triangles. The
+vertices are numbered in one sort over the (n, 3, 3) triangle vertex
+array instead of a dictionary of coordinate tuples, and the <P> and <F>
+elements are formatted a block at a time and streamed to a buffered file,
+so no element tree of the surface is held in memory. Points are numbered
+from 1 in the order they first appear in the triangles and written as
+"northing easting elevation", as the lxml exports of the tools were.
+
+The triangles are read from the TinTriangle feature class in one
+columnar pass into a packed vertex array, without the shapefile copy.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Triangles read straight from the TinTriangle feature class instead of a shapefile copy
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.2"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import numpy as np
+
+# Points or faces formatted per block, and the write buffer of the file in bytes
+BLOCK_ROWS = 65536
+WRITE_BUFFER = 1 << 20
+
+# LandXML unit elements by unit length
+LANDXML_UNITS = {"ft": ("Imperial", "squareFoot", "USSurveyFoot", "cubicFeet", "fahrenheit", "inHG"),
+                 "m": ("Metric", "squareMeter", "meter", "cubicMeter", "celsius", "mmHG"),
+                 "ft-int": ("Imperial", "squareFoot", "foot", "cubicFeet", "fahrenheit", "inHG")}
+
+def triangleMesh(triangles):
+    """Unique points and 1-based faces of (n, 3, 3) triangles of (northing, easting, elevation) vertices
+
+    Points are numbered in the order they first appear; vertices with the
+    same coordinates share a point. Returns (points (m, 3), faces (n, 3)).
+    """
+
+    vertices = np.asarray(triangles, dtype=np.float64).reshape(-1, 3)
+    if len(vertices) == 0:
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64)
+
+    order = np.lexsort((vertices[:, 2], vertices[:, 1], vertices[:, 0]))
+    ordered = vertices[order]
+    new = np.r_[True, np.any(ordered[1:] != ordered[:-1], axis=1)]
+    group = np.cumsum(new) - 1
+
+    # Renumber the groups by the first vertex of each, which is the first in the sort as lexsort is stable
+    first = order[new]
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(first))
+
+    pointIDs = np.empty(len(vertices), dtype=np.int64)
+    pointIDs[order] = rank[group]
+    points = np.empty((len(first), 3))
+    points[rank] = vertices[first]
+
+    return points, pointIDs.reshape(-1, 3) + 1
+
+def landXMLHeader(surfaceName="demGrade", unitLength="ft"):
+    """Declaration, units and surface definition opening of the LandXML file, indented as pretty printed"""
+
+    units = LANDXML_UNITS[unitLength]
+
+    return ("<?xml version='1.0' encoding='iso-8859-1'?>\n"
+            '<LandXML xmlns:xsi="http://www.w3.org/2001/XMLSchema" xmlns="http://www.landxml.org/schema/LandXML-1.2" '
+            'language="English" readOnly="false" time="08:00:00" date="2019-01-01" version="1.2">\n'
+            "  <Units>\n"
+            '    <%s areaUnit="%s" linearUnit="%s" volumeUnit="%s" temperatureUnit="%s" pressureUnit="%s"/>\n'
+            "  </Units>\n"
+            "  <Surfaces>\n"
+            '    <Surface name="%s">\n'
+            '      <Definition surfType="TIN">\n') % (units + (surfaceName,))
+
+def pointBlocks(points, start=1, blockRows=BLOCK_ROWS):
+    """<P> elements of points a block at a time, numbered from start"""
+
+    line = '          <P id="%d">%.5f %.5f %.3f</P>\n'
+    for r0 in range(0, len(points), blockRows):
+        block = points[r0:r0 + blockRows]
+        values = np.column_stack([np.arange(start + r0, start + r0 + len(block)), block])
+        yield (line * len(block)) % tuple(values.ravel().tolist())
+
+def faceBlocks(faces, blockRows=BLOCK_ROWS):
+    """<F> elements of faces a block at a time"""
+
+    for r0 in range(0, len(faces), blockRows):
+        block = np.asarray(faces[r0:r0 + blockRows], dtype=np.int64)
+        yield (("          <F>%d %d %d</F>\n" * len(block)) % tuple(block.ravel().tolist()))
+
+def writeLandXML(outFile, points, faces, surfaceName="demGrade", unitLength="ft", blockRows=BLOCK_ROWS):
+    """Stream a TIN surface of points (northing, easting, elevation) and 1-based faces to a LandXML file"""
+
+    with open(outFile, "w", encoding="iso-8859-1", newline="\n", buffering=WRITE_BUFFER) as xml:
+        xml.write(landXMLHeader(surfaceName, unitLength))
+
+        xml.write("        <Pnts>\n" if len(points) else "        <Pnts/>\n")
+        for block in pointBlocks(points, 1, blockRows):
+            xml.write(block)
+        if len(points):
+            xml.write("        </Pnts>\n")
+
+        xml.write("        <Faces>\n" if len(faces) else "        <Faces/>\n")
+        for block in faceBlocks(faces, blockRows):
+            xml.write(block)
+        if len(faces):
+            xml.write("        </Faces>\n")
+
+        xml.write("      </Definition>\n    </Surface>\n  </Surfaces>\n</LandXML>\n")
+
+    return outFile
+
+def writeTriangleLandXML(outFile, triangles, surfaceName="demGrade", unitLength="ft", blockRows=BLOCK_ROWS):
+    """Number the vertices of (n, 3, 3) triangles and stream them to a LandXML file"""
+
+    points, faces = triangleMesh(triangles)
+
+    return writeLandXML(outFile, points, faces, surfaceName, unitLength, blockRows)
+
+def packedTriangles(featureIDs, xyz):
+    """(n, 3, 3) (northing, easting, elevation) triangles from the exploded vertices of triangle polygons
+
+    The first three vertices of each polygon are its triangle; the ring's
+    closing vertex, if present, is dropped.
+    """
+    from rowGeometry import packVertices
+
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    offsets = packVertices(featureIDs, xyz[:, :2])[1]
+    triangles = xyz[offsets[:-1, None] + np.arange(3)]
+
+    return triangles[:, :, [1, 0, 2]]
+
+def readTriangles(featureClass):
+    """(n, 3, 3) (northing, easting, elevation) triangles of a TinTriangle feature class in one columnar read"""
+    import arcpy
+
+    vertices = arcpy.da.FeatureClassToNumPyArray(featureClass, ["OID@", "SHAPE@X", "SHAPE@Y", "SHAPE@Z"], explode_to_points=True)
+
+    return packedTriangles(vertices["OID@"], np.column_stack([vertices["SHAPE@X"], vertices["SHAPE@Y"], vertices["SHAPE@Z"]]))
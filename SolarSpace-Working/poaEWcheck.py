@@ -7,13 +7,15 @@ Revision log
 1.0.1 - 05/20/2022 - Made outputPath automatically detect
 2.0.0 - 02/07/2023 - Combined tools into one, converted into PYT format
 2.0.1 - 03/09/2023 - Fixed minor reference error
+2.1.0 - 10/16/2026 - Row end plane of array from the grouped row regression
+2.2.0 - 10/16/2026 - Row corner and end points from one packed vertex array instead of per-vertex distance checks
 
 FUTURE UPDATES - ADD SYMBOLOGY 
 """
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "2.0.1"
+__version__     = "2.2.0"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.1.0"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -26,6 +28,8 @@ import sys
 import math
 from arcpy.sa import *
 from arcpy.ddd import *
+from rowRegression import fitPiles, writeLinePOA
+from rowGeometry import insertRowPoints
 
 # Set workspace environment
 workspace = arcpy.env.workspace
@@ -148,124 +152,16 @@ class poaEWcheck(object):
         outputPath = os.path.dirname(workspace)
         spatialRef = arcpy.Describe(rowsInput).spatialReference
 
-        # Calculate north-south plane of array slope
-        piles_working = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, "piles_working")
-
-        # Add xy coordinates - will overwrite if already present
-        arcpy.management.AddXY(piles_working)
-
-        # Summary Statistics by row_ID to to get the mean of the plane of array and the mean of POINT_Y for each row and the count of piles for each row
-        coorStatsInput = [[poaField, "MEAN"], ["POINT_Y", "MEAN"]]
-        coorStats = arcpy.analysis.Statistics(piles_working, "coorStats", coorStatsInput, row_ID)
-
-        statPOAMean = "MEAN_" + poaField
-
-        # Join the mean of the plane of array and MEAN_POINT_Y back to the piles
-        arcpy.management.JoinField(piles_working, row_ID, coorStats, row_ID, [statPOAMean, "MEAN_POINT_Y"])
-
-        # Calculate zy_bar, y_ybar_sq
-        arcpy.management.CalculateField(piles_working, "zy_bar","(!"+poaField+"! + !"+statPOAMean+"!) * (!POINT_Y! - !MEAN_POINT_Y!)", "PYTHON3", "","DOUBLE")
-        arcpy.management.CalculateField(piles_working, "y_ybar_sq", "(!POINT_Y! - !MEAN_POINT_Y!)**2", "PYTHON3", "","DOUBLE")
-
-        # Summary Statistics by row_ID to get the sum of zy_bar, y_ybar_sq
-        sumStats = arcpy.analysis.Statistics(piles_working, "sumStats", [["zy_bar", "SUM"], ["y_ybar_sq", "SUM"]],row_ID)
-
-        # Calculate the slope (SUM_xy_bar/SUM_x_bar_sq), multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
-        arcpy.management.CalculateField(sumStats, "nsSlope", "!SUM_zy_bar!/!SUM_y_ybar_sq!", "PYTHON3", "","DOUBLE")
-
-        # Join slope to piles_working
-        arcpy.management.JoinField(piles_working, row_ID, sumStats, row_ID, ["nsSlope"])
-
-        # Find the intercept
-        arcpy.management.CalculateField(piles_working, "bInit", "!"+poaField+"! - !nsSlope! * !POINT_Y!", "PYTHON3", "", "DOUBLE")
-
-        endPointStats = arcpy.analysis.Statistics(piles_working, "endPointStats", [["bInit", "MEAN"],["nsSlope", "MEAN"]], row_ID)
-
+        # Fit the north-south line of the plane of array of every row in one pass over the piles
+        fit = fitPiles(pilesInput, row_ID, poaField)[0]
 
         rowPoints = arcpy.management.CreateFeatureclass(workspace, "rowPoints", "POINT", "#", "DISABLED", "DISABLED", rowsInput)
 
         arcpy.management.AddField(rowPoints, "PolygonOID", "LONG")
         arcpy.management.AddField(rowPoints, "Position", "TEXT")
 
-        result = arcpy.GetCount_management(rowsInput)
-        count = int(result.getOutput(0))
-
-        insert_cursor = arcpy.da.InsertCursor(rowPoints, ["SHAPE@", "PolygonOID", "Position"])
-        search_cursor = arcpy.da.SearchCursor(rowsInput, ["SHAPE@", "OID@"])
-
-        for row in search_cursor:
-            polygon_oid = str(row[1])
-
-            coordinateList = []
-            sw_dist = {}
-            se_dist = {}
-            nw_dist = {}
-            ne_dist = {}
-
-            for part in row[0]:
-                for pnt in part:
-                    if pnt:
-                        coordinateList.append((pnt.X, pnt.Y))
-
-            # Find the extent of each row
-            rowExtent = row[0].extent
-
-            sw_coordinate = rowExtent.lowerLeft
-            se_coordinate = rowExtent.lowerRight
-            nw_coordinate = rowExtent.upperLeft
-            ne_coordinate = rowExtent.upperRight
-
-            sw_point = arcpy.PointGeometry(sw_coordinate)
-            se_point = arcpy.PointGeometry(se_coordinate)
-            nw_point = arcpy.PointGeometry(nw_coordinate)
-            ne_point = arcpy.PointGeometry(ne_coordinate)
-
-            # Find the vertex closest to each corner of the row extent
-            for vertex in coordinateList:
-                vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                sw_dist[float(sw_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                se_dist[float(se_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                nw_dist[float(nw_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                ne_dist[float(ne_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-            #Calculates where quarter quarter sections would intersect polygon
-            swMinDist = min(sw_dist)
-            seMinDist = min(se_dist)
-            nwMinDist = min(nw_dist)
-            neMinDist = min(ne_dist)
-
-            sw_X = float(sw_dist[swMinDist][0])
-            sw_Y = float(sw_dist[swMinDist][1])
-            se_X = float(se_dist[seMinDist][0])
-            se_Y = float(se_dist[seMinDist][1])
-
-            nw_X = float(nw_dist[nwMinDist][0])
-            nw_Y = float(nw_dist[nwMinDist][1])
-            ne_X = float(ne_dist[neMinDist][0])
-            ne_Y = float(ne_dist[neMinDist][1])
-
-            north_bound_line = arcpy.Polyline(arcpy.Array([arcpy.Point(nw_X, nw_Y), arcpy.Point(ne_X, ne_Y)]))
-            south_bound_line = arcpy.Polyline(arcpy.Array([arcpy.Point(sw_X, sw_Y), arcpy.Point(se_X, se_Y)]))
-
-            north_row_end = north_bound_line.positionAlongLine(0.5, True)
-            south_row_end = south_bound_line.positionAlongLine(0.5, True)
-
-            insert_cursor.insertRow((north_row_end, polygon_oid, "N"))
-            insert_cursor.insertRow((south_row_end, polygon_oid, "S"))
-
-            sw_point = arcpy.PointGeometry(sw_coordinate)
-            se_point = arcpy.PointGeometry(se_coordinate)
-            nw_point = arcpy.PointGeometry(nw_coordinate)
-            ne_point = arcpy.PointGeometry(ne_coordinate)
-
-            insert_cursor.insertRow((nw_point, polygon_oid, "NW"))
-            insert_cursor.insertRow((ne_point, polygon_oid, "NE"))
-            insert_cursor.insertRow((sw_point, polygon_oid, "SW"))
-            insert_cursor.insertRow((se_point, polygon_oid, "SE"))
-
-        del insert_cursor
-        del search_cursor
+        # North and south row ends and the corners of each row extent
+        insertRowPoints(rowPoints, rowsInput, ["N", "S", "NW", "NE", "SW", "SE"], "EXTENT")
 
         rowPointsJoin = arcpy.analysis.SpatialJoin(rowPoints, rowsInput, "rowPointsJoin", "JOIN_ONE_TO_ONE", "KEEP_ALL")
 
@@ -273,16 +169,10 @@ class poaEWcheck(object):
         rowEndPoints = arcpy.analysis.Select(rowPointsJoin, "rowEndPoints", "Position = 'S' Or Position = 'N'")
         rowCornerPoints = arcpy.analysis.Select(rowPointsJoin, r"in_memory\rowCornerPoints","Position = 'NW' Or Position = 'NE' Or Position = 'SW' Or Position = 'SE'")
 
-        arcpy.management.JoinField(rowEndPoints, row_ID, endPointStats, row_ID, [["MEAN_nsSlope"],["MEAN_bInit"]])
-
         arcpy.management.AddXY(rowEndPoints)
 
-        arcpy.management.CalculateField(rowEndPoints, "poaEnd", "!MEAN_nsSlope! * !POINT_Y! + !MEAN_bInit!", "PYTHON3", "", "DOUBLE")
-
-        arcpy.management.Delete(coorStats)
-        arcpy.management.Delete(endPointStats)
-        arcpy.management.Delete(piles_working)
-        arcpy.management.Delete(sumStats)
+        # Plane of array of the row's line at each end point
+        writeLinePOA(rowEndPoints, row_ID, fit, "poaEnd")
         
         # Make the end points 3d based on the POA
         rowEnd3d = arcpy.ddd.FeatureTo3DByAttribute(rowEndPoints, "in_memory/rowEnd3d", "poaEnd", None)
@@ -5,12 +5,13 @@ Revision log
 0.0.1 - 12/06/2022 - Initial scripting
 1.0.0 - 12/29/2022 - Conversion to Python toolbox format
 1.1.0 - 12/12/2023 - Added calculation of "reveals" and grading at pile end points
+1.2.0 - 10/16/2026 - Row end plane of array from the grouped row regression
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "1.1.0"
+__version__     = "1.2.0"
 __license__     = "Internal/Commercial"
 __ArcVersion__  = "ArcPro 3.1.3"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -20,6 +21,7 @@ __status__      = "Deployed"
 import arcpy
 import sys
 import os
+from rowRegression import fitPiles, writeLinePOA
 
 class poaRowEnds(object):
     def __init__(self):
@@ -142,40 +144,8 @@ class poaRowEnds(object):
         maxReveal       = parameters[7].valueAsText 
         endofRowPt_out  = parameters[8].valueAsText
 
-        # Calculate north-south plane of array slope
-        piles_working = arcpy.conversion.FeatureClassToFeatureClass(pilesInput, workspace, "piles_working")
-
-        # Add xy coordinates - will overwrite if already present
-        arcpy.management.AddXY(piles_working)
-
-        # Change poaField to TOP_elv_orig
-        # Summary Statistics by row_ID to to get the mean of the plane of array and the mean of POINT_Y for each row and the count of piles for each row
-        coorStatsInput = [[poaField, "MEAN"], ["POINT_Y", "MEAN"]]
-        coorStats = arcpy.analysis.Statistics(piles_working, "coorStats", coorStatsInput, row_ID)
-
-        statPOAMean = "MEAN_" + poaField
-
-        # Join the mean of the plane of array and MEAN_POINT_Y back to the piles
-        arcpy.management.JoinField(piles_working, row_ID, coorStats, row_ID, [statPOAMean, "MEAN_POINT_Y"])
-
-        # Calculate zy_bar, y_ybar_sq
-        arcpy.management.CalculateField(piles_working, "zy_bar","(!"+poaField+"! + !"+statPOAMean+"!) * (!POINT_Y! - !MEAN_POINT_Y!)", "PYTHON3", "","DOUBLE")
-        arcpy.management.CalculateField(piles_working, "y_ybar_sq", "(!POINT_Y! - !MEAN_POINT_Y!)**2", "PYTHON3", "","DOUBLE")
-
-        # Summary Statistics by row_ID to get the sum of zy_bar, y_ybar_sq
-        sumStats = arcpy.analysis.Statistics(piles_working, "sumStats", [["zy_bar", "SUM"], ["y_ybar_sq", "SUM"]],row_ID)
-
-        # Calculate the slope (SUM_xy_bar/SUM_x_bar_sq), multiplied by 100 for percent and by -1 to get the convention of north is positive/south is negative
-        arcpy.management.CalculateField(sumStats, "nsSlope", "!SUM_zy_bar!/!SUM_y_ybar_sq!", "PYTHON3", "","DOUBLE")
-
-        # Join slope to piles_working
-        arcpy.management.JoinField(piles_working, row_ID, sumStats, row_ID, ["nsSlope"])
-
-        # Find the intercept
-        arcpy.management.CalculateField(piles_working, "bInit", "!"+poaField+"! - !nsSlope! * !POINT_Y!", "PYTHON3", "", "DOUBLE")
-
-        endPointStats = arcpy.analysis.Statistics(piles_working, "endPointStats", [["bInit", "MEAN"],["nsSlope", "MEAN"]], row_ID)
-
+        # Fit the north-south line of the plane of array of every row in one pass over the piles
+        fit = fitPiles(pilesInput, row_ID, poaField)[0]
 
         rowEndPoints = arcpy.management.CreateFeatureclass(workspace, "rowEndPoints", "POINT", "#", "DISABLED", "DISABLED", rowsInput)
 
@@ -254,18 +224,12 @@ class poaRowEnds(object):
 
         eorOutput = arcpy.analysis.SpatialJoin(rowEndPoints, rowsInput, endofRowPt_out, "JOIN_ONE_TO_ONE", "KEEP_ALL")
 
-        arcpy.management.JoinField(eorOutput, row_ID, endPointStats, row_ID, [["MEAN_nsSlope"],["MEAN_bInit"]])
-
         arcpy.management.AddXY(eorOutput)
 
-        arcpy.management.CalculateField(eorOutput, "poaEnd", "!MEAN_nsSlope! * !POINT_Y! + !MEAN_bInit!", "PYTHON3", "", "DOUBLE")
+        # Plane of array of the row's line at each end point
+        writeLinePOA(eorOutput, row_ID, fit, "poaEnd")
 
-        arcpy.management.DeleteField(eorOutput, ["MEAN_nsSlope", "MEAN_bInit"])
         arcpy.management.Delete(rowEndPoints)
-        arcpy.management.Delete(coorStats)
-        arcpy.management.Delete(endPointStats)
-        arcpy.management.Delete(piles_working)
-        arcpy.management.Delete(sumStats)
 
         # Determine valid grading at the points
         arcpy.sa.ExtractMultiValuesToPoints(eorOutput,[[demInput, "demExist"]], "BILINEAR")
@@ -0,0 +1,82 @@
+########################################################################
+"""PRELIMINARY GRADING ENGINE
+
+Array version of the theoretical row grading in the SAT Preliminary
+Grading Assessment: the north-south trend of the DEM over a tracker
+length window, the initial grade across the layout width and the cut and
+fill beyond the reveal tolerance. Written as a tile pipeline so large
+DEMs can be run tile by tile with tiledRaster.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Horn gradient moved to the shared directional slope kernels
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.2"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import numpy as np
+from focalStats import windowCells, focalMean
+from slopeKernels import hornGradient
+
+# Working memory of prelimGradingTile per tile cell in bytes; tiledRaster.tileCellBytes measures 124
+TILE_CELL_BYTES = 128
+
+def nsSlopePercent(aspectSurface, slopeSurface, cellSize):
+    """Tangent of the slope of one surface projected on the aspect of another
+
+    The aspect is the downslope azimuth; flat cells take the Aspect tool's
+    -1 degrees.
+    """
+
+    ax, ay = hornGradient(aspectSurface, cellSize)
+    sx, sy = hornGradient(slopeSurface, cellSize)
+
+    aGradient = np.hypot(ax, ay)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cosAspect = np.where(aGradient > 0, -ay / aGradient, np.cos(-np.pi / 180))
+    nsRad = cosAspect * np.arctan(np.hypot(sx, sy))
+
+    return np.tan(nsRad).astype(np.float32)
+
+def prelimGradingWindows(cellSize, layoutWidth, trackerLength):
+    """Focal windows (rows along the tracker, columns across the layout width) in cells"""
+
+    return windowCells(trackerLength, cellSize), windowCells(layoutWidth, cellSize)
+
+def prelimGradingHalo(cellSize, layoutWidth, trackerLength):
+    """Halo (rows, columns) a tile needs for its core to match a full-raster run"""
+
+    nAlong, nAcross = prelimGradingWindows(cellSize, layoutWidth, trackerLength)
+
+    # NS slope of the focal DEM, its focal mean and the initial grade window
+    return 2 * (nAlong // 2) + 1 + nAcross // 2, 2 * (nAcross // 2) + 1 + nAcross // 2
+
+def prelimGradingTile(dem, northing, origin=(0, 0), cellSize=1.0, layoutWidth=1.0, trackerLength=1.0, revTolerance=0.0):
+    """Tile pipeline: preliminary cut (at or below zero) and fill (at or above zero) depths"""
+
+    nAlong, nAcross = prelimGradingWindows(cellSize, layoutWidth, trackerLength)
+
+    # North-south trend over a tracker length
+    demFocal = focalMean(dem, nAlong, nAcross, origin)
+    nsFocal = focalMean(nsSlopePercent(dem, demFocal, cellSize), nAlong, nAcross, origin)
+    yFocal = focalMean(northing, nAlong, nAcross, origin)
+
+    intB = demFocal - nsFocal * yFocal
+    tPrelim = nsFocal * northing + intB
+    trendDem = tPrelim - dem
+
+    # Initial grade across the layout width, with the reveal tolerance shrunk to be conservative
+    initGrade = focalMean(trendDem, nAcross, nAcross, origin)
+    revToleranceHalf = np.float32(float(revTolerance) / 2.05)
+    upperBound = initGrade + revToleranceHalf
+    lowerBound = initGrade - revToleranceHalf
+
+    cut = np.where(upperBound > 0, np.nan, upperBound).astype(np.float32)
+    fill = np.where(lowerBound < 0, np.nan, lowerBound).astype(np.float32)
+
+    return cut, fill
@@ -0,0 +1,191 @@
+########################################################################
+"""PREPARED POLYGON INDEX
+
+Polygons such as the buildable area, with thousands of vertices and
+holes, prepared once for batch tests of many layout rectangles. The
+polygon edges are bucketed on a grid (spatialIndex) for the rectangle
+tests and in horizontal bands for point in polygon ray casting, so every
+rectangle is checked against only the few edges near it and a whole
+layout is tested in one vectorized pass.
+
+A rectangle is completely within a polygon when no edge of the polygon
+passes through the rectangle's interior and its center is inside the
+polygon (even-odd over all rings, so holes and parts are handled).
+Rectangles touching the boundary from inside are within.
+
+The planar area a rectangle shares with each polygon follows from
+Green's theorem over two sets of edges: the edges clipped to the
+rectangle, and the edges crossing the line of its top side east of its
+left side, which account for the polygon above the rectangle. Both come
+from the indexes, so no polygon is clipped piece by piece.
+
+Revision log
+0.0.1 - 10/17/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Planar overlap areas of rectangles and polygons
+0.0.3 - 10/17/2026 - Polygons read in the spatial reference of the rectangles
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+from collections import namedtuple
+import numpy as np
+from spatialIndex import gridIndex, overlapPairs
+
+# edges are (x0, y0, x1, y1) of every ring segment and edgeFeature the polygon each belongs to
+PreparedPolygons = namedtuple("PreparedPolygons", ["edges", "edgeFeature", "nFeatures", "edgeIndex", "bandIndex"])
+
+# Target number of edges per horizontal band
+BAND_EDGES = 8
+
+def polygonEdges(polygons):
+    """Segments of the rings of polygons (lists of (n, 2) rings) and the polygon of each"""
+
+    edges, features = [], []
+    for feature, rings in enumerate(polygons):
+        for ring in rings:
+            ring = np.asarray(ring, dtype=np.float64)
+            if not np.array_equal(ring[0], ring[-1]):
+                ring = np.vstack([ring, ring[:1]])
+            edges.append(np.column_stack([ring[:-1], ring[1:]]))
+            features.append(np.full(len(ring) - 1, feature))
+    if not edges:
+        return np.zeros((0, 4)), np.zeros(0, dtype=np.int64)
+    edges = np.concatenate(edges)
+    features = np.concatenate(features)
+    keep = np.any(edges[:, :2] != edges[:, 2:], axis=1)
+
+    return edges[keep], features[keep]
+
+def preparePolygons(polygons, cellSize=None):
+    """Edge grid and horizontal band indexes of polygons"""
+
+    edges, edgeFeature = polygonEdges(polygons)
+    extents = np.column_stack([np.minimum(edges[:, 0], edges[:, 2]), np.minimum(edges[:, 1], edges[:, 3]),
+                               np.maximum(edges[:, 0], edges[:, 2]), np.maximum(edges[:, 1], edges[:, 3])])
+
+    # Bands are a one column grid over the edges' y ranges
+    bandExtents = extents.copy()
+    bandExtents[:, [0, 2]] = 0.0
+    height = extents[:, 3].max() - extents[:, 1].min() if len(edges) else 1.0
+    bandHeight = max(height * BAND_EDGES / max(len(edges), 1), np.median(extents[:, 3] - extents[:, 1]) if len(edges) else 0.0, 1e-9)
+
+    return PreparedPolygons(edges, edgeFeature, len(polygons), gridIndex(extents, cellSize=cellSize), gridIndex(bandExtents, cellSize=bandHeight))
+
+def clipSegments(edges, boxes):
+    """Liang-Barsky clip of each segment to its paired closed box; returns (hit, t0, t1) along the segments"""
+
+    x0, y0 = edges[:, 0], edges[:, 1]
+    dx, dy = edges[:, 2] - x0, edges[:, 3] - y0
+    t0 = np.zeros(len(edges))
+    t1 = np.ones(len(edges))
+    hit = np.ones(len(edges), dtype=bool)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for p, q in ((-dx, x0 - boxes[:, 0]), (dx, boxes[:, 2] - x0), (-dy, y0 - boxes[:, 1]), (dy, boxes[:, 3] - y0)):
+            t = q / p
+            hit &= (p != 0) | (q >= 0)
+            t0 = np.where(p < 0, np.maximum(t0, t), t0)
+            t1 = np.where(p > 0, np.minimum(t1, t), t1)
+
+    return hit & (t0 <= t1), t0, t1
+
+def segmentsCrossInterior(edges, boxes):
+    """True where each segment passes through the open interior of its paired box"""
+
+    hit, t0, t1 = clipSegments(edges, boxes)
+    x0, y0 = edges[:, 0], edges[:, 1]
+    dx, dy = edges[:, 2] - x0, edges[:, 3] - y0
+
+    # The clipped piece is on the boundary unless its midpoint is inside
+    tm = (t0 + t1) / 2
+    mx, my = x0 + dx * tm, y0 + dy * tm
+
+    return hit & (mx > boxes[:, 0]) & (mx < boxes[:, 2]) & (my > boxes[:, 1]) & (my < boxes[:, 3])
+
+def pointFeatures(prepared, xy):
+    """(point, polygon) pairs of the points inside each polygon, by rays cast east through the band edges"""
+
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    bands = np.column_stack([np.zeros(len(xy)), xy[:, 1], np.zeros(len(xy)), xy[:, 1]])
+    point, edge = overlapPairs(prepared.bandIndex, bands, unique=True)
+
+    e = prepared.edges[edge]
+    x, y = xy[point, 0], xy[point, 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xCross = e[:, 0] + (y - e[:, 1]) * (e[:, 2] - e[:, 0]) / (e[:, 3] - e[:, 1])
+    crosses = ((e[:, 1] > y) != (e[:, 3] > y)) & (x < xCross)
+
+    key, count = np.unique(point[crosses] * prepared.nFeatures + prepared.edgeFeature[edge[crosses]], return_counts=True)
+    key = key[count % 2 == 1]
+
+    return key // prepared.nFeatures, key % prepared.nFeatures
+
+def rectanglesWithin(prepared, rectangles):
+    """True for every (xMin, yMin, xMax, yMax) rectangle completely within one of the polygons"""
+
+    rectangles = np.asarray(rectangles, dtype=np.float64).reshape(-1, 4)
+    within = np.zeros(len(rectangles), dtype=bool)
+    if len(rectangles) == 0 or len(prepared.edges) == 0:
+        return within
+
+    # Polygons with an edge through each rectangle
+    box, edge = overlapPairs(prepared.edgeIndex, rectangles)
+    cross = segmentsCrossInterior(prepared.edges[edge], rectangles[box])
+    crossed = np.unique(box[cross] * prepared.nFeatures + prepared.edgeFeature[edge[cross]])
+
+    # Polygons holding each rectangle's center
+    centers = (rectangles[:, :2] + rectangles[:, 2:]) / 2
+    point, feature = pointFeatures(prepared, centers)
+    clear = ~np.isin(point * prepared.nFeatures + feature, crossed)
+    within[point[clear]] = True
+
+    return within
+
+def overlapAreas(prepared, rectangles):
+    """Planar area each (xMin, yMin, xMax, yMax) rectangle shares with the polygons
+
+    Overlaps of the polygons with each other are counted once per polygon,
+    so the areas are capped at the rectangle areas; dissolve overlapping
+    polygons first for the area of their union.
+    """
+
+    rectangles = np.asarray(rectangles, dtype=np.float64).reshape(-1, 4)
+    rectArea = (rectangles[:, 2] - rectangles[:, 0]) * (rectangles[:, 3] - rectangles[:, 1])
+    if len(rectangles) == 0 or len(prepared.edges) == 0:
+        return np.zeros(len(rectangles))
+
+    # Edges clipped to the rectangles: -dx times the height of the clipped piece above the bottom
+    box, edge = overlapPairs(prepared.edgeIndex, rectangles, unique=True)
+    e, r = prepared.edges[edge], rectangles[box]
+    hit, t0, t1 = clipSegments(e, r)
+    dx, dy = e[:, 2] - e[:, 0], e[:, 3] - e[:, 1]
+    yMid = e[:, 1] + dy * (t0 + t1) / 2
+    inside = np.where(hit, -dx * (t1 - t0) * (yMid - r[:, 1]), 0.0)
+
+    # Edges crossing the top line east of the left side: the polygon above, a full rectangle height for each width
+    top = np.column_stack([np.zeros(len(rectangles)), rectangles[:, 3], np.zeros(len(rectangles)), rectangles[:, 3]])
+    band, crossEdge = overlapPairs(prepared.bandIndex, top, unique=True)
+    c, r = prepared.edges[crossEdge], rectangles[band]
+    crosses = (c[:, 1] > r[:, 3]) != (c[:, 3] > r[:, 3])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xCross = c[:, 0] + (r[:, 3] - c[:, 1]) * (c[:, 2] - c[:, 0]) / (c[:, 3] - c[:, 1])
+    above = np.where(crosses, np.sign(c[:, 3] - c[:, 1]) * np.clip(xCross - r[:, 0], 0, r[:, 2] - r[:, 0]) * (r[:, 3] - r[:, 1]), 0.0)
+
+    # Signed areas per rectangle and polygon, positive for counterclockwise rings
+    key = np.concatenate([box * prepared.nFeatures + prepared.edgeFeature[edge], band * prepared.nFeatures + prepared.edgeFeature[crossEdge]])
+    pairs, pair = np.unique(key, return_inverse=True)
+    signed = np.bincount(pair, weights=np.concatenate([inside, above]), minlength=len(pairs))
+    areas = np.bincount(pairs // prepared.nFeatures, weights=np.abs(signed), minlength=len(rectangles))
+
+    return np.minimum(areas, rectArea)
+
+def readPrepared(featureClass, spatialRef=None):
+    """Prepared polygons of a polygon feature class, in spatialRef when given"""
+    from rasterArrays import readPolygons
+
+    return preparePolygons(readPolygons(featureClass, spatialRef=spatialRef)[0])
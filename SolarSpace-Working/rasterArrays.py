@@ -0,0 +1,242 @@
+########################################################################
+"""RASTER ARRAY HELPERS
+
+Shared helpers for moving rasters between the geodatabase and float32
+NumPy arrays so the grading engines can run without arcpy.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Added polygon rasterization to label arrays
+0.0.3 - 10/17/2026 - Polygons optionally read in another spatial reference
+0.0.4 - 10/17/2026 - Linear unit conversion shared by the engines
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.4"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+from collections import namedtuple
+import numpy as np
+
+# Grid definition of an array: upper-left corner, square cell size and shape
+RasterGrid = namedtuple("RasterGrid", ["xMin", "yMax", "cellSize", "nRows", "nCols"])
+
+# Meters per unit of the distance units used in buffer strings and the z units of the tools
+UNIT_METERS = {"feet": 0.3048, "foot": 0.3048, "feetus": 1200.0 / 3937.0, "meters": 1.0, "meter": 1.0}
+
+def mapDistance(distance, spatialRef):
+    """Convert a linear distance string such as "10 Feet" to the spatial reference's units"""
+
+    parts = str(distance).split()
+    value = float(parts[0])
+    if len(parts) < 2:
+        return value
+
+    return value * UNIT_METERS[parts[1].lower()] / spatialRef.metersPerUnit
+
+def cellCenters(grid):
+    """Return the x coordinates of the column centers and y coordinates of the row centers"""
+
+    x = grid.xMin + (np.arange(grid.nCols) + 0.5) * grid.cellSize
+    y = grid.yMax - (np.arange(grid.nRows) + 0.5) * grid.cellSize
+
+    return x, y
+
+def snapGrid(grid, xMin, yMin, xMax, yMax):
+    """Sub-grid of a grid covering an extent, aligned to the grid's cells and clipped to it"""
+
+    c0 = max(int(np.floor((xMin - grid.xMin) / grid.cellSize)), 0)
+    c1 = min(int(np.ceil((xMax - grid.xMin) / grid.cellSize)), grid.nCols)
+    r0 = max(int(np.floor((grid.yMax - yMax) / grid.cellSize)), 0)
+    r1 = min(int(np.ceil((grid.yMax - yMin) / grid.cellSize)), grid.nRows)
+
+    return RasterGrid(grid.xMin + c0 * grid.cellSize, grid.yMax - r0 * grid.cellSize, grid.cellSize, max(r1 - r0, 0), max(c1 - c0, 0))
+
+def pointInRings(x, y, rings):
+    """Even-odd test of points against a list of (n, 2) rings, so holes are excluded"""
+
+    inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+    for ring in rings:
+        if not np.array_equal(ring[0], ring[-1]):
+            ring = np.vstack([ring, ring[:1]])
+        x0 = ring[:-1, 0]
+        y0 = ring[:-1, 1]
+        x1 = ring[1:, 0]
+        y1 = ring[1:, 1]
+        for i in range(len(x0)):
+            crosses = (y0[i] > y) != (y1[i] > y)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                xCross = x0[i] + (y - y0[i]) * (x1[i] - x0[i]) / (y1[i] - y0[i])
+            inside ^= crosses & (x < xCross)
+
+    return inside
+
+def rasterizePolygons(polygons, grid):
+    """Burn polygons into label arrays by cell center
+
+    Polygons are lists of closed (n, 2) rings and are labelled 1..n in the
+    order given; 0 is background. Overlapping polygons are placed on extra
+    label layers so every cell of every polygon is kept. Returns the list
+    of int32 label layers.
+    """
+
+    layers = []
+    for label, rings in enumerate(polygons, start=1):
+        coords = np.concatenate(rings)
+        window = snapGrid(grid, coords[:, 0].min(), coords[:, 1].min(), coords[:, 0].max(), coords[:, 1].max())
+        if window.nRows == 0 or window.nCols == 0:
+            continue
+
+        x, y = cellCenters(window)
+        inside = pointInRings(x[None, :], y[:, None], rings)
+
+        r0 = int(round((grid.yMax - window.yMax) / grid.cellSize))
+        c0 = int(round((window.xMin - grid.xMin) / grid.cellSize))
+        rows = slice(r0, r0 + window.nRows)
+        cols = slice(c0, c0 + window.nCols)
+
+        # Use the first layer with no labelled cells under this polygon
+        for layer in layers:
+            if not (layer[rows, cols][inside] != 0).any():
+                break
+        else:
+            layer = np.zeros((grid.nRows, grid.nCols), dtype=np.int32)
+            layers.append(layer)
+        layer[rows, cols][inside] = label
+
+    return layers
+
+def northingArray(grid, step=None):
+    """Return an array of cell northings, optionally quantized to a grid of the given step"""
+
+    x, y = cellCenters(grid)
+    if step:
+        # Snap to the centroid of the step-sized grid cell, as the grid index/point to raster chain does
+        yMin = grid.yMax - grid.nRows * grid.cellSize
+        y = (np.floor((y - yMin) / step) + 0.5) * step + yMin
+    return np.repeat(y.astype(np.float32)[:, None], grid.nCols, axis=1)
+
+def sampleBilinear(array, grid, x, y):
+    """Bilinearly interpolate an array at map coordinates; NoData neighbours are ignored"""
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    col = (x - grid.xMin) / grid.cellSize - 0.5
+    row = (grid.yMax - y) / grid.cellSize - 0.5
+
+    c0 = np.clip(np.floor(col).astype(np.int64), 0, grid.nCols - 1)
+    r0 = np.clip(np.floor(row).astype(np.int64), 0, grid.nRows - 1)
+    c1 = np.minimum(c0 + 1, grid.nCols - 1)
+    r1 = np.minimum(r0 + 1, grid.nRows - 1)
+    fc = np.clip(col - c0, 0, 1)
+    fr = np.clip(row - r0, 0, 1)
+
+    total = np.zeros(x.shape, dtype=np.float64)
+    weight = np.zeros(x.shape, dtype=np.float64)
+    for rr, cc, w in ((r0, c0, (1 - fr) * (1 - fc)), (r0, c1, (1 - fr) * fc),
+                      (r1, c0, fr * (1 - fc)), (r1, c1, fr * fc)):
+        v = array[rr, cc]
+        valid = ~np.isnan(v)
+        total += np.where(valid, v, 0) * w
+        weight += np.where(valid, w, 0)
+
+    inside = (col >= -0.5) & (col <= grid.nCols - 0.5) & (row >= -0.5) & (row <= grid.nRows - 0.5)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = total / weight
+    out[(weight == 0) | ~inside] = np.nan
+
+    return out
+
+def rasterGrid(raster):
+    """Grid definition of a raster"""
+    import arcpy
+
+    ras = raster if isinstance(raster, arcpy.Raster) else arcpy.Raster(str(raster))
+
+    return RasterGrid(ras.extent.XMin, ras.extent.YMax, ras.meanCellWidth, ras.height, ras.width)
+
+def readPolygons(featureClass, fieldName=None, spatialRef=None):
+    """Read polygon rings as (n, 2) coordinate arrays, with an optional attribute per polygon
+
+    The rings are projected to spatialRef when it is given, otherwise they
+    are in the feature class's own spatial reference.
+    """
+    import arcpy
+
+    fields = ["SHAPE@"] + ([fieldName] if fieldName else [])
+    polygons = []
+    values = []
+    with arcpy.da.SearchCursor(featureClass, fields, spatial_reference=spatialRef) as cursor:
+        for row in cursor:
+            rings = []
+            for part in row[0]:
+                ring = []
+                for pnt in part:
+                    # A null point separates the exterior ring from the interior rings
+                    if pnt:
+                        ring.append((pnt.X, pnt.Y))
+                    elif ring:
+                        rings.append(np.array(ring))
+                        ring = []
+                if ring:
+                    rings.append(np.array(ring))
+            polygons.append(rings)
+            values.append(row[1] if fieldName else None)
+
+    return polygons, values
+
+def readRaster(raster, grid=None):
+    """Read a raster into a float32 array with NoData as NaN
+
+    If a grid is given, the raster is read over that grid's extent so
+    several inputs line up cell for cell.
+    """
+    import arcpy
+
+    ras = raster if isinstance(raster, arcpy.Raster) else arcpy.Raster(str(raster))
+    if grid is None:
+        grid = rasterGrid(ras)
+
+    lowerLeft = arcpy.Point(grid.xMin, grid.yMax - grid.nRows * grid.cellSize)
+    array = arcpy.RasterToNumPyArray(ras, lowerLeft, grid.nCols, grid.nRows, nodata_to_value=np.nan)
+
+    return array.astype(np.float32, copy=False), grid
+
+def toRaster(array, grid, spatialRef):
+    """Convert a float32 array on the given grid to a temporary raster for map algebra"""
+    import arcpy
+
+    lowerLeft = arcpy.Point(grid.xMin, grid.yMax - grid.nRows * grid.cellSize)
+    with arcpy.EnvManager(outputCoordinateSystem=spatialRef):
+        outRas = arcpy.NumPyArrayToRaster(array.astype(np.float32, copy=False), lowerLeft, grid.cellSize, grid.cellSize, np.nan)
+
+    return outRas
+
+def writeRaster(array, grid, outRaster, spatialRef):
+    """Save a float32 array on the given grid as a raster dataset"""
+
+    toRaster(array, grid, spatialRef).save(outRaster)
+
+    return outRaster
+
+def addPointSamples(points, grid, surfaces):
+    """Bilinearly sample a dictionary of {field name: array} at each point and write the values to new fields"""
+    import arcpy
+
+    xy = arcpy.da.FeatureClassToNumPyArray(points, ["SHAPE@X", "SHAPE@Y"])
+    samples = {}
+    for fieldName, array in surfaces.items():
+        arcpy.management.AddField(points, fieldName, "DOUBLE")
+        samples[fieldName] = sampleBilinear(array, grid, xy["SHAPE@X"], xy["SHAPE@Y"])
+
+    fields = list(surfaces.keys())
+    with arcpy.da.UpdateCursor(points, fields) as cursor:
+        for i, row in enumerate(cursor):
+            values = [samples[f][i] for f in fields]
+            cursor.updateRow([None if np.isnan(v) else float(v) for v in values])
+
+    return points
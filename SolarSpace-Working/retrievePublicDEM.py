@@ -5,13 +5,14 @@ Revision log
 0.0.1 - 11/31/2023 - Drafting of tool
 0.1.0 - 12/1/2023 - Intial conversion to ArcPro/.pyt format
 1.0.0 - 4/1/2024 - Initial deployment
+1.1.0 - 10/16/2026 - DEM fetched as cached native resolution tiles over a bounded thread pool and mosaicked locally instead of one 1000x1000 image downloaded twice
 
 """
 
 __author__      = "Zane Nordquist"
 __copyright__   = "Copyright 2024, KiloNewton, LLC"
 __credits__     = ["Zane Nordquist", "John Williamson"]
-__version__     = "1.0.0"
+__version__     = "1.1.0"
 __license__     = "Internal"
 __ArcVersion__  = "ArcPro 3.2.1"
 __maintainer__  = ["Zane Nordquist"]
@@ -26,7 +27,7 @@ from arcpy.ddd import *
 import arcpy
 from arcpy.sa import *
 import os
-import requests
+from demTiles import retrieveDEM
 
 class retrievePublicDEM(object):
 
@@ -136,71 +137,43 @@ class retrievePublicDEM(object):
         desc = arcpy.Describe(projectArea)
         extent = desc.extent
         
-        # convert extent to bbox #bbox=<xmin>,<ymin>,<xmax>,<ymax>
-        bbox = str(extent.XMin) + ',' + str(extent.YMin) + ',' + str(extent.XMax) + ',' + str(extent.YMax)
-        arcpy.AddMessage(f'Bounding Box: {bbox}')
-
         # get sr of project area
         sr = desc.spatialReference
-        arcpy.AddMessage(f'Project area spatial reference: {sr}')
+        arcpy.AddMessage(f'Project area spatial reference: {sr.name}')
 
         # Specify the URL of the image service
         if dataSource == 'USGS':
             arcpy.AddMessage('Using USGS data source.')
             image_service_url = "https://elevation.nationalmap.gov/arcgis/rest/services/3DEPElevation/ImageServer"
-            sr = str(sr.factoryCode)
         elif dataSource == 'World Imagery':
             arcpy.AddMessage('Using World Imagery data source.')
             image_service_url = "https://elevation.arcgis.com/arcgis/rest/services/WorldElevation/Terrain/ImageServer"
-            sr = 3857 # if your input feature class aligns with World Imagery
+            sr = arcpy.SpatialReference(3857) # if your input feature class aligns with World Imagery
+            extent = extent.projectAs(sr)
         else:
             image_service_url = "https://elevation.nationalmap.gov/arcgis/rest/services/3DEPElevation/ImageServer"
-            sr = str(sr.factoryCode)
             arcpy.AddWarning('Data source not recognized. Using USGS data source.')
-        
-        # Edit the url to export the image
-        arcpy.SetProgressor('default', 'Sending in html request...')
-        image_service_url = f'{image_service_url}/exportImage?f=image&bbox={bbox}&bboxSR={sr}&imageSR={sr}&size=1000,1000&format=tiff&pixelType=F32&noData=0'
-        
-        arcpy.AddMessage(f'Image service URL: {image_service_url}')
 
-        # send in the request
-        try:
-            response = requests.get(image_service_url)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as err:
-            arcpy.AddError(err)
-            return
+        # convert extent to bbox #bbox=<xmin>,<ymin>,<xmax>,<ymax>
+        bbox = (extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+        arcpy.AddMessage(f'Bounding Box: {bbox}')
+        arcpy.AddMessage(f'Image service URL: {image_service_url}')
 
-        # create temp folder to store the image (one step below the workspace)
-        temp_folder = os.path.join((os.path.dirname(workspace)), 'temp')
-        
-        # check if the temp folder exists and create it if it doesn't
-        if not os.path.exists(temp_folder):
-            os.makedirs(temp_folder)
-        
-        # send in the request
-        arcpy.SetProgressor('default', 'Downloading image...')
-        response = requests.get(image_service_url)
-        
-        # write the image to the temp folder if the request is successful
-        if response.status_code == 200:
-            arcpy.AddMessage('Image successfully retrieved.')
-            # Write content to file
-            output_temp = f'{temp_folder}/outputName_raw.tif'
-        else:
-            arcpy.AddError('Failed to retrieve data: Status Code {response.status_code}')
-                    
         # Output name raw (no dir)
         output_basename = os.path.basename(outputName)
-        
-        # Save the output in the geodatabase
-        with open(output_temp, 'wb') as f:
-            f.write(response.content)
+        output_gdb = f'in_memory\{output_basename}_raw'
 
-            # save the image
-            output_gdb = f'in_memory\{output_basename}_raw'
-            arcpy.CopyRaster_management(output_temp, output_gdb, pixel_type='32_BIT_FLOAT', nodata_value=0)
+        # Fetch the native resolution tiles covering the bounding box (from the tile cache when already retrieved) and mosaic them
+        arcpy.SetProgressor('default', 'Downloading image tiles...')
+        def progress(done, total):
+            arcpy.SetProgressorLabel(f'Downloading image tiles ({done} of {total})...')
+
+        try:
+            output_gdb, layout = retrieveDEM(image_service_url, bbox, sr, output_gdb, progress=progress)
+        except Exception as err:
+            arcpy.AddError(f'Failed to retrieve data: {err}')
+            return
+        arcpy.AddMessage(f'Image successfully retrieved: {len(layout.tiles)} tiles at {layout.grid.cellSize:.3f} {sr.linearUnitName}')
 
         # clip the raster to the project area
         arcpy.SetProgressor('default', 'Clipping raster to project area...')
@@ -241,13 +214,6 @@ class retrievePublicDEM(object):
         arcpy.management.Delete(output_gdb_clip)
         arcpy.management.Delete(output_gdb_resample)
         
-        # remove the temp folder
-        try:
-            os.remove(output_temp)
-        except:
-            pass
-        os.rmdir(temp_folder)
-        
         ### Templates for error reporting ###
         
         # # Create a search cursor
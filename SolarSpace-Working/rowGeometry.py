@@ -0,0 +1,132 @@
+########################################################################
+"""ROW CORNER AND END POINTS
+
+Corners, edge midpoints and north/south ends of every row polygon from
+one packed coordinate array. The vertices of all rows are read in one
+columnar pass and held as an (n, 2) array with the offset of each row's
+first vertex, so the vertex nearest each corner of a row's extent is
+found with one sort per corner for the whole site instead of a
+PointGeometry and four distanceTo calls per vertex. The midpoint of the
+line between two corners is the positionAlongLine(0.5, True) point of
+the tools.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.1"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import numpy as np
+
+# Corners in the order of the row point tools
+CORNERS = ["NW", "NE", "SW", "SE"]
+MIDPOINTS = ["W", "E", "N", "S"]
+
+def packVertices(featureIDs, xy):
+    """Row IDs and vertex offsets of exploded vertices, which come feature by feature
+
+    Returns (row IDs, offsets); the vertices of row i are
+    xy[offsets[i]:offsets[i + 1]].
+    """
+
+    featureIDs = np.asarray(featureIDs)
+    if len(featureIDs) == 0:
+        return featureIDs, np.zeros(1, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, featureIDs[1:] != featureIDs[:-1]])
+
+    return featureIDs[starts], np.r_[starts, len(featureIDs)].astype(np.int64)
+
+def packedExtents(xy, offsets):
+    """Extent (xMin, yMin, xMax, yMax) of each row of packed vertices"""
+
+    starts = offsets[:-1]
+
+    return np.column_stack([np.minimum.reduceat(xy[:, 0], starts), np.minimum.reduceat(xy[:, 1], starts),
+                            np.maximum.reduceat(xy[:, 0], starts), np.maximum.reduceat(xy[:, 1], starts)])
+
+def extentCorners(extents):
+    """Corners of row extents as {position: (n, 2) array}"""
+
+    x0, y0, x1, y1 = extents.T
+
+    return {"NW": np.column_stack([x0, y1]), "NE": np.column_stack([x1, y1]),
+            "SW": np.column_stack([x0, y0]), "SE": np.column_stack([x1, y0])}
+
+def nearestVertices(xy, offsets, targets):
+    """Vertex of each row nearest its target point, the first of equally near vertices"""
+
+    counts = np.diff(offsets)
+    row = np.repeat(np.arange(len(counts)), counts)
+    d = ((xy - targets[row]) ** 2).sum(axis=1)
+
+    # Sorting by row then distance puts each row's nearest vertex at its offset
+    order = np.lexsort((np.arange(len(d)), d, row))
+
+    return xy[order[offsets[:-1]]]
+
+def vertexCorners(xy, offsets, extents=None):
+    """Vertex of each row nearest each corner of its extent as {position: (n, 2) array}"""
+
+    if extents is None:
+        extents = packedExtents(xy, offsets)
+
+    return dict((position, nearestVertices(xy, offsets, corner)) for position, corner in extentCorners(extents).items())
+
+def edgeMidpoints(corners):
+    """West, east, north and south edge midpoints from the corners; N and S are the row ends"""
+
+    return {"W": (corners["NW"] + corners["SW"]) / 2, "E": (corners["NE"] + corners["SE"]) / 2,
+            "N": (corners["NW"] + corners["NE"]) / 2, "S": (corners["SW"] + corners["SE"]) / 2}
+
+def rowPointSet(xy, offsets, corners="VERTEX"):
+    """Corners and edge midpoints of every row as {position: (n, 2) array}
+
+    Corners are the vertices nearest the extent corners ("VERTEX") or the
+    extent corners themselves ("EXTENT"); the midpoints are always taken
+    between the vertex corners.
+    """
+
+    extents = packedExtents(xy, offsets)
+    vertex = vertexCorners(xy, offsets, extents)
+    points = edgeMidpoints(vertex)
+    points.update(extentCorners(extents) if corners == "EXTENT" else vertex)
+
+    return points
+
+def pointRecords(rowIDs, points, positions):
+    """Rows of (x, y), row ID and position, row by row in the order of positions"""
+
+    nRows = len(rowIDs)
+    xy = np.stack([points[p] for p in positions], axis=1).reshape(-1, 2)
+    ids = np.repeat(np.asarray(rowIDs), len(positions))
+    labels = np.tile(np.array(positions), nRows)
+
+    return [((float(x), float(y)), rowID, label) for (x, y), rowID, label in zip(xy.tolist(), ids.tolist(), labels.tolist())]
+
+def readRowVertices(featureClass, where=None):
+    """Object IDs, packed vertices and offsets of the polygons of a feature class in one columnar read"""
+    import arcpy
+
+    vertices = arcpy.da.FeatureClassToNumPyArray(featureClass, ["OID@", "SHAPE@X", "SHAPE@Y"], where, explode_to_points=True)
+    xy = np.column_stack([vertices["SHAPE@X"], vertices["SHAPE@Y"]]).astype(np.float64)
+    oids, offsets = packVertices(vertices["OID@"], xy)
+
+    return oids, xy, offsets
+
+def insertRowPoints(points, rowsInput, positions, corners="VERTEX"):
+    """Insert corner and midpoint points of every row into a point feature class with PolygonOID and Position fields"""
+    import arcpy
+
+    oids, xy, offsets = readRowVertices(rowsInput)
+    records = pointRecords(oids, rowPointSet(xy, offsets, corners), positions)
+
+    with arcpy.da.InsertCursor(points, ["SHAPE@XY", "PolygonOID", "Position"]) as cursor:
+        for record in records:
+            cursor.insertRow(record)
+
+    return points
@@ -0,0 +1,171 @@
+########################################################################
+"""ROW PLANE OF ARRAY REGRESSION
+
+Least-squares north-south line of the plane of array (or top of pile)
+against northing for every row of piles in one grouped pass over columnar
+pile arrays. Replaces the Statistics, JoinField and CalculateField chain
+of the pile tools (MEAN_POINT_Y, zy_bar, y_ybar_sq, SUM_*, nsSlope and
+bInit), which rewrote the pile feature class on every step. The slope,
+intercept, per-pile residuals and the plane of array at the row ends are
+returned together, and the bridge functions write them back to piles or
+row end points in one cursor pass.
+
+Slopes are dz/dy; the tools report -100 * dz/dy so north facing slopes
+are positive.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.1"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+from collections import namedtuple
+import numpy as np
+
+# Per-row results are indexed like rows; inverse and residuals are per pile
+RowFit = namedtuple("RowFit", ["rows", "inverse", "count", "slope", "intercept", "residuals", "southY", "northY", "southPOA", "northPOA"])
+
+def rowFit(rowIDs, y, z):
+    """Least-squares line z = slope * y + intercept through the piles of every row
+
+    Piles without a value (NaN) are left out of their row's fit, as
+    Statistics skips nulls. Rows with a single pile or a single northing
+    have no slope (NaN), as the division in the field calculation failed.
+    The row ends are the southernmost and northernmost fitted piles.
+    """
+
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    rows, inverse = np.unique(np.asarray(rowIDs), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    nRows = len(rows)
+
+    valid = ~(np.isnan(y) | np.isnan(z))
+    weight = valid.astype(np.float64)
+    yv = np.where(valid, y, 0)
+    zv = np.where(valid, z, 0)
+
+    count = np.bincount(inverse, weight, minlength=nRows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        yBar = np.bincount(inverse, yv, minlength=nRows) / count
+        zBar = np.bincount(inverse, zv, minlength=nRows) / count
+
+        # Centered sums, as the zy_bar and y_ybar_sq fields
+        dy = np.where(valid, y - yBar[inverse], 0)
+        dz = np.where(valid, z - zBar[inverse], 0)
+        sxx = np.bincount(inverse, dy * dy, minlength=nRows)
+        slope = np.where(sxx > 0, np.bincount(inverse, dz * dy, minlength=nRows) / sxx, np.nan)
+    intercept = zBar - slope * yBar
+    residuals = z - (slope[inverse] * y + intercept[inverse])
+
+    southY = np.full(nRows, np.inf)
+    northY = np.full(nRows, -np.inf)
+    np.minimum.at(southY, inverse[valid], y[valid])
+    np.maximum.at(northY, inverse[valid], y[valid])
+    southY[np.isinf(southY)] = np.nan
+    northY[np.isinf(northY)] = np.nan
+
+    return RowFit(rows, inverse, count.astype(np.int64), slope, intercept, residuals, southY, northY,
+                  slope * southY + intercept, slope * northY + intercept)
+
+def rowIndex(fit, rowIDs):
+    """Index into fit.rows of each row ID, -1 where the row was not fitted"""
+
+    rowIDs = np.asarray(rowIDs).astype(fit.rows.dtype)
+    if len(fit.rows) == 0:
+        return np.full(len(rowIDs), -1)
+    index = np.minimum(np.searchsorted(fit.rows, rowIDs), len(fit.rows) - 1)
+
+    return np.where(fit.rows[index] == rowIDs, index, -1)
+
+def rowValues(fit, values, rowIDs):
+    """Per-row values picked for each row ID, NaN where the row was not fitted"""
+
+    index = rowIndex(fit, rowIDs)
+    values = np.append(np.asarray(values, dtype=np.float64), np.nan)
+
+    return values[index]
+
+def poaAt(fit, rowIDs, y):
+    """Fitted plane of array of each row ID's line at northing y"""
+
+    return rowValues(fit, fit.slope, rowIDs) * np.asarray(y, dtype=np.float64) + rowValues(fit, fit.intercept, rowIDs)
+
+def slopeValue(slope, slopeUnits="Percent"):
+    """Row slope dz/dy as the tools report it, north facing positive, in percent or degrees"""
+
+    percent = -100 * np.asarray(slope, dtype=np.float64)
+    if slopeUnits == "Degrees":
+        return np.degrees(np.arctan(percent / 100))
+
+    return percent
+
+def readPiles(featureClass, rowField, poaField, where=None):
+    """Object IDs, row IDs, northings and plane of array values of piles as columnar arrays
+
+    Null plane of array values are read as NaN.
+    """
+    import arcpy
+
+    piles = arcpy.da.FeatureClassToNumPyArray(featureClass, ["OID@", rowField, "SHAPE@Y", poaField], where,
+                                              null_value={poaField: np.nan})
+
+    return piles["OID@"], piles[rowField], piles["SHAPE@Y"].astype(np.float64), piles[poaField].astype(np.float64)
+
+def fitPiles(featureClass, rowField, poaField, where=None):
+    """Row fit of a pile feature class; returns (fit, object IDs of the piles)"""
+
+    oids, rowIDs, y, z = readPiles(featureClass, rowField, poaField, where)
+
+    return rowFit(rowIDs, y, z), oids
+
+def writeFields(featureClass, keyField, keys, fields):
+    """Write {field name: values} to a feature class in one cursor pass
+
+    values line up with keys, the row IDs or object IDs ("OID@") of the
+    features to update; features with another key get null. Fields are
+    added as DOUBLE if missing.
+    """
+    import arcpy
+
+    existing = [f.name.lower() for f in arcpy.ListFields(featureClass)]
+    names = list(fields.keys())
+    for name in names:
+        if name.lower() not in existing:
+            arcpy.management.AddField(featureClass, name, "DOUBLE")
+
+    # Keys are matched as text so numeric row IDs match a fit of text row IDs
+    lookup = dict(zip(np.asarray(keys).astype(str).tolist(), zip(*[np.asarray(fields[name], dtype=np.float64).tolist() for name in names])))
+    empty = (None,) * len(names)
+    with arcpy.da.UpdateCursor(featureClass, [keyField] + names) as cursor:
+        for row in cursor:
+            values = lookup.get(str(row[0]), empty)
+            cursor.updateRow([row[0]] + [None if v is None or np.isnan(v) else v for v in values])
+
+    return featureClass
+
+def writeRowFit(featureClass, rowField, fit, fields):
+    """Write per-row fit values {field name: values indexed like fit.rows} to every feature of the row"""
+
+    return writeFields(featureClass, rowField, fit.rows, fields)
+
+def writeLinePOA(featureClass, rowField, fit, field="poaEnd"):
+    """Plane of array of each feature from its row's line at the feature's northing, in one cursor pass"""
+    import arcpy
+
+    if field.lower() not in [f.name.lower() for f in arcpy.ListFields(featureClass)]:
+        arcpy.management.AddField(featureClass, field, "DOUBLE")
+
+    lines = dict(zip(fit.rows.astype(str).tolist(), zip(fit.slope.tolist(), fit.intercept.tolist())))
+    with arcpy.da.UpdateCursor(featureClass, [rowField, "SHAPE@Y", field]) as cursor:
+        for row in cursor:
+            slope, intercept = lines.get(str(row[0]), (np.nan, np.nan))
+            poa = slope * row[1] + intercept if row[1] is not None else np.nan
+            cursor.updateRow([row[0], row[1], None if np.isnan(poa) else poa])
+
+    return featureClass
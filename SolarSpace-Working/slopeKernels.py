@@ -0,0 +1,187 @@
+########################################################################
+"""DIRECTIONAL SLOPE KERNELS
+
+North-south and east-west slope components straight from the surface
+gradient. The gradient comes from the least-squares quadratic surface of
+SurfaceParameters (QUADRATIC) or Horn's method of the Slope and Aspect
+tools (PLANAR), and the aspect-projected slope the tools build with
+Cos(Aspect) * Slope and Sin(Aspect) * Slope is taken from dz/dy and dz/dx
+directly, with one arctangent per cell instead of the aspect, slope,
+cosine and sine rasters.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Tile folder removed after each run
+0.0.3 - 10/17/2026 - Neighborhood distances converted to map units; separate aspect neighborhood for the SurfaceParameters chains
+0.0.4 - 10/17/2026 - Z unit of the surface as in the z_unit of the tools; unit conversion from the raster array helpers
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.4"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import os.path
+import shutil
+import tempfile
+import numpy as np
+from rasterArrays import UNIT_METERS, mapDistance
+
+# Approximate working memory of directionalSlopeTile per tile cell, in bytes
+TILE_CELL_BYTES = 112
+
+def neighborhoodCells(neighborhood_distance, cellSize, spatialRef):
+    """Half width in cells of the SurfaceParameters neighborhood; the default is one cell (3x3)"""
+
+    if neighborhood_distance in (None, "", "#"):
+        return 1
+    distance = mapDistance(neighborhood_distance, spatialRef)
+
+    return max(1, int(round(distance / float(cellSize))))
+
+def quadraticGradient(surface, cellSize, k=1):
+    """dz/dx (east) and dz/dy (north) of the least-squares quadratic surface over a (2k+1) square window
+
+    On a symmetric window the second order terms are orthogonal to the
+    first order terms, so the gradient is the weighted column (row)
+    difference of the window. Edges are padded with the nearest cell and
+    NoData in the window gives NoData.
+    """
+
+    nRows, nCols = surface.shape
+    z = np.pad(surface.astype(np.float64), k, mode="edge")
+
+    # Window column and row sums, added in the same order for every cell so tiles match full runs
+    colSum = z[0:nRows, :].copy()
+    rowSum = z[:, 0:nCols].copy()
+    for i in range(1, 2 * k + 1):
+        colSum += z[i:i + nRows, :]
+        rowSum += z[:, i:i + nCols]
+
+    dzdx = np.zeros((nRows, nCols))
+    dzdy = np.zeros((nRows, nCols))
+    for j in range(1, k + 1):
+        dzdx += j * (colSum[:, k + j:k + j + nCols] - colSum[:, k - j:k - j + nCols])
+        dzdy += j * (rowSum[k - j:k - j + nRows, :] - rowSum[k + j:k + j + nRows, :])
+
+    # Sum of squared offsets over the window, in map units
+    weight = (2 * k + 1) * 2 * sum(j * j for j in range(1, k + 1)) * cellSize
+
+    return dzdx / weight, dzdy / weight
+
+def hornGradient(surface, cellSize):
+    """dz/dx (east) and dz/dy (north) from Horn's 3x3 method, as used by the PLANAR Slope and Aspect tools
+
+    NoData neighbours and cells beyond the edge take the center cell's value.
+    """
+
+    z = np.pad(surface.astype(np.float64), 1, mode="constant", constant_values=np.nan)
+    center = z[1:-1, 1:-1]
+
+    def cell(r, c):
+        n = z[r:r + surface.shape[0], c:c + surface.shape[1]]
+        return np.where(np.isnan(n), center, n)
+
+    a, b, c = cell(0, 0), cell(0, 1), cell(0, 2)
+    d, f = cell(1, 0), cell(1, 2)
+    g, h, i = cell(2, 0), cell(2, 1), cell(2, 2)
+
+    dzdx = ((c + 2 * f + i) - (a + 2 * d + g)) / (8 * cellSize)
+    dzdy = ((a + 2 * b + c) - (g + 2 * h + i)) / (8 * cellSize)
+
+    return dzdx, dzdy
+
+def directionalSlope(dzdx, dzdy, units="Degrees", aspectGradient=None):
+    """North-south and east-west slope, Cos(Aspect) * Slope and Sin(Aspect) * Slope, from the gradient
+
+    The aspect is the downslope azimuth, so slopes falling to the north
+    and to the east are positive. The angle is returned in "Radians" or
+    "Degrees", or as its tangent in "Percent". Flat cells are zero. The
+    aspect comes from aspectGradient (dz/dx, dz/dy) when the tool took
+    it over a different neighborhood than the slope.
+    """
+
+    ax, ay = (dzdx, dzdy) if aspectGradient is None else aspectGradient
+    slope = np.arctan(np.hypot(dzdx, dzdy))
+    aspectNorm = np.hypot(ax, ay)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.where(aspectNorm > 0, slope / aspectNorm, 0.0)
+    nsRad = -ay * scale
+    ewRad = -ax * scale
+
+    if units == "Degrees":
+        return np.degrees(nsRad).astype(np.float32), np.degrees(ewRad).astype(np.float32)
+    if units == "Percent":
+        return (np.tan(nsRad) * 100).astype(np.float32), (np.tan(ewRad) * 100).astype(np.float32)
+
+    return nsRad.astype(np.float32), ewRad.astype(np.float32)
+
+def zFactor(zUnit, spatialRef):
+    """Ratio of the z unit to the spatial reference's linear unit; 1 when the z unit is not given"""
+
+    if zUnit in (None, "", "#"):
+        return 1.0
+
+    return UNIT_METERS[str(zUnit).lower()] / spatialRef.metersPerUnit
+
+def directionalSlopeTile(surface, origin=(0, 0), cellSize=1.0, method="QUADRATIC", units="Degrees", k=1, kAspect=None, zScale=1.0):
+    """Tile pipeline: north-south and east-west slope of a surface, with dz scaled to the map units by zScale"""
+
+    if method == "PLANAR":
+        dzdx, dzdy = hornGradient(surface, cellSize)
+        return list(directionalSlope(dzdx * zScale, dzdy * zScale, units))
+
+    dzdx, dzdy = quadraticGradient(surface, cellSize, k)
+    aspectGradient = None if kAspect in (None, k) else quadraticGradient(surface, cellSize, kAspect)
+
+    return list(directionalSlope(dzdx * zScale, dzdy * zScale, units, aspectGradient))
+
+def directionalSlopeRaster(in_raster, method="QUADRATIC", units="Degrees", neighborhood_distance=None, aspect_distance=None,
+                           zUnit=None, memoryBudget=1024):
+    """North-south and east-west slope rasters of a surface
+
+    Replaces the SurfaceParameters (QUADRATIC) or Aspect and Slope
+    (PLANAR) chain with Cos/Sin of the aspect. The QUADRATIC aspect is
+    taken over aspect_distance when the chain ran ASPECT with its own
+    neighborhood, otherwise over neighborhood_distance. The z values are
+    in zUnit ("Foot", "Meter") as in the z_unit of the tools, or in the map
+    units if it is not given. The surface is processed in tiles across the
+    worker processes and the results are kept in the terrain product
+    cache. Returns (nsSlope, ewSlope) rasters.
+    """
+    import arcpy
+    from rasterArrays import rasterGrid
+    from tiledRaster import parallelWorkers, rasterToMemmap, memmapToRaster, tiledArrays
+    from terrainCache import cachedArrays
+
+    ras = in_raster if isinstance(in_raster, arcpy.Raster) else arcpy.Raster(str(in_raster))
+    grid = rasterGrid(ras)
+    if method == "PLANAR":
+        k = kAspect = 1
+    else:
+        k = neighborhoodCells(neighborhood_distance, grid.cellSize, ras.spatialReference)
+        kAspect = k if aspect_distance is None else neighborhoodCells(aspect_distance, grid.cellSize, ras.spatialReference)
+    halo = max(k, kAspect)
+    zScale = zFactor(zUnit, ras.spatialReference)
+    workers = parallelWorkers(arcpy.env.parallelProcessingFactor)
+
+    tileFolder = tempfile.mkdtemp(dir=arcpy.env.scratchFolder)
+    try:
+        array = rasterToMemmap(ras, os.path.join(tileFolder, "slopeInput.npy"), grid, memoryBudget)[0]
+
+        def compute():
+            return tiledArrays(directionalSlopeTile, [array], 2, (halo, halo), TILE_CELL_BYTES, memoryBudget, tileFolder, "slope", workers,
+                               cellSize=grid.cellSize, method=method, units=units, k=k, kAspect=kAspect, zScale=zScale)
+
+        ns, ew = cachedArrays([array], grid, "directionalSlope", {"method": method, "units": units, "k": k, "kAspect": kAspect, "zUnit": zUnit, "zScale": zScale},
+                              tileFolder, compute, spatialRef=ras.spatialReference.name)
+
+        nsRaster = memmapToRaster(ns, grid, arcpy.CreateUniqueName("nsSlope", arcpy.env.scratchGDB), ras.spatialReference, memoryBudget)
+        ewRaster = memmapToRaster(ew, grid, arcpy.CreateUniqueName("ewSlope", arcpy.env.scratchGDB), ras.spatialReference, memoryBudget)
+        del array, ns, ew
+    finally:
+        shutil.rmtree(tileFolder, ignore_errors=True)
+
+    return arcpy.Raster(nsRaster), arcpy.Raster(ewRaster)
@@ -0,0 +1,362 @@
+########################################################################
+"""SPATIAL INDEX FOR ROWS AND PILES
+
+Uniform grid index over the extents of row polygons or pile points for
+bulk nearest neighbor and directional queries in place of all-pairs
+GenerateNearTable and Near runs. The extents of a feature class are read
+in one columnar pass and packed by grid cell, so the neighbors of every
+query are found by searching rings of cells around it until no unseen
+feature can be nearer; a query touches a few cells and the whole site is
+one sort. Indexes are kept for the session and rebuilt only when the
+feature count or extent of the feature class changes.
+
+Distances are planar between extents and angles are azimuths of the line
+between the nearest points, clockwise from north (0 north, 90 east, -90
+west, 180 south) like the GEODESIC NEAR_ANGLE of the near tables.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Candidate pairs of query boxes and indexed extents sharing a cell
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.2"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+from collections import namedtuple
+import numpy as np
+
+# Items are indexes into extents, grouped by cell; the items of cell c are items[cellStart[c]:cellStart[c + 1]]
+GridIndex = namedtuple("GridIndex", ["ids", "extents", "xMin", "yMin", "cellSize", "nCols", "nRows", "cellStart", "items"])
+
+# Target number of features per grid cell
+CELL_ITEMS = 2
+
+# Indexes built this session by feature class
+_sessionIndexes = {}
+
+def pointExtents(xy):
+    """Extents (xMin, yMin, xMax, yMax) of points"""
+
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+
+    return np.column_stack([xy, xy])
+
+def _cellRanges(index, extents):
+    """First and last column and row of the cells each extent touches, clipped to the grid"""
+
+    c0 = np.clip(np.floor((extents[:, 0] - index.xMin) / index.cellSize), 0, index.nCols - 1).astype(np.int64)
+    r0 = np.clip(np.floor((extents[:, 1] - index.yMin) / index.cellSize), 0, index.nRows - 1).astype(np.int64)
+    c1 = np.clip(np.floor((extents[:, 2] - index.xMin) / index.cellSize), 0, index.nCols - 1).astype(np.int64)
+    r1 = np.clip(np.floor((extents[:, 3] - index.yMin) / index.cellSize), 0, index.nRows - 1).astype(np.int64)
+
+    return c0, r0, c1, r1
+
+def gridIndex(extents, ids=None, cellSize=None):
+    """Uniform grid index over extents; the cell size defaults to about CELL_ITEMS features per cell"""
+
+    extents = np.asarray(extents, dtype=np.float64).reshape(-1, 4)
+    n = len(extents)
+    ids = np.arange(n) if ids is None else np.asarray(ids)
+    if n == 0:
+        return GridIndex(ids, extents, 0.0, 0.0, 1.0, 1, 1, np.zeros(2, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    xMin, yMin = extents[:, 0].min(), extents[:, 1].min()
+    width = max(extents[:, 2].max() - xMin, 0.0)
+    height = max(extents[:, 3].max() - yMin, 0.0)
+    if cellSize is None:
+        # Cells no smaller than a typical feature so features touch few cells
+        featureSize = np.median(np.maximum(extents[:, 2] - extents[:, 0], extents[:, 3] - extents[:, 1]))
+        cellSize = max(np.sqrt(max(width * height, 1e-12) * CELL_ITEMS / n), featureSize, 1e-9)
+    nCols = int(width // cellSize) + 1
+    nRows = int(height // cellSize) + 1
+
+    index = GridIndex(ids, extents, xMin, yMin, float(cellSize), nCols, nRows, None, None)
+    c0, r0, c1, r1 = _cellRanges(index, extents)
+
+    # One (cell, item) pair for every cell an extent touches
+    cols = c1 - c0 + 1
+    counts = cols * (r1 - r0 + 1)
+    item = np.repeat(np.arange(n), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell = (r0[item] + k // cols[item]) * nCols + c0[item] + k % cols[item]
+
+    order = np.argsort(cell, kind="stable")
+    cellStart = np.zeros(nCols * nRows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cell, minlength=nCols * nRows), out=cellStart[1:])
+
+    return index._replace(cellStart=cellStart, items=item[order])
+
+def overlapPairs(index, boxes, unique=False):
+    """(box, item) pairs of query boxes and the indexed extents sharing a grid cell with them
+
+    Candidates for an exact test; an item spanning several cells a box
+    touches is listed once per cell unless unique is set.
+    """
+
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    xMax = index.xMin + index.nCols * index.cellSize
+    yMax = index.yMin + index.nRows * index.cellSize
+    onGrid = np.flatnonzero((boxes[:, 2] >= index.xMin) & (boxes[:, 0] <= xMax) & (boxes[:, 3] >= index.yMin) & (boxes[:, 1] <= yMax))
+    c0, r0, c1, r1 = _cellRanges(index, boxes[onGrid])
+
+    # (box, cell) pairs, then (box, item) pairs through the cell runs of items
+    cols = c1 - c0 + 1
+    counts = cols * (r1 - r0 + 1)
+    box = np.repeat(np.arange(len(onGrid)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell = (r0[box] + k // cols[box]) * index.nCols + c0[box] + k % cols[box]
+
+    start = index.cellStart[cell]
+    counts = index.cellStart[cell + 1] - start
+    pair = np.repeat(np.arange(len(cell)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    query, item = onGrid[box[pair]], index.items[start[pair] + k]
+
+    if unique and len(query):
+        key = np.unique(query * len(index.extents) + item)
+        query, item = key // len(index.extents), key % len(index.extents)
+
+    return query, item
+
+def boxOffsets(queries, extents):
+    """Distance and azimuth between the nearest points of paired extents"""
+
+    dx = np.maximum(extents[:, 0] - queries[:, 2], 0) - np.maximum(queries[:, 0] - extents[:, 2], 0)
+    dy = np.maximum(extents[:, 1] - queries[:, 3], 0) - np.maximum(queries[:, 1] - extents[:, 3], 0)
+
+    return np.hypot(dx, dy), np.degrees(np.arctan2(dx, dy))
+
+def inCones(azimuth, cones):
+    """True where an azimuth lies inside any of the open (low, high) angle ranges, which may wrap past 180"""
+
+    inside = np.zeros(np.shape(azimuth), dtype=bool)
+    for low, high in cones:
+        offset = np.mod(azimuth - low, 360)
+        inside |= (offset > 0) & (offset < high - low)
+
+    return inside
+
+def _ringCells(index, c0, r0, c1, r1, d):
+    """Cells of the ring d cells out from each block of cells; returns (query, cell) pairs inside the grid"""
+
+    x0, y0, x1, y1 = c0 - d, r0 - d, c1 + d, r1 + d
+    w = x1 - x0 + 1
+    h = y1 - y0 + 1
+    if d == 0:
+        counts = w * h
+    else:
+        counts = 2 * w + 2 * (h - 2)
+
+    query = np.repeat(np.arange(len(c0)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    wq, hq = w[query], h[query]
+    if d == 0:
+        col, row = x0[query] + k % wq, y0[query] + k // wq
+    else:
+        # Bottom and top rows of the ring, then its left and right columns
+        side = k - 2 * wq
+        edge = k < 2 * wq
+        col = np.where(edge, x0[query] + k % wq, np.where(side % 2 == 0, x0[query], x1[query]))
+        row = np.where(edge, np.where(k < wq, y0[query], y1[query]), y0[query] + 1 + side // 2)
+
+    inside = (col >= 0) & (col < index.nCols) & (row >= 0) & (row < index.nRows)
+
+    return query[inside], row[inside] * index.nCols + col[inside]
+
+def nearest(index, queries, k=1, maxDistance=np.inf, selfJoin=False, cones=None):
+    """The k nearest features of every query extent
+
+    With selfJoin the queries are the indexed features themselves, which
+    are not their own neighbors. With cones only features whose azimuth
+    lies inside one of the (low, high) angle ranges are neighbors, so a
+    directional query finds the nearest feature to the east, west, north
+    or south however far it is; queries without a neighbor in the cones
+    search the whole grid unless maxDistance is given. Returns (near, distance) arrays of shape
+    (queries, k), nearest first, with -1 and inf where there are fewer
+    than k neighbors; near indexes index.extents.
+    """
+
+    queries = np.asarray(queries, dtype=np.float64).reshape(-1, 4)
+    m = len(queries)
+    bestNear = np.full((m, k), -1, dtype=np.int64)
+    bestDist = np.full((m, k), np.inf)
+    if m == 0 or len(index.extents) == 0:
+        return bestNear, bestDist
+
+    c0, r0, c1, r1 = _cellRanges(index, queries)
+    ic0, ir0, ic1, ir1 = _cellRanges(index, index.extents)
+    multiCell = bool(np.any((ic0 != ic1) | (ir0 != ir1)))
+    active = np.arange(m)
+    d = 0
+    while len(active):
+        query, cell = _ringCells(index, c0[active], r0[active], c1[active], r1[active], d)
+        counts = index.cellStart[cell + 1] - index.cellStart[cell]
+        q = active[np.repeat(query, counts)]
+        j = index.items[np.repeat(index.cellStart[cell], counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+
+        # Features touching the inner block were found on an earlier ring
+        if d > 0 and multiCell:
+            seen = ((ic1[j] >= c0[q] - d + 1) & (ic0[j] <= c1[q] + d - 1) & (ir1[j] >= r0[q] - d + 1) & (ir0[j] <= r1[q] + d - 1))
+            q, j = q[~seen], j[~seen]
+        if multiCell:
+            pairs = np.unique(q * len(index.extents) + j)
+            q, j = pairs // len(index.extents), pairs % len(index.extents)
+
+        dist, azimuth = boxOffsets(queries[q], index.extents[j])
+        keep = dist <= maxDistance
+        if selfJoin:
+            keep &= q != j
+        if cones is not None:
+            keep &= inCones(azimuth, cones)
+        q, j, dist = q[keep], j[keep], dist[keep]
+
+        if len(q):
+            # Merge the ring's neighbors into the k best of each query; q is sorted
+            found = q[np.r_[True, q[1:] != q[:-1]]]
+            allQ = np.r_[np.repeat(found, k), q]
+            allJ = np.r_[bestNear[found].ravel(), j]
+            allD = np.r_[bestDist[found].ravel(), dist]
+            # Sort by query then distance through one integer key, cheaper than a two-key lexsort
+            distRank = np.empty(len(allD), dtype=np.int64)
+            distRank[np.argsort(allD)] = np.arange(len(allD))
+            order = np.argsort(allQ * len(allD) + distRank)
+            allQ, allJ, allD = allQ[order], allJ[order], allD[order]
+            starts = np.flatnonzero(np.r_[True, allQ[1:] != allQ[:-1]])
+            rank = np.arange(len(allQ)) - np.repeat(starts, np.diff(np.r_[starts, len(allQ)]))
+            top = rank < k
+            bestNear[allQ[top], rank[top]] = allJ[top]
+            bestDist[allQ[top], rank[top]] = allD[top]
+
+        # Unseen features lie beyond a side of the block of cells searched so far that is inside the grid
+        left, bottom = c0[active] - d <= 0, r0[active] - d <= 0
+        right, top = c1[active] + d >= index.nCols - 1, r1[active] + d >= index.nRows - 1
+        bound = np.minimum.reduce([np.where(left, np.inf, queries[active, 0] - (index.xMin + (c0[active] - d) * index.cellSize)),
+                                   np.where(right, np.inf, index.xMin + (c1[active] + d + 1) * index.cellSize - queries[active, 2]),
+                                   np.where(bottom, np.inf, queries[active, 1] - (index.yMin + (r0[active] - d) * index.cellSize)),
+                                   np.where(top, np.inf, index.yMin + (r1[active] + d + 1) * index.cellSize - queries[active, 3])])
+        done = (left & right & bottom & top) | (bestDist[active, -1] <= bound) | (bound > maxDistance)
+        active = active[~done]
+        d += 1
+
+    return bestNear, bestDist
+
+def coneNearest(index, queries, cones, k=None, maxDistance=np.inf, selfJoin=False):
+    """Nearest feature of every query inside the angle cones
+
+    With k the neighbor is taken from the k nearest features only, as the
+    angle filters of a k-closest near table did. Returns (near, distance)
+    with -1 and inf where there is none.
+    """
+
+    if k is None:
+        near, dist = nearest(index, queries, 1, maxDistance, selfJoin, cones)
+        return near[:, 0], dist[:, 0]
+
+    queries = np.asarray(queries, dtype=np.float64).reshape(-1, 4)
+    near, dist = nearest(index, queries, k, maxDistance, selfJoin)
+    found = near >= 0
+    azimuth = np.zeros(near.shape)
+    azimuth[found] = boxOffsets(np.repeat(queries, k, axis=0)[found.ravel()], index.extents[near[found]])[1]
+    inside = found & inCones(azimuth, cones)
+
+    # Neighbors are sorted by distance, so the first inside the cones is the nearest
+    first = np.argmax(inside, axis=1)
+    hit = inside[np.arange(len(near)), first]
+
+    return np.where(hit, near[np.arange(len(near)), first], -1), np.where(hit, dist[np.arange(len(near)), first], np.inf)
+
+def featureExtents(featureClass, where=None):
+    """Object IDs and extents of the features of a feature class in one columnar read"""
+    from rowGeometry import readRowVertices, packedExtents
+
+    oids, xy, offsets = readRowVertices(featureClass, where)
+
+    return oids, packedExtents(xy, offsets)
+
+def sessionIndex(featureClass, where=None):
+    """Grid index of a feature class, built once per session and rebuilt when its count or extent changes"""
+    import arcpy
+
+    featureClass = str(featureClass)
+    extent = arcpy.Describe(featureClass).extent
+    signature = (int(arcpy.management.GetCount(featureClass)[0]), extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+
+    key = (arcpy.Describe(featureClass).catalogPath, where)
+    cached = _sessionIndexes.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    oids, extents = featureExtents(featureClass, where)
+    index = gridIndex(extents, oids)
+    _sessionIndexes[key] = (signature, index)
+
+    return index
+
+def nearestTable(featureClass, outTable, cones, k=None, field="NEAR_DIST"):
+    """Table of the nearest other feature inside the angle cones of every feature of a feature class
+
+    Replacement for a GenerateNearTable of a feature class on itself, the
+    angle filter and the MIN NEAR_DIST statistics by IN_FID. Features
+    without a neighbor in the cones are left out. Returns outTable with
+    IN_FID, NEAR_FID and the distance as field.
+    """
+    import arcpy
+
+    index = sessionIndex(featureClass)
+    near, dist = coneNearest(index, index.extents, cones, k, selfJoin=True)
+    found = near >= 0
+
+    records = np.zeros(int(found.sum()), dtype=[("IN_FID", np.int32), ("NEAR_FID", np.int32), (field, np.float64)])
+    records["IN_FID"] = index.ids[found]
+    records["NEAR_FID"] = index.ids[near[found]]
+    records[field] = dist[found]
+    if arcpy.Exists(outTable):
+        arcpy.management.Delete(outTable)
+    arcpy.da.NumPyArrayToTable(records, outTable)
+
+    return outTable
+
+def nearestDistance(featureClass):
+    """Smallest distance between any two features of a feature class, the MIN NEAR_DIST of its near table"""
+
+    index = sessionIndex(featureClass)
+    dist = nearest(index, index.extents, 1, selfJoin=True)[1]
+
+    return float(dist.min()) if len(dist) else np.nan
+
+def nearValues(inFeatures, nearFeatures, valueField, cones=None, k=None, maxDistance=np.inf, distanceUnit=None):
+    """Value of the nearest near feature of every input feature, in place of Near and a JoinField by NEAR_FID
+
+    The nearest feature lies within maxDistance map units and inside the
+    angle cones if given, from the k nearest only if k is given. Returns
+    (object IDs, values, NEAR_FID, NEAR_DIST) of the input features with
+    NaN values and -1 NEAR_FID and NEAR_DIST where there is none, as Near
+    leaves them. NEAR_DIST is in map units or in distanceUnit ("Feet",
+    "Meters") if given.
+    """
+    import arcpy
+    from rasterArrays import UNIT_METERS
+
+    index = sessionIndex(nearFeatures)
+    oids, queries = featureExtents(inFeatures)
+    selfJoin = arcpy.Describe(str(inFeatures)).catalogPath == arcpy.Describe(str(nearFeatures)).catalogPath
+    if cones is None:
+        near, dist = nearest(index, queries, 1, maxDistance, selfJoin)
+        near, dist = near[:, 0], dist[:, 0]
+    else:
+        near, dist = coneNearest(index, queries, cones, k, maxDistance, selfJoin)
+
+    values = arcpy.da.FeatureClassToNumPyArray(str(nearFeatures), ["OID@", valueField], null_value={valueField: np.nan})
+    lookup = dict(zip(values["OID@"].tolist(), values[valueField].astype(np.float64).tolist()))
+    found = near >= 0
+    nearFID = np.where(found, index.ids[np.maximum(near, 0)] if len(index.ids) else -1, -1)
+    nearValue = np.array([lookup.get(fid, np.nan) if hit else np.nan for fid, hit in zip(nearFID.tolist(), found.tolist())], dtype=np.float64)
+
+    if distanceUnit:
+        dist = dist * arcpy.Describe(str(nearFeatures)).spatialReference.metersPerUnit / UNIT_METERS[distanceUnit.lower()]
+
+    return oids, nearValue, nearFID, np.where(found, dist, -1.0)
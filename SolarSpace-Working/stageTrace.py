@@ -0,0 +1,301 @@
+########################################################################
+"""TOOL STAGE TRACE
+
+Per-stage timing and memory profile of a tool run, turned on with
+SOLARSPACE_TRACE=1. The tools mark their stages with arcpy.SetProgressor;
+while a run is traced those calls also close the current stage and open
+the next one, named by the progressor label. Each stage records its wall
+time, CPU time and peak resident memory (sampled on a background thread).
+The growth of the workspace on disk is measured over the whole run, and
+per stage as well with SOLARSPACE_TRACE_BYTES=1, since each measurement
+walks the workspace folder. The run is written as a Chrome trace
+(chrome://tracing or ui.perfetto.dev) beside the workspace and
+summarized in the messages.
+
+Revision log
+0.0.1 - 10/17/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Tracing opt-in, memory reader resolved once, workspace size per stage only on request
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.2"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import contextlib
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# Seconds between memory samples; set SOLARSPACE_TRACE=1 to trace tool runs, SOLARSPACE_TRACE_BYTES=1 to size the workspace per stage
+SAMPLE_INTERVAL = 0.05
+TRACE_ENV = "SOLARSPACE_TRACE"
+TRACE_BYTES_ENV = "SOLARSPACE_TRACE_BYTES"
+
+# bytesWritten is None unless the workspace is sized per stage
+StageRecord = namedtuple("StageRecord", ["name", "start", "wall", "cpu", "peakRSS", "bytesWritten"])
+
+def _psutilRSS():
+    """Resident memory reader from psutil, None if it is not installed"""
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    process = psutil.Process()
+
+    return lambda: process.memory_info().rss
+
+def _windowsRSS():
+    """Resident memory reader from GetProcessMemoryInfo"""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD), ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t), ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t), ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t), ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+
+    def read():
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+
+    return read
+
+def _statmRSS():
+    """Resident memory reader from /proc/self/statm"""
+
+    def read():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    return read
+
+def rssReader():
+    """Resident memory reader of this platform: psutil where installed, otherwise the operating system's counters"""
+
+    reader = _psutilRSS()
+    if reader is None:
+        reader = _windowsRSS() if sys.platform == "win32" else _statmRSS()
+
+    return reader
+
+# Chosen once at import so the sampler does not look for psutil at every sample
+_readRSS = rssReader()
+
+def currentRSS():
+    """Resident memory of this process in bytes, None where it cannot be read"""
+
+    return _readRSS()
+
+def folderBytes(folder):
+    """Total size in bytes of the files under a folder"""
+
+    total = 0
+    if not folder or not os.path.isdir(folder):
+        return total
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+
+    return total
+
+class MemorySampler(threading.Thread):
+    """Background thread sampling the resident memory and keeping the peak since the last reset"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        threading.Thread.__init__(self, daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.peak = 0
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def sample(self):
+        rss = currentRSS()
+        if rss is not None:
+            with self._lock:
+                self.samples.append((time.perf_counter(), rss))
+                self.peak = max(self.peak, rss)
+
+    def resetPeak(self):
+        """Peak since the last reset, starting the next from the current memory"""
+
+        self.sample()
+        with self._lock:
+            peak = self.peak
+            self.peak = self.samples[-1][1] if self.samples else 0
+
+        return peak
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+
+class StageTrace(object):
+    """Wall time, CPU time and peak memory of the stages of a run and the workspace growth of the run
+
+    The workspace is sized at the start and end of the run, and at every
+    stage boundary only when stageBytes is set.
+    """
+
+    def __init__(self, name, workspace=None, interval=SAMPLE_INTERVAL, stageBytes=False):
+        self.name = name
+        self.workspace = workspace
+        self.stageBytes = stageBytes
+        self.stages = []
+        self.bytesWritten = None
+        self.startBytes = folderBytes(workspace)
+        self.origin = time.perf_counter()
+        self.started = datetime.datetime.now()
+        self.sampler = MemorySampler(interval)
+        self.sampler.start()
+        self._open("setup")
+
+    def _open(self, label, size=None):
+        self._label = label
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._bytes = size if size is not None else self.startBytes
+        self.sampler.resetPeak()
+
+    def _close(self):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        size = folderBytes(self.workspace) if self.stageBytes else None
+        self.stages.append(StageRecord(self._label, self._wall - self.origin, wall, cpu, self.sampler.resetPeak(),
+                                       None if size is None else size - self._bytes))
+
+        return size
+
+    def stage(self, label):
+        """End the current stage and start the next"""
+
+        self._open(str(label), self._close())
+
+    def finish(self):
+        """End the last stage and stop sampling"""
+
+        self._close()
+        self.sampler.stop()
+        self.sampler.join()
+        self.bytesWritten = folderBytes(self.workspace) - self.startBytes
+
+        return self.stages
+
+    def chromeTrace(self):
+        """Stages as complete events and memory samples as a counter, in Chrome trace format"""
+
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        for s in self.stages:
+            events.append({"name": s.name, "cat": "stage", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": s.start * 1e6, "dur": s.wall * 1e6,
+                           "args": {"cpu_s": round(s.cpu, 6), "peak_rss_mb": round(s.peakRSS / 1024.0 ** 2, 3),
+                                    "bytes_written": s.bytesWritten}})
+        for t, rss in self.sampler.samples:
+            events.append({"name": "memory", "ph": "C", "pid": pid, "tid": 0, "ts": (t - self.origin) * 1e6,
+                           "args": {"rss_mb": round(rss / 1024.0 ** 2, 3)}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"tool": self.name, "started": self.started.isoformat(), "workspace": self.workspace,
+                              "bytes_written": self.bytesWritten}}
+
+    def write(self, path):
+        """Write the Chrome trace JSON file"""
+
+        with open(path, "w") as f:
+            json.dump(self.chromeTrace(), f)
+
+        return path
+
+    def summary(self):
+        """Lines of a per-stage table with each stage's share of the run"""
+
+        total = sum(s.wall for s in self.stages) or 1.0
+        lines = ["{:<60}{:>10}{:>7}{:>10}{:>12}{:>12}".format("Stage", "Wall s", "%", "CPU s", "Peak MB", "Written MB")]
+        for s in self.stages:
+            written = "-" if s.bytesWritten is None else "{:.1f}".format(s.bytesWritten / 1024.0 ** 2)
+            lines.append("{:<60}{:>10.2f}{:>7.1f}{:>10.2f}{:>12.1f}{:>12}".format(
+                s.name[:59], s.wall, 100.0 * s.wall / total, s.cpu, s.peakRSS / 1024.0 ** 2, written))
+        if self.bytesWritten is not None:
+            lines.append("{:<60}{:>10.2f}{:>7}{:>10}{:>12}{:>12.1f}".format(
+                "Run", sum(s.wall for s in self.stages), "", "", "", self.bytesWritten / 1024.0 ** 2))
+
+        return lines
+
+def envFlag(name):
+    """True when an environment variable is set to 1, true, on or yes"""
+
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "on", "yes")
+
+def tracingEnabled():
+    """Tracing is off unless SOLARSPACE_TRACE is 1, true, on or yes"""
+
+    return envFlag(TRACE_ENV)
+
+@contextlib.contextmanager
+def tracedProgressor(trace):
+    """Open a new stage of the trace at every arcpy.SetProgressor label while in the context"""
+    import arcpy
+
+    setProgressor, resetProgressor = arcpy.SetProgressor, arcpy.ResetProgressor
+
+    def tracedSetProgressor(type="default", message="", *args, **kwargs):
+        trace.stage(message or type)
+        return setProgressor(type, message, *args, **kwargs)
+
+    def tracedResetProgressor():
+        trace.stage("(no progressor)")
+        return resetProgressor()
+
+    arcpy.SetProgressor, arcpy.ResetProgressor = tracedSetProgressor, tracedResetProgressor
+    try:
+        yield trace
+    finally:
+        arcpy.SetProgressor, arcpy.ResetProgressor = setProgressor, resetProgressor
+
+def tracedExecute(name, execute, parameters, messages):
+    """Run a tool's execute, with its stages traced when tracing is on; the trace is written beside the workspace"""
+    import arcpy
+
+    if not tracingEnabled():
+        return execute(parameters, messages)
+
+    workspace = arcpy.env.workspace
+    trace = StageTrace(name, workspace, stageBytes=envFlag(TRACE_BYTES_ENV))
+    try:
+        with tracedProgressor(trace):
+            return execute(parameters, messages)
+    finally:
+        trace.finish()
+        try:
+            folder = os.path.dirname(workspace) if workspace else arcpy.env.scratchFolder
+            path = trace.write(os.path.join(folder, "{}_{}.trace.json".format(name, trace.started.strftime("%Y%m%d_%H%M%S"))))
+            arcpy.AddMessage("Stage trace written to " + path)
+            for line in trace.summary():
+                arcpy.AddMessage(line)
+        except Exception as e:
+            arcpy.AddWarning("Stage trace not written: " + str(e))
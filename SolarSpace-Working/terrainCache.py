@@ -0,0 +1,192 @@
+########################################################################
+"""TERRAIN PRODUCT CACHE
+
+Content-addressed cache of derived terrain products (aspect, slope,
+surface parameters, focal statistics and the terrain following surfaces)
+shared by the tools of a project. A product is keyed by a digest of the
+input surface's cell values, grid and spatial reference together with the
+operation, its parameters and the extent, cell size and mask environments, so a second tool run on the same DEM with
+the same kernel, neighborhood, z-unit or window reads the product back
+instead of redoing the surface analysis. Products are stored as
+compressed tiles and the least recently used are evicted when the cache
+grows past its size cap.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Keys include the extent, cell size and mask environments; cache beside the scratch folder without a workspace; dropped the unused raster wrapper
+0.0.3 - 10/17/2026 - Digest of a surface read strip by strip
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from rasterArrays import RasterGrid
+
+# Size cap of the cache folder in MB and the edge of the compressed tiles in cells
+TERRAIN_CACHE_MB = 4096
+CACHE_TILE = 1024
+
+def _surfaceDigest(grid, spatialRef):
+    """Digest started with a surface's grid and spatial reference name"""
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((tuple(float(v) for v in grid), str(spatialRef))).encode())
+
+    return digest
+
+def stripDigest(readRows, nRows, grid, spatialRef="", chunkRows=1024):
+    """Digest of a surface's cell values, grid and spatial reference, with readRows(r0, r1) returning a chunk of rows at a time"""
+
+    digest = _surfaceDigest(grid, spatialRef)
+    for r0 in range(0, nRows, chunkRows):
+        digest.update(np.ascontiguousarray(readRows(r0, min(r0 + chunkRows, nRows)), dtype=np.float32).tobytes())
+
+    return digest.hexdigest()
+
+def arrayDigest(array, grid, spatialRef="", chunkRows=1024):
+    """Digest of an array's cell values, grid and spatial reference, read a chunk of rows at a time"""
+
+    return stripDigest(lambda r0, r1: array[r0:r1], array.shape[0], grid, spatialRef, chunkRows)
+
+def productKey(surfaceDigests, operation, params, environment=None):
+    """Cache key of an operation and its parameters on one or more surface digests and the analysis environment"""
+
+    text = json.dumps({"surfaces": surfaceDigests, "operation": operation, "params": params, "environment": environment},
+                      sort_keys=True, default=str)
+
+    return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+def _productTiles(shape, tile=CACHE_TILE):
+    """Windows (r0, r1, c0, c1) of the compressed tiles of a product"""
+
+    return [(r0, min(r0 + tile, shape[0]), c0, min(c0 + tile, shape[1]))
+            for r0 in range(0, shape[0], tile) for c0 in range(0, shape[1], tile)]
+
+def _productSize(path):
+    """Bytes on disk of a cached product"""
+
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+def evictProducts(folder, maxBytes, keep=None):
+    """Delete the least recently used products until the cache fits in maxBytes; returns the bytes freed"""
+
+    products = []
+    for name in os.listdir(folder):
+        meta = os.path.join(folder, name, "product.npz")
+        if os.path.exists(meta):
+            products.append((os.path.getmtime(meta), _productSize(os.path.join(folder, name)), name))
+    products.sort()
+
+    total = sum(size for mtime, size, name in products)
+    freed = 0
+    for mtime, size, name in products:
+        if total - freed <= maxBytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(folder, name), ignore_errors=True)
+        freed += size
+
+    return freed
+
+def storeProduct(folder, key, arrays, grid, maxMB=TERRAIN_CACHE_MB):
+    """Write a product's arrays as compressed tiles under its key and evict down to the size cap
+
+    The tiles are written to a staging folder first so a partly written
+    product is never read back.
+    """
+
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    target = os.path.join(folder, key)
+    if os.path.exists(target):
+        return target
+
+    staging = tempfile.mkdtemp(dir=folder, prefix="staging_")
+    for r0, r1, c0, c1 in _productTiles(arrays[0].shape):
+        np.savez_compressed(os.path.join(staging, "tile_%d_%d.npz" % (r0, c0)), *[np.asarray(a[r0:r1, c0:c1]) for a in arrays])
+    np.savez(os.path.join(staging, "product.npz"), grid=np.array(grid, dtype=np.float64), count=len(arrays))
+
+    try:
+        os.rename(staging, target)
+    except OSError:
+        # Another run stored the same product first
+        shutil.rmtree(staging, ignore_errors=True)
+
+    evictProducts(folder, maxMB * 2 ** 20, keep=key)
+
+    return target
+
+def loadProduct(folder, key, outFolder):
+    """Unpack a cached product into memory-mapped arrays in outFolder
+
+    Returns (arrays, grid), or None if the product is not cached. Reading a
+    product marks it as recently used.
+    """
+    from tiledRaster import createMemmap
+
+    path = os.path.join(folder, key)
+    meta = os.path.join(path, "product.npz")
+    if not os.path.exists(meta):
+        return None
+
+    with np.load(meta) as data:
+        values = data["grid"]
+        count = int(data["count"])
+    grid = RasterGrid(values[0], values[1], values[2], int(values[3]), int(values[4]))
+
+    arrays = [createMemmap(os.path.join(outFolder, "%s_%d.npy" % (key, i)), (grid.nRows, grid.nCols)) for i in range(count)]
+    for r0, r1, c0, c1 in _productTiles((grid.nRows, grid.nCols)):
+        with np.load(os.path.join(path, "tile_%d_%d.npz" % (r0, c0))) as data:
+            for i in range(count):
+                arrays[i][r0:r1, c0:c1] = data["arr_%d" % i]
+    for array in arrays:
+        array.flush()
+    os.utime(meta)
+
+    return arrays, grid
+
+def cachedArrays(inputs, grid, operation, params, outFolder, compute, cacheFolder=None, spatialRef=""):
+    """Output arrays of an operation on input arrays, from the cache when the inputs and parameters match
+
+    compute() is called on a cache miss and returns the list of output
+    arrays on the grid, which are then stored.
+    """
+
+    if cacheFolder is None:
+        cacheFolder = terrainCacheFolder()
+    key = productKey([arrayDigest(a, grid, spatialRef) for a in inputs], operation, params, analysisEnvironment())
+
+    cached = loadProduct(cacheFolder, key, outFolder)
+    if cached is not None:
+        return cached[0]
+
+    arrays = compute()
+    storeProduct(cacheFolder, key, arrays, grid)
+
+    return arrays
+
+def terrainCacheFolder():
+    """Cache folder shared by the tools of a project, beside the workspace geodatabase"""
+    import arcpy
+
+    if arcpy.env.workspace:
+        return os.path.join(os.path.dirname(arcpy.env.workspace), "terrainCache")
+
+    return os.path.join(arcpy.env.scratchFolder, "terrainCache")
+
+def analysisEnvironment():
+    """Extent, cell size and mask settings that shape the products of a tool run"""
+    import arcpy
+
+    return {"extent": str(arcpy.env.extent), "cellSize": str(arcpy.env.cellSize), "mask": str(arcpy.env.mask)}
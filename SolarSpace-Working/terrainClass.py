@@ -3,12 +3,13 @@
 
 Revision log
 0.0.1 - 04/19/2024 - Initial scripting
+0.0.2 - 10/16/2026 - Focal mean and standard deviation computed with the shared summed-area table kernel
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "0.0.1"
+__version__     = "0.0.2"
 __license__     = "Internal"
 __ArcVersion__  = "ArcPro 3.1.0"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist", "Liza Flowers"]
@@ -19,6 +20,7 @@ import math
 from arcpy.sa import *
 import os
 import sys
+from focalStats import focalRaster
 
 class terrainClass(object):
     def __init__(self):
@@ -103,8 +105,8 @@ class terrainClass(object):
         demClip = arcpy.management.Clip(demInput, "", 'in_memory\demClip', aoi_buffer, "", "ClippingGeometry")
 
         # Take the focal statistics mean and standard deviation of the raster with a rectangale of 30 ft
-        elv_STD = arcpy.sa.FocalStatistics(demClip, "Rectangle 30 30 MAP", "STD", "DATA")
-        elv_mean = arcpy.sa.FocalStatistics(demClip, "Rectangle 30 30 MAP", "MEAN", "DATA")
+        elv_STD = focalRaster(demClip, "Rectangle 30 30 MAP", "STD")
+        elv_mean = focalRaster(demClip, "Rectangle 30 30 MAP", "MEAN")
 
         # Subtract the elevation from the mean
         dem_mean = arcpy.sa.Minus(demClip, elv_mean)
@@ -0,0 +1,157 @@
+########################################################################
+"""TERRAIN FOLLOWING GRADING ENGINE
+
+Array-resident version of the five t1-t5 iterations in the SAT Terrain
+Following Tracker Grading Analysis. Every iteration runs on float32
+NumPy arrays with no intermediate geodatabase rasters, so the chain can
+be run and benchmarked headless on synthetic DEMs.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Grading band applied with the fused band clamp kernel
+0.0.3 - 10/16/2026 - Added the tile pipeline and halo for tiled runs
+0.0.4 - 10/16/2026 - North-south slope from the shared directional slope kernel
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.4"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import math
+import numpy as np
+from focalStats import windowCells, focalMean, focalMax
+from gradeBand import bandClamp
+from slopeKernels import quadraticGradient, directionalSlope
+
+# Working memory of terrainFollowingTile per tile cell in bytes; tiledRaster.tileCellBytes measures 117
+TILE_CELL_BYTES = 128
+
+def iterationLengths(tracker_length, maxHalfRow, maxPileSpan):
+    """Window lengths of the five iterations"""
+
+    return [float(tracker_length),
+            float(tracker_length) * .75,
+            float(maxHalfRow),
+            float(maxHalfRow) * 0.5,
+            float(maxPileSpan)]
+
+def iterationRanges(lengths, pilesRow, maxAngleSpan, maxHalfRow, maxAngleHalfRow, deflectionTolerance, safetyFactor, revWindow):
+    """Allowable grading range of each iteration from the chord height of the tracker deflection"""
+
+    ranges = []
+    spanAngle = (int(pilesRow) - 1) * float(maxAngleSpan)
+    for tLength in lengths:
+        halfRowAngle = tLength / float(maxHalfRow) * float(maxAngleHalfRow)
+
+        # Limit the deflection to whichever of the pile span or half row angles governs
+        if spanAngle > halfRowAngle:
+            theta = halfRowAngle * float(deflectionTolerance) / 2
+        else:
+            theta = spanAngle * float(deflectionTolerance) / 2
+
+        r = tLength / (2 * math.sin(theta * math.pi / 180))
+        d = math.sqrt(r**2 - tLength**2 / 4)
+        h = r - d + float(revWindow)
+        ranges.append(h * float(safetyFactor))
+
+    return ranges
+
+def _nsSlopePercent(surface, cellSize):
+    """North-south slope as the tangent of the aspect-projected slope angle
+
+    Uses the 3x3 quadratic surface fit of SurfaceParameters; edges are
+    padded with the nearest cell.
+    """
+
+    dzdx, dzdy = quadraticGradient(surface, cellSize)
+
+    return np.tan(directionalSlope(dzdx, dzdy, "Radians")[0])
+
+def gradeIteration(surface, northing, cellSize, analysisWidth, tLength, tRange, maxMean="MEAN", lowerLimit=None, origin=(0, 0)):
+    """Run one terrain following iteration
+
+    Returns the graded surface and the lower limit of the grading band.
+    If lowerLimit is given it is used in place of this iteration's own
+    lower limit. origin is the raster (row, column) of the first cell
+    when the arrays are a tile.
+    """
+
+    nAcross = windowCells(analysisWidth, cellSize)
+    nAlong = windowCells(tLength, cellSize)
+
+    # Local trend of the surface along the row
+    demFocal = focalMean(surface, nAlong, nAcross, origin)
+    nsFocal = focalMean(_nsSlopePercent(surface, cellSize), nAlong, nAcross, origin)
+    yFocal = focalMean(northing, nAlong, nAcross, origin)
+
+    intB = demFocal - nsFocal * yFocal
+    tPrelim = nsFocal * northing + intB
+    trendDem = tPrelim - surface
+
+    # Initial grade across the row width
+    if maxMean == "MAXIMUM":
+        initGrade = focalMax(trendDem, nAcross, nAcross)
+    else:
+        initGrade = focalMean(trendDem, nAcross, nAcross, origin)
+
+    # Mosaic SUM keeps the surface where the grade has no data
+    initSurface = surface + np.nan_to_num(initGrade)
+
+    revToleranceHalf = float(tRange) / 2
+    if lowerLimit is None:
+        lowerLimit = initSurface - np.float32(revToleranceHalf)
+    tSurface = bandClamp(surface, initSurface, revToleranceHalf, lowerLimit)[0]
+
+    return tSurface, lowerLimit
+
+def terrainFollowingSurfaces(dem, northing, cellSize, analysisWidth, lengths, ranges, maxMean="MEAN", origin=(0, 0)):
+    """Run the t1-t5 iteration chain and return the list of surfaces"""
+
+    surface = dem.astype(np.float32, copy=False)
+    northing = northing.astype(np.float32, copy=False)
+
+    surfaces = []
+    lowerLimits = []
+    for i, (tLength, tRange) in enumerate(zip(lengths, ranges)):
+        # The t3 band is bounded below by the t2 lower limit, matching the geoprocessing chain
+        lowerLimit = lowerLimits[1] if i == 2 else None
+        surface, lowerLimit = gradeIteration(surface, northing, cellSize, analysisWidth, tLength, tRange, maxMean, lowerLimit, origin)
+        surfaces.append(surface)
+        lowerLimits.append(lowerLimit)
+
+    return surfaces
+
+def screenSurface(dem, surface, gradeMin):
+    """Keep the existing surface wherever grading is under the minimum grading depth"""
+
+    delta = surface - dem
+    keep = np.isnan(surface) | ((delta > -float(gradeMin)) & (delta < float(gradeMin)))
+
+    return np.where(keep, dem, surface).astype(np.float32)
+
+def iterationHalo(cellSize, analysisWidth, lengths):
+    """Halo (rows, columns) a tile needs for its core to match a full-raster run of the iteration chain
+
+    Each iteration reaches half its focal window, one cell for the slope
+    and half the initial grade window beyond the previous surface.
+    """
+
+    nAcross = windowCells(analysisWidth, cellSize)
+    haloRows = 0
+    haloCols = 0
+    for tLength in lengths:
+        nAlong = windowCells(tLength, cellSize)
+        haloRows += nAlong // 2 + 1 + nAcross // 2
+        haloCols += nAcross // 2 + 1 + nAcross // 2
+
+    return haloRows, haloCols
+
+def terrainFollowingTile(dem, northing, origin=(0, 0), cellSize=1.0, analysisWidth=1.0, lengths=(), ranges=(), maxMean="MEAN", gradeMin=0.0):
+    """Tile pipeline: the t1-t5 surfaces followed by the screened final surface"""
+
+    surfaces = terrainFollowingSurfaces(dem, northing, cellSize, analysisWidth, lengths, ranges, maxMean, origin)
+
+    return surfaces + [screenSurface(dem, surfaces[-1], gradeMin)]
@@ -6,12 +6,18 @@ Revision log
 1.0.0 - 08/10/2022 - Internal release
 1.1.0 - 03/30/2023 - Converted to PYT format, added external slope down 1 foot external/exposed rows, combined all terrain loss scripts into one
 2.0.0 - 12/12/2023 - Added ability for blocks and strings production calculations
+2.1.0 - 10/16/2026 - Slope statistics reduced with the zonal statistics engine
+2.2.0 - 10/16/2026 - Surface analysis read back from the shared terrain product cache when the DEM and parameters repeat
+2.3.0 - 10/16/2026 - North-south and east-west slopes from the directional slope kernel without the aspect and trig rasters
+2.4.0 - 10/16/2026 - Row corner and end points from one packed vertex array instead of per-vertex distance checks
+2.4.1 - 10/17/2026 - Slope back on the default neighborhood with "3 Feet" kept for the aspect only
+2.4.2 - 10/17/2026 - Slopes in the z unit of the DEM as the replaced surface analysis tools took it
 """
 
 __author__      = "Matthew Gagne"
 __copyright__   = "Copyright 2023, KiloNewton, LLC"
 __credits__     = ["Matthew Gagne", "Zane Nordquist", "John Williamson"]
-__version__     = "2.0.0"
+__version__     = "2.4.2"
 __license__     = "Internal"
 __ArcVersion__  = "ArcPro 3.1.0"
 __maintainer__  = ["Matthew Gagne", "Zane Nordquist"]
@@ -21,10 +27,12 @@ __status__      = "Deployed"
 import arcpy
 import os.path
 import sys
-import math
 from arcpy.sa import *
 from arcpy.ddd import *
 import numpy as np
+from zonalStats import zonalTables
+from slopeKernels import directionalSlopeRaster
+from rowGeometry import insertRowPoints
 
 class terrainLoss(object):
     def __init__(self):
@@ -418,42 +426,10 @@ class terrainLoss(object):
             gridRes = arcpy.Describe(demInput).meanCellWidth
             arcpy.env.snapRaster = demInput
 
-            # Process aspect
-            AspectDEM = arcpy.sa.SurfaceParameters(
-                in_raster=demInput,
-                parameter_type="ASPECT",
-                local_surface_type="QUADRATIC",
-                neighborhood_distance="3 Feet",
-                use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-                z_unit=xyzUnit,
-                output_slope_measurement="DEGREE",
-                project_geodesic_azimuths="GEODESIC_AZIMUTHS",
-                use_equatorial_aspect="NORTH_POLE_ASPECT",
-                in_analysis_mask=None
-            )
-
-            AspectRad = AspectDEM * math.pi / 180
-
-            # Process slope
-            terrainSlopeRaster = arcpy.sa.SurfaceParameters(
-                in_raster=demInput,
-                parameter_type="SLOPE",
-                local_surface_type="QUADRATIC",
-                use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-                z_unit=xyzUnit,
-                output_slope_measurement="DEGREE",
-                project_geodesic_azimuths="GEODESIC_AZIMUTHS",
-                use_equatorial_aspect="NORTH_POLE_ASPECT",
-                in_analysis_mask=None
-            )
-            
-            SlopeRad = terrainSlopeRaster * math.pi / 180
-
             # Process north-south and east-west slope in degrees
-            ewSlope = Sin(AspectRad) * SlopeRad * 180 / math.pi
-            nsSlope = Cos(AspectRad) * SlopeRad * 180 / math.pi
+            nsSlope, ewSlope = directionalSlopeRaster(demInput, "QUADRATIC", "Degrees", aspect_distance="3 Feet", zUnit=xyzUnit)
 
-            nsStats = arcpy.sa.ZonalStatisticsAsTable(poaNSInput,ns_ID,nsSlope,r"in_memory\nsStats","DATA","ALL")
+            nsStats = zonalTables(poaNSInput, ns_ID, {r"in_memory\nsStats": nsSlope})[0]
 
             if strings_or_rows == "Tracker rows":
                 arcpy.management.JoinField(prodRows,ns_ID,nsStats,ns_ID,[["MEAN"],["MAX"]])
@@ -471,85 +447,8 @@ class terrainLoss(object):
             arcpy.management.AddField(poaPoints, "PolygonOID", "LONG")
             arcpy.management.AddField(poaPoints, "Position", "TEXT")
 
-            result = arcpy.GetCount_management(rowsInput)
-            count = int(result.getOutput(0))
-
-            insert_cursor = arcpy.da.InsertCursor(poaPoints, ["SHAPE@", "PolygonOID", "Position"])
-            search_cursor = arcpy.da.SearchCursor(rowsInput, ["SHAPE@", "OID@"])
-
-            for row in search_cursor:
-                polygon_oid = str(row[1])
-
-                coordinateList = []
-                sw_dist = {}
-                se_dist = {}
-                nw_dist = {}
-                ne_dist = {}
-
-                for part in row[0]:
-                    for pnt in part:
-                        if pnt:
-                            coordinateList.append((pnt.X, pnt.Y))
-
-                # Find the extent of each row
-                rowExtent = row[0].extent
-
-                sw_coordinate = rowExtent.lowerLeft
-                se_coordinate = rowExtent.lowerRight
-                nw_coordinate = rowExtent.upperLeft
-                ne_coordinate = rowExtent.upperRight
-
-                sw_point = arcpy.PointGeometry(sw_coordinate)
-                se_point = arcpy.PointGeometry(se_coordinate)
-                nw_point = arcpy.PointGeometry(nw_coordinate)
-                ne_point = arcpy.PointGeometry(ne_coordinate)
-
-                # Find the vertex closest to each corner of the row extent
-                for vertex in coordinateList:
-                    vertex_coordinates = arcpy.Point(vertex[0], vertex[1])
-                    vertex_point = arcpy.PointGeometry(vertex_coordinates)
-                    sw_dist[float(sw_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                    se_dist[float(se_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                    nw_dist[float(nw_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-                    ne_dist[float(ne_point.distanceTo(vertex_point))] = (vertex[0], vertex[1])
-
-                #Calculates where quarter quarter sections would intersect polygon
-                swMinDist = min(sw_dist)
-                seMinDist = min(se_dist)
-                nwMinDist = min(nw_dist)
-                neMinDist = min(ne_dist)
-
-                sw_X = float(sw_dist[swMinDist][0])
-                sw_Y = float(sw_dist[swMinDist][1])
-                se_X = float(se_dist[seMinDist][0])
-                se_Y = float(se_dist[seMinDist][1])
-
-                nw_X = float(nw_dist[nwMinDist][0])
-                nw_Y = float(nw_dist[nwMinDist][1])
-                ne_X = float(ne_dist[neMinDist][0])
-                ne_Y = float(ne_dist[neMinDist][1])
-
-                north_bound_line = arcpy.Polyline(arcpy.Array([arcpy.Point(nw_X, nw_Y), arcpy.Point(ne_X, ne_Y)]))
-                south_bound_line = arcpy.Polyline(arcpy.Array([arcpy.Point(sw_X, sw_Y), arcpy.Point(se_X, se_Y)]))
-
-                north_row_end = north_bound_line.positionAlongLine(0.5, True)
-                south_row_end = south_bound_line.positionAlongLine(0.5, True)
-
-                insert_cursor.insertRow((north_row_end, polygon_oid, "N"))
-                insert_cursor.insertRow((south_row_end, polygon_oid, "S"))
-
-                sw_point = arcpy.PointGeometry(sw_coordinate)
-                se_point = arcpy.PointGeometry(se_coordinate)
-                nw_point = arcpy.PointGeometry(nw_coordinate)
-                ne_point = arcpy.PointGeometry(ne_coordinate)
-
-                insert_cursor.insertRow((nw_point, polygon_oid, "NW"))
-                insert_cursor.insertRow((ne_point, polygon_oid, "NE"))
-                insert_cursor.insertRow((sw_point, polygon_oid, "SW"))
-                insert_cursor.insertRow((se_point, polygon_oid, "SE"))
-
-            del insert_cursor
-            del search_cursor
+            # North and south row ends and the corners of each row extent
+            insertRowPoints(poaPoints, rowsInput, ["N", "S", "NW", "NE", "SW", "SE"], "EXTENT")
 
             rowPointsJoin = arcpy.analysis.SpatialJoin(poaPoints, rowsInput, "rowPointsJoin", "JOIN_ONE_TO_ONE", "KEEP_ALL")
 
@@ -693,47 +592,13 @@ def xNew(pos,x,ctc):
             # Convert to a raster
             poaEWRaster = arcpy.ddd.TinRaster(poaEW_TIN, "poaEWRaster", "FLOAT", "LINEAR", "CELLSIZE", 1,1)
 
-            # Derive slope
-            # Process aspect in radians
-            AspectDEM = arcpy.sa.SurfaceParameters(
-                in_raster=poaEWRaster,
-                parameter_type="ASPECT",
-                local_surface_type="QUADRATIC",
-                neighborhood_distance="3 Feet",
-                use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-                z_unit=xyzUnit,
-                output_slope_measurement="DEGREE",
-                project_geodesic_azimuths="GEODESIC_AZIMUTHS",
-                use_equatorial_aspect="NORTH_POLE_ASPECT",
-                in_analysis_mask=None
-            )
-       
-        
-            AspectRad = AspectDEM * math.pi / 180
-
-            # Process slope in radians
-            SlopeRaster = arcpy.sa.SurfaceParameters(
-                in_raster=poaEWRaster,
-                parameter_type="SLOPE",
-                local_surface_type="QUADRATIC",
-                use_adaptive_neighborhood="FIXED_NEIGHBORHOOD",
-                z_unit=xyzUnit,
-                output_slope_measurement="DEGREE",
-                project_geodesic_azimuths="GEODESIC_AZIMUTHS",
-                use_equatorial_aspect="NORTH_POLE_ASPECT",
-                in_analysis_mask=None
-            )
-
-            SlopeRad = SlopeRaster * math.pi / 180
-
-            # Process the east-west slope in degrees
-            ewSlope = Sin( AspectRad) * SlopeRad * 180 / math.pi
+            # Derive the north-south and east-west slope in degrees
+            nsSlope, ewSlope = directionalSlopeRaster(poaEWRaster, "QUADRATIC", "Degrees", aspect_distance="3 Feet", zUnit=xyzUnit)
         
             if strings_or_rows == "Strings":
-                nsSlope = Cos( AspectRad) * SlopeRad * 180 / math.pi
                 nsStringBuffer = -2
                 nsStringClip = arcpy.analysis.GraphicBuffer(stringsInput,  r"in_memory\nsStringClip", nsStringBuffer)
-                nsStringStats = arcpy.sa.ZonalStatisticsAsTable(nsStringClip, string_ID, nsSlope, "nsStringStats", "DATA", "ALL")
+                nsStringStats = zonalTables(nsStringClip, string_ID, {"nsStringStats": nsSlope})[0]
 
                 # Join the ns stats to the strings
                 arcpy.management.JoinField(prodStrings,string_ID,nsStringStats,string_ID,[["MAX"],["MEAN"]])
@@ -750,10 +615,9 @@ def xNew(pos,x,ctc):
                 prodBlocks = arcpy.analysis.SummarizeWithin(blockInput, prodStrings, blockOutput, "KEEP_ALL", "power_kW Sum")
 
             # Calculate east-west statistics, north-south statistics, add production and loss fields
-            ewStatsBlocks = arcpy.sa.ZonalStatisticsAsTable(prodBlocks,blockID,ewSlope,r"in_memory\ewStatsBlocks","DATA","ALL")
-
             if poaTerrainOption == "Terrain-based":
-                nsStatsBlocks = arcpy.sa.ZonalStatisticsAsTable(prodBlocks,blockID,nsSlope,r"in_memory\nsStatsBlocks","DATA","ALL")
+                # Both slopes share one rasterization of the blocks
+                ewStatsBlocks, nsStatsBlocks = zonalTables(prodBlocks, blockID, {r"in_memory\ewStatsBlocks": ewSlope, r"in_memory\nsStatsBlocks": nsSlope})
                 arcpy.management.CalculateField(ewStatsBlocks, "prod_ew", ""+specProd+" + "+ewVar+" * (abs(0.5*!STD! * "+numbSTDs+"))", "PYTHON3","", "FLOAT")
                 arcpy.management.JoinField(prodBlocks,blockID,ewStatsBlocks,blockID,["STD","prod_ew"])
                 arcpy.management.AlterField(prodBlocks, "STD", "STD_ewSlope", "STD_ewSlope")
@@ -761,6 +625,7 @@ def xNew(pos,x,ctc):
                 arcpy.management.AlterField(nsStatsBlocks, "MEAN", slopeOutput, slopeOutput)
 
             if poaTerrainOption == "Plane of array-based":
+                ewStatsBlocks = zonalTables(prodBlocks, blockID, {r"in_memory\ewStatsBlocks": ewSlope})[0]
                 if strings_or_rows == "Tracker rows":
                     nsStatsBlocks = arcpy.analysis.SummarizeWithin(prodBlocks, prodRows, r"in_memory\nsStatsBlocks", "KEEP_ALL", [[slopeOutput, "MEAN"]])
                 if strings_or_rows == "Strings":
@@ -803,7 +668,7 @@ def xNew(pos,x,ctc):
         # save ewSlope to a raster
         #ewSlope.save(os.path.join(workspace, "ewSlope_testing")) 
         try:
-            ewStatsRows = arcpy.sa.ZonalStatisticsAsTable(rowsInput,row_ID,ewSlope,r"in_memory\ewStatsRows","DATA","ALL")
+            ewStatsRows = zonalTables(rowsInput, row_ID, {r"in_memory\ewStatsRows": ewSlope})[0]
         except Exception as e:
             arcpy.AddMessage(e)
             arcpy.AddMessage("Failed to calculate east-west statistics; trying clipping rows to the raster extent & recalculating")
@@ -815,7 +680,7 @@ def xNew(pos,x,ctc):
             rowsClip = arcpy.analysis.Clip(rowsInput, domain_ewSlope, "rowsClip")
             
             # calculate the zonal statistics
-            ewStatsRows = arcpy.sa.ZonalStatisticsAsTable(rowsClip, row_ID, ewSlope, r"in_memory\ewStatsRows", "DATA", "ALL")
+            ewStatsRows = zonalTables(rowsClip, row_ID, {r"in_memory\ewStatsRows": ewSlope})[0]
             
             return
 
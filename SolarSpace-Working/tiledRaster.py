@@ -0,0 +1,335 @@
+########################################################################
+"""TILED RASTER EXECUTION
+
+Runs an array pipeline over a DEM too large to hold in memory. Inputs
+and outputs are float32 memory-mapped files; the pipeline is run on one
+tile at a time, each read with a halo of cells around it wide enough to
+cover every window the pipeline uses, and only the tile core is written
+back. The tile size is chosen so each tile's working set stays under a
+memory budget. The focal kernels anchor their running sums to the raster
+index, so the stitched result is bit-identical to a full-raster run.
+
+Tiles can be spread over a pool of worker processes. Inputs and outputs
+are shared with the workers through their memory-mapped files or shared
+memory blocks rather than pickled, and every tile writes only its own
+core, so the stitched output does not depend on the number of workers or
+the order tiles finish in.
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Added the multi-core tile scheduler
+0.0.3 - 10/17/2026 - Measured working memory per tile cell
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import math
+import multiprocessing
+import os.path
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from rasterArrays import RasterGrid
+
+def budgetTileShape(memoryBudget, halo, cellBytes, nRows, nCols):
+    """Largest square tile core whose padded tile fits in the memory budget
+
+    memoryBudget is in MB, halo is (rows, columns) and cellBytes is the
+    pipeline's working memory per padded tile cell. Returns (tileRows,
+    tileCols), limited to the raster size.
+    """
+
+    cells = float(memoryBudget) * 1024 ** 2 / float(cellBytes)
+    if (nRows + 2 * halo[0]) * (nCols + 2 * halo[1]) <= cells:
+        return nRows, nCols
+
+    # Solve (t + 2 * haloRows) * (t + 2 * haloCols) = cells for the core edge t
+    a = 2.0 * (halo[0] + halo[1])
+    b = 4.0 * halo[0] * halo[1] - cells
+    edge = int((-a + np.sqrt(a * a - 4 * b)) / 2) if cells > 4.0 * halo[0] * halo[1] else 0
+    if edge < 1:
+        raise ValueError("Memory budget of " + str(memoryBudget) + " MB is too small for a halo of " + str(halo) + " cells")
+
+    return min(edge, nRows), min(edge, nCols)
+
+def tileCellBytes(func, inputs, **kwargs):
+    """Peak working memory of a tile pipeline per tile cell in bytes, measured with tracemalloc
+
+    Counts the input tile copies runTile makes and every array the
+    pipeline allocates; the TILE_CELL_BYTES budgets of the engines are
+    this measurement on a 1024 x 1024 tile of the medium synthetic site,
+    rounded up.
+    """
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    try:
+        tiles = [np.array(array) for array in inputs]
+        func(*tiles, origin=(0, 0), **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    return peak / float(inputs[0].size)
+
+def tileLayout(nRows, nCols, tileShape, halo):
+    """List of (core, padded) tile windows as (r0, r1, c0, c1), with the padding clipped to the raster"""
+
+    tiles = []
+    for r0 in range(0, nRows, tileShape[0]):
+        r1 = min(r0 + tileShape[0], nRows)
+        for c0 in range(0, nCols, tileShape[1]):
+            c1 = min(c0 + tileShape[1], nCols)
+            padded = (max(r0 - halo[0], 0), min(r1 + halo[0], nRows), max(c0 - halo[1], 0), min(c1 + halo[1], nCols))
+            tiles.append(((r0, r1, c0, c1), padded))
+
+    return tiles
+
+def runTile(func, inputs, outputs, core, padded, **kwargs):
+    """Run the pipeline on one padded tile and write its core to the outputs"""
+
+    pr0, pr1, pc0, pc1 = padded
+    r0, r1, c0, c1 = core
+    tiles = [np.array(array[pr0:pr1, pc0:pc1]) for array in inputs]
+    results = func(*tiles, origin=(pr0, pc0), **kwargs)
+    for out, result in zip(outputs, results):
+        out[r0:r1, c0:c1] = result[r0 - pr0:r1 - pr0, c0 - pc0:c1 - pc0]
+
+def parallelWorkers(factor=None):
+    """Number of worker processes from a parallelProcessingFactor style value
+
+    Accepts a count ("4"), a percentage of the cores ("50%") or an empty
+    value or "0" for every core but one.
+    """
+
+    cores = os.cpu_count() or 1
+    factor = str(factor).strip() if factor is not None else ""
+    try:
+        if factor.endswith("%"):
+            workers = int(math.ceil(cores * float(factor[:-1]) / 100))
+        else:
+            workers = int(float(factor))
+    except ValueError:
+        workers = 0
+    if workers <= 0:
+        workers = cores - 1
+
+    return max(1, workers)
+
+def _shareArray(array):
+    """Describe an array so a worker process can open it without a copy
+
+    Memory maps are shared by file name; other arrays are copied once into
+    a shared memory block. Returns (spec, block), with block None for
+    memory maps.
+    """
+
+    if isinstance(array, np.memmap) and array.filename:
+        return ("file", array.filename), None
+
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+
+    return ("shm", block.name, array.shape, array.dtype.str), block
+
+def _openShared(spec, writable=False):
+    """Open an array shared with _shareArray; returns (array, block)"""
+
+    if spec[0] == "file":
+        return np.load(spec[1], mmap_mode="r+" if writable else "r"), None
+
+    block = shared_memory.SharedMemory(name=spec[1])
+
+    return np.ndarray(spec[2], dtype=np.dtype(spec[3]), buffer=block.buf), block
+
+def _tileWorker(func, inputSpecs, outputSpecs, core, padded, kwargs):
+    """Run one tile in a worker process against the shared inputs and outputs"""
+
+    opened = [_openShared(spec) for spec in inputSpecs] + [_openShared(spec, writable=True) for spec in outputSpecs]
+    arrays = [array for array, block in opened]
+    blocks = [block for array, block in opened if block is not None]
+
+    runTile(func, arrays[:len(inputSpecs)], arrays[len(inputSpecs):], core, padded, **kwargs)
+    for array in arrays[len(inputSpecs):]:
+        if isinstance(array, np.memmap):
+            array.flush()
+
+    # Views into shared memory must be released before the blocks are closed
+    del arrays, opened
+    for block in blocks:
+        block.close()
+
+    return core
+
+def _processContext():
+    """Spawn context that starts workers with python.exe when running inside ArcGIS Pro"""
+
+    context = multiprocessing.get_context("spawn")
+    if os.path.basename(sys.executable).lower() == "arcgispro.exe":
+        context.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+
+    return context
+
+def runTiledParallel(func, inputs, outputs, halo, tileShape, workers, **kwargs):
+    """Run the tiles of runTiled on a pool of worker processes
+
+    func must be a module-level function so the workers can import it.
+    """
+
+    shared = [_shareArray(array) for array in list(inputs) + list(outputs)]
+    inputSpecs = [spec for spec, block in shared[:len(inputs)]]
+    outputSpecs = [spec for spec, block in shared[len(inputs):]]
+
+    nRows, nCols = inputs[0].shape
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_processContext()) as pool:
+            jobs = [pool.submit(_tileWorker, func, inputSpecs, outputSpecs, core, padded, kwargs)
+                    for core, padded in tileLayout(nRows, nCols, tileShape, halo)]
+            for job in jobs:
+                job.result()
+
+        # Copy outputs that were not memory maps back from shared memory
+        for out, (spec, block) in zip(outputs, shared[len(inputs):]):
+            if block is not None:
+                out[...] = np.ndarray(spec[2], dtype=np.dtype(spec[3]), buffer=block.buf)
+    finally:
+        for spec, block in shared:
+            if block is not None:
+                block.close()
+                block.unlink()
+
+    return outputs
+
+def runTiled(func, inputs, outputs, halo, tileShape, workers=1, **kwargs):
+    """Run func(*tiles, origin=(row, col), **kwargs) over every tile of the inputs
+
+    func returns one array per output, each the shape of the padded tile.
+    Inputs and outputs are 2D arrays or memory maps of the same shape.
+    With more than one worker the tiles run in a process pool.
+    """
+
+    nRows, nCols = inputs[0].shape
+    if workers > 1 and len(tileLayout(nRows, nCols, tileShape, halo)) > 1:
+        runTiledParallel(func, inputs, outputs, halo, tileShape, workers, **kwargs)
+    else:
+        for core, padded in tileLayout(nRows, nCols, tileShape, halo):
+            runTile(func, inputs, outputs, core, padded, **kwargs)
+
+    for out in outputs:
+        if isinstance(out, np.memmap):
+            out.flush()
+
+    return outputs
+
+def createMemmap(path, shape, fill=np.nan):
+    """Create a float32 memory-mapped array file filled with a value"""
+
+    array = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=tuple(shape))
+    array[...] = fill
+
+    return array
+
+def stripRows(memoryBudget, nCols, arrays=4):
+    """Number of raster rows per strip so a few float32 strip copies fit in the memory budget"""
+
+    return max(1, int(float(memoryBudget) * 1024 ** 2 / (4.0 * arrays * nCols)))
+
+def subGrid(grid, r0, r1):
+    """Grid of rows r0 to r1 of a grid"""
+
+    return RasterGrid(grid.xMin, grid.yMax - r0 * grid.cellSize, grid.cellSize, r1 - r0, grid.nCols)
+
+def rasterToMemmap(raster, path, grid=None, memoryBudget=1024):
+    """Read a raster strip by strip into a float32 memory-mapped file; returns (array, grid)"""
+    import arcpy
+    from rasterArrays import rasterGrid, readRaster
+
+    ras = raster if isinstance(raster, arcpy.Raster) else arcpy.Raster(str(raster))
+    if grid is None:
+        grid = rasterGrid(ras)
+
+    array = createMemmap(path, (grid.nRows, grid.nCols))
+    nStrip = stripRows(memoryBudget, grid.nCols)
+    for r0 in range(0, grid.nRows, nStrip):
+        r1 = min(r0 + nStrip, grid.nRows)
+        array[r0:r1] = readRaster(ras, subGrid(grid, r0, r1))[0]
+    array.flush()
+
+    return array, grid
+
+def memmapToRaster(array, grid, outRaster, spatialRef, memoryBudget=1024):
+    """Save a float32 array or memory map as a raster dataset, converting it strip by strip"""
+    import arcpy
+    from rasterArrays import toRaster
+
+    nStrip = stripRows(memoryBudget, grid.nCols)
+    strips = []
+    for r0 in range(0, grid.nRows, nStrip):
+        r1 = min(r0 + nStrip, grid.nRows)
+        strips.append(toRaster(np.asarray(array[r0:r1]), subGrid(grid, r0, r1), spatialRef))
+
+    if len(strips) == 1:
+        strips[0].save(outRaster)
+    else:
+        outPath, outName = os.path.split(outRaster)
+        arcpy.management.MosaicToNewRaster(strips, outPath, outName, spatialRef, "32_BIT_FLOAT", grid.cellSize, 1, "FIRST", "FIRST")
+
+    return outRaster
+
+def workerTileShape(memoryBudget, halo, cellBytes, nRows, nCols, workers=1):
+    """Tile core shape when the memory budget is shared by the workers
+
+    Each worker holds one tile, and the raster is split into at least one
+    band of rows per worker so every worker has a tile.
+    """
+
+    tileShape = budgetTileShape(float(memoryBudget) / workers, halo, cellBytes, nRows, nCols)
+    if workers > 1 and len(tileLayout(nRows, nCols, tileShape, halo)) < workers:
+        tileShape = (min(tileShape[0], -(-nRows // workers)), tileShape[1])
+
+    return tileShape
+
+def tiledArrays(func, inputs, nOutputs, halo, cellBytes, memoryBudget, folder, name="tile", workers=1, **kwargs):
+    """Create output memory maps in a folder and run the pipeline over tiles sized to the memory budget"""
+
+    nRows, nCols = inputs[0].shape
+    tileShape = workerTileShape(memoryBudget, halo, cellBytes, nRows, nCols, workers)
+    outputs = [createMemmap(os.path.join(folder, name + "_" + str(i) + ".npy"), (nRows, nCols)) for i in range(nOutputs)]
+
+    return runTiled(func, inputs, outputs, halo, tileShape, workers, **kwargs)
+
+def scalingReport(func, inputs, nOutputs, halo, tileShape, workerCounts, **kwargs):
+    """Time the tiled pipeline for each worker count
+
+    Returns a list of (workers, seconds, speedup, identical) where speedup
+    is against the first worker count and identical reports whether the
+    outputs match the first run bit for bit.
+    """
+
+    report = []
+    baseline = None
+    for workers in workerCounts:
+        outputs = [np.full(inputs[0].shape, np.nan, dtype=np.float32) for i in range(nOutputs)]
+        start = time.perf_counter()
+        runTiled(func, inputs, outputs, halo, tileShape, workers, **kwargs)
+        seconds = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = (seconds, outputs)
+        identical = all(np.array_equal(a, b, equal_nan=True) for a, b in zip(outputs, baseline[1]))
+        report.append((workers, seconds, baseline[0] / seconds, identical))
+
+    return report
@@ -0,0 +1,252 @@
+########################################################################
+"""TOOLBOX TOOL REGISTRY
+
+Names, source modules and dialog metadata of the tools of the SolarSpace
+toolbox. The toolbox lists a lightweight stand-in class per tool built
+from this registry, so opening the toolbox only reads the labels and
+categories below. A tool's module, and with it arcpy.sa, arcpy.ddd,
+numpy and the other heavy imports, is loaded the first time the tool's
+parameters are asked for or the tool is run.
+
+The labels and categories here must follow the tool classes;
+registryMismatches() lists where they have drifted apart.
+
+Runs through the registry are traced stage by stage when SOLARSPACE_TRACE=1
+(see stageTrace).
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/17/2026 - Tool runs traced stage by stage
+0.0.3 - 10/17/2026 - Stage tracing opt-in
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import importlib
+from collections import namedtuple
+
+ToolSpec = namedtuple("ToolSpec", ["name", "module", "label", "description", "category", "canRunInBackground"])
+
+TOOL_SPECS = (
+    ToolSpec("BasePlanes", "basePlanes",
+             "Derive Base Planes of Array",
+             "Creates base planes for single axis tracker rows to derive grading, reveals, and the tracker plane of array",
+             "Civil Analysis\\SAT Grading", False),
+    ToolSpec("BuildableArea", "BuildableArea",
+             "Derive buildable area",
+             "Derives the buildable area based on inputs",
+             "Site Design", False),
+    ToolSpec("SATGradeConventional", "ConventionalGrading",
+             "Conventional Single Axis Tracker Grading Estimate",
+             "Grading estimate using a conventional grading method by pinning the ends of the tracker rows",
+             "Civil Analysis\\SAT Grading", False),
+    ToolSpec("CutFillAssessment", "cutFill",
+             "Cut & Fill Assessment",
+             "Calculates cut & fill rasters and summary volume statistics from graded and existing surfaces. Allows for zonal calculations",
+             "Civil Analysis", False),
+    ToolSpec("DirectionalBuffer", "DirectionalBuffer",
+             "Polygon Directional Graphic Buffer",
+             "Graphically buffers a polygon feature class  east-west and north-south by prescribed distances",
+             "kNz Utilities", False),
+    ToolSpec("SlopeExclusion_v2", "DirectionalSlopeExclusion_v2",
+             "Directional Slope Exclusion Analysis",
+             "Analyzes the slope of a surface in terms of mechanical & production exclusion zones",
+             "Site Suitability\\Terrain Analysis", False),
+    ToolSpec("DirectionalSlope", "DirectionalSlope",
+             "Directional Slope Analysis",
+             "Analyzes the directional slope of a surface N/S & E/W",
+             "Site Suitability\\Terrain Analysis", False),
+    ToolSpec("ewPOAopt", "ewPOAopt",
+             "East-West Plane of Array Optimization",
+             "Optimizes the plane of array using theoretical planes of array from adacent rows",
+             "Civil Analysis\\Optimization", False),
+    ToolSpec("ExclusionLimits", "exclusionLimits",
+             "Create Exclusions from Raster Using Limits",
+             "Creates exclusion areas based on prescribed limits",
+             "kNz Utilities", False),
+    ToolSpec("fixedRackLayout", "fixedRackLayout",
+             "Fixed Rack Layout Tool",
+             "Creates a preliminary fixed rack layout based on a buildable area and technology specifications",
+             "Site Design\\Layout Creation", False),
+    ToolSpec("floodAdj", "floodAdj",
+             "Adjust Grading at Piles to Account for Flood Depths",
+             "Revises grading, reveals, and planes of array at piles to account for flood depths",
+             "Civil Analysis\\SAT Grading Adjustments", False),
+    ToolSpec("gradePilesBounds_v2", "gradePilesBounds_v2",
+             "New graded raster from piles and bounds",
+             " ",
+             "Civil Analysis\\SAT Grading Adjustments", False),
+    ToolSpec("gradeRevisePOA", "gradeRevisePOA",
+             "Revise Grading Based on Adjusted Planes of Array",
+             "Revises grading to planes of array that have been adjusted",
+             "Civil Analysis\\SAT Grading Adjustments", False),
+    ToolSpec("LXMLExport", "LXMLExport",
+             "Export Graded Raster Surface to LandXML",
+             "Exports a raster surface to a LandXML",
+             "Civil Analysis\\Civil Utilities", False),
+    ToolSpec("MassGradev2", "MassGrading_v2",
+             "Mass Grading Assessment",
+             "Creates a heat map of the volume and cost of grading based on the directional slope of a surface",
+             "Site Suitability\\Civil Analysis", False),
+    ToolSpec("maxPOADeltaNS", "maxPOADeltaNS",
+             "Adjust Adjacent Planes of Array N-S Based on a Maximum Delta",
+             "Adjusts the plane of array and grading based on the latitude and the planes of array derived from the standard grading process",
+             "Civil Analysis\\SAT Grading Adjustments", False),
+    ToolSpec("NorthingAdjPOA", "NorthingAdjPOA",
+             "Adjust Pile Northing to Plane of Array",
+             "Adjusts the northing of piles based on the slope of the plane of array",
+             "Civil Analysis\\Civil Utilities", False),
+    ToolSpec("NSPOACheck", "NSPOACheck",
+             "North-South Transition and Shading Checking Tool",
+             "Checks the ends of the rows for transition issues and shading",
+             "Civil Analysis\\Checking Tools", False),
+    ToolSpec("NSSlopePiles", "NSSlopePOAPiles",
+             "Derive North-South Plane of Array Slope from Piles",
+             "Derives the north-south plane of array slope from piles with a top of pile elevation of array field",
+             "Civil Analysis\\Civil Utilities", False),
+    ToolSpec("poaEWcheck", "poaEWcheck",
+             "Plane of Array East-West Tolerance Check",
+             "Creates a raster that defines the slope east-west between the axis of single axis trackers for checking",
+             "Civil Analysis\\Checking Tools", False),
+    ToolSpec("poaRowEnds", "poaRowEnds",
+             "Derive POA at Row Ends from Piles",
+             "Derives the plane of array at the end of rows as points from piles with a top of pile/plane of array height field",
+             "Civil Analysis\\Civil Utilities", False),
+    ToolSpec("PreliminaryGrading", "SATPrelimGrading",
+             "Single Axis Tracker Preliminary Grading Assessment",
+             "Analyzes a surface and calculates potential grading using theoretical solar tracker rows",
+             "Site Suitability\\Civil Analysis", False),
+    ToolSpec("PrelimTerrainLoss", "PrelimTerrainLoss",
+             "Preliminary SAT Terrain Loss Assessment",
+             "Estimates the losses with respect to terrain for single axis trackers without a layout",
+             "Site Suitability\\Terrain Analysis", False),
+    ToolSpec("revisePilesFromPOAEnds", "revisePilesFromPOAEnds",
+             "Calculate New POA Grading and Reveal for Piles from Revised End of Rows",
+             "Calculates the plane of array, grading, and reveal for piles based on adjusted row ends",
+             "Civil Analysis\\SAT Grading Adjustments", False),
+    ToolSpec("SamplePiles", "SamplePiles",
+             "Create Sample Piles for Tracker Rows",
+             "Creates sample piles for tracker rows",
+             "Site Design\\Layout Creation", False),
+    ToolSpec("SATGradingEstimate", "SATGradingEst",
+             "SiTE Optimized Single Axis Tracker Grading Estimate",
+             "Grading algorithm for single axis trackers with a constant reveal tolerance for every pile",
+             "Civil Analysis\\SAT Grading", False),
+    ToolSpec("SATLayoutPrelim", "SATLayoutPrelim",
+             "Create Single Axis Tracker Preliminary Layout",
+             "Creates a preliminary tracker layout based on a buildable area and technology specifications",
+             "Site Design\\Layout Creation", False),
+    ToolSpec("SATSiTE_Rough", "SATSiTE_Rough",
+             "SAT Single Reveal - Rough Grading",
+             " Grading algorithm for single axis trackers with a constant reveal tolerance for every pile",
+             "Civil Analysis\\SAT Grading", False),
+    ToolSpec("SmoothRoughGrading", "SmoothRoughGrading",
+             "Smoothed Grading from Rough Grading",
+             " Creates smoothed grading from rough grading output",
+             "Civil Analysis\\SAT Grading", False),
+    ToolSpec("terrainLoss", "terrainLoss",
+             "Calculate Terrain Losses",
+             "Calculates production-based losses from the plane of array or from the terrain",
+             "SolarAnalytics", False),
+    ToolSpec("TINtoLXML", "TINtoLXML",
+             "Export TIN to LandXML",
+             "Exports a TIN to a LandXML",
+             "Civil Analysis\\Civil Utilities", False),
+    ToolSpec("PtsOnPolygon", "PointsOnPoylgon",
+             "Create Points On Polygons",
+             "Creates points on a polygon",
+             "kNz Utilities", False),
+    ToolSpec("terrainFollowingGrading_v4", "terrainFollowingGrading_v4",
+             "SAT Terrain Following Tracker Grading Analysis",
+             "Performs grading based on terrain following tracker specifications",
+             "Civil Analysis\\SAT Grading", False),
+    ToolSpec("MassGrade", "MassGrading",
+             "Mass Grading Cost Analysis v1 - Outdated",
+             "Estimates the cost of grading based on slope and terrain variation for a surface",
+             "Site Suitability\\Civil Analysis", False),
+    ToolSpec("adjustRows", "adjustRows",
+             "Adjust Rows",
+             "Tilts or adjusts the poa of input rows",
+             "Civil Analysis\\SAT Grading Adjustments", False),
+    ToolSpec("retrievePublicDEM", "retrievePublicDEM",
+             "Retrieve Public DEM Raster dataset",
+             "Find and download a public DEM raster dataset from the USGS National Map or world image server.",
+             "Site Suitability\\Data Retrieval", False),
+    )
+
+_toolClasses = {}
+
+def toolClass(spec):
+    """Tool class of a registry entry, importing its module on first use"""
+
+    if spec.name not in _toolClasses:
+        _toolClasses[spec.name] = getattr(importlib.import_module(spec.module), spec.name)
+
+    return _toolClasses[spec.name]
+
+class LazyTool(object):
+    """Stand-in for a toolbox tool that shows its registry metadata and
+    hands the parameters, validation and execution to the real tool,
+    created on first use"""
+
+    spec = None
+
+    def __init__(self):
+        self.label = self.spec.label
+        self.description = self.spec.description
+        self.canRunInBackground = self.spec.canRunInBackground
+        self.category = self.spec.category
+        self._tool = None
+
+    def tool(self):
+        """Instance of the real tool"""
+
+        if self._tool is None:
+            self._tool = toolClass(self.spec)()
+
+        return self._tool
+
+    def getParameterInfo(self):
+        """Define parameter definitions"""
+        return self.tool().getParameterInfo()
+
+    def isLicensed(self):
+        """Set whether tool is licensed to execute."""
+        return True
+
+    def updateParameters(self, parameters):
+        """Modify the values and properties of parameters before internal
+        validation is performed."""
+        return self.tool().updateParameters(parameters)
+
+    def updateMessages(self, parameters):
+        """Modify the messages created by internal validation for each tool
+        parameter."""
+        return self.tool().updateMessages(parameters)
+
+    def execute(self, parameters, messages):
+        """Run the tool, tracing the time and memory of its progressor stages when tracing is on"""
+        from stageTrace import tracedExecute
+        return tracedExecute(self.spec.name, self.tool().execute, parameters, messages)
+
+def lazyTools(specs=TOOL_SPECS):
+    """Stand-in tool classes of registry entries, named as the tools so the toolbox and its metadata files see the same tool names"""
+
+    return [type(spec.name, (LazyTool,), {"spec": spec, "__doc__": spec.description}) for spec in specs]
+
+def registryMismatches(specs=TOOL_SPECS):
+    """(tool, attribute, registry value, tool value) where the registry differs from the tool classes; imports every tool"""
+
+    mismatches = []
+    for spec in specs:
+        tool = toolClass(spec)()
+        for attribute in ("label", "description", "category", "canRunInBackground"):
+            if getattr(spec, attribute) != getattr(tool, attribute, None):
+                mismatches.append((spec.name, attribute, getattr(spec, attribute), getattr(tool, attribute, None)))
+
+    return mismatches
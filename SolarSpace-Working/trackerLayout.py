@@ -0,0 +1,155 @@
+########################################################################
+"""SINGLE AXIS TRACKER LAYOUT GEOMETRY
+
+Block, row block, row, string and inverter rectangles of a preliminary
+single axis tracker layout computed arithmetically. The inverter blocks
+tile the buildable area's extent from its lower-left corner; each block
+is shrunk to its rows plus the north-south row gaps and cut into row
+blocks, each row block into rows at the east-west pitch and each row into
+strings. Rectangles are (xMin, yMin, xMax, yMax) arrays, and are written
+to feature classes with one insert cursor per output.
+
+Revision log
+0.0.1 - 10/17/2026 - Initial scripting
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.1"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import math
+from collections import namedtuple
+import numpy as np
+
+TrackerLayout = namedtuple("TrackerLayout", ["blocks", "blockCell", "rowBlocks", "rows", "rowBlock", "strings", "stringRow", "nCols", "nRows"])
+
+# Little-endian OGC WKB polygon of one five point ring
+_WKB_RECTANGLE = np.dtype([("order", "u1"), ("type", "<u4"), ("rings", "<u4"), ("points", "<u4"), ("xy", "<f8", (10,))])
+
+def fishnetCells(extent, cellWidth, cellHeight):
+    """Fishnet cells covering an extent from its lower-left corner, row by row from the bottom
+
+    Returns (cells (n, 4), column, row) as CreateFishnet lays them out with
+    the extent as its template.
+    """
+
+    xMin, yMin, xMax, yMax = extent
+    nCols = max(int(math.ceil((xMax - xMin) / cellWidth - 1e-9)), 1)
+    nRows = max(int(math.ceil((yMax - yMin) / cellHeight - 1e-9)), 1)
+    row, col = np.divmod(np.arange(nRows * nCols), nCols)
+    x0 = xMin + col * cellWidth
+    y0 = yMin + row * cellHeight
+
+    return np.column_stack([x0, y0, x0 + cellWidth, y0 + cellHeight]), col, row
+
+def trackerLayout(extent, rowWidth, rowLength, pitch, rowGap, roadWidth, nsRowsBlock, ewRowsBlock, stringsRow):
+    """Blocks, row blocks, rows and strings of a layout over an extent
+
+    Row blocks are the strips of rows of a block including half a row gap
+    above and below, as the row block limits of the block row removal.
+    rowBlock, stringRow and blockCell give the 0-based parent of each
+    rectangle; the fishnet is nCols by nRows blocks.
+    """
+
+    gapEW = pitch - rowWidth
+    nsBlock = nsRowsBlock * rowLength + (nsRowsBlock - 1) * rowGap
+    ewBlock = ewRowsBlock * pitch - gapEW
+    blocks, col, row = fishnetCells(extent, ewBlock + roadWidth, nsBlock + roadWidth)
+
+    # Blocks shrunk by half the spare width on each side and by half of the road less a row gap top and bottom
+    xAdj = ewBlock + roadWidth - pitch * ewRowsBlock
+    yAdj = roadWidth - rowGap
+    left = blocks[:, 0] + xAdj / 2
+    bottom = blocks[:, 1] + yAdj / 2
+
+    # Row blocks stacked north-south, one row length and gap each
+    strip = rowLength + rowGap
+    rowBlock = np.repeat(np.arange(len(blocks)), nsRowsBlock)
+    rbBottom = bottom[rowBlock] + np.tile(np.arange(nsRowsBlock), len(blocks)) * strip
+    rowBlocks = np.column_stack([left[rowBlock], rbBottom, left[rowBlock] + ewRowsBlock * pitch, rbBottom + strip])
+
+    # Rows east-west at the pitch, less half the east-west gap on each side
+    parent = np.repeat(np.arange(len(rowBlocks)), ewRowsBlock)
+    rLeft = rowBlocks[parent, 0] + np.tile(np.arange(ewRowsBlock), len(rowBlocks)) * pitch + gapEW / 2
+    rBottom = rowBlocks[parent, 1] + rowGap / 2
+    rows = np.column_stack([rLeft, rBottom, rLeft + rowWidth, rBottom + rowLength])
+
+    # Strings stacked north-south along each row
+    stringRow = np.repeat(np.arange(len(rows)), int(stringsRow))
+    sLength = rowLength / float(stringsRow)
+    sBottom = rows[stringRow, 1] + np.tile(np.arange(int(stringsRow)), len(rows)) * sLength
+    strings = np.column_stack([rows[stringRow, 0], sBottom, rows[stringRow, 2], sBottom + sLength])
+
+    return TrackerLayout(blocks, np.column_stack([col, row]), rowBlocks, rows, rowBlock[parent], strings, stringRow,
+                         int(col.max()) + 1, int(row.max()) + 1)
+
+def inverterPads(blocks, pitch, rowLength, rowGap, roadWidth, nsRowsBlock, ewRowsBlock, stringsRow, inverterWidth, inverterLength):
+    """Inverter pad of every block, offset from the block center and padded by one unit on each side"""
+
+    nsFishnet = blocks[:, 3] - blocks[:, 1]
+    yAdj = (nsFishnet - (nsRowsBlock - 1) * rowGap - roadWidth / 2 - rowLength / float(stringsRow)) / 2
+    xAdj = pitch * (ewRowsBlock - 1) / 2 - pitch / 2
+    x = (blocks[:, 0] + blocks[:, 2]) / 2 + xAdj
+    y = (blocks[:, 1] + blocks[:, 3]) / 2 + yAdj
+    halfWidth = inverterWidth / 2.0 + 1
+    halfLength = inverterLength / 2.0 + 1
+
+    return np.column_stack([x - halfWidth, y - halfLength, x + halfWidth, y + halfLength])
+
+def rectangleDistance(a, b):
+    """Distance between pairs of rectangles, zero where they touch or overlap"""
+
+    dx = np.maximum(np.maximum(a[:, 0] - b[:, 2], b[:, 0] - a[:, 2]), 0)
+    dy = np.maximum(np.maximum(a[:, 1] - b[:, 3], b[:, 1] - a[:, 3]), 0)
+
+    return np.hypot(dx, dy)
+
+def nearPads(layout, pads, distance):
+    """Strings within a distance of the inverter pad of their block or a neighboring block"""
+
+    stringBlock = layout.rowBlock[layout.stringRow]
+    col, row = layout.blockCell[stringBlock, 0], layout.blockCell[stringBlock, 1]
+    near = np.zeros(len(layout.strings), dtype=bool)
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            c, r = col + dc, row + dr
+            valid = (c >= 0) & (c < layout.nCols) & (r >= 0) & (r < layout.nRows)
+            pad = pads[np.where(valid, r * layout.nCols + c, 0)]
+            near |= valid & (rectangleDistance(layout.strings, pad) <= distance)
+
+    return near
+
+def rectangleWKB(rectangles):
+    """WKB polygons of rectangles with clockwise rings"""
+
+    rectangles = np.asarray(rectangles, dtype=np.float64).reshape(-1, 4)
+    records = np.zeros(len(rectangles), dtype=_WKB_RECTANGLE)
+    records["order"] = 1
+    records["type"] = 3
+    records["rings"] = 1
+    records["points"] = 5
+    x0, y0, x1, y1 = rectangles.T
+    records["xy"] = np.column_stack([x0, y0, x0, y1, x1, y1, x1, y0, x0, y0])
+
+    data = records.tobytes()
+    size = _WKB_RECTANGLE.itemsize
+
+    return [bytearray(data[i:i + size]) for i in range(0, len(data), size)]
+
+def writeRectangles(outPath, outName, rectangles, spatialRef, fields=(), values=()):
+    """Polygon feature class of rectangles with LONG fields, written with one insert cursor"""
+    import arcpy
+
+    outFC = arcpy.management.CreateFeatureclass(outPath, outName, "POLYGON", None, "DISABLED", "DISABLED", spatialRef)[0]
+    if fields:
+        arcpy.management.AddFields(outFC, [[field, "LONG"] for field in fields])
+
+    columns = [np.asarray(v).astype(int).tolist() for v in values]
+    with arcpy.da.InsertCursor(outFC, ["SHAPE@WKB"] + list(fields)) as cursor:
+        for record in zip(rectangleWKB(rectangles), *columns):
+            cursor.insertRow(record)
+
+    return outFC
@@ -0,0 +1,229 @@
+########################################################################
+"""ZONAL STATISTICS ENGINE
+
+Zonal statistics of rows, blocks and zones on float32 NumPy arrays. The
+zone polygons are rasterized once into label arrays and sorted once, then
+COUNT, SUM, MEAN, STD, MINIMUM, MAXIMUM and RANGE of any number of value
+rasters are reduced per zone in vectorized passes. NoData (NaN) cells are
+ignored as with ignore_nodata="DATA".
+
+Revision log
+0.0.1 - 10/16/2026 - Initial scripting
+0.0.2 - 10/16/2026 - Feature to zone label lookup shared with the cut/fill volume engine
+0.0.3 - 10/17/2026 - STD from squared deviations about the zone means
+"""
+
+__copyright__   = "Copyright 2026, KiloNewton, LLC"
+__version__     = "0.0.3"
+__license__     = "Internal"
+__ArcVersion__  = "ArcPro 3.2.1"
+__status__      = "Testing"
+
+# Load modules
+import os.path
+import numpy as np
+from rasterArrays import rasterizePolygons
+
+# Statistics written by ZonalStatisticsAsTable with statistics_type="ALL"
+TABLE_STATISTICS = ["COUNT", "AREA", "MIN", "MAX", "RANGE", "MEAN", "STD", "SUM"]
+
+def zoneIndex(labelLayers):
+    """Sort the labelled cells of each label layer by label
+
+    Returns a list of (cells, labels, starts) per layer: the flat indices
+    of the labelled cells in label order, the label of each run of cells
+    and the start of each run.
+    """
+
+    index = []
+    for layer in labelLayers:
+        flat = layer.ravel()
+        cells = np.flatnonzero(flat)
+        cells = cells[np.argsort(flat[cells], kind="stable")]
+        sortedLabels = flat[cells]
+        starts = np.flatnonzero(np.r_[True, sortedLabels[1:] != sortedLabels[:-1]]) if len(cells) else np.zeros(0, dtype=np.int64)
+        index.append((cells, sortedLabels[starts], starts))
+
+    return index
+
+def zonalStatistics(index, nLabels, values):
+    """COUNT, SUM, MEAN, STD, MINIMUM, MAXIMUM and RANGE of each value array per label
+
+    values is a dictionary of {name: array}; returns {name: {statistic:
+    array}} with one entry per label 0..nLabels. Labels with no data are
+    NaN (COUNT is 0). STD is the population standard deviation, summed
+    about each zone's mean in a second pass so elevation-scale values
+    keep their precision.
+    """
+
+    results = {}
+    for name, array in values.items():
+        flat = array.ravel()
+        count = np.zeros(nLabels + 1)
+        total = np.zeros(nLabels + 1)
+        high = np.full(nLabels + 1, -np.inf)
+        low = np.full(nLabels + 1, np.inf)
+
+        for cells, labels, starts in index:
+            if len(cells) == 0:
+                continue
+            v = flat[cells].astype(np.float64)
+            valid = ~np.isnan(v)
+            runLabels = np.repeat(labels, np.diff(np.r_[starts, len(cells)]))
+
+            count += np.bincount(runLabels, valid, minlength=nLabels + 1)
+            filled = np.where(valid, v, 0)
+            total += np.bincount(runLabels, filled, minlength=nLabels + 1)
+
+            # Runs are contiguous so max and min reduce over each run
+            np.maximum.at(high, labels, np.maximum.reduceat(np.where(valid, v, -np.inf), starts))
+            np.minimum.at(low, labels, np.minimum.reduceat(np.where(valid, v, np.inf), starts))
+
+        noData = count == 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+
+        # Squared deviations about the zone means
+        totalSq = np.zeros(nLabels + 1)
+        for cells, labels, starts in index:
+            if len(cells) == 0:
+                continue
+            v = flat[cells].astype(np.float64)
+            runLabels = np.repeat(labels, np.diff(np.r_[starts, len(cells)]))
+            deviation = np.where(np.isnan(v), 0, v - mean[runLabels])
+            totalSq += np.bincount(runLabels, deviation * deviation, minlength=nLabels + 1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(totalSq / count)
+        stats = {"COUNT": count, "SUM": total, "MEAN": mean, "STD": std, "MINIMUM": low, "MAXIMUM": high, "RANGE": high - low}
+        for key in stats:
+            if key != "COUNT":
+                stats[key][noData] = np.nan
+        results[name] = stats
+
+    return results
+
+def zonalFill(labelLayers, zoneValues):
+    """Spread a per-label value back over the cells of each label
+
+    Where labels overlap, the first label layer is used. Unlabelled cells
+    are NaN.
+    """
+
+    zoneValues = np.asarray(zoneValues, dtype=np.float32)
+    out = np.full(labelLayers[0].shape if labelLayers else (0, 0), np.nan, dtype=np.float32)
+    for labels in reversed(labelLayers):
+        out = np.where(labels > 0, zoneValues[labels], out)
+
+    return out
+
+def featureZones(values):
+    """Zone label of each feature label, with features sharing a zone value given one label
+
+    Returns (featureZone, zoneIDs): featureZone[i] is the zone label of
+    feature i (1..n, 0 for no value) and zone label j is zoneIDs[j - 1].
+    """
+
+    zoneIDs = []
+    lookup = {}
+    featureZone = np.zeros(len(values) + 1, dtype=np.int32)
+    for i, value in enumerate(values, start=1):
+        if value is None:
+            continue
+        if value not in lookup:
+            zoneIDs.append(value)
+            lookup[value] = len(zoneIDs)
+        featureZone[i] = lookup[value]
+
+    return featureZone, zoneIDs
+
+def zoneLabels(featureClass, zoneField, grid):
+    """Rasterize zone polygons on a grid, with features sharing a zone value given one label
+
+    Returns (labelLayers, zoneIDs) where label i is zoneIDs[i - 1].
+    """
+    from rasterArrays import readPolygons
+
+    polygons, values = readPolygons(featureClass, zoneField)
+    featureZone, zoneIDs = featureZones(values)
+
+    labelLayers = [featureZone[layer] for layer in rasterizePolygons(polygons, grid)]
+
+    return labelLayers, zoneIDs
+
+def _zonalRasters(featureClass, zoneField, valueRasters):
+    """Read the value rasters on the grid of the first, rasterize the zones and reduce them"""
+    from rasterArrays import readRaster
+
+    grid = None
+    arrays = {}
+    for name, raster in valueRasters.items():
+        arrays[name], grid = readRaster(raster, grid)
+
+    labelLayers, zoneIDs = zoneLabels(featureClass, zoneField, grid)
+    results = zonalStatistics(zoneIndex(labelLayers), len(zoneIDs), arrays)
+
+    return zoneIDs, labelLayers, results, grid
+
+def zonalArrays(featureClass, zoneField, valueRasters):
+    """Statistics of several value rasters over the zones of a feature class, keyed by zone ID
+
+    valueRasters is a dictionary of {name: raster}; every raster is read on
+    the grid of the first. Returns (zoneIDs, {name: {statistic: array}})
+    with the statistic arrays aligned to zoneIDs.
+    """
+
+    zoneIDs, labelLayers, results, grid = _zonalRasters(featureClass, zoneField, valueRasters)
+    for name in results:
+        results[name] = dict((key, stat[1:]) for key, stat in results[name].items())
+
+    return zoneIDs, results
+
+def zonalRaster(featureClass, zoneField, valueRaster, statistics_type):
+    """Drop-in replacement for arcpy.sa.ZonalStatistics(featureClass, zoneField, valueRaster, statistics_type, "DATA")"""
+    import arcpy
+    from rasterArrays import toRaster
+
+    ras = valueRaster if isinstance(valueRaster, arcpy.Raster) else arcpy.Raster(str(valueRaster))
+    zoneIDs, labelLayers, results, grid = _zonalRasters(featureClass, zoneField, {"value": ras})
+
+    return toRaster(zonalFill(labelLayers, results["value"][statistics_type.upper()]), grid, ras.spatialReference)
+
+def zonalTables(featureClass, zoneField, valueRasters):
+    """Drop-in replacement for ZonalStatisticsAsTable(..., "DATA", "ALL") on several value rasters
+
+    valueRasters is a dictionary of {output table: raster}. The zones are
+    rasterized once and each table is written with the zone field and
+    the COUNT, AREA, MIN, MAX, RANGE, MEAN, STD and SUM fields. Zones with
+    no data are left out. Returns the list of tables.
+    """
+    import arcpy
+
+    zoneIDs, labelLayers, results, grid = _zonalRasters(featureClass, zoneField, valueRasters)
+    ids = np.array(zoneIDs)
+    if ids.dtype.kind in "iu":
+        ids = ids.astype(np.int32)
+    cellArea = grid.cellSize ** 2
+
+    tables = []
+    for outTable, stats in results.items():
+        stats = dict((key, stat[1:]) for key, stat in stats.items())
+        keep = stats["COUNT"] > 0
+        columns = {"COUNT": stats["COUNT"], "AREA": stats["COUNT"] * cellArea,
+                   "MIN": stats["MINIMUM"], "MAX": stats["MAXIMUM"], "RANGE": stats["RANGE"],
+                   "MEAN": stats["MEAN"], "STD": stats["STD"], "SUM": stats["SUM"]}
+
+        dtype = [(zoneField, ids.dtype)] + [(key, np.int32 if key == "COUNT" else np.float64) for key in TABLE_STATISTICS]
+        records = np.zeros(int(keep.sum()), dtype=dtype)
+        records[zoneField] = ids[keep]
+        for key in TABLE_STATISTICS:
+            records[key] = columns[key][keep]
+
+        if not os.path.isabs(outTable) and not outTable.lower().startswith(("in_memory", "memory")):
+            outTable = os.path.join(arcpy.env.workspace, outTable)
+        if arcpy.Exists(outTable):
+            arcpy.management.Delete(outTable)
+        arcpy.da.NumPyArrayToTable(records, outTable)
+        tables.append(outTable)
+
+    return tables